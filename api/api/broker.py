@@ -1,5 +1,7 @@
+import inspect
 import logging
 import os
+from collections.abc import Callable
 from typing import Any
 
 from taskiq import SimpleRetryMiddleware, TaskiqEvents, TaskiqMessage, TaskiqResult, TaskiqState
@@ -8,9 +10,13 @@ from typing_extensions import override
 
 from api.common import setup
 from api.errors import configure_scope_for_error
+from api.jobs.utils.run_counters import shared_run_counters
 from api.utils import close_metrics, setup_metrics
 from core.domain.errors import InternalError
 from core.domain.metrics import Metric
+from core.providers.base.httpx_provider import shared_client_pool
+from core.runners.workflowai.workflowai_runner import WorkflowAIRunner
+from core.storage.clickhouse.clickhouse_client import ClickhouseClient
 from core.utils.background import wait_for_background_tasks
 
 setup()
@@ -95,9 +101,37 @@ broker = _broker().with_middlewares(
 async def worker_startup(state: TaskiqState):
     state.metrics_service = await setup_metrics()
 
+    # Runs are stored one by one by the store_task_run job, batching inserts
+    # across jobs in the worker
+    if os.getenv("CLICKHOUSE_RUN_BATCHING", "true") == "true":
+        ClickhouseClient.enable_run_batching()
+        if clickhouse_dsn := os.getenv("CLICKHOUSE_CONNECTION_STRING"):
+            await ClickhouseClient.replay_spooled_runs(clickhouse_dsn)
+
+    # Run counters are written periodically instead of once per run
+    if os.getenv("RUN_COUNTERS_AGGREGATION", "true") == "true":
+        shared_run_counters.start()
+
+    shared_client_pool.start()
+
 
 @broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
 async def worker_shutdown(state: TaskiqState):
-    await close_metrics(state.metrics_service)
-
-    await wait_for_background_tasks()
+    steps: list[tuple[str, Callable[[], Any]]] = [
+        # Flushing pending runs and counters before closing the metrics since they send metrics
+        ("run_batchers", ClickhouseClient.close_run_batchers),
+        ("run_counters", shared_run_counters.close),
+        ("client_pool", shared_client_pool.close_all),
+        ("pdf_renderer", WorkflowAIRunner.pdf_renderer.shutdown),
+        ("image_preprocessor", WorkflowAIRunner.image_preprocessor.shutdown),
+        ("metrics", lambda: close_metrics(state.metrics_service)),
+        ("background_tasks", wait_for_background_tasks),
+    ]
+    # A failing step should not prevent the next ones from running
+    for name, step in steps:
+        try:
+            result = step()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            _logger.exception("Failed to run worker shutdown step", extra={"step": name})
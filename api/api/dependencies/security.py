@@ -24,6 +24,7 @@ from core.domain.users import User
 from core.storage import ObjectNotFoundException
 from core.storage.backend_storage import SystemBackendStorage
 from core.storage.organization_storage import OrganizationSystemStorage
+from core.storage.tenant_cache import shared_tenant_cache
 from core.utils import no_op
 from core.utils.encryption import Encryption
 
@@ -161,7 +162,7 @@ OrgSystemStorageDep = Annotated[OrganizationSystemStorage, Depends(system_org_st
 
 
 def security_service_dependency(org_storage: OrgSystemStorageDep) -> SecurityService:
-    return SecurityService(org_storage, system_event_router())
+    return SecurityService(org_storage, system_event_router(), shared_tenant_cache)
 
 
 SecurityServiceDep = Annotated[SecurityService, Depends(security_service_dependency)]
@@ -212,7 +213,11 @@ async def url_public_organization(
             return user_org
 
     try:
-        return await org_storage.get_public_organization(tenant_param)
+        return await shared_tenant_cache.get_or_fetch(
+            ("slug", tenant_param),
+            PublicOrganizationData,
+            lambda: org_storage.get_public_organization(tenant_param),
+        )
     except ObjectNotFoundException:
         # TODO: raise a 404 if the tenant does not exist
         # Leaving it as a warning for now, to make sure we don't old clients using invalid URLs
@@ -10,9 +10,9 @@ from api.jobs.common import (
     StorageDep,
 )
 from api.jobs.utils.jobs_utils import get_task_run_str
+from api.jobs.utils.run_counters import shared_run_counters
 from api.services.slack_notifications import get_user_and_org_str
 from core.domain.events import RunCreatedEvent
-from core.domain.task_group_update import TaskGroupUpdate
 from core.storage.models import TaskUpdate
 
 
@@ -37,6 +37,14 @@ async def evaluate_run_review(event: RunCreatedEvent, reviews_service: ReviewsSe
     )
 
 
+@broker.task(retry_on_error=False)
+async def add_run_to_review_benchmark(event: RunCreatedEvent, reviews_service: ReviewsServiceDep):
+    if _is_run_external(event):
+        return
+
+    await reviews_service.add_run_to_review_benchmark(event.run)
+
+
 @broker.task(retry_on_error=False)
 async def decrement_credits(event: RunCreatedEvent, payment_service: PaymentSystemServiceDep):
     if cost := event.run.credits_used:
@@ -47,26 +55,25 @@ async def decrement_credits(event: RunCreatedEvent, payment_service: PaymentSyst
 
 
 @broker.task(retry_on_error=False)
-async def increment_run_count(event: RunCreatedEvent, storage: StorageDep):
-    await storage.task_groups.increment_run_count(
-        event.run.task_id,
-        event.run.task_schema_id,
-        event.run.group.iteration,
-        increment=1,
-    )
+async def update_run_counters(event: RunCreatedEvent):
+    """Increments the run count and updates the last active date of the task group.
+    Writes are aggregated in the worker and applied periodically"""
+    await shared_run_counters.add(event)
+
+
+# Deprecated, replaced by update_run_counters. Kept so that events sent by API instances that
+# are not updated yet are still processed, should be removed after the next release.
+@broker.task(retry_on_error=False)
+async def increment_run_count(event: RunCreatedEvent):
+    await shared_run_counters.add(event, update_last_active_at=False)
 
 
+# Deprecated, replaced by update_run_counters. See increment_run_count.
 @broker.task(retry_on_error=False)
-async def update_task_group_last_active_at(event: RunCreatedEvent, storage: StorageDep):
+async def update_task_group_last_active_at(event: RunCreatedEvent):
     if not event.run.is_active:
         return
-
-    await storage.task_groups.update_task_group(
-        task_id=event.run.task_id,
-        task_schema_id=event.run.task_schema_id,
-        iteration=event.run.group.iteration,
-        update=TaskGroupUpdate(last_active_at=datetime.now(timezone.utc)),
-    )
+    await shared_run_counters.add(event, run_count=0)
 
 
 @broker.task(retry_on_error=False)
@@ -75,7 +82,7 @@ async def update_task_schema_last_active_at(
     storage: StorageDep,
     customer_service: CustomerServiceDep,
 ):
-    if not event.run.is_active:
+    if not event.run.is_active or not shared_run_counters.should_write_schema_last_active_at(event):
         return
 
     before_update = await storage.tasks.update_task(
@@ -118,9 +125,9 @@ async def run_task_run_moderation(
 
 JOBS = [
     decrement_credits,
-    increment_run_count,
+    update_run_counters,
     evaluate_run_review,
-    update_task_group_last_active_at,
+    add_run_to_review_benchmark,
     update_task_schema_last_active_at,
     run_task_run_moderation,
 ]
@@ -1,5 +1,6 @@
 from api.broker import broker
 from api.jobs.common import RunsServiceDep
+from api.services.run_payloads import shared_run_payloads
 from core.domain.events import StoreTaskRunEvent
 
 
@@ -8,13 +9,15 @@ async def store_task_run(
     event: StoreTaskRunEvent,
     runs_service: RunsServiceDep,
 ):
+    task, run = await shared_run_payloads.check_out(event)
     await runs_service.store_task_run(
-        event.task,
-        event.run,
+        task,
+        run,
         event.user_identifier,
         event.trigger,
         event.user_properties.client_source if event.user_properties else None,
     )
+    await shared_run_payloads.release(event)
 
 
 JOBS = [store_task_run]
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from api.services import storage as storage_service
+from core.domain.events import RunCreatedEvent
+from core.domain.metrics import send_gauge
+from core.domain.task_group_update import TaskGroupRunCounters
+from core.storage import TenantTuple
+from core.utils import no_op
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import TLRUCache
+
+_logger = logging.getLogger(__name__)
+
+_FLUSH_INTERVAL_SECONDS = float(os.getenv("RUN_COUNTERS_FLUSH_INTERVAL_SECONDS", "1"))
+_SCHEMA_ACTIVE_WINDOW_SECONDS = float(os.getenv("RUN_COUNTERS_SCHEMA_ACTIVE_WINDOW_SECONDS", "60"))
+
+FlushTaskGroupsFn = Callable[[TenantTuple, Sequence[TaskGroupRunCounters]], Awaitable[None]]
+
+
+class _GroupKey(NamedTuple):
+    tenant: str
+    tenant_uid: int
+    task_id: str
+    task_schema_id: int
+    iteration: int
+
+
+class _GroupCounters(NamedTuple):
+    run_count: int
+    last_active_at: datetime | None
+
+
+def _max_date(a: datetime | None, b: datetime | None) -> datetime | None:
+    if a is None or b is None:
+        return a or b
+    return max(a, b)
+
+
+class RunCounterAggregator:
+    """Accumulates the writes triggered by each created run and applies them periodically:
+
+    - run counts and last active dates are applied with a single bulk write per tenant
+    - the last active date of a task schema is only written once per window since
+      the write is not aggregatable, it is followed by a became active notification
+
+    Pending counters are lost if the worker crashes before a flush, which is acceptable for
+    counters but not for credits so credits are still decremented once per run.
+
+    The aggregator is only started in workers. When it is not started, for example
+    in tests, counters are written right away."""
+
+    def __init__(
+        self,
+        flush_task_groups: FlushTaskGroupsFn,
+        flush_interval_seconds: float = _FLUSH_INTERVAL_SECONDS,
+        schema_last_active_window_seconds: float = _SCHEMA_ACTIVE_WINDOW_SECONDS,
+    ):
+        self._flush_task_groups = flush_task_groups
+        self._flush_interval_seconds = flush_interval_seconds
+        self._groups: dict[_GroupKey, _GroupCounters] = {}
+        self._flush_lock = asyncio.Lock()
+        self._loop: asyncio.Task[None] | None = None
+        self._periodic_flush: asyncio.Task[None] | None = None
+        window = timedelta(seconds=schema_last_active_window_seconds)
+        self._schema_last_active_writes = TLRUCache[tuple[str, str, int], bool](10_000, lambda _, __: window)
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    def start(self):
+        if self._loop is None:
+            self._loop = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self._flush_interval_seconds)
+            # The flush runs in its own task and is shielded so that cancelling the loop on close
+            # does not drop the groups that are being written
+            self._periodic_flush = asyncio.create_task(self.flush())
+            try:
+                await asyncio.shield(self._periodic_flush)
+            except Exception:
+                # Should not happen since flushes log their own errors but the loop must survive
+                _logger.exception("Unexpected error while flushing run counters")
+
+    @classmethod
+    def _merge_group(cls, groups: dict[_GroupKey, _GroupCounters], key: _GroupKey, counters: _GroupCounters):
+        if existing := groups.get(key):
+            counters = _GroupCounters(
+                existing.run_count + counters.run_count,
+                _max_date(existing.last_active_at, counters.last_active_at),
+            )
+        groups[key] = counters
+
+    async def add(self, event: RunCreatedEvent, run_count: int = 1, update_last_active_at: bool = True):
+        key = _GroupKey(
+            event.tenant,
+            event.tenant_uid,
+            event.run.task_id,
+            event.run.task_schema_id,
+            event.run.group.iteration,
+        )
+        last_active_at = datetime.now(timezone.utc) if update_last_active_at and event.run.is_active else None
+        counters = _GroupCounters(run_count, last_active_at)
+
+        if not self.started:
+            await self._write_task_groups({key: counters})
+            return
+
+        self._merge_group(self._groups, key, counters)
+
+    def should_write_schema_last_active_at(self, event: RunCreatedEvent) -> bool:
+        """Returns false if the last active date of the schema was written recently by this worker"""
+        if not self.started:
+            return True
+        key = (event.tenant, event.run.task_id, event.run.task_schema_id)
+        if self._schema_last_active_writes.get(key):
+            return False
+        self._schema_last_active_writes[key] = True
+        return True
+
+    async def _write_task_groups(self, groups: dict[_GroupKey, _GroupCounters]):
+        by_tenant: dict[TenantTuple, list[TaskGroupRunCounters]] = {}
+        for key, counters in groups.items():
+            by_tenant.setdefault((key.tenant, key.tenant_uid), []).append(
+                TaskGroupRunCounters(
+                    task_id=key.task_id,
+                    task_schema_id=key.task_schema_id,
+                    iteration=key.iteration,
+                    run_count=counters.run_count,
+                    last_active_at=counters.last_active_at,
+                ),
+            )
+
+        for tenant, task_group_counters in by_tenant.items():
+            try:
+                await self._flush_task_groups(tenant, task_group_counters)
+            except Exception:
+                _logger.exception(
+                    "Failed to write task group run counters",
+                    extra={"tenant": tenant[0], "count": len(task_group_counters)},
+                )
+
+    async def flush(self):
+        async with self._flush_lock:
+            groups, self._groups = self._groups, {}
+            if not groups:
+                return
+
+            start = time.time()
+            await self._write_task_groups(groups)
+            add_background_task(send_gauge("run_counters_flush_seconds", time.time() - start, groups=len(groups)))
+
+    async def close(self):
+        """Stops the periodic flushes and writes the remaining counters, after the flush
+        in progress if any"""
+        if self._loop is not None:
+            self._loop.cancel()
+            self._loop = None
+        # Waits for the flush in progress since it holds the flush lock
+        await self.flush()
+        self._periodic_flush = None
+
+
+async def _flush_task_groups(tenant: TenantTuple, counters: Sequence[TaskGroupRunCounters]):
+    storage = storage_service.storage_for_tenant(tenant[0], tenant[1], no_op.event_router)
+    await storage.task_groups.apply_run_counters(counters)
+
+
+shared_run_counters = RunCounterAggregator(_flush_task_groups)
@@ -0,0 +1,161 @@
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from api.jobs.utils.run_counters import RunCounterAggregator
+from core.domain.events import RunCreatedEvent
+from core.domain.task_group_update import TaskGroupRunCounters
+
+
+@pytest.fixture(autouse=True)
+def patched_send_gauge():
+    with patch("api.jobs.utils.run_counters.send_gauge") as mock:
+        yield mock
+
+
+@pytest.fixture
+def flush_task_groups():
+    return AsyncMock()
+
+
+@pytest.fixture
+def aggregator(flush_task_groups: AsyncMock):
+    return RunCounterAggregator(flush_task_groups, flush_interval_seconds=1000)
+
+
+def _event(tenant: str = "tenant", iteration: int = 1, is_active: bool = True):
+    event = Mock(spec=RunCreatedEvent)
+    event.tenant = tenant
+    event.tenant_uid = 1
+    event.run = Mock()
+    event.run.task_id = "task_id"
+    event.run.task_schema_id = 1
+    event.run.group.iteration = iteration
+    event.run.is_active = is_active
+    return event
+
+
+class TestAdd:
+    async def test_not_started_writes_right_away(
+        self,
+        aggregator: RunCounterAggregator,
+        flush_task_groups: AsyncMock,
+    ):
+        await aggregator.add(_event())
+
+        flush_task_groups.assert_awaited_once()
+        tenant, counters = flush_task_groups.call_args.args
+        assert tenant == ("tenant", 1)
+        assert counters == [TaskGroupRunCounters("task_id", 1, 1, 1, counters[0].last_active_at)]
+        assert counters[0].last_active_at is not None
+
+    async def test_aggregates_until_flush(
+        self,
+        aggregator: RunCounterAggregator,
+        flush_task_groups: AsyncMock,
+    ):
+        aggregator.start()
+        try:
+            await aggregator.add(_event(is_active=False))
+            await aggregator.add(_event())
+            await aggregator.add(_event(iteration=2, is_active=False))
+            await aggregator.add(_event(tenant="other"))
+            await aggregator.add(_event(tenant="other"))
+
+            flush_task_groups.assert_not_awaited()
+
+            await aggregator.flush()
+        finally:
+            await aggregator.close()
+
+        assert flush_task_groups.await_count == 2
+        by_tenant = {c.args[0]: c.args[1] for c in flush_task_groups.call_args_list}
+        tenant_counters = sorted(by_tenant[("tenant", 1)], key=lambda c: c.iteration)
+        assert [(c.iteration, c.run_count) for c in tenant_counters] == [(1, 2), (2, 1)]
+        assert tenant_counters[0].last_active_at is not None
+        assert tenant_counters[1].last_active_at is None
+        assert by_tenant[("other", 1)][0].run_count == 2
+
+    async def test_partial_updates(self, aggregator: RunCounterAggregator, flush_task_groups: AsyncMock):
+        aggregator.start()
+        try:
+            await aggregator.add(_event(), update_last_active_at=False)
+            await aggregator.flush()
+            assert flush_task_groups.call_args.args[1] == [TaskGroupRunCounters("task_id", 1, 1, 1, None)]
+
+            await aggregator.add(_event(), run_count=0)
+            await aggregator.flush()
+            counters = flush_task_groups.call_args.args[1]
+            assert counters[0].run_count == 0
+            assert counters[0].last_active_at is not None
+        finally:
+            await aggregator.close()
+
+    async def test_close_flushes(
+        self,
+        aggregator: RunCounterAggregator,
+        flush_task_groups: AsyncMock,
+    ):
+        aggregator.start()
+        await aggregator.add(_event())
+        await aggregator.close()
+
+        assert not aggregator.started
+        flush_task_groups.assert_awaited_once()
+
+    async def test_close_during_periodic_flush(self, flush_task_groups: AsyncMock):
+        release = asyncio.Event()
+        flushing = asyncio.Event()
+        written: list[Any] = []
+
+        async def _flush(tenant: Any, counters: Any):
+            flushing.set()
+            await release.wait()
+            written.append(tenant)
+
+        flush_task_groups.side_effect = _flush
+        aggregator = RunCounterAggregator(flush_task_groups, flush_interval_seconds=0.01)
+        aggregator.start()
+        await aggregator.add(_event(tenant="t1"))
+        await flushing.wait()
+        # Added while the first tenant is being written
+        await aggregator.add(_event(tenant="t2"))
+
+        close = asyncio.create_task(aggregator.close())
+        await asyncio.sleep(0.01)
+        assert not close.done()
+        release.set()
+        await close
+
+        # The flush in progress completed and the remaining counters were written
+        assert written == [("t1", 1), ("t2", 1)]
+
+    async def test_failure_does_not_block_other_tenants(
+        self,
+        aggregator: RunCounterAggregator,
+        flush_task_groups: AsyncMock,
+    ):
+        flush_task_groups.side_effect = [Exception("boom"), None]
+        aggregator.start()
+        await aggregator.add(_event(tenant="t1"))
+        await aggregator.add(_event(tenant="t2"))
+        await aggregator.close()
+
+        assert flush_task_groups.await_count == 2
+
+
+class TestShouldWriteSchemaLastActiveAt:
+    def test_not_started(self, aggregator: RunCounterAggregator):
+        assert aggregator.should_write_schema_last_active_at(_event())
+        assert aggregator.should_write_schema_last_active_at(_event())
+
+    async def test_once_per_window(self, aggregator: RunCounterAggregator):
+        aggregator.start()
+        try:
+            assert aggregator.should_write_schema_last_active_at(_event())
+            assert not aggregator.should_write_schema_last_active_at(_event())
+            assert aggregator.should_write_schema_last_active_at(_event(tenant="other"))
+        finally:
+            await aggregator.close()
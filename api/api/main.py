@@ -27,10 +27,12 @@ from core.domain.errors import (
     ProviderError,
 )
 from core.domain.models import Model
+from core.providers.base.httpx_provider import prewarm_provider_clients, shared_client_pool
+from core.runners.workflowai.workflowai_runner import WorkflowAIRunner
 from core.storage import ObjectNotFoundException
 from core.storage.mongo.migrations.migrate import check_migrations, migrate
 from core.utils import no_op
-from core.utils.background import wait_for_background_tasks
+from core.utils.background import add_background_task, wait_for_background_tasks
 from core.utils.uuid import uuid7
 
 from .common import setup
@@ -74,8 +76,6 @@ async def lifespan(app: FastAPI):
 
     logger.info("Checking migrations")
 
-    # TODO: purge connection pool for httpx_provider
-
     await _prepare_storage()
 
     logger.info("Preparing providers")
@@ -85,9 +85,20 @@ async def lifespan(app: FastAPI):
     factory = shared_provider_factory()
     logger.info(f"Prepared providers {', '.join(list(factory.available_providers()))}")  # noqa: G004
 
+    # Idle clients are closed periodically
+    shared_client_pool.start()
+    if os.getenv("PROVIDER_CLIENT_PREWARM", "true") == "true":
+        # Opening connections in the background to not delay the startup
+        providers = [p for name in factory.available_providers() for p in factory.get_providers(name)]
+        add_background_task(prewarm_provider_clients(providers))
+
     logger.info("Starting services")
     yield
 
+    await shared_client_pool.close_all()
+    WorkflowAIRunner.pdf_renderer.shutdown()
+    WorkflowAIRunner.image_preprocessor.shutdown()
+
     # Closing the metrics service to send whatever is left in the buffer
     await close_metrics(metrics_service)
     await wait_for_background_tasks()
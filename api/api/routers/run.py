@@ -2,7 +2,7 @@ import logging
 import os
 import time
 import uuid
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 from typing import Annotated, Any, Literal, override
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
@@ -46,6 +46,7 @@ from core.domain.version_environment import VersionEnvironment
 from core.domain.version_reference import VersionReference as DomainVersionReference
 from core.storage import TenantTuple
 from core.utils.background import add_background_task
+from core.utils.dicts import update_in_order
 from core.utils.fields import id_factory
 from core.utils.iter_utils import safe_map_optional
 from core.utils.models.previews import compute_preview
@@ -63,6 +64,8 @@ _logger = logging.getLogger("RunRouter")
 
 VersionReference = int | VersionEnvironment | TaskGroupProperties | TaskGroupIdentifier
 
+StreamFormat = Literal["full", "delta"]
+
 
 def version_reference_to_domain(version: VersionReference) -> DomainVersionReference:
     if isinstance(version, TaskGroupProperties):
@@ -101,6 +104,13 @@ class RunRequest(BaseModel):
 
     stream: bool = False
 
+    stream_format: StreamFormat = Field(
+        default="full",
+        description="The format of streamed chunks. With 'full', each chunk contains the entire task output. "
+        "With 'delta', each chunk only contains the keypath updates to apply to the output received so far. "
+        "In both cases the final chunk contains the entire run.",
+    )
+
     use_cache: CacheUsage = "auto"
 
     metadata: dict[str, Any] | None = Field(default=None, description="Additional metadata to store with the task run.")
@@ -266,6 +276,80 @@ class RunResponseStreamChunk(_RunResponseCommon):
         )
 
 
+class RunResponseStreamDelta(BaseModel):
+    """A streamed chunk for a run request when the stream format is 'delta'.
+    The final chunk will be a RunResponse object."""
+
+    class OutputDelta(BaseModel):
+        keypath: str = Field(
+            description="The dot separated path of the updated value in the task output. "
+            "Integer components are list indices. An empty keypath replaces the whole task output, "
+            "e-g when the output restarts after a provider fallback",
+        )
+        op: Literal["set", "append"] = Field(
+            description="'set' replaces the value at the keypath. "
+            "'append' appends the value to the string at the keypath",
+        )
+        value: Any = Field(default=None, description="The value, a missing value means null")
+
+    id: str
+    task_output_delta: list[OutputDelta] = Field(
+        description="The updates to apply to the task output received so far, in order",
+    )
+
+    tool_calls: list[RunResponseStreamChunk.ToolCall] | None = Field(
+        description="A list of WorkflowAI tool calls that are executed during the run.",
+    )
+    tool_call_requests: list[APIToolCallRequest] | None = Field(
+        description="Tool calls that should be executed client side.",
+    )
+    reasoning_steps: list[ReasoningStep] | None = Field(
+        description="A list of reasoning steps that were taken during the run.",
+    )
+
+
+class _DeltaStreamSerializer:
+    """Serializes streamed outputs as deltas from the previously serialized output"""
+
+    def __init__(self):
+        self._sent: dict[str, Any] = {}
+
+    @classmethod
+    def _delta(cls, keypath: str, previous: Any, value: Any) -> RunResponseStreamDelta.OutputDelta:
+        if isinstance(value, str) and isinstance(previous, str) and previous and value.startswith(previous):
+            return RunResponseStreamDelta.OutputDelta(keypath=keypath, op="append", value=value[len(previous) :])
+        return RunResponseStreamDelta.OutputDelta(keypath=keypath, op="set", value=value)
+
+    def __call__(self, id: str, output: RunOutput) -> RunResponseStreamDelta:
+        # Outputs can be mutated in place by the providers so the sent output is a separate copy
+        # that only gets the updates
+        deltas = [self._delta(*update) for update in update_in_order(self._sent, output.task_output)]
+        return RunResponseStreamDelta(
+            id=id,
+            task_output_delta=deltas,
+            tool_calls=safe_map_optional(
+                output.tool_calls,
+                RunResponseStreamChunk.ToolCall.from_domain,
+                logger=_logger,
+            ),
+            tool_call_requests=safe_map_optional(
+                output.tool_call_requests,
+                APIToolCallRequest.from_domain,
+                logger=_logger,
+            ),
+            reasoning_steps=safe_map_optional(output.reasoning_steps, ReasoningStep.from_domain, logger=_logger),
+        )
+
+
+def _stream_serializer(stream: bool, stream_format: StreamFormat) -> Callable[[str, RunOutput], BaseModel] | None:
+    if not stream:
+        return None
+    if stream_format == "delta":
+        # A new serializer per request since it keeps track of the sent output
+        return _DeltaStreamSerializer()
+    return RunResponseStreamChunk.from_stream
+
+
 _RUN_RESPONSE_V1: dict[int | str, dict[str, Any]] = {
     200: {
         "content": {
@@ -273,7 +357,7 @@ _RUN_RESPONSE_V1: dict[int | str, dict[str, Any]] = {
                 "schema": RunResponse.model_json_schema(),
             },
             "text/event-stream": {
-                "schema": TypeAdapter(RunResponseStreamChunk | RunResponse).json_schema(),
+                "schema": TypeAdapter(RunResponseStreamChunk | RunResponseStreamDelta | RunResponse).json_schema(),
             },
         },
     },
@@ -391,7 +475,7 @@ async def run_task(
         author_tenant=author_tenant,
         serializer=lambda run: RunResponse.from_domain(run, feedback_token_generator(run.id)),
         stream_last_chunk=True,
-        stream_serializer=RunResponseStreamChunk.from_stream if body.stream else None,
+        stream_serializer=_stream_serializer(body.stream, body.stream_format),
         store_inline=False,
         private_fields=body.private_fields,
         # We don't pass the source here, it is only used when storing the run inline
@@ -422,6 +506,13 @@ class RunReplyRequest(BaseModel):
 
     stream: bool = False
 
+    stream_format: StreamFormat = Field(
+        default="full",
+        description="The format of streamed chunks. With 'full', each chunk contains the entire task output. "
+        "With 'delta', each chunk only contains the keypath updates to apply to the output received so far. "
+        "In both cases the final chunk contains the entire run.",
+    )
+
     @model_validator(mode="after")
     def validate_reply(self):
         if not self.user_message and not self.tool_results:
@@ -471,7 +562,7 @@ async def reply_to_run(
         user_message=body.user_message,
         tool_calls=[r.to_domain() for r in body.tool_results] if body.tool_results else None,
         metadata=body.metadata,
-        stream_serializer=RunResponseStreamChunk.from_stream if body.stream else None,
+        stream_serializer=_stream_serializer(body.stream, body.stream_format),
         serializer=lambda run: RunResponse.from_domain(run, feedback_token_generator(run.id)),
         is_different_version=is_different_version,
         start_time=get_start_time(request),
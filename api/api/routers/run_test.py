@@ -9,7 +9,12 @@ from freezegun import freeze_time
 from httpx import AsyncClient
 
 from api.dependencies.security import user_organization
-from api.routers.run import DeprecatedVersionReference, version_reference_to_domain
+from api.routers.run import (
+    DeprecatedVersionReference,
+    RunResponseStreamDelta,
+    _DeltaStreamSerializer,  # pyright: ignore [reportPrivateUsage]
+    version_reference_to_domain,
+)
 from core.domain.agent_run import AgentRun
 from core.domain.ban import Ban
 from core.domain.errors import InvalidGenerationError, ProviderRateLimitError
@@ -67,6 +72,48 @@ class TestDeprecatedVersionReferenceToDomain:
         assert version.to_domain() == expected
 
 
+class TestDeltaStreamSerializer:
+    def test_deltas(self):
+        serializer = _DeltaStreamSerializer()
+
+        first = serializer("1", RunOutput({"greeting": "Hel"}))
+        assert first.task_output_delta == [
+            RunResponseStreamDelta.OutputDelta(keypath="greeting", op="set", value="Hel"),
+        ]
+
+        # Outputs can be mutated in place
+        output = {"greeting": "Hello", "names": ["a"]}
+        second = serializer("1", RunOutput(output))
+        assert second.task_output_delta == [
+            RunResponseStreamDelta.OutputDelta(keypath="greeting", op="append", value="lo"),
+            RunResponseStreamDelta.OutputDelta(keypath="names", op="set", value=["a"]),
+        ]
+
+        output["names"].append("b")
+        third = serializer("1", RunOutput(output))
+        assert third.task_output_delta == [
+            RunResponseStreamDelta.OutputDelta(keypath="names.1", op="set", value="b"),
+        ]
+
+        # No changes
+        assert serializer("1", RunOutput(output)).task_output_delta == []
+
+    def test_restarted_stream(self):
+        serializer = _DeltaStreamSerializer()
+        serializer("1", RunOutput({"a": "hello", "b": "wor"}))
+
+        # The stream restarts, e-g after a provider fallback
+        restarted = serializer("1", RunOutput({"a": "hi"}))
+        assert restarted.task_output_delta == [
+            RunResponseStreamDelta.OutputDelta(keypath="", op="set", value={"a": "hi"}),
+        ]
+
+        # The deltas continue from the restarted output
+        assert serializer("1", RunOutput({"a": "hi", "b": "x"})).task_output_delta == [
+            RunResponseStreamDelta.OutputDelta(keypath="b", op="set", value="x"),
+        ]
+
+
 class TestRunModelsNotAuthenticated:
     @pytest.mark.unauthenticated
     async def test_run_models_not_authenticated(self, test_api_client: AsyncClient):
@@ -14,7 +14,7 @@ from api.services.runs import LLMCompletionsResponse
 from api.tags import RouteTags
 from core.domain.agent_run import AgentRun, AgentRunBase
 from core.domain.error_response import ErrorCode, ErrorResponse
-from core.domain.page import Page
+from core.domain.page import CursorPage
 from core.domain.search_query import FieldQuery, SearchOperator
 from core.domain.task_group import TaskGroup
 from core.domain.types import TaskInputDict, TaskOutputDict
@@ -43,6 +43,18 @@ class SearchTaskRunsRequest(BaseModel):
     limit: int = 20
     offset: int = 0
 
+    page_token: str | None = Field(
+        default=None,
+        description="The next_page_token of the previous page. Paginating with page tokens is much faster than "
+        "using an offset for deep pages. The page token already sets the start of the page so it can't be "
+        "combined with a non zero offset.",
+    )
+    include_count: bool = Field(
+        default=True,
+        description="Whether to include the total number of matching runs. The count may be slightly outdated "
+        "and is omitted when it takes too long to compute.",
+    )
+
 
 class _BaseRunV1(BaseModel):
     id: str = Field(description="the id of the task run")
@@ -131,7 +143,7 @@ async def search_runs(
     service: RunsSearchServiceDep,
     task: TaskInfoDep,
     feedback_token_generator: RunFeedbackGeneratorDep,
-) -> Page[RunItemV1]:
+) -> CursorPage[RunItemV1]:
     if not task:
         raise ObjectNotFoundException("Task not found")
     return await service.search_task_runs(
@@ -140,6 +152,8 @@ async def search_runs(
         request.limit,
         request.offset,
         lambda run: RunItemV1.from_domain(run, feedback_token_generator(run.id)),
+        page_token=request.page_token,
+        include_count=request.include_count,
     )
 
 
@@ -8,6 +8,7 @@ from taskiq import AsyncTaskiqDecoratedTask
 from taskiq_redis import RedisScheduleSource
 
 from api.jobs import features_by_domain_generation_started_jobs
+from api.services.run_payloads import shared_run_payloads
 from core.domain.analytics_events.analytics_events import OrganizationProperties, TaskProperties, UserProperties
 from core.domain.events import (
     AIReviewCompletedEvent,
@@ -149,13 +150,24 @@ class _EventRouter:
             except Exception:
                 _logger.exception("Error sending job")
 
+    @classmethod
+    async def _send_jobs(
+        cls,
+        jobs: list[AsyncTaskiqDecoratedTask[[_T], Coroutine[Any, Any, None]]],
+        event: _T,
+        retry_after: datetime | None = None,
+    ):
+        if isinstance(event, StoreTaskRunEvent):
+            # The run and the task are stored out of the broker message
+            event = await shared_run_payloads.check_in(event)  # pyright: ignore [reportAssignmentType]
+        await asyncio.gather(*(cls._send_job(job, event, retry_after) for job in jobs))
+
     def __call__(self, event: Event, retry_after: datetime | None = None) -> None:
         try:
             listing = self._handlers[type(event)]
-            for job in listing.jobs:
-                t = asyncio.create_task(self._send_job(job, event, retry_after))
-                self._tasks.add(t)
-                t.add_done_callback(self._tasks.remove)
+            t = asyncio.create_task(self._send_jobs(listing.jobs, event, retry_after))
+            self._tasks.add(t)
+            t.add_done_callback(self._tasks.remove)
 
         except KeyError as e:
             _logger.exception("Missing event handler", exc_info=e)
@@ -2,7 +2,7 @@ import logging
 import os
 from typing import override
 
-from core.storage.file_storage import FileData, FileStorage
+from core.storage.file_storage import CachedFileStorage, FileData, FileStorage
 
 
 def _default_file_storage() -> FileStorage:
@@ -37,4 +37,5 @@ def _default_file_storage() -> FileStorage:
     return NoopFileStorage()
 
 
-shared_file_storage = _default_file_storage()
+# Files are stored by content hash so the URLs of stored files can be reused
+shared_file_storage = CachedFileStorage(_default_file_storage())
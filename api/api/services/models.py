@@ -9,8 +9,7 @@ import httpx
 from core.domain.consts import WORKFLOWAI_RUN_URL
 from core.domain.errors import ProviderDoesNotSupportModelError
 from core.domain.models import Model, Provider
-from core.domain.models.model_data import DeprecatedModel, LatestModel, ModelData
-from core.domain.models.model_datas_mapping import MODEL_DATAS
+from core.domain.models.model_index import MODEL_INDEX
 from core.domain.models.model_provider_data import ModelProviderData
 from core.domain.models.utils import get_model_provider_data
 from core.domain.task_typology import TaskTypology
@@ -20,7 +19,6 @@ from core.storage.backend_storage import BackendStorage
 from core.storage.task_run_storage import TokenCounts
 from core.tools import get_tools_in_instructions
 from core.utils.lru.lru_cache import TLRUCache
-from core.utils.models.dumps import safe_dump_pydantic_model
 
 
 def _token_cache_ttl(_: Any, value: TokenCounts):
@@ -107,33 +105,12 @@ class ModelsService:
         model: Model,
         task_typology: TaskTypology | None,
         price_calculator: Callable[[ModelProviderData, Model], float | None] | None,
-        instructions: str | None,
-        requires_tools: bool | None,
+        requires_tools: bool,
     ):
-        data = MODEL_DATAS[model]
-        if isinstance(data, DeprecatedModel):
-            return None
-
-        display_name = data.display_name
-        is_default = data.is_default
-        model_id = model
-
-        if isinstance(data, LatestModel):
-            model = data.model
-            data = MODEL_DATAS[data.model]
-            is_latest = True
-        else:
-            # Otherwise is_latest is True when the model has no latest model
-            is_latest = data.latest_model is None
-
-        # We have tests in place checking that the model data of latest models is a ModelData
-        # So this should never happen
-        if not isinstance(data, ModelData):
-            _logger.error(
-                "Unexpected model data is not a ModelData",
-                extra={"model": safe_dump_pydantic_model(model)},
-            )
+        listed = MODEL_INDEX.listed_model(model)
+        if listed is None:
             return None
+        data = listed.data
 
         def _build(
             is_not_supported_reason: str | None,
@@ -141,28 +118,26 @@ class ModelsService:
             average_cost_per_run_usd: float | None,
         ):
             return cls.ModelForTask(
-                id=model_id,
-                name=display_name,
+                id=listed.id,
+                name=listed.display_name,
                 icon_url=data.icon_url,
                 is_not_supported_reason=is_not_supported_reason,
                 average_cost_per_run_usd=average_cost_per_run_usd,
-                modes=data.modes,
-                is_latest=is_latest,
-                is_default=is_default,
+                modes=list(listed.modes),
+                is_latest=listed.is_latest,
+                is_default=listed.is_default,
                 release_date=data.release_date,
                 quality_index=data.quality_index,
                 price_per_input_token_usd=provider_data.text_price.prompt_cost_per_token,
                 price_per_output_token_usd=provider_data.text_price.completion_cost_per_token,
                 context_window_tokens=data.max_tokens_data.max_tokens,
                 provider_name=data.provider_name,
-                providers=[p for p, _ in data.providers],
+                providers=list(listed.providers),
             )
 
-        provider_data = data.provider_data_for_pricing()
+        provider_data = listed.pricing
 
-        if (
-            requires_tools or len(get_tools_in_instructions(instructions or "")) > 0
-        ) and data.supports_tool_calling is False:
+        if requires_tools and data.supports_tool_calling is False:
             return _build(
                 f"{data.display_name} does not support tool calling",
                 provider_data,
@@ -175,14 +150,14 @@ class ModelsService:
         return _build(
             None,
             provider_data,
-            price_calculator(provider_data, model) if price_calculator else None,
+            price_calculator(provider_data, listed.model) if price_calculator else None,
         )
 
     @classmethod
     async def preview_models(cls, typology: TaskTypology | None = None):
         models = await cls._available_models_from_run_endpoint()
         for model in models:
-            if m := cls._build_model_for_task(model, typology, None, None, None):
+            if m := cls._build_model_for_task(model, typology, None, False):
                 yield m
 
     async def models_for_task(
@@ -198,13 +173,15 @@ class ModelsService:
             task.task_schema_id,
         )
 
+        # The instructions are the same for all models so the tools are only extracted once
+        requires_tools = bool(requires_tools) or len(get_tools_in_instructions(instructions or "")) > 0
+
         out: list[ModelsService.ModelForTask] = []
         for model in models:
             if m := self._build_model_for_task(
                 model,
                 task_typology,
                 price_calculator,
-                instructions,
                 requires_tools,
             ):
                 out.append(m)  # noqa: PERF401
@@ -329,21 +306,9 @@ class ModelsService:
         )
 
         def _compute_price(model: Model) -> float | None:
-            data = MODEL_DATAS[model]
-            if isinstance(data, DeprecatedModel):
-                return None
-            if isinstance(data, LatestModel):
-                model = data.model
-                data = MODEL_DATAS[data.model]
-            if not isinstance(data, ModelData):
-                self._logger.error(
-                    "Unexpected model data is not a ModelData",
-                    extra={"model": safe_dump_pydantic_model(model)},
-                )
+            listed = MODEL_INDEX.listed_model(model)
+            if listed is None:
                 return None
-            return price_calculator(
-                data.provider_data_for_pricing(),
-                model,
-            )
+            return price_calculator(listed.pricing, listed.model)
 
         return _compute_price
@@ -0,0 +1,112 @@
+from collections.abc import Iterable
+
+from core.domain.agent_run import AgentRun
+from core.domain.review import Review
+from core.storage.review_benchmark_storage import (
+    BenchmarkReviewOutcome,
+    ReviewBenchmarkDelta,
+    ReviewBenchmarkState,
+)
+
+# The review count fields of a version aggregation that a run with a given outcome is counted in
+_OUTCOME_FIELDS: dict[BenchmarkReviewOutcome, tuple[str, ...]] = {
+    "in_progress": ("in_progress_review_count",),
+    "positive": ("positive_review_count",),
+    "positive_user": ("positive_review_count", "positive_user_review_count"),
+    "negative": ("negative_review_count",),
+    "negative_user": ("negative_review_count", "negative_user_review_count"),
+    "unsure": ("unsure_review_count",),
+}
+
+
+def outcome_fields(outcome: BenchmarkReviewOutcome | None) -> tuple[str, ...]:
+    return _OUTCOME_FIELDS[outcome] if outcome else ()
+
+
+def counted_reviews(reviews: Iterable[Review]) -> dict[str, Review]:
+    """Returns the review counted for each eval hash"""
+    out: dict[str, Review] = {}
+    for review in reviews:
+        # Supposedly the first review should be the good one
+        # But just in case, we only override the review for a given hash if it is a user review
+        if review.eval_hash not in out or review.reviewer.reviewer_type == "user":
+            out[review.eval_hash] = review
+    return out
+
+
+def benchmark_outcome(review: Review | None) -> BenchmarkReviewOutcome | None:
+    """Returns None for missing reviews and completed reviews without an outcome"""
+    if review is None:
+        return None
+    if review.status == "in_progress":
+        return "in_progress"
+    is_user = review.reviewer.reviewer_type == "user"
+    match review.outcome:
+        case "positive":
+            return "positive_user" if is_user else "positive"
+        case "negative":
+            return "negative_user" if is_user else "negative"
+        case "unsure":
+            return "unsure"
+        case None:
+            return None
+
+
+def run_delta(state: ReviewBenchmarkState, run: AgentRun) -> ReviewBenchmarkDelta | None:
+    """The delta for a newly stored run, or None if the run is not part of the benchmark,
+    i-e its version is not benchmarked or its input was not evaluated"""
+    iteration = run.group.iteration
+    if (
+        not run.eval_hash
+        or iteration not in state.eval_hash_run_counts
+        or run.task_input_hash not in state.input_hashes
+    ):
+        return None
+
+    increments: dict[str, float] = {
+        "total_run_count": 1,
+        "total_cost_usd": run.cost_usd or 0,
+        "total_duration_seconds": run.duration_seconds or 0,
+        f"eval_hash_run_counts.{run.eval_hash}": 1,
+    }
+    if run.status == "failure":
+        increments["run_failed_count"] = 1
+    for field in outcome_fields(state.review_outcome):
+        increments[field] = 1
+
+    return ReviewBenchmarkDelta(
+        revision=state.revision,
+        increments={iteration: increments},
+        eval_hash=run.eval_hash,
+        review_outcome=state.review_outcome,
+    )
+
+
+def review_delta(
+    state: ReviewBenchmarkState,
+    eval_hash: str,
+    outcome: BenchmarkReviewOutcome | None,
+) -> ReviewBenchmarkDelta | None:
+    """The delta for a change of the review counted for an eval hash, moving the runs
+    with the eval hash from the previous outcome to the new one"""
+    if outcome == state.review_outcome:
+        return None
+
+    increments: dict[int, dict[str, float]] = {}
+    for iteration, run_count in state.eval_hash_run_counts.items():
+        if not run_count:
+            continue
+        version_increments: dict[str, float] = {}
+        for field in outcome_fields(state.review_outcome):
+            version_increments[field] = version_increments.get(field, 0) - run_count
+        for field in outcome_fields(outcome):
+            version_increments[field] = version_increments.get(field, 0) + run_count
+        if version_increments := {k: v for k, v in version_increments.items() if v}:
+            increments[iteration] = version_increments
+
+    return ReviewBenchmarkDelta(
+        revision=state.revision,
+        increments=increments,
+        eval_hash=eval_hash,
+        review_outcome=outcome,
+    )
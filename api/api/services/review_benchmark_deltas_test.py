@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+
+from api.services.review_benchmark_deltas import benchmark_outcome, counted_reviews, review_delta, run_delta
+from core.domain.review import Review
+from core.storage.review_benchmark_storage import ReviewBenchmarkDelta, ReviewBenchmarkState
+from tests.models import review, task_run_ser
+
+
+def _state(**kwargs: Any):
+    base = ReviewBenchmarkState(
+        revision=1,
+        reconciled_at=datetime(2024, 8, 12, tzinfo=timezone.utc),
+        input_hashes={"input_hash"},
+        eval_hash_run_counts={1: 2, 2: 0, 3: 1},
+        review_outcome=None,
+    )
+    return base._replace(**kwargs)
+
+
+class TestBenchmarkOutcome:
+    @pytest.mark.parametrize(
+        ("kwargs", "expected"),
+        [
+            ({"status": "in_progress", "outcome": None}, "in_progress"),
+            ({"outcome": "positive"}, "positive_user"),
+            ({"outcome": "positive", "reviewer": Review.AIReviewer()}, "positive"),
+            ({"outcome": "negative"}, "negative_user"),
+            ({"outcome": "negative", "reviewer": Review.AIReviewer()}, "negative"),
+            ({"outcome": "unsure"}, "unsure"),
+            ({"outcome": None}, None),
+        ],
+    )
+    def test_outcome(self, kwargs: dict[str, Any], expected: str | None):
+        assert benchmark_outcome(review(**kwargs)) == expected
+
+    def test_no_review(self):
+        assert benchmark_outcome(None) is None
+
+
+class TestCountedReviews:
+    def test_user_review_overrides(self):
+        ai = review(eval_hash="e1", reviewer=Review.AIReviewer(), outcome="negative")
+        user = review(eval_hash="e1", outcome="positive")
+        other = review(eval_hash="e2", reviewer=Review.AIReviewer())
+        assert counted_reviews([ai, user, other]) == {"e1": user, "e2": other}
+
+    def test_first_ai_review_is_kept(self):
+        first = review(eval_hash="e1", reviewer=Review.AIReviewer(), outcome="negative")
+        second = review(eval_hash="e1", reviewer=Review.AIReviewer(), outcome="positive")
+        assert counted_reviews([first, second]) == {"e1": first}
+
+
+class TestRunDelta:
+    def test_successful_run_without_review(self):
+        run = task_run_ser(
+            task_input_hash="input_hash",
+            cost_usd=0.1,
+            duration_seconds=3,
+            group_kwargs={"iteration": 2},
+        )
+
+        assert run_delta(_state(), run) == ReviewBenchmarkDelta(
+            revision=1,
+            increments={
+                2: {
+                    "total_run_count": 1,
+                    "total_cost_usd": 0.1,
+                    "total_duration_seconds": 3,
+                    f"eval_hash_run_counts.{run.eval_hash}": 1,
+                },
+            },
+            eval_hash=run.eval_hash,
+            review_outcome=None,
+        )
+
+    def test_missing_cost(self):
+        run = task_run_ser(task_input_hash="input_hash", group_kwargs={"iteration": 1})
+        delta = run_delta(_state(review_outcome="negative"), run)
+        assert delta
+        assert delta.increments[1]["total_cost_usd"] == 0
+        assert delta.increments[1]["negative_review_count"] == 1
+
+    def test_not_benchmarked(self):
+        run = task_run_ser(task_input_hash="input_hash", group_kwargs={"iteration": 4})
+        assert run_delta(_state(), run) is None
+
+    def test_not_evaluated(self):
+        run = task_run_ser(task_input_hash="other_hash", group_kwargs={"iteration": 1})
+        assert run_delta(_state(), run) is None
+
+
+class TestReviewDelta:
+    def test_new_review(self):
+        assert review_delta(_state(), "e1", "positive_user") == ReviewBenchmarkDelta(
+            revision=1,
+            increments={
+                1: {"positive_review_count": 2, "positive_user_review_count": 2},
+                3: {"positive_review_count": 1, "positive_user_review_count": 1},
+            },
+            eval_hash="e1",
+            review_outcome="positive_user",
+        )
+
+    def test_user_confirms_ai_review(self):
+        # Only the user count changes
+        delta = review_delta(_state(review_outcome="positive"), "e1", "positive_user")
+        assert delta
+        assert delta.increments == {
+            1: {"positive_user_review_count": 2},
+            3: {"positive_user_review_count": 1},
+        }
+
+    def test_review_removed(self):
+        delta = review_delta(_state(review_outcome="negative_user"), "e1", None)
+        assert delta
+        assert delta.review_outcome is None
+        assert delta.increments[1] == {"negative_review_count": -2, "negative_user_review_count": -2}
+
+    def test_unchanged(self):
+        assert review_delta(_state(review_outcome="unsure"), "e1", "unsure") is None
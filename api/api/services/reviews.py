@@ -1,7 +1,17 @@
 import logging
-from typing import Any, Literal, NamedTuple, Protocol, TypedDict, cast
-
-from core.domain.agent_run import TaskRunIO
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any, Literal, NamedTuple, NotRequired, Protocol, TypedDict, cast
+
+from api.services.review_benchmark_deltas import (
+    benchmark_outcome,
+    counted_reviews,
+    outcome_fields,
+    review_delta,
+    run_delta,
+)
+from core.domain.agent_run import AgentRun, TaskRunIO
 from core.domain.errors import BadRequestError, DuplicateValueError, InternalError
 from core.domain.events import (
     AIReviewCompletedEvent,
@@ -23,6 +33,7 @@ from core.domain.task_run_query import SerializableTaskRunField, SerializableTas
 from core.domain.task_variant import SerializableTaskVariant
 from core.domain.types import TaskInputDict
 from core.domain.users import UserIdentifier
+from core.domain.utils import compute_eval_hash
 from core.evaluators.input_task_evaluator import (
     InputTaskEvaluator,
     InputTaskEvaluatorOptions,
@@ -30,7 +41,11 @@ from core.evaluators.input_task_evaluator import (
 )
 from core.storage import ObjectNotFoundException, TaskTuple
 from core.storage.backend_storage import BackendStorage
-from core.storage.review_benchmark_storage import RunReviewAggregateWithIteration
+from core.storage.review_benchmark_storage import (
+    BenchmarkReviewOutcome,
+    ReviewBenchmarkReconciliation,
+    RunReviewAggregateWithIteration,
+)
 from core.storage.reviews_storage import AIReviewerFilter
 from core.storage.task_run_storage import RunAggregate
 from core.utils.fields import datetime_factory
@@ -63,8 +78,18 @@ class _RunReviewAggregate(TypedDict):
     total_run_count: int
     failed_run_count: int | None
 
+    eval_hash_run_counts: NotRequired[dict[str, int]]
+    total_cost_usd: NotRequired[float]
+    total_duration_seconds: NotRequired[float]
+
 
 class ReviewsService:
+    # Benchmarks are maintained with deltas and fully recomputed periodically to fix
+    # any drift, e-g runs stored while a recompute was in progress
+    _BENCHMARK_RECONCILIATION_INTERVAL = timedelta(hours=1)
+    # Deltas are computed from a revision of the benchmark so concurrent updates can conflict
+    _MAX_BENCHMARK_DELTA_ATTEMPTS = 3
+
     def __init__(
         self,
         backend_storage: BackendStorage,
@@ -555,6 +580,8 @@ class ReviewsService:
                     task_schema_id=task_schema_id,
                     run_id=run_id,
                     iterations={iteration},
+                    # The run is counted when stored, only the review counted for its hash can change
+                    input_hashes=(task_input_hash, task_output_hash),
                 ),
             )
 
@@ -987,6 +1014,14 @@ class ReviewsService:
         ]
 
         benchmark = await self._storage.review_benchmarks.add_versions(task_id, task_schema_id, fetched_versions)
+        # Counting the existing runs of the added versions
+        self._event_router(
+            RecomputeReviewBenchmarkEvent(
+                task_id=task_id,
+                task_schema_id=task_schema_id,
+                iterations={v[0] for v in fetched_versions},
+            ),
+        )
 
         # Schedule 1 run per version per input hash
         evaluated_hashes = await self._storage.input_evaluations.unique_input_hashes(
@@ -1096,7 +1131,11 @@ class ReviewsService:
         cached_run_id: str | None = None,
         input_hashes: tuple[str, str] | None = None,
     ):
-        """Recompute benchmark for a given task"""
+        """Updates the benchmark after a run completed or a review changed.
+
+        Deltas are applied when possible. Otherwise, e-g when a new input was evaluated
+        or when the benchmark is due for a reconciliation, the benchmark is recomputed from
+        all runs"""
         task_tuple = await self._storage.get_task_tuple(task_id)
         if run_id:
             if iterations and len(iterations) == 1:
@@ -1122,6 +1161,13 @@ class ReviewsService:
             ):
                 return
 
+        if run_id or cached_run_id or input_hashes:
+            if await self._apply_review_benchmark_delta(task_id, task_schema_id, input_hashes):
+                return
+            # Reconciling the whole benchmark
+            iterations = None
+            input_hashes = None
+
         version_ids = await self._find_versions_to_aggregate(task_tuple, task_schema_id, iterations, input_hashes)
         if not version_ids:
             self._logger.info("Skipping recompute review benchmark since no iterations to aggregate")
@@ -1142,16 +1188,83 @@ class ReviewsService:
                 "iteration": version_ids[v],
             }
 
-        aggregates = [
-            _add_iteration(a)
-            async for a in self._aggregate_reviews(
-                task_tuple,
-                task_schema_id,
-                set(hashes),
-                set(version_ids.keys()) if version_ids else None,
+        aggregates, outcomes = await self._aggregate_reviews(
+            task_tuple,
+            task_schema_id,
+            set(hashes),
+            set(version_ids.keys()) if version_ids else None,
+        )
+        await self._storage.review_benchmarks.update_benchmark(
+            task_id,
+            task_schema_id,
+            [_add_iteration(a) for a in aggregates],
+            now,
+            ReviewBenchmarkReconciliation(
+                review_outcomes=outcomes,
+                input_hashes=set(hashes),
+                is_full=iterations is None and input_hashes is None,
+            ),
+        )
+
+    def _should_reconcile_benchmark(self, reconciled_at: datetime) -> bool:
+        return datetime_factory() - reconciled_at > self._BENCHMARK_RECONCILIATION_INTERVAL
+
+    async def _apply_review_benchmark_delta(
+        self,
+        task_id: str,
+        task_schema_id: int,
+        input_hashes: tuple[str, str] | None,
+    ) -> bool:
+        """Returns False if the benchmark should be reconciled instead"""
+        eval_hash = compute_eval_hash(task_schema_id, *input_hashes) if input_hashes else None
+        for _ in range(self._MAX_BENCHMARK_DELTA_ATTEMPTS):
+            state = await self._storage.review_benchmarks.get_benchmark_state(task_id, task_schema_id, eval_hash)
+            if state is None or self._should_reconcile_benchmark(state.reconciled_at):
+                return False
+            if not input_hashes or not eval_hash:
+                # Runs are counted when they are stored, see add_run_to_review_benchmark
+                return True
+            if input_hashes[0] not in state.input_hashes:
+                # The runs for a newly evaluated input were never counted
+                return False
+
+            reviews = [r async for r in self._reviews_storage.reviews_for_eval_hashes(task_id, {eval_hash})]
+            outcome = benchmark_outcome(counted_reviews(reviews).get(eval_hash))
+            delta = review_delta(state, eval_hash, outcome)
+            if delta is None or await self._storage.review_benchmarks.apply_delta(task_id, task_schema_id, delta):
+                return True
+
+        self._logger.warning(
+            "Too many conflicts when applying a review benchmark delta",
+            extra={"task_id": task_id, "task_schema_id": task_schema_id},
+        )
+        return False
+
+    async def add_run_to_review_benchmark(self, run: AgentRun):
+        """Counts a stored run in the benchmark of its schema when its version is benchmarked"""
+        for _ in range(self._MAX_BENCHMARK_DELTA_ATTEMPTS):
+            state = await self._storage.review_benchmarks.get_benchmark_state(
+                run.task_id,
+                run.task_schema_id,
+                run.eval_hash or None,
             )
-        ]
-        await self._storage.review_benchmarks.update_benchmark(task_id, task_schema_id, aggregates, now)
+            if state is None:
+                # No benchmark or the benchmark was never reconciled, the run
+                # will be counted by the reconciliation
+                return
+            delta = run_delta(state, run)
+            if delta is None or await self._storage.review_benchmarks.apply_delta(
+                run.task_id,
+                run.task_schema_id,
+                delta,
+            ):
+                return
+
+        self._logger.warning(
+            "Too many conflicts when adding a run to the review benchmark, reconciling",
+            extra={"task_id": run.task_id, "task_schema_id": run.task_schema_id, "run_id": run.id},
+        )
+        self._event_router(RecomputeReviewBenchmarkEvent(task_id=run.task_id, task_schema_id=run.task_schema_id))
 
     async def assign_review_to_runs(
         self,
@@ -1468,57 +1581,54 @@ class ReviewsService:
 
         return await self._add_input_to_evaluation(task_tuple, task_schema_id, created_input_evaluation)
 
-    # TODO: test, right now only tested throw
-    def _merge_aggregate(  # noqa: C901
+    def _merge_aggregate(
         self,
         version_id: str,
         agg: RunAggregate,
-        reviews_by_eval_hash: dict[str, Review],
+        outcomes_by_eval_hash: Mapping[str, BenchmarkReviewOutcome],
     ):
-        in_progress_review_count = 0
-        positive_review_count = 0
-        positive_user_review_count = 0
-        negative_review_count = 0
-        negative_user_review_count = 0
-        unsure_review_count = 0
-        for eval_hash in agg["eval_hashes"]:
-            review = reviews_by_eval_hash.get(eval_hash)
-            if not review:
-                continue
-            match review.status:
-                case "in_progress":
-                    in_progress_review_count += 1
-                    continue
-                case "completed":
-                    pass
-            match review.outcome:
-                case "negative":
-                    negative_review_count += 1
-                    if review.reviewer.reviewer_type == "user":
-                        negative_user_review_count += 1
-                case "positive":
-                    positive_review_count += 1
-                    if review.reviewer.reviewer_type == "user":
-                        positive_user_review_count += 1
-                case "unsure":
-                    unsure_review_count += 1
-                case None:
-                    self._logger.warning("Review has no outcome", extra={"review": safe_dump_pydantic_model(review)})
-
+        counts = {
+            "in_progress_review_count": 0,
+            "positive_review_count": 0,
+            "positive_user_review_count": 0,
+            "negative_review_count": 0,
+            "negative_user_review_count": 0,
+            "unsure_review_count": 0,
+        }
+        eval_hash_run_counts = Counter(h for h in agg["eval_hashes"] if h)
+        for eval_hash, run_count in eval_hash_run_counts.items():
+            for field in outcome_fields(outcomes_by_eval_hash.get(eval_hash)):
+                counts[field] += run_count
+
+        total_run_count = agg["total_run_count"]
+        average_cost_usd = agg.get("average_cost_usd")
+        average_duration_seconds = agg.get("average_duration_seconds")
         return _RunReviewAggregate(
             version_id=version_id,
-            in_progress_review_count=in_progress_review_count,
-            positive_review_count=positive_review_count,
-            positive_user_review_count=positive_user_review_count,
-            negative_review_count=negative_review_count,
-            negative_user_review_count=negative_user_review_count,
-            unsure_review_count=unsure_review_count,
-            average_cost_usd=agg.get("average_cost_usd"),
-            average_duration_seconds=agg.get("average_duration_seconds"),
-            total_run_count=agg["total_run_count"],
+            in_progress_review_count=counts["in_progress_review_count"],
+            positive_review_count=counts["positive_review_count"],
+            positive_user_review_count=counts["positive_user_review_count"],
+            negative_review_count=counts["negative_review_count"],
+            negative_user_review_count=counts["negative_user_review_count"],
+            unsure_review_count=counts["unsure_review_count"],
+            average_cost_usd=average_cost_usd,
+            average_duration_seconds=average_duration_seconds,
+            total_run_count=total_run_count,
             failed_run_count=agg.get("failed_run_count"),
+            eval_hash_run_counts=dict(eval_hash_run_counts),
+            total_cost_usd=(average_cost_usd or 0) * total_run_count,
+            total_duration_seconds=(average_duration_seconds or 0) * total_run_count,
         )
 
+    def _benchmark_outcomes(self, reviews_by_eval_hash: Mapping[str, Review]):
+        outcomes: dict[str, BenchmarkReviewOutcome] = {}
+        for eval_hash, review in reviews_by_eval_hash.items():
+            if outcome := benchmark_outcome(review):
+                outcomes[eval_hash] = outcome
+            elif review.status == "completed":
+                self._logger.warning("Review has no outcome", extra={"review": safe_dump_pydantic_model(review)})
+        return outcomes
+
     async def _aggregate_reviews(
         self,
         task_id: TaskTuple,
@@ -1536,12 +1646,10 @@ class ReviewsService:
         for r in run_aggs.values():
             eval_hashes.update(r["eval_hashes"])
 
-        reviews_by_eval_hash: dict[str, Review] = {}
-        async for review in self._storage.reviews.reviews_for_eval_hashes(task_id[0], eval_hashes):
-            # Supposedly the first review should be the good one
-            # But just in case, we only override the review for a given hash if it is a user review
-            if review.eval_hash not in reviews_by_eval_hash or review.reviewer.reviewer_type == "user":
-                reviews_by_eval_hash[review.eval_hash] = review
+        reviews_by_eval_hash = counted_reviews(
+            [review async for review in self._storage.reviews.reviews_for_eval_hashes(task_id[0], eval_hashes)],
+        )
+        outcomes = self._benchmark_outcomes(reviews_by_eval_hash)
 
-        for version_id, run_agg in run_aggs.items():
-            yield self._merge_aggregate(version_id, run_agg, reviews_by_eval_hash)
+        aggregates = [self._merge_aggregate(version_id, run_agg, outcomes) for version_id, run_agg in run_aggs.items()]
+        return aggregates, outcomes
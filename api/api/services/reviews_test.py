@@ -1,3 +1,4 @@
+from datetime import timedelta
 from typing import Any, cast
 from unittest.mock import AsyncMock, Mock
 
@@ -14,11 +15,17 @@ from core.domain.input_evaluation import InputEvaluation
 from core.domain.review import Review, ReviewOutcome
 from core.domain.task_evaluation import TaskEvaluation
 from core.domain.users import UserIdentifier
+from core.domain.utils import compute_eval_hash
 from core.evaluators.abstract_evaluator import AbstractEvaluator
-from core.storage.review_benchmark_storage import RunReviewAggregateWithIteration
+from core.storage.review_benchmark_storage import (
+    ReviewBenchmarkDelta,
+    ReviewBenchmarkReconciliation,
+    ReviewBenchmarkState,
+    RunReviewAggregateWithIteration,
+)
 from core.storage.task_run_storage import RunAggregate
 from core.utils.fields import datetime_factory
-from tests.models import task_variant
+from tests.models import task_run_ser, task_variant
 from tests.utils import mock_aiter
 
 
@@ -56,10 +63,24 @@ def _review_agg(iteration: int = 1, **kwargs: Any):
         negative_review_count=0,
         negative_user_review_count=0,
         unsure_review_count=0,
+        eval_hash_run_counts={},
+        total_cost_usd=0,
+        total_duration_seconds=0,
     )
     return cast(RunReviewAggregateWithIteration, {**raw, **kwargs})
 
 
+def _benchmark_state(**kwargs: Any):
+    base = ReviewBenchmarkState(
+        revision=3,
+        reconciled_at=datetime_factory(),
+        input_hashes={"a"},
+        eval_hash_run_counts={1: 0, 2: 0},
+        review_outcome=None,
+    )
+    return base._replace(**kwargs)
+
+
 def _review(eval_hash: str = "", user: bool = False, outcome: ReviewOutcome = "positive", **kwargs: Any):
     r = Review(
         task_id="task_id",
@@ -122,6 +143,7 @@ class TestRecomputeReviewBenchmark:
                     version_id="v1",
                     positive_review_count=2,
                     positive_user_review_count=1,
+                    eval_hash_run_counts={"e1": 1, "e2": 1},
                 ),
                 _review_agg(
                     2,
@@ -131,9 +153,15 @@ class TestRecomputeReviewBenchmark:
                     positive_user_review_count=1,
                     failed_run_count=1,
                     negative_review_count=1,
+                    eval_hash_run_counts={"e1": 1, "e3": 1},
                 ),
             ],
             datetime_factory(),
+            ReviewBenchmarkReconciliation(
+                review_outcomes={"e1": "positive_user", "e2": "positive", "e3": "negative"},
+                input_hashes={"a", "b"},
+                is_full=True,
+            ),
         )
 
         mock_storage.task_runs.aggregate_runs.assert_called_once_with(
@@ -171,8 +199,22 @@ class TestRecomputeReviewBenchmark:
         mock_storage.review_benchmarks.update_benchmark.assert_awaited_once_with(
             "task_id",
             1,
-            [_review_agg(2, version_id="v2", positive_review_count=1, positive_user_review_count=1)],
+            [
+                _review_agg(
+                    2,
+                    version_id="v2",
+                    positive_review_count=1,
+                    positive_user_review_count=1,
+                    eval_hash_run_counts={"e1": 1},
+                ),
+            ],
             datetime_factory(),
+            # Only some versions were recomputed
+            ReviewBenchmarkReconciliation(
+                review_outcomes={"e1": "positive_user"},
+                input_hashes={"a", "b"},
+                is_full=False,
+            ),
         )
         mock_storage.task_runs.aggregate_runs.assert_called_once_with(
             ("task_id", 1),
@@ -189,9 +231,34 @@ class TestRecomputeReviewBenchmark:
         frozen_time: FrozenDateTimeFactory,
     ):
         mock_storage.get_task_tuple.return_value = ("task_id", 1)
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state()
+
+        await reviews_service.recompute_review_benchmark(
+            task_id="task_id",
+            task_schema_id=1,
+            iterations={1},
+            run_id="run_id",
+        )
+
+        mock_storage.review_benchmarks.complete_run.assert_awaited_once_with("task_id", 1, 1, "run_id")
+        mock_storage.review_benchmarks.get_benchmark_state.assert_awaited_once_with("task_id", 1, None)
+        # The run is counted when it is stored
+        mock_storage.review_benchmarks.update_benchmark.assert_not_called()
+        mock_storage.task_runs.aggregate_runs.assert_not_called()
+
+    async def test_complete_run_reconciles_stale_benchmark(
+        self,
+        reviews_service: ReviewsService,
+        mock_storage: Mock,
+        frozen_time: FrozenDateTimeFactory,
+    ):
+        mock_storage.get_task_tuple.return_value = ("task_id", 1)
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state(
+            reconciled_at=datetime_factory() - timedelta(hours=2),
+        )
         mock_storage.review_benchmarks.get_benchmark_versions.return_value = {1, 2}
         mock_storage.reviews.find_unique_input_hashes.return_value = {"a", "b"}
-        mock_storage.task_groups.map_iterations.return_value = {1: "v1"}
+        mock_storage.task_groups.map_iterations.return_value = {1: "v1", 2: "v2"}
         mock_storage.task_runs.aggregate_runs.return_value = {
             "v1": _run_agg(["e1", "e2"]),
         }
@@ -207,9 +274,174 @@ class TestRecomputeReviewBenchmark:
         )
 
         mock_storage.review_benchmarks.complete_run.assert_awaited_once_with("task_id", 1, 1, "run_id")
+        # All versions are recomputed
+        mock_storage.task_groups.map_iterations.assert_awaited_once_with("task_id", 1, {1, 2})
+        mock_storage.review_benchmarks.update_benchmark.assert_awaited_once()
+        assert mock_storage.review_benchmarks.update_benchmark.call_args.args[4].is_full
+
+    async def test_review_changed(
+        self,
+        reviews_service: ReviewsService,
+        mock_storage: Mock,
+        frozen_time: FrozenDateTimeFactory,
+    ):
+        eval_hash = compute_eval_hash(1, "a", "output_hash")
+        mock_storage.get_task_tuple.return_value = ("task_id", 1)
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state(
+            eval_hash_run_counts={1: 2, 2: 0},
+            review_outcome="in_progress",
+        )
+        mock_storage.review_benchmarks.apply_delta.return_value = True
+        mock_storage.reviews.reviews_for_eval_hashes.return_value = mock_aiter(
+            _review(eval_hash=eval_hash, outcome="negative"),
+        )
+
+        await reviews_service.recompute_review_benchmark(
+            task_id="task_id",
+            task_schema_id=1,
+            input_hashes=("a", "output_hash"),
+        )
+
+        mock_storage.review_benchmarks.apply_delta.assert_awaited_once_with(
+            "task_id",
+            1,
+            ReviewBenchmarkDelta(
+                revision=3,
+                increments={1: {"in_progress_review_count": -2, "negative_review_count": 2}},
+                eval_hash=eval_hash,
+                review_outcome="negative",
+            ),
+        )
+        mock_storage.task_runs.aggregate_runs.assert_not_called()
+
+    async def test_review_changed_conflict(
+        self,
+        reviews_service: ReviewsService,
+        mock_storage: Mock,
+        frozen_time: FrozenDateTimeFactory,
+    ):
+        eval_hash = compute_eval_hash(1, "a", "output_hash")
+        mock_storage.get_task_tuple.return_value = ("task_id", 1)
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state(
+            eval_hash_run_counts={1: 1},
+        )
+        # The benchmark keeps being updated concurrently
+        mock_storage.review_benchmarks.apply_delta.return_value = False
+        mock_storage.reviews.reviews_for_eval_hashes.side_effect = lambda *_: mock_aiter(  # pyright: ignore [reportUnknownLambdaType]
+            _review(eval_hash=eval_hash),
+        )
+        mock_storage.review_benchmarks.get_benchmark_versions.return_value = {1}
+        mock_storage.reviews.find_unique_input_hashes.return_value = {"a"}
+        mock_storage.task_groups.map_iterations.return_value = {1: "v1"}
+        mock_storage.task_runs.aggregate_runs.return_value = {"v1": _run_agg([eval_hash])}
+
+        await reviews_service.recompute_review_benchmark(
+            task_id="task_id",
+            task_schema_id=1,
+            input_hashes=("a", "output_hash"),
+        )
+
+        assert mock_storage.review_benchmarks.apply_delta.await_count == 3
+        # Falling back to reconciling all the runs
+        mock_storage.task_runs.aggregate_runs.assert_awaited_once_with(("task_id", 1), 1, {"a"}, {"v1"})
         mock_storage.review_benchmarks.update_benchmark.assert_awaited_once()
-        mock_storage.task_runs.aggregate_runs.assert_called_once()
-        mock_storage.task_groups.map_iterations.assert_awaited_once_with("task_id", 1, {1})
+
+    async def test_new_evaluated_input(
+        self,
+        reviews_service: ReviewsService,
+        mock_storage: Mock,
+        frozen_time: FrozenDateTimeFactory,
+    ):
+        mock_storage.get_task_tuple.return_value = ("task_id", 1)
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state()
+        mock_storage.review_benchmarks.get_benchmark_versions.return_value = {1}
+        mock_storage.reviews.find_unique_input_hashes.return_value = {"a", "new"}
+        mock_storage.task_groups.map_iterations.return_value = {1: "v1"}
+        mock_storage.task_runs.aggregate_runs.return_value = {"v1": _run_agg(["e1"])}
+        mock_storage.reviews.reviews_for_eval_hashes.return_value = mock_aiter()
+
+        await reviews_service.recompute_review_benchmark(
+            task_id="task_id",
+            task_schema_id=1,
+            input_hashes=("new", "output_hash"),
+        )
+
+        mock_storage.review_benchmarks.apply_delta.assert_not_called()
+        mock_storage.task_runs.aggregate_runs.assert_awaited_once_with(("task_id", 1), 1, {"a", "new"}, {"v1"})
+        reconciliation = mock_storage.review_benchmarks.update_benchmark.call_args.args[4]
+        assert reconciliation.is_full
+        assert reconciliation.input_hashes == {"a", "new"}
+
+
+class TestAddRunToReviewBenchmark:
+    async def test_counted(self, reviews_service: ReviewsService, mock_storage: Mock):
+        run = task_run_ser(
+            task_input_hash="a",
+            cost_usd=0.5,
+            duration_seconds=2,
+            status="failure",
+            group_kwargs={"iteration": 1},
+        )
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state(
+            review_outcome="positive_user",
+        )
+        mock_storage.review_benchmarks.apply_delta.return_value = True
+
+        await reviews_service.add_run_to_review_benchmark(run)
+
+        mock_storage.review_benchmarks.get_benchmark_state.assert_awaited_once_with("task_id", 1, run.eval_hash)
+        mock_storage.review_benchmarks.apply_delta.assert_awaited_once_with(
+            "task_id",
+            1,
+            ReviewBenchmarkDelta(
+                revision=3,
+                increments={
+                    1: {
+                        "total_run_count": 1,
+                        "total_cost_usd": 0.5,
+                        "total_duration_seconds": 2,
+                        f"eval_hash_run_counts.{run.eval_hash}": 1,
+                        "run_failed_count": 1,
+                        "positive_review_count": 1,
+                        "positive_user_review_count": 1,
+                    },
+                },
+                eval_hash=run.eval_hash,
+                review_outcome="positive_user",
+            ),
+        )
+
+    @pytest.mark.parametrize(
+        "run_kwargs",
+        [
+            pytest.param({"task_input_hash": "not_evaluated", "group_kwargs": {"iteration": 1}}, id="not evaluated"),
+            pytest.param({"task_input_hash": "a", "group_kwargs": {"iteration": 3}}, id="not benchmarked"),
+        ],
+    )
+    async def test_not_counted(self, reviews_service: ReviewsService, mock_storage: Mock, run_kwargs: dict[str, Any]):
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state()
+
+        await reviews_service.add_run_to_review_benchmark(task_run_ser(**run_kwargs))
+
+        mock_storage.review_benchmarks.apply_delta.assert_not_called()
+
+    async def test_no_benchmark(self, reviews_service: ReviewsService, mock_storage: Mock):
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = None
+
+        await reviews_service.add_run_to_review_benchmark(task_run_ser(task_input_hash="a"))
+
+        mock_storage.review_benchmarks.apply_delta.assert_not_called()
+
+    async def test_conflicts(self, reviews_service: ReviewsService, mock_storage: Mock, mock_event_router: Mock):
+        mock_storage.review_benchmarks.get_benchmark_state.return_value = _benchmark_state()
+        mock_storage.review_benchmarks.apply_delta.return_value = False
+
+        await reviews_service.add_run_to_review_benchmark(
+            task_run_ser(task_input_hash="a", group_kwargs={"iteration": 1}),
+        )
+
+        assert mock_storage.review_benchmarks.apply_delta.await_count == 3
+        mock_event_router.assert_called_once_with(RecomputeReviewBenchmarkEvent(task_id="task_id", task_schema_id=1))
 
 
 class TestTriggerRunsForBenchmark:
@@ -439,6 +671,7 @@ class TestEvaluateRunsByHashIfNeeded:
                 task_schema_id=1,
                 run_id="run_id",
                 iterations={1},
+                input_hashes=("hash", "hash"),
             ),
         )
 
@@ -1,4 +1,5 @@
 import logging
+import os
 from collections.abc import Callable
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator, Iterable, Optional
@@ -34,6 +35,7 @@ from core.runners.workflowai.workflowai_runner import WorkflowAIRunner
 from core.storage import TenantTuple
 from core.storage.azure.azure_blob_file_storage import FileStorage
 from core.storage.backend_storage import BackendStorage
+from core.utils.aio import latest_only
 
 
 def _format_model(model: BaseModel, exclude_none: bool = True) -> str:
@@ -43,6 +45,10 @@ def _format_model(model: BaseModel, exclude_none: bool = True) -> str:
 class RunService:
     """The run service is on the critical path so should be thoroughly tested and as efficient as possible"""
 
+    # When the client reads the stream slower than chunks are produced, only the latest chunk
+    # is serialized and sent. Chunks are cumulative so no information is lost.
+    coalesce_stream_chunks = os.getenv("STREAM_COALESCE_CHUNKS", "true") == "true"
+
     def __init__(
         self,
         storage: BackendStorage,
@@ -73,7 +79,7 @@ class RunService:
     ) -> AsyncGenerator[str, None]:
         try:
             chunk: RunOutput | None = None
-            async for chunk in self.stream_from_builder(
+            chunks = self.stream_from_builder(
                 builder=builder,
                 runner=runner,
                 cache=cache,
@@ -82,7 +88,10 @@ class RunService:
                 store_inline=store_inline,
                 source=source,
                 file_storage=file_storage,
-            ):
+            )
+            if self.coalesce_stream_chunks:
+                chunks = latest_only(chunks)
+            async for chunk in chunks:
                 if chunk:
                     yield _format_model(chunk_serializer(builder.id, chunk))
             if serializer:
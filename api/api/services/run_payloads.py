@@ -0,0 +1,123 @@
+import logging
+import os
+
+from core.domain.agent_run import AgentRun
+from core.domain.errors import InternalError
+from core.domain.events import StoreTaskRunEvent
+from core.domain.metrics import send_counter
+from core.domain.task_variant import SerializableTaskVariant
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import LRUCache, TLRUCache
+from core.utils.payload_store import PayloadStore
+from core.utils.redis_cache import shared_redis_client
+
+_logger = logging.getLogger(__name__)
+
+# Runs with a smaller JSON payload are sent inline
+_MIN_RUN_SIZE_BYTES = int(os.getenv("PAYLOAD_CLAIM_CHECK_MIN_RUN_SIZE_BYTES", "4096"))
+
+
+class RunPayloads:
+    """Claim checks for the payloads of StoreTaskRunEvent.
+
+    The run, with its LLM completions, and the task variant, with both schemas, are written
+    to the payload store and the event only carries their references.
+    - task variants are immutable so they are only written again when the last write is
+    about to expire, and they are cached by the workers
+    - small runs are kept in the event since the round trip to the store would cost more
+    than sending them through the broker"""
+
+    def __init__(self, store: PayloadStore, min_run_size_bytes: int = _MIN_RUN_SIZE_BYTES, variant_capacity: int = 256):
+        self._store = store
+        self._min_run_size_bytes = min_run_size_bytes
+        # Variants that were written recently. Each write resets the expiration in the store
+        # and the entries expire well before so that a variant is never referenced after
+        # it expired, including by retried jobs
+        written_ttl = store.ttl / 2
+        self._written_variants = TLRUCache[str, bool](
+            variant_capacity,
+            lambda _, __: written_ttl,
+        )
+        self._variants = LRUCache[str, SerializableTaskVariant](variant_capacity)
+
+    @classmethod
+    def _run_key(cls, tenant_uid: int, run_id: str) -> str:
+        return f"store_task_run:{tenant_uid}:{run_id}"
+
+    @classmethod
+    def _variant_key(cls, tenant_uid: int, task_id: str, variant_id: str) -> str:
+        return f"task_variant:{tenant_uid}:{task_id}:{variant_id}"
+
+    async def _check_in_variant(self, tenant_uid: int, task: SerializableTaskVariant) -> bool:
+        key = self._variant_key(tenant_uid, task.task_id, task.id)
+        if self._written_variants.get(key):
+            return True
+        if not await self._store.put_model(key, task):
+            return False
+        self._written_variants[key] = True
+        return True
+
+    async def check_in(self, event: StoreTaskRunEvent) -> StoreTaskRunEvent:
+        """Returns a copy of the event with the payloads replaced by references. The event
+        is returned as is when the payloads could not be stored"""
+        if not self._store.enabled or event.run is None or event.task is None:
+            return event
+
+        try:
+            if not await self._check_in_variant(event.tenant_uid, event.task):
+                return event
+
+            update: dict[str, object] = {
+                "task": None,
+                "task_id": event.task.task_id,
+                "task_variant_id": event.task.id,
+            }
+            serialized_run = event.run.model_dump_json().encode()
+            if len(serialized_run) >= self._min_run_size_bytes:
+                run_ref = self._run_key(event.tenant_uid, event.run.id)
+                if await self._store.put(run_ref, serialized_run):
+                    update["run"] = None
+                    update["run_ref"] = run_ref
+        except Exception:
+            _logger.exception("Failed to check in run payloads", extra={"run_id": event.run.id})
+            return event
+
+        add_background_task(send_counter("run_payload_check_in", run_inline=update.get("run_ref") is None))
+        return event.model_copy(update=update)
+
+    async def _check_out_variant(self, event: StoreTaskRunEvent) -> SerializableTaskVariant:
+        if event.task is not None:
+            return event.task
+        if not event.task_id or not event.task_variant_id:
+            raise InternalError("Store task run event has no task", run_ref=event.run_ref)
+
+        key = self._variant_key(event.tenant_uid, event.task_id, event.task_variant_id)
+        if (variant := self._variants.peek(key)) is None:
+            variant = await self._store.get_model(key, SerializableTaskVariant)
+            if variant is None:
+                raise InternalError("Task variant payload not found", key=key)
+            self._variants[key] = variant
+        # Callers are allowed to update the variant
+        return variant.model_copy()
+
+    async def check_out(self, event: StoreTaskRunEvent) -> tuple[SerializableTaskVariant, AgentRun]:
+        """Resolves the task variant and the run of the event. Raises a fatal error when a payload
+        has expired since retrying would not help"""
+        task = await self._check_out_variant(event)
+        if event.run is not None:
+            return task, event.run
+        if not event.run_ref:
+            raise InternalError("Store task run event has no run", task_variant_id=event.task_variant_id)
+        run = await self._store.get_model(event.run_ref, AgentRun)
+        if run is None:
+            raise InternalError("Run payload not found", run_ref=event.run_ref)
+        return task, run
+
+    async def release(self, event: StoreTaskRunEvent):
+        """Deletes the run payload once it is no longer needed. Variants are left to expire
+        since they are shared between runs"""
+        if event.run_ref:
+            await self._store.delete(event.run_ref)
+
+
+shared_run_payloads = RunPayloads(PayloadStore(shared_redis_client))
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+
+from api.services.run_payloads import RunPayloads
+from core.domain.errors import InternalError
+from core.domain.events import StoreTaskRunEvent
+from core.utils.payload_store import PayloadStore
+from tests.models import task_run_ser, task_variant
+
+
+@pytest.fixture(autouse=True)
+def patched_send_counter():
+    with patch("api.services.run_payloads.send_counter") as mock:
+        yield mock
+
+
+@pytest.fixture
+def store():
+    return PayloadStore(enabled=True)
+
+
+@pytest.fixture
+def run_payloads(store: PayloadStore):
+    return RunPayloads(store, min_run_size_bytes=4096)
+
+
+def _event(output_size: int = 8192):
+    return StoreTaskRunEvent(
+        run=task_run_ser(task_output={"output": "a" * output_size}),
+        task=task_variant(),
+        trigger="user",
+        tenant_uid=1,
+    )
+
+
+class TestCheckIn:
+    async def test_large_run(self, run_payloads: RunPayloads):
+        event = _event()
+
+        checked_in = await run_payloads.check_in(event)
+        assert checked_in.run is None
+        assert checked_in.task is None
+        assert checked_in.run_ref == "store_task_run:1:run_id"
+        assert checked_in.task_id == "task_id"
+        assert checked_in.task_variant_id == "task_version_id"
+        # The message is a fraction of the original one
+        assert len(checked_in.model_dump_json()) < len(event.model_dump_json()) / 4
+        # The original event is not modified
+        assert event.run is not None
+
+        task, run = await run_payloads.check_out(checked_in)
+        assert task == event.task
+        assert run == event.run
+
+        await run_payloads.release(checked_in)
+        with pytest.raises(InternalError, match="Run payload not found"):
+            await run_payloads.check_out(checked_in)
+
+    async def test_small_run_is_inline(self, run_payloads: RunPayloads):
+        event = _event(output_size=10)
+
+        checked_in = await run_payloads.check_in(event)
+        assert checked_in.run == event.run
+        assert checked_in.run_ref is None
+        assert checked_in.task is None
+
+        task, run = await run_payloads.check_out(checked_in)
+        assert task == event.task
+        assert run == event.run
+
+    async def test_variant_is_written_once(self, store: PayloadStore, run_payloads: RunPayloads):
+        with patch.object(store, "put_model", wraps=store.put_model) as put_model:
+            await run_payloads.check_in(_event())
+            await run_payloads.check_in(_event())
+        put_model.assert_called_once()
+
+    async def test_variant_is_written_again_before_expiring(
+        self,
+        store: PayloadStore,
+        run_payloads: RunPayloads,
+        frozen_time: FrozenDateTimeFactory,
+    ):
+        with patch.object(store, "put_model", wraps=store.put_model) as put_model:
+            await run_payloads.check_in(_event())
+            frozen_time.tick(store.ttl / 2 + timedelta(seconds=1))
+            await run_payloads.check_in(_event())
+        # The second write resets the expiration of the stored variant
+        assert put_model.call_count == 2
+
+    async def test_store_failure(self, store: PayloadStore, run_payloads: RunPayloads):
+        event = _event()
+        with patch.object(store, "put_model", AsyncMock(return_value=False)):
+            assert await run_payloads.check_in(event) is event
+
+    async def test_disabled(self):
+        run_payloads = RunPayloads(PayloadStore(enabled=False))
+        event = _event()
+        assert await run_payloads.check_in(event) is event
+
+
+class TestCheckOut:
+    async def test_variant_is_cached(self, store: PayloadStore, run_payloads: RunPayloads):
+        checked_in = await run_payloads.check_in(_event())
+
+        with patch.object(store, "get_model", wraps=store.get_model) as get_model:
+            await run_payloads.check_out(checked_in)
+            await run_payloads.check_out(checked_in)
+        # Once for the variant, twice for the run
+        assert get_model.call_count == 3
+
+    async def test_inline_event(self, run_payloads: RunPayloads):
+        event = _event()
+        task, run = await run_payloads.check_out(event)
+        assert task is event.task
+        assert run is event.run
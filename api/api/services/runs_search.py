@@ -1,4 +1,5 @@
 import asyncio
+import base64
 import logging
 from collections.abc import Callable
 from datetime import datetime
@@ -9,7 +10,7 @@ from core.domain.agent_run import AgentRunBase
 from core.domain.errors import BadRequestError
 from core.domain.major_minor import MajorMinor
 from core.domain.models import Model
-from core.domain.page import Page
+from core.domain.page import CursorPage
 from core.domain.search_query import (
     FieldQuery,
     ReviewSearchOptions,
@@ -18,6 +19,7 @@ from core.domain.search_query import (
     SearchOperationBetween,
     SearchOperationSingle,
     SearchOperator,
+    SearchQuery,
     SearchQueryNested,
     SearchQuerySimple,
     SimpleSearchField,
@@ -31,7 +33,9 @@ from core.storage.backend_storage import BackendStorage
 from core.storage.task_group_storage import TaskGroupStorage
 from core.storage.task_run_storage import TaskRunStorage
 from core.utils.generics import BM
+from core.utils.redis_cache import redis_cached
 from core.utils.schemas import FieldType, JsonSchema
+from core.utils.strings import b64_urldecode
 
 
 class RunsSearchService:
@@ -476,6 +480,30 @@ class RunsSearchService:
             except KeyError:
                 raise BadRequestError(f"Version {semver} not found")
 
+    @classmethod
+    def _page_token(cls, run: AgentRunBase) -> str:
+        return base64.urlsafe_b64encode(run.id.encode()).decode().rstrip("=")
+
+    @classmethod
+    def _run_id_from_page_token(cls, page_token: str) -> str:
+        try:
+            return b64_urldecode(page_token).decode()
+        except (ValueError, UnicodeDecodeError):
+            raise BadRequestError("Invalid page token")
+
+    async def _count_task_runs(self, task_uid: TaskTuple, fields: list[SearchQuery] | None) -> int | None:
+        task_runs_storage = self._storage.task_runs
+
+        # Counting is as expensive as reading all matching rows so the count is cached
+        # for a short while, which covers fetching the following pages
+        # Passing the tenant as an argument since it is part of the cache key
+        # Counts that timed out are not cached so that the next page tries again
+        @redis_cached(expiration_seconds=60, cache_none=False)
+        async def _count(tenant: str, task_uid: TaskTuple, fields: list[SearchQuery] | None):
+            return await task_runs_storage.count_filtered_task_runs(task_uid, fields, timeout_ms=20_000)
+
+        return await _count(self._storage.tenant, task_uid, fields)
+
     async def search_task_runs(
         self,
         task_uid: TaskTuple,
@@ -483,13 +511,19 @@ class RunsSearchService:
         limit: int,
         offset: int,
         map: Callable[[AgentRunBase], BM],
-    ) -> Page[BM]:
+        page_token: str | None = None,
+        include_count: bool = True,
+    ) -> CursorPage[BM]:
+        if page_token and offset:
+            # The offset would be applied after the page token and silently skip runs
+            raise BadRequestError("An offset can't be used with a page token")
         fields = [f async for f in self._process_field_query(task_uid[0], field_queries)] if field_queries else None
-
-        task_runs_storage = self._storage.task_runs
+        before_run_id = self._run_id_from_page_token(page_token) if page_token else None
 
         async def _fetch_count():
-            return await task_runs_storage.count_filtered_task_runs(task_uid, fields, timeout_ms=20_000)
+            if not include_count:
+                return None
+            return await self._count_task_runs(task_uid, fields)
 
         async def _fetch_runs():
             runs = [
@@ -499,11 +533,17 @@ class RunsSearchService:
                     fields,
                     limit,
                     offset,
+                    before_run_id=before_run_id,
                 )
             ]
             # TODO[test]: add dedicated tests, for not it is tested through the runs service
             await apply_reviews(self._storage.reviews, task_uid[0], runs, self._logger)
-            return [map(item) for item in runs]
-
-        items, count = await asyncio.gather(_fetch_runs(), _fetch_count())
-        return Page(items=items, count=count)
+            return runs
+
+        runs, count = await asyncio.gather(_fetch_runs(), _fetch_count())
+        return CursorPage(
+            items=[map(item) for item in runs],
+            count=count,
+            # A full page means that there might be more runs
+            next_page_token=self._page_token(runs[-1]) if runs and len(runs) >= limit else None,
+        )
@@ -3,6 +3,7 @@ from unittest.mock import Mock
 import pytest
 
 from api.services.runs_search import RunsSearchService
+from core.domain.errors import BadRequestError
 from core.domain.major_minor import MajorMinor
 from core.domain.models import Model
 from core.domain.search_query import (
@@ -14,7 +15,8 @@ from core.domain.search_query import (
     SearchQueryNested,
     SearchQuerySimple,
 )
-from tests.models import task_variant
+from core.utils.uuid import uuid7
+from tests.models import task_run_ser, task_variant
 from tests.utils import fixtures_json, mock_aiter
 
 
@@ -309,6 +311,69 @@ class TestProcessFieldQuery:
         mock_storage.reviews.eval_hashes_for_review.assert_awaited_once_with("test_task", ReviewSearchOptions.POSITIVE)
 
 
+class TestSearchTaskRunsPagination:
+    async def test_full_page_has_token(self, service: RunsSearchService, mock_storage: Mock):
+        runs = [task_run_ser(id=str(uuid7())) for _ in range(2)]
+        mock_storage.task_runs.search_task_runs.return_value = mock_aiter(*runs)
+        mock_storage.task_runs.count_filtered_task_runs.return_value = 10
+
+        page = await service.search_task_runs(("task_id", 1), None, limit=2, offset=0, map=lambda x: x)
+
+        assert page.items == runs
+        assert page.count == 10
+        assert page.next_page_token
+
+        # The token resumes after the last run
+        mock_storage.task_runs.search_task_runs.return_value = mock_aiter()
+        page = await service.search_task_runs(
+            ("task_id", 1),
+            None,
+            limit=2,
+            offset=0,
+            map=lambda x: x,
+            page_token=page.next_page_token,
+            include_count=False,
+        )
+        assert mock_storage.task_runs.search_task_runs.call_args.kwargs == {"before_run_id": runs[-1].id}
+        assert page.items == []
+        assert page.count is None
+        assert page.next_page_token is None
+        # The count was only fetched once
+        mock_storage.task_runs.count_filtered_task_runs.assert_awaited_once()
+
+    async def test_last_page_has_no_token(self, service: RunsSearchService, mock_storage: Mock):
+        mock_storage.task_runs.search_task_runs.return_value = mock_aiter(task_run_ser())
+        mock_storage.task_runs.count_filtered_task_runs.return_value = 1
+
+        page = await service.search_task_runs(("task_id", 1), None, limit=2, offset=0, map=lambda x: x)
+
+        assert len(page.items) == 1
+        assert page.next_page_token is None
+
+    async def test_offset_with_token(self, service: RunsSearchService, mock_storage: Mock):
+        with pytest.raises(BadRequestError, match="offset"):
+            await service.search_task_runs(
+                ("task_id", 1),
+                None,
+                limit=2,
+                offset=2,
+                map=lambda x: x,
+                page_token="YQ",
+            )
+        mock_storage.task_runs.search_task_runs.assert_not_called()
+
+    async def test_invalid_token(self, service: RunsSearchService):
+        with pytest.raises(BadRequestError, match="Invalid page token"):
+            await service.search_task_runs(
+                ("task_id", 1),
+                None,
+                limit=2,
+                offset=0,
+                map=lambda x: x,
+                page_token="\xff",
+            )
+
+
 # TODO[search]
 # class TestSearchTaskRuns:
 #     async def test_search_task_runs(
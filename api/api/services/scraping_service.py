@@ -11,7 +11,7 @@ from core.tools.browser_text.browser_text_tool import (
     browser_text_with_proxy_setting,
     get_sitemap,
 )
-from core.utils.token_utils import tokens_from_string
+from core.utils.token_utils import count_tokens
 
 _logger = logging.getLogger(__name__)
 
@@ -105,7 +105,7 @@ class ScrapingService:
                 continue
 
             try:
-                content_tokens = tokens_from_string(content.content, DEFAULT_MODEL_FOR_TOKEN_COUNT)
+                content_tokens = await count_tokens(content.content, DEFAULT_MODEL_FOR_TOKEN_COUNT)
             except Exception as e:
                 _logger.exception(
                     "Could not calculate tokens for content",
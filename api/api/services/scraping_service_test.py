@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from pytest import LogCaptureFixture
@@ -168,7 +168,7 @@ class TestLimiteURLContentSize:
     scraping_service = ScrapingService()
 
     @pytest.mark.parametrize(
-        "url_contents, max_tokens, expected_token_counts, mock_tokens_from_string_side_effect, expected_result_indices",
+        "url_contents, max_tokens, expected_token_counts, mock_count_tokens_side_effect, expected_result_indices",
         [
             # Test case 1: Empty input list
             ([], 100, [], [], []),
@@ -253,17 +253,17 @@ class TestLimiteURLContentSize:
             ),
         ],
     )
-    @patch("api.services.scraping_service.tokens_from_string")
+    @patch("api.services.scraping_service.count_tokens", new_callable=AsyncMock)
     async def test_limit_url_content_size(
         self,
-        mock_tokens_from_string: Mock,
+        mock_count_tokens: AsyncMock,
         url_contents: list[URLContent],
         max_tokens: int,
         expected_token_counts: list[int | Exception],
-        mock_tokens_from_string_side_effect: list[int | Exception],
+        mock_count_tokens_side_effect: list[int | Exception],
         expected_result_indices: list[int],
     ):
-        mock_tokens_from_string.side_effect = mock_tokens_from_string_side_effect
+        mock_count_tokens.side_effect = mock_count_tokens_side_effect
 
         result = await self.scraping_service.limit_url_content_size(url_contents, max_tokens)  # pyright: ignore[reportPrivateUsage]
 
@@ -274,21 +274,21 @@ class TestLimiteURLContentSize:
         total_tokens_added = 0
         for i, content in enumerate(url_contents):
             if i in expected_result_indices and content.content:
-                # Check if tokens_from_string was called for content that was added and non-empty
-                assert mock_tokens_from_string.call_count > call_index
-                args, _ = mock_tokens_from_string.call_args_list[call_index]  # Ignore kwargs
+                # Check if count_tokens was called for content that was added and non-empty
+                assert mock_count_tokens.call_count > call_index
+                args, _ = mock_count_tokens.call_args_list[call_index]  # Ignore kwargs
                 assert args[0] == content.content
                 assert args[1] == "gpt-4"  # Check the model used
                 # Sum tokens only if the mock didn't raise an exception for this call
-                effect = mock_tokens_from_string_side_effect[call_index]
+                effect = mock_count_tokens_side_effect[call_index]
                 if not isinstance(effect, Exception):
                     assert isinstance(effect, int)  # Add assertion for type checker
                     total_tokens_added += effect
                 call_index += 1
             elif content.content and i not in expected_result_indices:
-                # Check if tokens_from_string was called for content that was *not* added (if it was the one exceeding the limit)
-                if mock_tokens_from_string.call_count > call_index:
-                    args, _ = mock_tokens_from_string.call_args_list[call_index]  # Ignore kwargs
+                # Check if count_tokens was called for content that was *not* added (if it was the one exceeding the limit)
+                if mock_count_tokens.call_count > call_index:
+                    args, _ = mock_count_tokens.call_args_list[call_index]  # Ignore kwargs
                     if args[0] == content.content:
                         call_index += 1  # Count the call even if not added
 
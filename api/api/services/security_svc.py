@@ -16,6 +16,7 @@ from core.domain.tenant_data import TenantData
 from core.domain.users import User
 from core.storage import ObjectNotFoundException
 from core.storage.organization_storage import OrganizationSystemStorage
+from core.storage.tenant_cache import TenantCache
 from core.utils.background import add_background_task
 from core.utils.coroutines import capture_errors
 from core.utils.hash import secure_hash
@@ -27,9 +28,15 @@ _logger = logging.getLogger(__name__)
 
 class SecurityService:
     # Can't use the analytics service here since it depends on data provided by this service
-    def __init__(self, org_storage: OrganizationSystemStorage, event_router: EventRouter):
+    def __init__(
+        self,
+        org_storage: OrganizationSystemStorage,
+        event_router: EventRouter,
+        tenant_cache: TenantCache | None = None,
+    ):
         self._org_storage = org_storage
         self._event_router = event_router
+        self._tenant_cache = tenant_cache or TenantCache(ttl_seconds=0)
 
     def _send_tenant_created_analytics(self, org: TenantData):
         # This is annoying, we should not go through
@@ -141,7 +148,11 @@ class SecurityService:
         anon_id: str | None,
     ) -> TenantData:
         try:
-            return await self._org_storage.find_tenant_for_org_id(org_id)
+            return await self._tenant_cache.get_or_fetch(
+                ("org_id", org_id),
+                TenantData,
+                lambda: self._org_storage.find_tenant_for_org_id(org_id),
+            )
         except ObjectNotFoundException:
             pass
 
@@ -182,7 +193,11 @@ class SecurityService:
         """Find, migrate or create a tenant for a user_id. This should be called
         if there is a user_id but no org_id"""
         try:
-            return await self._org_storage.find_tenant_for_owner_id(owner_id)
+            return await self._tenant_cache.get_or_fetch(
+                ("owner_id", owner_id),
+                TenantData,
+                lambda: self._org_storage.find_tenant_for_owner_id(owner_id),
+            )
         except ObjectNotFoundException:
             pass
 
@@ -198,11 +213,19 @@ class SecurityService:
         )
 
     async def _find_tenant_for_api_key(self, credentials: str):
+        # Deleting a key invalidates the cache of the process that deleted it. Other processes
+        # keep accepting the key until the cached lookup expires so the tenant cache TTL,
+        # TENANT_CACHE_TTL_SECONDS, is the bound for revoking a key
         try:
             # We split the find and the update, the find is on the critical path
-            res = await self._org_storage.find_tenant_for_api_key(secure_hash(credentials))
+            hashed_key = secure_hash(credentials)
+            res = await self._tenant_cache.get_or_fetch(
+                ("api_key", hashed_key),
+                TenantData,
+                lambda: self._org_storage.find_tenant_for_api_key(hashed_key),
+            )
             add_background_task(
-                self._org_storage.update_api_key_last_used_at(secure_hash(credentials), datetime.now(timezone.utc)),
+                self._org_storage.update_api_key_last_used_at(hashed_key, datetime.now(timezone.utc)),
             )
             return res
         except ObjectNotFoundException:
@@ -210,7 +233,11 @@ class SecurityService:
 
     async def _find_anonymous_tenant(self, unknown_user_id: str) -> TenantData:
         try:
-            return await self._org_storage.find_anonymous_tenant(unknown_user_id)
+            return await self._tenant_cache.get_or_fetch(
+                ("anon_id", unknown_user_id),
+                TenantData,
+                lambda: self._org_storage.find_anonymous_tenant(unknown_user_id),
+            )
         except ObjectNotFoundException:
             pass
 
@@ -10,6 +10,7 @@ from core.domain.tenant_data import TenantData
 from core.domain.users import User
 from core.storage import ObjectNotFoundException
 from core.storage.organization_storage import OrganizationSystemStorage
+from core.storage.tenant_cache import TenantCache
 
 
 @pytest.fixture(scope="function")
@@ -76,6 +77,19 @@ class TestUserOrganization:
         )
         assert result == org_settings
 
+    async def test_with_api_key_cached(self, mock_org_storage: Mock, mock_event_router: EventRouter):
+        security_svc = SecurityService(mock_org_storage, mock_event_router, TenantCache())
+        org_settings = TenantData(tenant="test_tenant", slug="test_slug", org_id="test_org_id")
+        mock_org_storage.find_tenant_for_api_key.return_value = org_settings
+
+        for _ in range(2):
+            result = await security_svc.find_tenant(None, "wai-aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
+            assert result == org_settings
+
+        mock_org_storage.find_tenant_for_api_key.assert_called_once()
+        # Last used at is still updated for every request
+        assert mock_org_storage.update_api_key_last_used_at.call_count == 2
+
     async def test_with_invalid_api_key(
         self,
         mock_org_storage: Mock,
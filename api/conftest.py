@@ -587,3 +587,27 @@ def mock_user_service() -> AsyncMock:
     from core.services.users.user_service import UserService
 
     return AsyncMock(spec=UserService)
+
+
+@pytest.fixture(autouse=True)
+def clear_custom_provider_cache():
+    """Tests build custom providers with mocked factories that should not be reused"""
+    from core.providers.factory.custom_provider_cache import shared_custom_provider_cache
+
+    shared_custom_provider_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_tenant_cache():
+    """Organizations resolved in a test should not be returned to other tests"""
+    from core.storage.tenant_cache import shared_tenant_cache
+
+    shared_tenant_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_mongo_storage_caches():
+    """Databases are reset between tests so cached groups and task uids would be invalid"""
+    from core.storage.mongo.mongo_storage import MongoStorage
+
+    MongoStorage.clear_caches()
@@ -48,10 +48,18 @@ class Event(BaseModel):
 
 
 class StoreTaskRunEvent(Event):
-    run: AgentRun
-    task: SerializableTaskVariant
+    # The run and the task are None when they are stored out of the broker message
+    # In which case the references below are set, see api/services/run_payloads.py
+    # Workers that predate the references require both payloads so PAYLOAD_CLAIM_CHECK
+    # must only be enabled once all workers are deployed
+    run: AgentRun | None = None
+    task: SerializableTaskVariant | None = None
     trigger: RunTrigger | None
 
+    run_ref: str | None = None
+    task_id: str | None = None
+    task_variant_id: str | None = None
+
 
 class RunCreatedEvent(Event):
     run: AgentRun
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import time
 from collections.abc import Awaitable, Callable
@@ -50,6 +51,16 @@ async def send_gauge(name: str, value: float, timestamp: float | None = None, **
         logging.getLogger(__name__).exception("Failed to send gauge metric %s: %s", name, tags)
 
 
+def send_counter_nowait(name: str, value: int = 1, **tags: int | str | float | bool | None):
+    """Sends a counter in the background from sync code. The counter is dropped when there is
+    no running event loop, e-g in scripts"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    add_background_task(send_counter(name, value, **tags))
+
+
 @contextmanager
 def measure_time(name: str, **tags: int | str | float | bool | None):
     start = time.time()
@@ -57,6 +57,12 @@ class ModelData(ModelDataSupports):
         description="Whether the model supports tool calling",
     )
 
+    max_image_dimension: int | None = Field(
+        default=None,
+        description="The size in pixels of the longest side of the largest image the model makes use of. "
+        "Larger input images are downscaled before being sent to the provider.",
+    )
+
     @property
     def modes(self) -> list[str]:
         out: list[str] = []
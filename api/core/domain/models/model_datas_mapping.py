@@ -33,6 +33,7 @@ def _build_model_datas():
             release_date=date(2024, 11, 20),
             quality_index=641,  # MMLU=85.70, GPQA=46.00
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GPT_4O_2024_08_06: ModelData(
@@ -54,6 +55,7 @@ def _build_model_datas():
             quality_index=674,  # MMLU=88.70, GPQA=53.10
             latest_model=Model.GPT_4O_LATEST,
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GPT_41_LATEST: LatestModel(
@@ -80,6 +82,7 @@ def _build_model_datas():
             release_date=date(2025, 4, 14),
             quality_index=782,  # MMLU=90.2, GPQA=66.3
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GPT_41_MINI_LATEST: LatestModel(
@@ -106,6 +109,7 @@ def _build_model_datas():
             release_date=date(2025, 4, 14),
             quality_index=762,  # MMLU=87.5, GPQA=65
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GPT_41_NANO_LATEST: LatestModel(
@@ -132,6 +136,7 @@ def _build_model_datas():
             quality_index=650,  # MMLU=80, GPQA=50
             latest_model=Model.GPT_41_NANO_LATEST,
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GPT_45_PREVIEW_2025_02_27: ModelData(
@@ -153,6 +158,7 @@ def _build_model_datas():
             quality_index=782,  # MMLU=85.10, GPQA=71.40
             latest_model=Model.GPT_4O_LATEST,
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GPT_4O_2024_05_13: DeprecatedModel(replacement_model=Model.GPT_4O_2024_11_20),
@@ -182,6 +188,7 @@ def _build_model_datas():
             release_date=date(2024, 7, 18),
             quality_index=611,  # MMLU=82.00, GPQA=40.20
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GPT_3_5_TURBO_0125: DeprecatedModel(replacement_model=Model.GPT_4O_MINI_2024_07_18),
@@ -356,6 +363,7 @@ def _build_model_datas():
             ),
             provider_for_pricing=Provider.OPEN_AI,
             latest_model=Model.O4_MINI_LATEST_HIGH_REASONING_EFFORT,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.O4_MINI_2025_04_16_MEDIUM_REASONING_EFFORT: ModelData(
@@ -377,6 +385,7 @@ def _build_model_datas():
             ),
             provider_for_pricing=Provider.OPEN_AI,
             latest_model=Model.O4_MINI_LATEST_MEDIUM_REASONING_EFFORT,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.O4_MINI_2025_04_16_LOW_REASONING_EFFORT: ModelData(
@@ -398,6 +407,7 @@ def _build_model_datas():
             ),
             provider_for_pricing=Provider.OPEN_AI,
             latest_model=Model.O4_MINI_LATEST_LOW_REASONING_EFFORT,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.O3_LATEST_HIGH_REASONING_EFFORT: LatestModel(
@@ -431,6 +441,7 @@ def _build_model_datas():
             ),
             provider_for_pricing=Provider.OPEN_AI,
             latest_model=Model.O3_LATEST_HIGH_REASONING_EFFORT,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.O3_2025_04_16_MEDIUM_REASONING_EFFORT: ModelData(
@@ -452,6 +463,7 @@ def _build_model_datas():
             ),
             provider_for_pricing=Provider.OPEN_AI,
             latest_model=Model.O3_LATEST_MEDIUM_REASONING_EFFORT,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.O3_2025_04_16_LOW_REASONING_EFFORT: ModelData(
@@ -473,6 +485,7 @@ def _build_model_datas():
             ),
             provider_for_pricing=Provider.OPEN_AI,
             latest_model=Model.O3_LATEST_LOW_REASONING_EFFORT,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.GEMINI_1_5_PRO_PREVIEW_0514: DeprecatedModel(replacement_model=Model.GEMINI_1_5_PRO_002),
@@ -495,6 +508,7 @@ def _build_model_datas():
             release_date=date(2025, 2, 5),
             quality_index=675,  # MMLU=83.50, GPQA=51.50
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_2_0_FLASH_001: ModelData(
@@ -516,6 +530,7 @@ def _build_model_datas():
             latest_model=Model.GEMINI_2_0_FLASH_LATEST,
             quality_index=718,  # MMLU=76.40, GPQA=74.20
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_2_5_PRO_PREVIEW_0325: ModelData(
@@ -537,6 +552,7 @@ def _build_model_datas():
             # https://www.vals.ai/benchmarks/gpqa-04-04-2025
             quality_index=842,  # TODO: GEMINI_2_0_PRO_EXP + 1
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_2_5_PRO_EXP_0325: DeprecatedModel(replacement_model=Model.GEMINI_2_5_PRO_PREVIEW_0325),
@@ -570,6 +586,7 @@ def _build_model_datas():
             release_date=date(2025, 1, 21),
             quality_index=759,  # MMLU=77.60, GPQA=74.20
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=False,
         ),
         Model.GEMINI_2_0_FLASH_THINKING_EXP_1219: DeprecatedModel(
@@ -594,6 +611,7 @@ def _build_model_datas():
             release_date=date(2024, 9, 24),
             quality_index=721,  # MMLU=85.14, GPQA=59.10
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_1_5_PRO_001: ModelData(
@@ -615,6 +633,7 @@ def _build_model_datas():
             release_date=date(2024, 5, 24),
             quality_index=705,  # MMLU=81.90, GPQA=59.10
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_1_5_PRO_PREVIEW_0409: DeprecatedModel(replacement_model=Model.GEMINI_1_5_PRO_002),
@@ -649,6 +668,7 @@ def _build_model_datas():
             quality_index=878,  # MMLU=90.80, GPQA=84.80
             latest_model=Model.CLAUDE_3_7_SONNET_LATEST,
             provider_name=DisplayedProvider.ANTHROPIC.value,
+            max_image_dimension=1568,
             supports_tool_calling=True,
         ),
         Model.CLAUDE_3_5_SONNET_20241022: ModelData(
@@ -669,6 +689,7 @@ def _build_model_datas():
             quality_index=768,  # MMLU=86.00, GPQA=68.00
             latest_model=Model.CLAUDE_3_5_SONNET_LATEST,
             provider_name=DisplayedProvider.ANTHROPIC.value,
+            max_image_dimension=1568,
             supports_tool_calling=True,
         ),
         Model.GEMINI_1_5_FLASH_002: ModelData(
@@ -690,6 +711,7 @@ def _build_model_datas():
             release_date=date(2024, 9, 24),
             quality_index=650,  # MMLU=78.90, GPQA=51.00
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_1_5_FLASH_001: ModelData(
@@ -711,6 +733,7 @@ def _build_model_datas():
             release_date=date(2024, 5, 24),
             quality_index=650,  # MMLU=78.90, GPQA=51.00
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_1_0_PRO_VISION_001: DeprecatedModel(replacement_model=Model.GEMINI_1_5_PRO_002),
@@ -738,6 +761,7 @@ def _build_model_datas():
             release_date=date(2024, 12, 17),
             quality_index=839,  # MMLU=90.80, GPQA=78.30
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.O1_2024_12_17_HIGH_REASONING_EFFORT: ModelData(
@@ -758,6 +782,7 @@ def _build_model_datas():
             release_date=date(2024, 12, 17),
             quality_index=853,  # MMLU=87.00, GPQA=91.60
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.O1_2024_12_17_LOW_REASONING_EFFORT: ModelData(
@@ -778,6 +803,7 @@ def _build_model_datas():
             release_date=date(2024, 12, 17),
             quality_index=798,  # MMLU=84.10, GPQA=78.00
             provider_name=DisplayedProvider.OPEN_AI.value,
+            max_image_dimension=2048,
             supports_tool_calling=True,
         ),
         Model.CLAUDE_3_5_SONNET_20240620: ModelData(
@@ -798,6 +824,7 @@ def _build_model_datas():
             release_date=date(2024, 6, 20),
             quality_index=738,  # MMLU=88.30, GPQA=59.40
             provider_name=DisplayedProvider.ANTHROPIC.value,
+            max_image_dimension=1568,
             supports_tool_calling=True,
         ),
         Model.CLAUDE_3_OPUS_20240229: ModelData(
@@ -817,6 +844,7 @@ def _build_model_datas():
             release_date=date(2024, 2, 29),
             quality_index=693,  # MMLU=88.20, GPQA=50.40
             provider_name=DisplayedProvider.ANTHROPIC.value,
+            max_image_dimension=1568,
             supports_tool_calling=True,
         ),
         Model.CLAUDE_3_SONNET_20240229: ModelData(
@@ -836,6 +864,7 @@ def _build_model_datas():
             release_date=date(2024, 2, 29),
             quality_index=704,  # MMLU=81.50, GPQA=59.40
             provider_name=DisplayedProvider.ANTHROPIC.value,
+            max_image_dimension=1568,
             supports_tool_calling=True,
         ),
         Model.CLAUDE_3_HAIKU_20240307: ModelData(
@@ -855,6 +884,7 @@ def _build_model_datas():
             release_date=date(2024, 3, 7),
             quality_index=550,  #  MMLU=76.7, GPQA=33.3
             provider_name=DisplayedProvider.ANTHROPIC.value,
+            max_image_dimension=1568,
             supports_tool_calling=True,
         ),
         Model.CLAUDE_3_5_HAIKU_LATEST: LatestModel(
@@ -1075,6 +1105,7 @@ def _build_model_datas():
             release_date=date(2024, 10, 3),
             quality_index=485,  # MMLU=58.7, GPQA=38.4
             provider_name=DisplayedProvider.GOOGLE.value,
+            max_image_dimension=3072,
             supports_tool_calling=True,
         ),
         Model.GEMINI_EXP_1206: DeprecatedModel(replacement_model=Model.GEMINI_2_5_PRO_PREVIEW_0325),
@@ -57,7 +57,11 @@ def test_MODEL_DATAS_has_all_fields_defined() -> None:
     for model in Model:
         model_data = MODEL_DATAS[model]
         if isinstance(model_data, ModelData):
-            assert_model_data_has_all_fields_defined(model_data, exclude={"latest_model", "quality_index"})
+            # max_image_dimension is only set for models that downscale images to a documented resolution
+            assert_model_data_has_all_fields_defined(
+                model_data,
+                exclude={"latest_model", "quality_index", "max_image_dimension"},
+            )
 
 
 @pytest.fixture
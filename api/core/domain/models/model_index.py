@@ -0,0 +1,139 @@
+import datetime
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import NamedTuple
+
+from core.domain.errors import ProviderDoesNotSupportModelError
+from core.domain.models import Model, Provider
+from core.domain.models.model_data import DeprecatedModel, FinalModelData, LatestModel
+from core.domain.models.model_datas_mapping import MODEL_DATAS
+from core.domain.models.model_provider_data import ModelProviderData
+
+
+class ListedModel(NamedTuple):
+    """A model as displayed in model listings"""
+
+    # The listed id, e-g the latest alias
+    id: Model
+    # The model the id resolves to
+    model: Model
+    data: FinalModelData
+    display_name: str
+    is_default: bool
+    is_latest: bool
+    modes: tuple[str, ...]
+    providers: tuple[Provider, ...]
+    pricing: ModelProviderData
+
+
+class ModelIndex:
+    """Lookups on the model and provider data, computed once from MODEL_DATAS.
+
+    Aliases are resolved, the provider overrides are applied and the listing entries
+    are built ahead of time so that runs and model listings do not walk the mappings
+    or build pydantic objects. The model data returned by model_data and the listings is
+    shared and must not be mutated, copy it first."""
+
+    def __init__(self, model_datas: Mapping[Model, FinalModelData | LatestModel | DeprecatedModel]):
+        resolved: dict[Model, FinalModelData] = {}
+        provider_datas: dict[tuple[Model, Provider], ModelProviderData] = {}
+        provider_model_datas: dict[tuple[Model, Provider], FinalModelData] = {}
+        sunset_dates: dict[tuple[Model, Provider], datetime.date] = {}
+        listed: dict[Model, ListedModel] = {}
+
+        for model, data in model_datas.items():
+            final = self._resolve(model_datas, model)
+            resolved[model] = final
+            if isinstance(data, FinalModelData):
+                for provider, provider_data in data.providers:
+                    provider_datas[(model, provider)] = provider_data
+                    provider_model_datas[(model, provider)] = provider_data.override(data)
+                    if provider_data.lifecycle_data:
+                        sunset_dates[(model, provider)] = provider_data.lifecycle_data.sunset_date
+            if entry := self._listed_model(model, data, final):
+                listed[model] = entry
+
+        self._resolved = MappingProxyType(resolved)
+        self._provider_datas = MappingProxyType(provider_datas)
+        self._provider_model_datas = MappingProxyType(provider_model_datas)
+        self._sunset_dates = MappingProxyType(sunset_dates)
+        self._listed = MappingProxyType(listed)
+
+    @classmethod
+    def _resolve(
+        cls,
+        model_datas: Mapping[Model, FinalModelData | LatestModel | DeprecatedModel],
+        model: Model,
+    ) -> FinalModelData:
+        seen: set[Model] = set()
+        data = model_datas[model]
+        while not isinstance(data, FinalModelData):
+            if model in seen:
+                raise ValueError(f"Model {model} has a circular alias")
+            seen.add(model)
+            model = data.model if isinstance(data, LatestModel) else data.replacement_model
+            data = model_datas[model]
+        return data
+
+    @classmethod
+    def _listed_model(
+        cls,
+        model: Model,
+        data: FinalModelData | LatestModel | DeprecatedModel,
+        final: FinalModelData,
+    ) -> ListedModel | None:
+        if isinstance(data, DeprecatedModel):
+            return None
+        if isinstance(data, LatestModel):
+            is_latest = True
+        else:
+            # Otherwise is_latest is True when the model has no latest model
+            is_latest = data.latest_model is None
+        return ListedModel(
+            id=model,
+            model=final.model,
+            data=final,
+            display_name=data.display_name,
+            is_default=data.is_default,
+            is_latest=is_latest,
+            modes=tuple(final.modes),
+            providers=tuple(p for p, _ in final.providers),
+            pricing=final.provider_data_for_pricing(),
+        )
+
+    def model_data(self, model: Model) -> FinalModelData:
+        """Returns the data of the model, resolving latest and deprecated aliases"""
+        return self._resolved[model]
+
+    def supported_by_provider(self, model: Model, provider: Provider) -> bool:
+        return (self._resolved[model].model, provider) in self._provider_datas
+
+    def provider_data(self, model: Model, provider: Provider) -> ModelProviderData:
+        resolved = self._resolved[model].model
+        try:
+            return self._provider_datas[(resolved, provider)]
+        except KeyError:
+            raise ProviderDoesNotSupportModelError(resolved, provider) from None
+
+    def provider_model_data(self, model: Model, provider: Provider) -> FinalModelData:
+        """Returns a copy of the data of the model with the overrides of the provider applied.
+        The overrides are computed once, copying is cheap since it does not validate"""
+        resolved = self._resolved[model].model
+        try:
+            return self._provider_model_datas[(resolved, provider)].model_copy()
+        except KeyError:
+            raise ProviderDoesNotSupportModelError(resolved, provider) from None
+
+    def is_available(self, model: Model, provider: Provider, today: datetime.date) -> bool:
+        """Whether the provider still serves the model, without resolving aliases"""
+        if (model, provider) not in self._provider_datas:
+            return False
+        sunset_date = self._sunset_dates.get((model, provider))
+        return sunset_date is None or today < sunset_date
+
+    def listed_model(self, model: Model) -> ListedModel | None:
+        """Returns None for deprecated models"""
+        return self._listed.get(model)
+
+
+MODEL_INDEX = ModelIndex(MODEL_DATAS)
@@ -0,0 +1,94 @@
+import datetime
+
+import pytest
+
+from core.domain.errors import ProviderDoesNotSupportModelError
+from core.domain.models import Model, Provider
+from core.domain.models.model_data import DeprecatedModel, FinalModelData, LatestModel
+from core.domain.models.model_datas_mapping import MODEL_DATAS
+from core.domain.models.model_index import MODEL_INDEX, ModelIndex
+
+
+def _final_model_data(model: Model) -> FinalModelData:
+    data = MODEL_DATAS[model]
+    if isinstance(data, LatestModel):
+        data = MODEL_DATAS[data.model]
+    elif isinstance(data, DeprecatedModel):
+        data = MODEL_DATAS[data.replacement_model]
+    assert isinstance(data, FinalModelData)
+    return data
+
+
+class TestModelData:
+    @pytest.mark.parametrize("model", list(Model))
+    def test_resolved(self, model: Model):
+        assert MODEL_INDEX.model_data(model) is _final_model_data(model)
+
+    def test_circular_alias(self):
+        with pytest.raises(ValueError, match="circular"):
+            ModelIndex(
+                {
+                    Model.GPT_4O_LATEST: LatestModel(model=Model.GPT_4O_2024_11_20, display_name="GPT-4o"),
+                    Model.GPT_4O_2024_11_20: DeprecatedModel(replacement_model=Model.GPT_4O_LATEST),
+                },
+            )
+
+
+class TestProviderData:
+    @pytest.mark.parametrize("model", list(Model))
+    def test_matches_model_data(self, model: Model):
+        data = _final_model_data(model)
+        for provider in Provider:
+            supported = data.supported_by_provider(provider)
+            assert MODEL_INDEX.supported_by_provider(model, provider) == supported
+            if not supported:
+                with pytest.raises(ProviderDoesNotSupportModelError):
+                    MODEL_INDEX.provider_data(model, provider)
+                continue
+
+            provider_data = data.provider_data(provider)
+            assert MODEL_INDEX.provider_data(model, provider) is provider_data
+            overridden = provider_data.override(data)
+            assert MODEL_INDEX.provider_model_data(model, provider) == overridden
+
+    def test_provider_model_data_is_a_copy(self):
+        first = MODEL_INDEX.provider_model_data(Model.CLAUDE_3_5_SONNET_20241022, Provider.ANTHROPIC)
+        assert first.supports_input_pdf
+        first.supports_input_pdf = False
+
+        second = MODEL_INDEX.provider_model_data(Model.CLAUDE_3_5_SONNET_20241022, Provider.ANTHROPIC)
+        assert second is not first
+        assert second.supports_input_pdf
+        # The override of Anthropic is not applied for Bedrock
+        assert not MODEL_INDEX.provider_model_data(
+            Model.CLAUDE_3_5_SONNET_20241022,
+            Provider.AMAZON_BEDROCK,
+        ).supports_input_pdf
+
+
+class TestIsAvailable:
+    @pytest.mark.parametrize("today", [datetime.date(2024, 1, 1), datetime.date(2025, 6, 1), datetime.date(2030, 1, 1)])
+    def test_matches_lifecycle_data(self, today: datetime.date):
+        for model, data in MODEL_DATAS.items():
+            if not isinstance(data, FinalModelData):
+                continue
+            for provider, provider_data in data.providers:
+                assert MODEL_INDEX.is_available(model, provider, today) == provider_data.is_available(today)
+
+    def test_unsupported_provider(self):
+        assert not MODEL_INDEX.is_available(Model.GPT_4O_2024_11_20, Provider.ANTHROPIC, datetime.date(2024, 1, 1))
+
+
+class TestListedModel:
+    def test_latest(self):
+        listed = MODEL_INDEX.listed_model(Model.GPT_4O_LATEST)
+        assert listed
+        assert listed.id == Model.GPT_4O_LATEST
+        assert listed.model == Model.GPT_4O_2024_11_20
+        assert listed.display_name == "GPT-4o (latest)"
+        assert listed.is_latest
+        assert listed.pricing is listed.data.provider_data_for_pricing()
+
+    def test_deprecated(self):
+        deprecated = next(m for m, data in MODEL_DATAS.items() if isinstance(data, DeprecatedModel))
+        assert MODEL_INDEX.listed_model(deprecated) is None
@@ -4,17 +4,12 @@ from core.domain.models import Model, Provider
 from core.domain.models.model_provider_data import ModelProviderData
 from core.domain.models.model_provider_datas_mapping import MODEL_PROVIDER_DATAS, ProviderDataByModel
 
-from .model_data import DeprecatedModel, FinalModelData, LatestModel
-from .model_datas_mapping import MODEL_DATAS
+from .model_data import FinalModelData
+from .model_index import MODEL_INDEX
 
 
 def get_model_data(model: Model) -> FinalModelData:
-    model_data = MODEL_DATAS[model]
-    if isinstance(model_data, LatestModel):
-        return MODEL_DATAS[model_data.model]  # pyright: ignore [reportReturnType]
-    if isinstance(model_data, DeprecatedModel):
-        return MODEL_DATAS[model_data.replacement_model]  # pyright: ignore [reportReturnType]
-    return model_data
+    return MODEL_INDEX.model_data(model)
 
 
 def get_provider_data_by_model(provider: Provider) -> ProviderDataByModel:
@@ -22,13 +17,9 @@ def get_provider_data_by_model(provider: Provider) -> ProviderDataByModel:
 
 
 def get_model_provider_data(provider: Provider, model: Model) -> ModelProviderData:
-    return get_model_data(model).provider_data(provider)
+    return MODEL_INDEX.provider_data(model, provider)
 
 
 # TODO: this is deprecated, do not use
 def is_model_available_at_provider(provider: Provider, model: Model, today: datetime.date) -> bool:
-    try:
-        model_data = MODEL_PROVIDER_DATAS[provider][model]
-    except KeyError:
-        return False
-    return model_data.is_available(today)
+    return MODEL_INDEX.is_available(model, provider, today)
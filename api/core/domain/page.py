@@ -8,3 +8,8 @@ T = TypeVar("T", bound=BaseModel)
 class Page(BaseModel, Generic[T]):
     items: list[T]
     count: Optional[int] = None
+
+
+class CursorPage(Page[T], Generic[T]):
+    # Opaque token to pass to fetch the next page, None when there are no more items
+    next_page_token: Optional[str] = None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Self
+from typing import NamedTuple, Self
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -36,3 +36,14 @@ class TaskGroupUpdate(BaseModel):
         if not self.model_dump(exclude_none=True):
             raise ValueError("At least one of is_favorite, or notes must be set")
         return self
+
+
+class TaskGroupRunCounters(NamedTuple):
+    """Run counters of a task group, accumulated over several runs and applied at once"""
+
+    task_id: str
+    task_schema_id: int
+    iteration: int
+    run_count: int
+    # The time of the last active run, if any
+    last_active_at: datetime | None
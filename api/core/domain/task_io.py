@@ -1,13 +1,16 @@
 from copy import deepcopy
 from typing import Any
 
-from jsonschema import SchemaError, validate
+from jsonschema import SchemaError
 from jsonschema import ValidationError as SchemaValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
 from jsonschema.validators import validator_for  # pyright: ignore[reportUnknownVariableType]
 from pydantic import BaseModel, Field
 
 from core.domain.errors import JSONSchemaValidationError
 from core.utils.hash import compute_obj_hash
+from core.utils.lru.lru_cache import LRUCache
 from core.utils.schema_sanitation import streamline_schema
 from core.utils.schemas import (
     JsonSchema,
@@ -17,12 +20,25 @@ from core.utils.schemas import (
     strip_metadata,
 )
 
+# Validators compiled for a schema version and whether the schema is the partial one, shared
+# between all task IOs of the process. Each entry also holds the schema used to build the validator
+# since nothing prevents creating different schemas with the same version
+_validators = LRUCache[tuple[str, bool], tuple[dict[str, Any], Validator]](capacity=1024)
+
+
+def _build_validator(schema: dict[str, Any]) -> Validator:
+    cls = validator_for(schema)  # pyright: ignore [reportUnknownVariableType]
+    cls.check_schema(schema)  # pyright: ignore [reportUnknownMemberType]
+    return cls(schema)  # pyright: ignore [reportUnknownVariableType]
+
 
 class SerializableTaskIO(BaseModel):
     version: str = Field(..., description="the version of the schema definition. Titles and descriptions are ignored.")
     json_schema: dict[str, Any] = Field(..., description="A json schema")
 
     _optional_json_schema: dict[str, Any] | None = None
+    _validator: Validator | None = None
+    _optional_validator: Validator | None = None
 
     def enforce(
         self,
@@ -49,12 +65,33 @@ class SerializableTaskIO(BaseModel):
         if navigators:
             JsonSchema(schema).navigate(obj, navigators=navigators)
 
-        try:
-            validate(obj, schema)
-        except SchemaValidationError as e:
+        # Same as jsonschema.validate but with a validator that is only built once per schema
+        if e := best_match(self._get_validator(schema, partial).iter_errors(obj)):
             kp = ".".join([str(p) for p in e.path])
             raise JSONSchemaValidationError(f"at [{kp}], {e.message}")
 
+    def _shared_validator(self, schema: dict[str, Any], partial: bool) -> Validator:
+        key = (self.version, partial)
+        try:
+            cached = _validators[key]
+        except KeyError:
+            cached = None
+        if cached is not None and cached[0] == schema:
+            return cached[1]
+        validator = _build_validator(schema)
+        if cached is None:
+            _validators[key] = (schema, validator)
+        return validator
+
+    def _get_validator(self, schema: dict[str, Any], partial: bool) -> Validator:
+        if partial:
+            if self._optional_validator is None:
+                self._optional_validator = self._shared_validator(schema, partial)
+            return self._optional_validator
+        if self._validator is None:
+            self._validator = self._shared_validator(schema, partial)
+        return self._validator
+
     def sanitize(self, obj: dict[str, Any]) -> dict[str, Any]:
         """Duplicate and enforce an object to match the schema"""
         obj = deepcopy(obj)
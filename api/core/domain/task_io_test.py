@@ -262,3 +262,41 @@ class TestFromJsonSchema:
                 "field": {"$ref": "#/$defs/Image"},
             },
         }
+
+
+class TestEnforceValidatorCache:
+    _schema: dict[str, Any] = {
+        "type": "object",
+        "properties": {"a": {"type": "string"}, "b": {"type": "integer"}},
+        "required": ["a", "b"],
+    }
+
+    def test_validator_is_shared_between_instances(self):
+        task_io = SerializableTaskIO.from_json_schema(deepcopy(self._schema))
+        task_io.enforce({"a": "a", "b": 1})
+
+        other = SerializableTaskIO.from_json_schema(deepcopy(self._schema))
+        assert other._get_validator(other.json_schema, partial=False) is task_io._validator  # pyright: ignore [reportPrivateUsage]
+
+    def test_partial_uses_its_own_validator(self):
+        task_io = SerializableTaskIO.from_json_schema(deepcopy(self._schema))
+        task_io.enforce({"a": "a"}, partial=True)
+
+        with pytest.raises(JSONSchemaValidationError, match="'b' is a required property"):
+            task_io.enforce({"a": "a"})
+
+        with pytest.raises(JSONSchemaValidationError, match=r"at \[b\], 'b' is not of type 'integer'"):
+            task_io.enforce({"a": "a", "b": "b"}, partial=True)
+
+    def test_same_version_different_schema(self):
+        # Versions are not always computed from the schema so a version does not guarantee a schema
+        task_io = SerializableTaskIO(version="same_version_different_schema", json_schema=deepcopy(self._schema))
+        task_io.enforce({"a": "a", "b": 1})
+
+        other = SerializableTaskIO(
+            version="same_version_different_schema",
+            json_schema={"type": "object", "properties": {"a": {"type": "integer"}}},
+        )
+        other.enforce({"a": 1})
+        with pytest.raises(JSONSchemaValidationError):
+            other.enforce({"a": "a"})
@@ -17,6 +17,10 @@ class ProviderSettings(BaseModel):
         # Implement decryption in subclasses
         raise NotImplementedError()
 
+    def revision(self) -> str:
+        """Changes when the content of the config changes, used to cache the providers built from configs"""
+        return self.created_at.isoformat()
+
 
 class PublicOrganizationData(BaseModel):
     uid: int = 0  # will be filled by storage
@@ -30,6 +30,7 @@ from core.providers.anthropic.anthropic_domain import (
     ToolUseContent,
     Usage,
 )
+from core.providers.base.client_pool import ClientLimits
 from core.providers.base.httpx_provider import HTTPXProvider, ParsedResponse
 from core.providers.base.models import RawCompletion, StandardMessage
 from core.providers.base.provider_options import ProviderOptions
@@ -48,6 +49,11 @@ ANTHROPIC_VERSION = "2023-06-01"
 ANTHROPIC_PDF_BETA = "pdfs-2024-09-25"
 
 
+# Anthropic completions are streamed and often long, e-g with extended thinking, so
+# connections are held longer than with other providers
+_CLIENT_LIMITS = ClientLimits(max_connections=200, max_keepalive_connections=50)
+
+
 class AnthropicConfig(BaseModel):
     provider: Literal[Provider.ANTHROPIC] = Provider.ANTHROPIC
     api_key: str
@@ -104,6 +110,10 @@ class AnthropicProvider(HTTPXProvider[AnthropicConfig, CompletionResponse]):
     def _request_url(self, model: Model, stream: bool) -> str:
         return self._config.url
 
+    @classmethod
+    def _client_limits(cls) -> ClientLimits | None:
+        return _CLIENT_LIMITS
+
     @override
     def _response_model_cls(self) -> type[CompletionResponse]:
         return CompletionResponse
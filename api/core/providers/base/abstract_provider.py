@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import os
+import time
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator, Iterator
 from contextlib import asynccontextmanager
@@ -34,13 +35,14 @@ from core.domain.structured_output import StructuredOutput
 from core.domain.tool import Tool
 from core.domain.tool_call import ToolCallRequestWithID
 from core.providers.base.models import RawCompletion, StandardMessage
+from core.providers.base.provider_health import ProviderHealthKey, ProviderHealthRegistry
 from core.providers.base.provider_options import ProviderOptions
 from core.runners.builder_context import builder_context
 from core.runners.workflowai.templates import TemplateName
 from core.runners.workflowai.utils import FileWithKeyPath
 from core.tools import ToolKind
 from core.utils.fields import datetime_factory
-from core.utils.token_utils import tokens_from_string
+from core.utils.token_utils import run_token_count, tokens_from_string
 
 
 class ProviderConfigInterface(Protocol):
@@ -54,6 +56,9 @@ ProviderOutput = TypeVar("ProviderOutput")
 
 
 class AbstractProvider(ABC, Generic[ProviderConfigVar, ProviderRequestVar]):
+    # Shared by all providers of the process, fed with the outcome of each completion
+    health_registry = ProviderHealthRegistry()
+
     def __init__(
         self,
         config: Optional[ProviderConfigVar] = None,
@@ -73,6 +78,11 @@ class AbstractProvider(ABC, Generic[ProviderConfigVar, ProviderRequestVar]):
     def is_custom_config(self) -> bool:
         return self._config_id is not None
 
+    def health_key(self, model: Model) -> ProviderHealthKey:
+        """The key used to track the health of the provider config for a model"""
+        config = f"custom_{self._config_id}" if self._config_id else f"workflowai_{self._index}"
+        return (self.name(), config, model)
+
     # TODO: remove
     @abstractmethod
     def default_model(self) -> Model:
@@ -198,12 +208,16 @@ class AbstractProvider(ABC, Generic[ProviderConfigVar, ProviderRequestVar]):
             tags={"provider": self.name(), "model": model.value},
         ).send()
 
+    async def _compute_prompt_token_count_off_loop(self, messages: list[dict[str, Any]], model: Model) -> float:
+        # Encoding large prompts can take tens of milliseconds so it is done in the token counter's thread pool
+        return await run_token_count(self._compute_prompt_token_count, messages, model)
+
     async def feed_prompt_token_count(self, llm_usage: LLMUsage, messages: list[dict[str, Any]], model: Model) -> None:
         if llm_usage.prompt_token_count is None:
             # Send metric so we can see how many runs are missing the prompt token count
             await self._send_no_prompt_token_count_metric(llm_usage, model)
             # Compute the prompt token count
-            llm_usage.prompt_token_count = self._compute_prompt_token_count(messages, model)
+            llm_usage.prompt_token_count = await self._compute_prompt_token_count_off_loop(messages, model)
 
     def feed_completion_token_count(self, llm_usage: LLMUsage, response: str | None, model: Model) -> None:
         if llm_usage.completion_token_count is None:
@@ -624,10 +638,13 @@ class AbstractProvider(ABC, Generic[ProviderConfigVar, ProviderRequestVar]):
     @asynccontextmanager
     async def _wrap_for_metric(self, model: Model, tenant: str | None):
         status = "success"
+        start = time.monotonic()
         try:
             yield
+            self.health_registry.record_success(self.health_key(model), time.monotonic() - start)
         except ProviderError as e:
             status = e.code
+            self.health_registry.record_error(self.health_key(model), e)
             raise e
         except Exception as e:
             status = "workflowai_internal_error"
@@ -786,6 +803,7 @@ class AbstractProvider(ABC, Generic[ProviderConfigVar, ProviderRequestVar]):
 
     async def _log_rate_limit(self, limit_name: str, percentage: float, options: ProviderOptions):
         """Percentage is a float between 0 and 1"""
+        self.health_registry.record_rate_limit(self.health_key(options.model), limit_name, percentage)
         await send_gauge(
             "provider_rate_limit",
             percentage,
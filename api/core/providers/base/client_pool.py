@@ -1,11 +1,131 @@
+import asyncio
+import importlib.util
+import logging
+import os
 import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any, cast
 
 import httpx
+from pydantic import BaseModel
+
+from core.domain.metrics import send_gauge
+from core.utils.background import add_background_task
+
+_logger = logging.getLogger(__name__)
+
+# Events sent by httpcore once a connection is assigned to a request, either
+# a new connection starts connecting or an existing one starts sending the request
+_CONNECTION_ACQUIRED_EVENTS = {
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+}
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_MAX_CONNECTIONS = int(os.getenv("PROVIDER_CLIENT_MAX_CONNECTIONS", "100"))
+_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("PROVIDER_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20"))
+# Providers usually close idle connections after a minute or so
+_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("PROVIDER_CLIENT_KEEPALIVE_EXPIRY_SECONDS", "30"))
+# Allows multiplexing requests over a few connections, requires the h2 package
+_HTTP2 = os.getenv("PROVIDER_CLIENT_HTTP2", "false") == "true"
+_IDLE_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_CLIENT_IDLE_TIMEOUT_SECONDS", "3600"))
+
+
+class ClientLimits(BaseModel):
+    max_connections: int = _MAX_CONNECTIONS
+    max_keepalive_connections: int = _MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry: float = _KEEPALIVE_EXPIRY_SECONDS
+    http2: bool = _HTTP2
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Calls on_close once the response is closed, i-e when its connection is released"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close: Callable[[], None] | None = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close:
+                self._on_close()
+                self._on_close = None
+
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """Tracks the requests in flight and the time requests wait for a connection"""
+
+    def __init__(self, host: str, limits: ClientLimits):
+        self._host = host
+        self._limits = limits
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections,
+                keepalive_expiry=limits.keepalive_expiry,
+            ),
+            http2=limits.http2,
+        )
+        self.in_flight = 0
+
+    def _release(self):
+        self.in_flight -= 1
+
+    def _trace(self, request: httpx.Request, start: float):
+        previous = request.extensions.get("trace")
+        acquired = False
+        saturated = self.in_flight > self._limits.max_connections
+
+        async def trace(event_name: str, info: dict[str, Any]):
+            nonlocal acquired
+            if not acquired and event_name in _CONNECTION_ACQUIRED_EVENTS:
+                acquired = True
+                add_background_task(
+                    send_gauge(
+                        "provider_client_pool_wait_seconds",
+                        time.monotonic() - start,
+                        host=self._host,
+                        new_connection=event_name == "connection.connect_tcp.started",
+                        saturated=saturated,
+                    ),
+                )
+            if previous:
+                await previous(event_name, info)
+
+        return trace
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        request.extensions["trace"] = self._trace(request, time.monotonic())
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(cast(httpx.AsyncByteStream, response.stream), self._release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
 
 
 class ClientWithLastUsed:
-    def __init__(self):
-        self._client = httpx.AsyncClient()
+    def __init__(self, host: str, limits: ClientLimits):
+        self._transport = _PooledTransport(host, limits)
+        self._client = httpx.AsyncClient(transport=self._transport)
         self._last_used = time.time()
 
     def update_last_used(self):
@@ -19,19 +139,60 @@ class ClientWithLastUsed:
     def last_used(self) -> float:
         return self._last_used
 
+    @property
+    def in_flight(self) -> int:
+        return self._transport.in_flight
+
 
 class ClientPool:
-    def __init__(self):
+    """A client per host, shared by all providers.
+
+    Limits are set when the client for a host is created, so the limits of the first
+    provider that reaches a host are used. Clients that are not used for a while are
+    closed by a periodic purge."""
+
+    def __init__(
+        self,
+        default_limits: ClientLimits | None = None,
+        idle_timeout_seconds: float = _IDLE_TIMEOUT_SECONDS,
+        purge_interval_seconds: float = 300,
+        prewarm_timeout_seconds: float = 5,
+    ):
+        self._default_limits = default_limits or ClientLimits()
+        self._idle_timeout_seconds = idle_timeout_seconds
+        self._purge_interval_seconds = purge_interval_seconds
+        self._prewarm_timeout_seconds = prewarm_timeout_seconds
         self.clients: dict[str, ClientWithLastUsed] = {}
+        self._purge_loop: asyncio.Task[None] | None = None
+
+    def _limits(self, limits: ClientLimits | None) -> ClientLimits:
+        limits = limits or self._default_limits
+        if limits.http2 and not _HTTP2_AVAILABLE:
+            _logger.warning("HTTP/2 requested but the h2 package is not installed, falling back to HTTP/1.1")
+            return limits.model_copy(update={"http2": False})
+        return limits
 
-    def get(self, url: str) -> httpx.AsyncClient:
+    def get(self, url: str, limits: ClientLimits | None = None) -> httpx.AsyncClient:
         domain = httpx.URL(url).host
         client = self.clients.get(domain)
         if client is None:
-            client = ClientWithLastUsed()
+            client = ClientWithLastUsed(domain, self._limits(limits))
             self.clients[domain] = client
         return client.update_last_used()
 
+    async def prewarm(self, url: str, limits: ClientLimits | None = None):
+        """Opens a connection to the host of the url so that the TLS handshake is done
+        before the first request. The response does not matter."""
+        client = self.get(url, limits)
+        parsed = httpx.URL(url)
+        try:
+            await client.head(
+                f"{parsed.scheme}://{parsed.netloc.decode()}/",
+                timeout=self._prewarm_timeout_seconds,
+            )
+        except httpx.HTTPError as e:
+            _logger.info("Failed to prewarm client", extra={"host": parsed.host, "error": str(e)})
+
     async def close(self, domain: str):
         try:
             client = self.clients.pop(domain)
@@ -40,7 +201,29 @@ class ClientPool:
             pass
 
     async def purge(self):
-        for client in self.clients.values():
-            # Close clients that haven't been used in the last hour
-            if client.last_used < time.time() - 3600:
-                await client.close()
+        # Close clients that haven't been used recently and have no request in flight
+        min_last_used = time.time() - self._idle_timeout_seconds
+        for domain, client in list(self.clients.items()):
+            if client.last_used < min_last_used and client.in_flight == 0:
+                await self.close(domain)
+
+        add_background_task(send_gauge("provider_client_pool_size", len(self.clients)))
+
+    async def _purge_periodically(self):
+        while True:
+            await asyncio.sleep(self._purge_interval_seconds)
+            try:
+                await self.purge()
+            except Exception:
+                _logger.exception("Failed to purge client pool")
+
+    def start(self):
+        if self._purge_loop is None:
+            self._purge_loop = asyncio.create_task(self._purge_periodically())
+
+    async def close_all(self):
+        if self._purge_loop is not None:
+            self._purge_loop.cancel()
+            self._purge_loop = None
+        for domain in list(self.clients):
+            await self.close(domain)
@@ -0,0 +1,92 @@
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from .client_pool import ClientLimits, ClientPool
+
+
+@pytest.fixture
+def pool():
+    return ClientPool(idle_timeout_seconds=60)
+
+
+class TestGet:
+    def test_client_per_host(self, pool: ClientPool):
+        client = pool.get("https://api.openai.com/v1/chat/completions")
+        assert pool.get("https://api.openai.com/v1/other") is client
+        assert pool.get("https://api.anthropic.com/v1/messages") is not client
+
+    def test_http2_fallback(self, pool: ClientPool):
+        with patch("core.providers.base.client_pool._HTTP2_AVAILABLE", False):
+            client = pool.get("https://api.openai.com", ClientLimits(http2=True))
+        assert client
+
+
+class TestInFlight:
+    async def test_released_after_response(self, pool: ClientPool, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(url="https://api.openai.com/v1", json={"hello": "world"})
+
+        client = pool.get("https://api.openai.com/v1")
+        response = await client.post("https://api.openai.com/v1")
+        assert response.json() == {"hello": "world"}
+        assert pool.clients["api.openai.com"].in_flight == 0
+
+    async def test_held_while_streaming(self, pool: ClientPool, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(url="https://api.openai.com/v1", content=b"hello")
+
+        client = pool.get("https://api.openai.com/v1")
+        async with client.stream("POST", "https://api.openai.com/v1") as response:
+            assert pool.clients["api.openai.com"].in_flight == 1
+            assert await response.aread() == b"hello"
+        assert pool.clients["api.openai.com"].in_flight == 0
+
+    async def test_released_on_error(self, pool: ClientPool, httpx_mock: HTTPXMock):
+        httpx_mock.add_exception(httpx.ConnectError("boom"))
+
+        client = pool.get("https://api.openai.com/v1")
+        with pytest.raises(httpx.ConnectError):
+            await client.post("https://api.openai.com/v1")
+        assert pool.clients["api.openai.com"].in_flight == 0
+
+
+class TestPurge:
+    async def test_purge_idle_clients(self, pool: ClientPool, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(url="https://api.anthropic.com/v1", content=b"hello")
+
+        pool.get("https://api.openai.com/v1")
+        client = pool.get("https://api.anthropic.com/v1")
+        pool.get("https://api.mistral.ai/v1")
+
+        async with client.stream("POST", "https://api.anthropic.com/v1"):
+            with patch("time.time", return_value=time.time() + 120):
+                # Mistral was used recently
+                pool.get("https://api.mistral.ai/v1")
+                await pool.purge()
+
+        # Anthropic is idle but has a request in flight
+        assert set(pool.clients) == {"api.anthropic.com", "api.mistral.ai"}
+
+    async def test_close_all(self, pool: ClientPool):
+        pool.get("https://api.openai.com/v1")
+        pool.start()
+
+        await pool.close_all()
+        assert pool.clients == {}
+
+
+class TestPrewarm:
+    async def test_prewarm(self, pool: ClientPool, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(method="HEAD", url="https://api.openai.com/", status_code=404)
+
+        await pool.prewarm("https://api.openai.com/v1/chat/completions")
+        assert "api.openai.com" in pool.clients
+        assert len(httpx_mock.get_requests()) == 1
+
+    async def test_prewarm_failure(self, pool: ClientPool, httpx_mock: HTTPXMock):
+        httpx_mock.add_exception(httpx.ConnectError("boom"))
+
+        # Errors are swallowed
+        await pool.prewarm("https://api.openai.com/v1/chat/completions")
@@ -1,6 +1,7 @@
+import asyncio
 import json
 from abc import abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from contextlib import asynccontextmanager
 from json import JSONDecodeError
 from typing import Any, AsyncGenerator, AsyncIterator, Generic, NamedTuple, TypeVar
@@ -34,7 +35,7 @@ from core.domain.models import Model
 from core.domain.structured_output import StructuredOutput
 from core.domain.tool_call import ToolCallRequestWithID
 from core.providers.base.abstract_provider import AbstractProvider, ProviderConfigVar, RawCompletion
-from core.providers.base.client_pool import ClientPool
+from core.providers.base.client_pool import ClientLimits, ClientPool
 from core.providers.base.provider_options import ProviderOptions
 from core.providers.base.streaming_context import StreamingContext, ToolCallRequestBuffer
 from core.utils.background import add_background_task
@@ -47,6 +48,10 @@ ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
 shared_client_pool = ClientPool()
 
 
+async def prewarm_provider_clients(providers: Iterable[AbstractProvider[Any, Any]]):
+    await asyncio.gather(*(p.prewarm_client() for p in providers if isinstance(p, HTTPXProvider)))
+
+
 class ParsedResponse(NamedTuple):
     content: str
     reasoning_steps: str | None = None
@@ -201,10 +206,25 @@ class HTTPXProvider(AbstractProvider[ProviderConfigVar, dict[str, Any]], Generic
     def _client_pool(cls) -> ClientPool:
         return shared_client_pool
 
+    @classmethod
+    def _client_limits(cls) -> ClientLimits | None:
+        """Override to use specific connection limits for the provider's host"""
+        return None
+
+    async def prewarm_client(self):
+        """Opens a connection to the provider's host ahead of the first completion"""
+        try:
+            url = self._request_url(model=self.default_model(), stream=False)
+        except Exception:
+            # Some urls can't be built without a request, e-g when they depend on the model
+            self.logger.debug("Could not build prewarm url", extra={"provider": self.name()})
+            return
+        await self._client_pool().prewarm(url, self._client_limits())
+
     @asynccontextmanager
     async def _open_client(self, url: str):
         try:
-            yield shared_client_pool.get(url)
+            yield self._client_pool().get(url, self._client_limits())
         except (httpx.ConnectError, httpx.ReadError) as e:
             raise ProviderUnavailableError(
                 msg=f"Failed to reach provider: {e}",
@@ -389,6 +409,7 @@ class HTTPXProvider(AbstractProvider[ProviderConfigVar, dict[str, Any]], Generic
         if not delta:
             return False
 
+        context.received_chars += len(delta.content) + len(delta.reasoning_steps or "")
         should_yield = self._handle_chunk_output(context, delta.content)
         should_yield |= self._handle_chunk_reasoning_steps(context, delta.reasoning_steps)
         should_yield |= self._handle_chunk_tool_calls(context, delta.tool_calls)
@@ -425,7 +446,9 @@ class HTTPXProvider(AbstractProvider[ProviderConfigVar, dict[str, Any]], Generic
                     async for chunk in self.wrap_sse(response.aiter_bytes()):
                         should_yield = self._handle_chunk(streaming_context, chunk)
 
-                        if should_yield:
+                        # Building the partial output validates the entire aggregated output
+                        # so partial outputs are throttled
+                        if should_yield and streaming_context.throttle.should_emit(streaming_context.received_chars):
                             yield self._partial_structured_output(
                                 partial_output_factory,
                                 streaming_context.agg_output,
@@ -0,0 +1,168 @@
+import logging
+import os
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+from core.domain.error_response import ProviderErrorCode
+from core.domain.errors import ProviderError
+from core.domain.metrics import send_counter_nowait
+from core.domain.models import Model, Provider
+
+_logger = logging.getLogger(__name__)
+
+_CIRCUIT_BREAKER_ENABLED = os.getenv("PROVIDER_CIRCUIT_BREAKER_ENABLED", "true") == "true"
+# Number of consecutive failures before the circuit opens
+_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
+_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_CIRCUIT_BREAKER_COOLDOWN_SECONDS", "30"))
+# Used when a rate limit error does not provide a retry after
+_RATE_LIMIT_COOLDOWN_SECONDS = 10
+_MAX_COOLDOWN_SECONDS = 300
+# Above this rate limit percentage, a config is considered degraded
+_RATE_LIMIT_SATURATION = 0.95
+# Rate limit percentages older than this are ignored
+_RATE_LIMIT_WINDOW_SECONDS = 60
+# A config is considered degraded when its latency is above _SLOW_FACTOR times
+# the latency of the fastest config for the same provider and model
+_SLOW_FACTOR = 3
+_MIN_LATENCY_SAMPLES = 10
+_LATENCY_ALPHA = 0.2
+
+# A provider, a config (e-g workflowai_0 or custom_<config id>) and a model
+ProviderHealthKey = tuple[Provider, str, Model]
+
+# Errors that indicate that the provider, and not the request, is unhealthy
+_FAILURE_CODES: set[ProviderErrorCode] = {
+    "server_overloaded",
+    "provider_internal_error",
+    "provider_unavailable",
+    "timeout",
+    "read_timeout",
+    "invalid_provider_config",
+}
+
+
+class _Health:
+    __slots__ = ("consecutive_failures", "latency", "latency_samples", "open_until", "rate_limits")
+
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.open_until: float | None = None
+        # Exponentially weighted moving average of the completion durations
+        self.latency: float | None = None
+        self.latency_samples = 0
+        # limit name -> (percentage, time at which it was recorded)
+        self.rate_limits: dict[str, tuple[float, float]] = {}
+
+
+class ProviderHealthRegistry:
+    """A registry of the health of each provider config and model.
+
+    The registry is fed by provider errors, completion durations and the rate limit
+    percentages returned by providers. When a config fails repeatedly or is rate limited,
+    its circuit is opened for a cooldown window and the pipeline tries it last. Once the
+    cooldown expires, the circuit is half open: the next failure re-opens it right away
+    and the next success closes it."""
+
+    def __init__(
+        self,
+        enabled: bool = _CIRCUIT_BREAKER_ENABLED,
+        failure_threshold: int = _FAILURE_THRESHOLD,
+        cooldown_seconds: float = _COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._enabled = enabled
+        self._failure_threshold = failure_threshold
+        self._cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._health: dict[ProviderHealthKey, _Health] = {}
+
+    def _get(self, key: ProviderHealthKey) -> _Health:
+        if key not in self._health:
+            self._health[key] = _Health()
+        return self._health[key]
+
+    def _open(self, key: ProviderHealthKey, health: _Health, cooldown: float, reason: str):
+        health.open_until = self._clock() + min(cooldown, _MAX_COOLDOWN_SECONDS)
+        _logger.warning(
+            "Opening provider circuit",
+            extra={"provider": key[0], "config": key[1], "model": key[2], "reason": reason},
+        )
+        send_counter_nowait(
+            "provider_circuit_opened",
+            provider=key[0],
+            config=key[1],
+            model=key[2].value,
+            reason=reason,
+        )
+
+    def _retry_after_seconds(self, error: ProviderError) -> float | None:
+        if isinstance(error.retry_after, datetime):
+            return (error.retry_after - datetime.now(error.retry_after.tzinfo)).total_seconds()
+        return error.retry_after or None
+
+    def record_success(self, key: ProviderHealthKey, duration_seconds: float):
+        if not self._enabled:
+            return
+        health = self._get(key)
+        health.consecutive_failures = 0
+        health.open_until = None
+        health.latency_samples += 1
+        if health.latency is None:
+            health.latency = duration_seconds
+        else:
+            alpha = _LATENCY_ALPHA
+            health.latency = alpha * duration_seconds + (1 - alpha) * health.latency
+
+    def record_error(self, key: ProviderHealthKey, error: ProviderError):
+        if not self._enabled:
+            return
+        health = self._get(key)
+        if error.code == "rate_limit":
+            cooldown = self._retry_after_seconds(error) or _RATE_LIMIT_COOLDOWN_SECONDS
+            self._open(key, health, cooldown, error.code)
+            return
+        if error.code not in _FAILURE_CODES:
+            return
+
+        health.consecutive_failures += 1
+        if health.consecutive_failures >= self._failure_threshold:
+            self._open(key, health, self._cooldown_seconds, error.code)
+
+    def record_rate_limit(self, key: ProviderHealthKey, limit_name: str, percentage: float):
+        """Percentage is a float between 0 and 1"""
+        if not self._enabled:
+            return
+        self._get(key).rate_limits[limit_name] = (percentage, self._clock())
+
+    def is_open(self, key: ProviderHealthKey) -> bool:
+        health = self._health.get(key)
+        return health is not None and health.open_until is not None and health.open_until > self._clock()
+
+    def _is_saturated(self, health: _Health) -> bool:
+        min_time = self._clock() - _RATE_LIMIT_WINDOW_SECONDS
+        return any(
+            percentage >= _RATE_LIMIT_SATURATION and at >= min_time for percentage, at in health.rate_limits.values()
+        )
+
+    def _latency(self, health: _Health | None) -> float | None:
+        if health is None or health.latency_samples < _MIN_LATENCY_SAMPLES:
+            return None
+        return health.latency
+
+    def is_degraded(self, key: ProviderHealthKey, peers: list[ProviderHealthKey]) -> bool:
+        """A degraded config is still available but should be tried after its healthy peers"""
+        health = self._health.get(key)
+        if health is None:
+            return False
+        if self._is_saturated(health):
+            return True
+
+        latency = self._latency(health)
+        if latency is None:
+            return False
+        peer_latencies = [lat for peer in peers if (lat := self._latency(self._health.get(peer))) is not None]
+        return latency > _SLOW_FACTOR * min(peer_latencies, default=latency)
+
+    def reset(self):
+        self._health = {}
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.domain.errors import (
+    FailedGenerationError,
+    ProviderInternalError,
+    ProviderRateLimitError,
+    ProviderUnavailableError,
+)
+from core.domain.models import Model, Provider
+
+from .provider_health import ProviderHealthKey, ProviderHealthRegistry
+
+_KEY: ProviderHealthKey = (Provider.OPEN_AI, "workflowai_0", Model.GPT_4O_MINI_2024_07_18)
+_OTHER_KEY: ProviderHealthKey = (Provider.OPEN_AI, "workflowai_1", Model.GPT_4O_MINI_2024_07_18)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def registry(clock: _Clock):
+    return ProviderHealthRegistry(failure_threshold=2, cooldown_seconds=30, clock=clock)
+
+
+class TestCircuit:
+    def test_opens_after_consecutive_failures(self, registry: ProviderHealthRegistry, clock: _Clock):
+        registry.record_error(_KEY, ProviderInternalError())
+        assert not registry.is_open(_KEY)
+
+        registry.record_error(_KEY, ProviderUnavailableError())
+        assert registry.is_open(_KEY)
+        assert not registry.is_open(_OTHER_KEY)
+
+        # Circuit is half open after the cooldown, a single failure re-opens it
+        clock.now += 31
+        assert not registry.is_open(_KEY)
+        registry.record_error(_KEY, ProviderInternalError())
+        assert registry.is_open(_KEY)
+
+    def test_success_resets_failures(self, registry: ProviderHealthRegistry):
+        registry.record_error(_KEY, ProviderInternalError())
+        registry.record_success(_KEY, 1)
+        registry.record_error(_KEY, ProviderInternalError())
+        assert not registry.is_open(_KEY)
+
+    def test_request_errors_are_ignored(self, registry: ProviderHealthRegistry):
+        for _ in range(5):
+            registry.record_error(_KEY, FailedGenerationError())
+        assert not registry.is_open(_KEY)
+
+    def test_rate_limit_opens_immediately(self, registry: ProviderHealthRegistry, clock: _Clock):
+        registry.record_error(_KEY, ProviderRateLimitError(retry_after=5))
+        assert registry.is_open(_KEY)
+        clock.now += 6
+        assert not registry.is_open(_KEY)
+
+    def test_rate_limit_retry_after_datetime(self, registry: ProviderHealthRegistry, clock: _Clock):
+        registry.record_error(
+            _KEY,
+            ProviderRateLimitError(retry_after=datetime.now(timezone.utc) + timedelta(seconds=20)),
+        )
+        clock.now += 15
+        assert registry.is_open(_KEY)
+
+    def test_disabled(self, clock: _Clock):
+        registry = ProviderHealthRegistry(enabled=False, clock=clock)
+        registry.record_error(_KEY, ProviderRateLimitError())
+        assert not registry.is_open(_KEY)
+
+
+class TestIsDegraded:
+    def test_rate_limit_saturation(self, registry: ProviderHealthRegistry, clock: _Clock):
+        registry.record_rate_limit(_KEY, "tokens", 0.5)
+        assert not registry.is_degraded(_KEY, [_KEY, _OTHER_KEY])
+
+        registry.record_rate_limit(_KEY, "requests", 0.99)
+        assert registry.is_degraded(_KEY, [_KEY, _OTHER_KEY])
+
+        # Old percentages are ignored
+        clock.now += 61
+        assert not registry.is_degraded(_KEY, [_KEY, _OTHER_KEY])
+
+    def test_slow_config(self, registry: ProviderHealthRegistry):
+        for _ in range(10):
+            registry.record_success(_KEY, 10)
+            registry.record_success(_OTHER_KEY, 1)
+
+        assert registry.is_degraded(_KEY, [_KEY, _OTHER_KEY])
+        assert not registry.is_degraded(_OTHER_KEY, [_KEY, _OTHER_KEY])
+
+    def test_not_enough_latency_samples(self, registry: ProviderHealthRegistry):
+        registry.record_success(_KEY, 10)
+        for _ in range(10):
+            registry.record_success(_OTHER_KEY, 1)
+        assert not registry.is_degraded(_KEY, [_KEY, _OTHER_KEY])
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from core.domain.fields.internal_reasoning_steps import InternalReasoningStep
 from core.domain.tool_call import ToolCallRequestWithID
 from core.providers.base.models import RawCompletion
+from core.utils.stream_throttle import StreamThrottle
 from core.utils.streams import JSONStreamParser
 
 
@@ -23,3 +24,7 @@ class StreamingContext:
 
         self.tool_call_request_buffer: dict[int, ToolCallRequestBuffer] = {}
         self.tool_calls: list[ToolCallRequestWithID] | None = None
+
+        # Number of chars received, used to throttle partial outputs
+        self.received_chars = 0
+        self.throttle = StreamThrottle()
@@ -0,0 +1,53 @@
+from collections.abc import Callable
+from typing import Any, Generic, TypeVar
+
+from core.domain.metrics import send_counter_nowait
+from core.domain.models import Provider
+from core.domain.tenant_data import ProviderConfig, ProviderSettings
+from core.utils.lru.lru_cache import LRUCache
+
+_P = TypeVar("_P")
+
+# config id, provider, revision, preserve credits
+_CacheKey = tuple[str, Provider, str, bool | None]
+
+
+class CustomProviderCache(Generic[_P]):
+    """A per process cache of the providers built from the custom configs of tenants.
+
+    Building a provider requires decrypting and validating the config and sometimes
+    parsing credentials so providers are built once per config revision. Configs are
+    evicted when deleted through the organization storage. Deletions in other processes
+    are harmless since deleted configs are no longer part of the tenant data."""
+
+    def __init__(self, capacity: int = 1024):
+        self._providers = LRUCache[_CacheKey, _P](capacity)
+
+    @classmethod
+    def _key(cls, config: ProviderSettings) -> _CacheKey:
+        return (config.id, config.provider, config.revision(), config.preserve_credits)
+
+    def get_or_build(self, config: ProviderSettings, build: Callable[[ProviderConfig], _P]) -> _P:
+        """Errors raised when decrypting or building are propagated and not cached"""
+        key = self._key(config)
+        try:
+            provider = self._providers[key]
+            send_counter_nowait("custom_provider_cache_lookup", provider=config.provider, hit=True)
+            return provider
+        except KeyError:
+            pass
+
+        send_counter_nowait("custom_provider_cache_lookup", provider=config.provider, hit=False)
+        provider = build(config.decrypt())
+        self._providers[key] = provider
+        return provider
+
+    def invalidate(self, config_id: str):
+        for key in [key for key in self._providers.cache if key[0] == config_id]:
+            del self._providers[key]
+
+    def clear(self):
+        self._providers = LRUCache[_CacheKey, _P](self._providers.capacity)
+
+
+shared_custom_provider_cache = CustomProviderCache[Any]()
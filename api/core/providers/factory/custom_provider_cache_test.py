@@ -0,0 +1,67 @@
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from core.domain.models import Provider
+from core.domain.tenant_data import ProviderConfig, ProviderSettings
+
+from .custom_provider_cache import CustomProviderCache
+
+
+class _Settings(ProviderSettings):
+    secrets: str = "secret"
+
+    def decrypt(self) -> ProviderConfig:
+        return Mock()
+
+    def revision(self) -> str:
+        return self.secrets
+
+
+def _settings(id: str = "config_1", **kwargs: object) -> _Settings:
+    return _Settings.model_validate(
+        {"id": id, "created_at": datetime(2024, 1, 1), "provider": Provider.OPEN_AI, **kwargs},
+    )
+
+
+@pytest.fixture
+def cache():
+    return CustomProviderCache[Mock]()
+
+
+class TestGetOrBuild:
+    def test_built_once(self, cache: CustomProviderCache[Mock]):
+        build = Mock(side_effect=lambda _: Mock())  # pyright: ignore [reportUnknownLambdaType]
+
+        provider = cache.get_or_build(_settings(), build)
+        assert cache.get_or_build(_settings(), build) is provider
+        build.assert_called_once()
+
+    def test_rebuilt_on_new_revision(self, cache: CustomProviderCache[Mock]):
+        build = Mock(side_effect=lambda _: Mock())  # pyright: ignore [reportUnknownLambdaType]
+
+        provider = cache.get_or_build(_settings(), build)
+        assert cache.get_or_build(_settings(secrets="other"), build) is not provider
+        assert cache.get_or_build(_settings(preserve_credits=True), build) is not provider
+        assert build.call_count == 3
+
+    def test_errors_are_not_cached(self, cache: CustomProviderCache[Mock]):
+        build = Mock(side_effect=[ValueError("invalid config"), Mock()])
+
+        with pytest.raises(ValueError):
+            cache.get_or_build(_settings(), build)
+        assert cache.get_or_build(_settings(), build)
+        assert build.call_count == 2
+
+
+class TestInvalidate:
+    def test_invalidate(self, cache: CustomProviderCache[Mock]):
+        build = Mock(side_effect=lambda _: Mock())  # pyright: ignore [reportUnknownLambdaType]
+        provider_1 = cache.get_or_build(_settings("config_1"), build)
+        provider_2 = cache.get_or_build(_settings("config_2"), build)
+
+        cache.invalidate("config_1")
+
+        assert cache.get_or_build(_settings("config_1"), build) is not provider_1
+        assert cache.get_or_build(_settings("config_2"), build) is provider_2
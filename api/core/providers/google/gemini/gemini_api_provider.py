@@ -100,7 +100,7 @@ class GoogleGeminiAPIProvider(GoogleProviderBase[GoogleGeminiAPIProviderConfig])
     @override
     async def feed_prompt_token_count(self, llm_usage: LLMUsage, messages: list[dict[str, Any]], model: Model) -> None:
         if llm_usage.prompt_token_count is None:
-            llm_usage.prompt_token_count = self._compute_prompt_token_count(messages, model)
+            llm_usage.prompt_token_count = await self._compute_prompt_token_count_off_loop(messages, model)
             if llm_usage.prompt_audio_token_count is not None:
                 llm_usage.prompt_token_count += llm_usage.prompt_audio_token_count
 
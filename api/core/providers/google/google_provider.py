@@ -80,6 +80,15 @@ class GoogleProvider(GoogleProviderBase[GoogleProviderConfig]):
             raise UnknownProviderError("No available regions left to retry.", extra={"choices": choices})
         return self._get_random_region(choices)
 
+    @override
+    async def prewarm_client(self):
+        # Minting the first token ahead of the first completion
+        try:
+            await google_provider_auth.get_token(self._config.vertex_credentials)
+        except Exception:
+            self.logger.exception("Failed to prewarm vertex token")
+        await super().prewarm_client()
+
     @override
     async def _request_headers(self, request: dict[str, Any], url: str, model: Model) -> dict[str, str]:
         token = await google_provider_auth.get_token(self._config.vertex_credentials)
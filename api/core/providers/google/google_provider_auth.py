@@ -1,32 +1,161 @@
+import asyncio
+import hashlib
 import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from datetime import timezone
+from typing import Any, NamedTuple
 
-from cachetools import LRUCache
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 
-# Caching the last 100 tokens
-# In practice, we should not have too many service accounts
-_credential_cache: LRUCache[str, service_account.Credentials] = LRUCache(maxsize=100)
+from core.domain.metrics import send_counter
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import LRUCache
+from core.utils.redis_cache import shared_redis_client
 
+_logger = logging.getLogger(__name__)
 
-def _get_token_from_credentials(credentials: service_account.Credentials) -> str:
-    return credentials.token  # pyright: ignore [reportUnknownVariableType, reportUnknownMemberType]
+# Tokens are refreshed in the background when they expire in less than this
+_REFRESH_AHEAD_SECONDS = float(os.getenv("VERTEX_TOKEN_REFRESH_AHEAD_SECONDS", "600"))
+# When enabled, tokens are shared between processes through redis
+_TOKEN_SHARING = os.getenv("VERTEX_TOKEN_SHARING", "true") == "true"
 
 
-async def get_token(service_account_info: str) -> str:
-    json_obj = json.loads(service_account_info)
-    credentials: service_account.Credentials | None = _credential_cache.get(service_account_info)
+class _Token(NamedTuple):
+    token: str
+    # Unix timestamp
+    expires_at: float
+
+
+class VertexTokenManager:
+    """Caches the access tokens of Vertex service accounts.
+
+    - tokens are cached per credential fingerprint and shared between processes through redis
+    - tokens that are about to expire are refreshed in the background while the current token
+    is still returned, so that minting a token is only on the critical path when no valid
+    token exists
+    - concurrent refreshes of the same credentials are de-duplicated"""
+
+    def __init__(
+        self,
+        redis_client: Any | None = None,
+        refresh_ahead_seconds: float = _REFRESH_AHEAD_SECONDS,
+        # Tokens are not used when they expire in less than this
+        min_validity_seconds: float = 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._redis = redis_client
+        self._refresh_ahead_seconds = refresh_ahead_seconds
+        self._min_validity_seconds = min_validity_seconds
+        self._clock = clock
+        # In practice, we should not have too many service accounts
+        self._tokens = LRUCache[str, _Token](capacity=100)
+        self._credentials = LRUCache[str, service_account.Credentials](capacity=100)
+        self._refreshes: dict[str, asyncio.Task[_Token]] = {}
+
+    @classmethod
+    def _fingerprint(cls, service_account_info: str) -> str:
+        return hashlib.sha256(service_account_info.encode()).hexdigest()
 
-    if credentials and credentials.valid:
-        return _get_token_from_credentials(credentials)
+    @classmethod
+    def _redis_key(cls, fingerprint: str) -> str:
+        return f"vertex_token:{fingerprint}"
 
-    if not credentials:
+    def _remaining_seconds(self, token: _Token) -> float:
+        return token.expires_at - self._clock()
+
+    def _is_usable(self, token: _Token | None) -> bool:
+        return token is not None and self._remaining_seconds(token) > self._min_validity_seconds
+
+    async def _get_shared(self, fingerprint: str) -> _Token | None:
+        if not self._redis:
+            return None
+        try:
+            raw = await self._redis.get(self._redis_key(fingerprint))
+        except Exception:
+            _logger.exception("Failed to get shared vertex token")
+            return None
+        if not raw:
+            return None
+        return _Token(**json.loads(raw))
+
+    async def _set_shared(self, fingerprint: str, token: _Token):
+        if not self._redis:
+            return
+        try:
+            await self._redis.set(
+                self._redis_key(fingerprint),
+                json.dumps(token._asdict()),
+                ex=max(int(self._remaining_seconds(token)), 1),
+            )
+        except Exception:
+            _logger.exception("Failed to share vertex token")
+
+    def _get_credentials(self, fingerprint: str, service_account_info: str) -> service_account.Credentials:
+        if credentials := self._credentials.peek(fingerprint):
+            return credentials
         credentials = service_account.Credentials.from_service_account_info(  # pyright: ignore [reportUnknownMemberType]
-            json_obj,
+            json.loads(service_account_info),
             scopes=["https://www.googleapis.com/auth/cloud-platform"],
         )
-        _credential_cache[service_account_info] = credentials
+        self._credentials[fingerprint] = credentials
+        return credentials
+
+    async def _mint(self, fingerprint: str, service_account_info: str) -> _Token:
+        # Another process might have refreshed the token already
+        shared = await self._get_shared(fingerprint)
+        if shared and self._remaining_seconds(shared) > self._refresh_ahead_seconds:
+            self._tokens[fingerprint] = shared
+            return shared
 
-    credentials.refresh(Request())  # pyright: ignore [reportUnknownMemberType]
+        credentials = self._get_credentials(fingerprint, service_account_info)
+        # Refreshing performs a blocking HTTP call
+        await asyncio.to_thread(credentials.refresh, Request())  # pyright: ignore [reportUnknownMemberType, reportUnknownArgumentType]
+        # Expiry is a naive UTC datetime
+        expiry = credentials.expiry.replace(tzinfo=timezone.utc).timestamp()  # pyright: ignore [reportUnknownMemberType, reportOptionalMemberAccess]
+        token = _Token(credentials.token, expiry)  # pyright: ignore [reportUnknownArgumentType, reportUnknownMemberType]
+        self._tokens[fingerprint] = token
+        await self._set_shared(fingerprint, token)
+        add_background_task(send_counter("vertex_token_minted"))
+        return token
 
-    return _get_token_from_credentials(credentials)
+    def _on_refresh_done(self, fingerprint: str, task: asyncio.Task[_Token]):
+        self._refreshes.pop(fingerprint, None)
+        if not task.cancelled() and (e := task.exception()):
+            # Errors are raised to the callers that wait for the refresh, background refreshes
+            # are retried on the next call
+            _logger.warning("Failed to refresh vertex token", exc_info=e)
+
+    def _refresh(self, fingerprint: str, service_account_info: str) -> asyncio.Task[_Token]:
+        if (task := self._refreshes.get(fingerprint)) is None:
+            task = asyncio.create_task(self._mint(fingerprint, service_account_info))
+            task.add_done_callback(lambda t: self._on_refresh_done(fingerprint, t))
+            self._refreshes[fingerprint] = task
+        return task
+
+    async def get_token(self, service_account_info: str) -> str:
+        fingerprint = self._fingerprint(service_account_info)
+
+        token = self._tokens.peek(fingerprint)
+        if not self._is_usable(token):
+            token = await self._get_shared(fingerprint)
+            if token:
+                self._tokens[fingerprint] = token
+
+        if token is None or not self._is_usable(token):
+            # Shielding so that a cancelled caller does not cancel the refresh for other callers
+            token = await asyncio.shield(self._refresh(fingerprint, service_account_info))
+        elif self._remaining_seconds(token) < self._refresh_ahead_seconds:
+            self._refresh(fingerprint, service_account_info)
+
+        return token.token
+
+
+_vertex_tokens = VertexTokenManager(shared_redis_client if _TOKEN_SHARING else None)
+
+
+async def get_token(service_account_info: str) -> str:
+    return await _vertex_tokens.get_token(service_account_info)
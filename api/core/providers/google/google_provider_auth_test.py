@@ -1,51 +1,136 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any
 from unittest import mock
 
 import pytest
 from google.oauth2.service_account import Credentials
 
-from core.providers.google.google_provider_auth import get_token
+from core.providers.google.google_provider_auth import VertexTokenManager
+
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = _NOW.timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return _Clock()
 
 
 @pytest.fixture()
-def mock_from_service_account_info():
+def mock_credentials(clock: _Clock):
+    credentials = mock.Mock(spec=Credentials)
+    refresh_count = 0
+
+    def _refresh(_: Any):
+        nonlocal refresh_count
+        refresh_count += 1
+        credentials.token = f"token_{refresh_count}"
+        # Expiry is a naive UTC datetime
+        credentials.expiry = datetime.fromtimestamp(clock.now + 3600, tz=timezone.utc).replace(tzinfo=None)
+
+    credentials.refresh.side_effect = _refresh
+    return credentials
+
+
+@pytest.fixture()
+def mock_from_service_account_info(mock_credentials: mock.Mock):
     with mock.patch(
         "google.oauth2.service_account.Credentials.from_service_account_info",
         spec=Credentials.from_service_account_info,  # pyright: ignore [reportUnknownArgumentType,reportUnknownMemberType]
+        return_value=mock_credentials,
     ) as mock_auth:
         yield mock_auth
 
 
+@pytest.fixture()
+def manager(clock: _Clock, mock_from_service_account_info: mock.Mock):
+    return VertexTokenManager(clock=clock)
+
+
 class TestGetToken:
-    async def test_get_token(self, mock_from_service_account_info: mock.Mock):
-        mock_credentials = mock.Mock(spec=Credentials)
-        mock_credentials.token = "token"
-        # First call to get_token should create the credentials
-        mock_from_service_account_info.return_value = mock_credentials
+    async def test_cached(self, manager: VertexTokenManager, mock_credentials: mock.Mock):
+        assert await manager.get_token("{}") == "token_1"
+        assert await manager.get_token("{}") == "token_1"
+        mock_credentials.refresh.assert_called_once()
+
+    async def test_refresh_ahead(self, manager: VertexTokenManager, mock_credentials: mock.Mock, clock: _Clock):
+        assert await manager.get_token("{}") == "token_1"
+
+        # The token expires in 5 minutes so the current one is returned while it is refreshed
+        clock.now += 3300
+        assert await manager.get_token("{}") == "token_1"
+        await asyncio.sleep(0.01)
+        assert mock_credentials.refresh.call_count == 2
+        assert await manager.get_token("{}") == "token_2"
+
+    async def test_expired(self, manager: VertexTokenManager, mock_credentials: mock.Mock, clock: _Clock):
+        assert await manager.get_token("{}") == "token_1"
 
-        token = await get_token("{}")
-        assert token == "token"
+        clock.now += 3600
+        assert await manager.get_token("{}") == "token_2"
 
-        mock_from_service_account_info.assert_called_once()
+    async def test_concurrent_refreshes(self, manager: VertexTokenManager, mock_credentials: mock.Mock):
+        tokens = await asyncio.gather(*(manager.get_token("{}") for _ in range(5)))
+        assert tokens == ["token_1"] * 5
         mock_credentials.refresh.assert_called_once()
 
-        # Now we try again
-        mock_credentials.valid = True
-        token = await get_token("{}")
+    async def test_refresh_error(self, manager: VertexTokenManager, mock_credentials: mock.Mock):
+        mock_credentials.refresh.side_effect = ValueError("invalid grant")
 
-        mock_from_service_account_info.reset_mock()
-        mock_credentials.reset_mock()
+        with pytest.raises(ValueError):
+            await manager.get_token("{}")
 
-        mock_from_service_account_info.assert_not_called()
+
+class TestSharedTokens:
+    @pytest.fixture()
+    def redis_client(self):
+        client = mock.AsyncMock()
+        client.get.return_value = None
+        return client
+
+    @pytest.fixture()
+    def shared_manager(self, clock: _Clock, redis_client: mock.AsyncMock, mock_from_service_account_info: mock.Mock):
+        return VertexTokenManager(redis_client=redis_client, clock=clock)
+
+    async def test_shared_token_is_used(
+        self,
+        shared_manager: VertexTokenManager,
+        redis_client: mock.AsyncMock,
+        mock_credentials: mock.Mock,
+        clock: _Clock,
+    ):
+        redis_client.get.return_value = json.dumps({"token": "shared", "expires_at": clock.now + 3600})
+
+        assert await shared_manager.get_token("{}") == "shared"
         mock_credentials.refresh.assert_not_called()
-        assert token == "token"
 
-        mock_from_service_account_info.reset_mock()
-        mock_credentials.reset_mock()
+    async def test_minted_token_is_shared(
+        self,
+        shared_manager: VertexTokenManager,
+        redis_client: mock.AsyncMock,
+        clock: _Clock,
+    ):
+        assert await shared_manager.get_token("{}") == "token_1"
 
-        # Now the token is invalid
-        mock_credentials.valid = False
-        token = await get_token("{}")
+        redis_client.set.assert_called_once()
+        key, value = redis_client.set.call_args.args
+        assert key.startswith("vertex_token:")
+        # The credentials are not part of the key
+        assert "{}" not in key
+        assert json.loads(value) == {"token": "token_1", "expires_at": clock.now + 3600}
+        assert redis_client.set.call_args.kwargs == {"ex": 3600}
 
-        mock_from_service_account_info.assert_not_called()
-        mock_credentials.refresh.assert_called_once()
-        assert token == "token"
+    async def test_redis_errors_are_ignored(self, shared_manager: VertexTokenManager, redis_client: mock.AsyncMock):
+        redis_client.get.side_effect = ConnectionError("redis is down")
+        redis_client.set.side_effect = ConnectionError("redis is down")
+
+        assert await shared_manager.get_token("{}") == "token_1"
@@ -27,6 +27,7 @@ from core.domain.models import Model
 from core.domain.models.utils import get_model_data
 from core.domain.tool_call import ToolCallRequestWithID
 from core.providers.base.abstract_provider import ProviderConfigInterface
+from core.providers.base.client_pool import ClientLimits
 from core.providers.base.httpx_provider import HTTPXProvider, ParsedResponse
 from core.providers.base.models import RawCompletion, StandardMessage
 from core.providers.base.provider_options import ProviderOptions
@@ -55,6 +56,11 @@ MODELS_THAT_REQUIRE_DOWNLOADING_FILES = {
 }
 
 
+# Vertex and Gemini serve a large part of the traffic, including long running
+# completions on large files
+_CLIENT_LIMITS = ClientLimits(max_connections=200, max_keepalive_connections=50)
+
+
 class GoogleProviderBaseConfig(ProviderConfigInterface, Protocol):
     @property
     def default_block_threshold(self) -> BLOCK_THRESHOLD | None: ...
@@ -180,6 +186,10 @@ class GoogleProviderBase(HTTPXProvider[_GoogleConfigVar, CompletionResponse], Ge
     def _request_url(self, model: Model, stream: bool) -> str:
         pass
 
+    @classmethod
+    def _client_limits(cls) -> ClientLimits | None:
+        return _CLIENT_LIMITS
+
     @override
     def _response_model_cls(self) -> type[CompletionResponse]:
         return CompletionResponse
@@ -22,6 +22,7 @@ from core.domain.models import Model
 from core.domain.structured_output import StructuredOutput
 from core.domain.tool_call import ToolCallRequestWithID
 from core.providers.base.abstract_provider import ProviderConfigInterface, RawCompletion
+from core.providers.base.client_pool import ClientLimits
 from core.providers.base.httpx_provider import HTTPXProvider, ParsedResponse
 from core.providers.base.models import StandardMessage
 from core.providers.base.provider_options import ProviderOptions
@@ -52,6 +53,10 @@ from .openai_domain import (
     parse_tool_call_or_raise,
 )
 
+# OpenAI and Azure OpenAI serve most of the traffic, mostly long lived streamed completions,
+# so the pool is larger than the default one
+_CLIENT_LIMITS = ClientLimits(max_connections=400, max_keepalive_connections=100)
+
 
 class OpenAIProviderBaseConfig(ProviderConfigInterface, Protocol):
     pass
@@ -169,6 +174,10 @@ class OpenAIProviderBase(HTTPXProvider[_OpenAIConfigVar, CompletionResponse], Ge
     def _request_url(self, model: Model, stream: bool) -> str:
         pass
 
+    @classmethod
+    def _client_limits(cls) -> ClientLimits | None:
+        return _CLIENT_LIMITS
+
     @abstractmethod
     async def _request_headers(self, request: dict[str, Any], url: str, model: Model) -> dict[str, str]:
         pass
@@ -17,6 +17,7 @@ from core.domain.task_variant import SerializableTaskVariant
 from core.domain.types import CacheUsage, TaskInputDict
 from core.runners.builder_context import builder_context
 from core.storage import TaskTuple
+from core.utils.single_flight import Flight, FlightAbandonedError, SingleFlight
 from core.utils.tags import compute_tags
 from core.utils.uuid import uuid7
 
@@ -26,6 +27,13 @@ CacheType = Literal["always", "only", "never", "auto", "when_available"]
 
 _logger = logging.getLogger(__name__)
 
+# (tenant, (task_id, task_uid), task_schema_id, task_input_hash, group hash)
+_InflightKey = tuple[str | None, TaskTuple, int, str, str]
+
+# Runs that are currently executing and that could be served from the cache once stored.
+# Concurrent identical runs attach to the in flight run instead of calling the provider again.
+_inflight_runs = SingleFlight[_InflightKey, RunOutput, AgentRun]()
+
 
 class CacheFetcher(Protocol):
     async def __call__(
@@ -229,6 +237,57 @@ class AbstractRunner(
             raise MissingCacheError()
         return None
 
+    def _inflight_key(self, builder: TaskRunBuilder, cache: CacheUsage) -> _InflightKey | None:
+        """The key used to coalesce concurrent identical runs. Only runs that could be served
+        from the cache are coalesced"""
+        if builder.reply is not None or cache == "only" or not self._should_use_cache(cache):
+            return None
+        return (
+            self.task.tenant,
+            self.task.id_tuple,
+            self.task.task_schema_id,
+            builder.task_input_hash,
+            self.properties.model_hash(),
+        )
+
+    def _adopt_leader_id(self, builder: TaskRunBuilder, flight: Flight[RunOutput, AgentRun]):
+        # Waiters use the id of the in flight run from the start so that the id does not change
+        # within a stream. If the leader fails, the waiter that takes over keeps the id so the
+        # run it stores replaces the failed one.
+        if flight.leader_id:
+            builder.id = flight.leader_id
+
+    def _attach_inflight_run(self, builder: TaskRunBuilder, run: AgentRun) -> AgentRun:
+        # Same as when returning a run from the cache, the builder is updated to match the in flight run
+        attached = run.model_copy(update={"from_cache": True})
+        builder._task_run = attached  # type:ignore
+        builder.id = attached.id
+        return attached
+
+    async def _send_coalesced_metric(self):
+        await send_counter(
+            "workflowai_inference_coalesced",
+            model=self.properties.model or "unknown",
+            provider=self.properties.provider or "workflowai",
+            tenant=self.task.tenant or "unknown",
+        )
+
+    async def _join_inflight_run(self, builder: TaskRunBuilder, key: _InflightKey | None) -> AgentRun | None:
+        """Waits for the in flight run to complete. Returns None if there is no in flight run,
+        in which case the run should be executed normally.
+
+        When a leader stops without producing a run, the first waiter to wake up leads the next
+        flight and the other waiters attach to it."""
+        while key is not None and (flight := _inflight_runs.get(key)):
+            self._adopt_leader_id(builder, flight)
+            try:
+                run = await flight.result()
+            except FlightAbandonedError:
+                continue
+            await self._send_coalesced_metric()
+            return self._attach_inflight_run(builder, run)
+        return None
+
     def _get_builder_context(self):
         return builder_context.get()
 
@@ -285,9 +344,16 @@ class AbstractRunner(
         if cached is not None:
             return cached
 
+        key = self._inflight_key(builder, cache)
+        if (joined := await self._join_inflight_run(builder, key)) is not None:
+            return joined
+
         async with self._wrap_for_metric():
-            chunk = await self._build_task_output(builder.task_input)
-            return builder.build(chunk)
+            with _inflight_runs.lead(key, leader_id=builder.id) as flight:
+                chunk = await self._build_task_output(builder.task_input)
+                run = builder.build(chunk)
+                flight.complete(run)
+                return run
 
     async def stream(
         self,
@@ -299,9 +365,30 @@ class AbstractRunner(
             yield RunOutput.from_run(cached)
             return
 
+        key = self._inflight_key(builder, cache)
+        while key is not None and (flight := _inflight_runs.get(key)):
+            self._adopt_leader_id(builder, flight)
+            # Fanning out the chunks of the in flight run
+            try:
+                async for chunk in flight.stream():
+                    yield chunk
+                run = await flight.result()
+            except FlightAbandonedError:
+                # The leader stopped before the end, the first waiter to wake up leads the next
+                # flight. Since chunks are cumulative the client will just see the output restart
+                continue
+            await self._send_coalesced_metric()
+            self._attach_inflight_run(builder, run)
+            return
+
         async with self._wrap_for_metric():
-            async for o in self._stream_task_output(builder.task_input):
-                yield o
+            with _inflight_runs.lead(key, leader_id=builder.id) as flight:
+                o: RunOutput | None = None
+                async for o in self._stream_task_output(builder.task_input):
+                    flight.publish(o)
+                    yield o
+                if o is not None and flight.waiter_count:
+                    flight.complete(builder.build(o))
 
     @classmethod
     @abstractmethod
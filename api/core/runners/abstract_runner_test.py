@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 from unittest.mock import Mock, patch
 
@@ -244,3 +245,218 @@ class TestTaskRunBuilder:
 
         builder = await dummy_runner.task_run_builder(input=task_input, start_time=0)
         assert builder.task_input == task_input
+
+
+class TestInflightRuns:
+    @pytest.fixture(autouse=True)
+    def no_cache(self, mock_cache_fetcher: Mock):
+        mock_cache_fetcher.return_value = None
+
+    def _runner(self, hello_task: SerializableTaskVariant, mock_cache_fetcher: Mock):
+        return DummyRunner(task=hello_task, cache_fetcher=mock_cache_fetcher)
+
+    async def test_concurrent_runs_are_coalesced(self, hello_task: SerializableTaskVariant, mock_cache_fetcher: Mock):
+        release = asyncio.Event()
+        call_count = 0
+
+        async def _build(*args: Any, **kwargs: Any) -> RunOutput:
+            nonlocal call_count
+            call_count += 1
+            await release.wait()
+            return RunOutput({"say_hello": "bla"})
+
+        runners = [self._runner(hello_task, mock_cache_fetcher) for _ in range(3)]
+        for runner in runners:
+            runner._build_task_output = _build  # pyright: ignore [reportPrivateUsage]
+
+        builders = [await runner.task_run_builder(input={"name": "a"}, start_time=0) for runner in runners]
+        tasks = [asyncio.create_task(runner.run(builder, cache="always")) for runner, builder in zip(runners, builders)]
+        await asyncio.sleep(0.01)
+        release.set()
+        runs = await asyncio.gather(*tasks)
+
+        assert call_count == 1
+        assert all(run.task_output == {"say_hello": "bla"} for run in runs)
+        # Only the leader's run is not from the cache, and all runs share the same id
+        assert sum(1 for run in runs if not run.from_cache) == 1
+        assert len({run.id for run in runs}) == 1
+        assert len({builder.id for builder in builders}) == 1
+
+    async def test_runs_are_not_coalesced_when_cache_is_disabled(
+        self,
+        hello_task: SerializableTaskVariant,
+        mock_cache_fetcher: Mock,
+    ):
+        release = asyncio.Event()
+        call_count = 0
+
+        async def _build(*args: Any, **kwargs: Any) -> RunOutput:
+            nonlocal call_count
+            call_count += 1
+            await release.wait()
+            return RunOutput({"say_hello": "bla"})
+
+        runners = [self._runner(hello_task, mock_cache_fetcher) for _ in range(2)]
+        for runner in runners:
+            runner._build_task_output = _build  # pyright: ignore [reportPrivateUsage]
+
+        tasks = [
+            asyncio.create_task(
+                runner.run(await runner.task_run_builder(input={"name": "a"}, start_time=0), cache="never"),
+            )
+            for runner in runners
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert call_count == 2
+
+    async def test_waiter_runs_when_leader_fails(self, hello_task: SerializableTaskVariant, mock_cache_fetcher: Mock):
+        release = asyncio.Event()
+        call_count = 0
+
+        async def _build(*args: Any, **kwargs: Any) -> RunOutput:
+            nonlocal call_count
+            call_count += 1
+            if call_count == 1:
+                await release.wait()
+                raise ValueError("boom")
+            return RunOutput({"say_hello": "bla"})
+
+        leader, waiter = self._runner(hello_task, mock_cache_fetcher), self._runner(hello_task, mock_cache_fetcher)
+        leader._build_task_output = _build  # pyright: ignore [reportPrivateUsage]
+        waiter._build_task_output = _build  # pyright: ignore [reportPrivateUsage]
+
+        leader_task = asyncio.create_task(
+            leader.run(await leader.task_run_builder(input={"name": "a"}, start_time=0), cache="always"),
+        )
+        await asyncio.sleep(0)
+        waiter_task = asyncio.create_task(
+            waiter.run(await waiter.task_run_builder(input={"name": "a"}, start_time=0), cache="always"),
+        )
+        await asyncio.sleep(0.01)
+        release.set()
+
+        with pytest.raises(ValueError):
+            await leader_task
+        run = await waiter_task
+        assert run.task_output == {"say_hello": "bla"}
+        assert not run.from_cache
+        assert call_count == 2
+
+    async def test_single_waiter_leads_when_leader_fails(
+        self,
+        hello_task: SerializableTaskVariant,
+        mock_cache_fetcher: Mock,
+    ):
+        release = asyncio.Event()
+        call_count = 0
+
+        async def _build(*args: Any, **kwargs: Any) -> RunOutput:
+            nonlocal call_count
+            call_count += 1
+            if call_count == 1:
+                await release.wait()
+                raise ValueError("boom")
+            await asyncio.sleep(0.01)
+            return RunOutput({"say_hello": "bla"})
+
+        runners = [self._runner(hello_task, mock_cache_fetcher) for _ in range(4)]
+        for runner in runners:
+            runner._build_task_output = _build  # pyright: ignore [reportPrivateUsage]
+        builders = [await runner.task_run_builder(input={"name": "a"}, start_time=0) for runner in runners]
+        leader_id = builders[0].id
+
+        leader_task = asyncio.create_task(runners[0].run(builders[0], cache="always"))
+        await asyncio.sleep(0)
+        waiter_tasks = [
+            asyncio.create_task(runner.run(builder, cache="always"))
+            for runner, builder in zip(runners[1:], builders[1:])
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+
+        with pytest.raises(ValueError):
+            await leader_task
+        runs = await asyncio.gather(*waiter_tasks)
+
+        # Only one waiter executed the run again
+        assert call_count == 2
+        assert sum(1 for run in runs if not run.from_cache) == 1
+        # The id of the failed run is kept
+        assert {run.id for run in runs} == {leader_id}
+
+    async def test_stream_waiter_keeps_the_leader_id(
+        self,
+        hello_task: SerializableTaskVariant,
+        mock_cache_fetcher: Mock,
+    ):
+        release = asyncio.Event()
+        call_count = 0
+
+        async def _stream(*args: Any, **kwargs: Any):
+            nonlocal call_count
+            call_count += 1
+            yield RunOutput({"say_hello": "b"})
+            if call_count == 1:
+                await release.wait()
+                raise ValueError("boom")
+            yield RunOutput({"say_hello": "bla"})
+
+        runners = [self._runner(hello_task, mock_cache_fetcher) for _ in range(2)]
+        for runner in runners:
+            runner._stream_task_output = _stream  # pyright: ignore [reportPrivateUsage]
+        builders = [await runner.task_run_builder(input={"name": "a"}, start_time=0) for runner in runners]
+        leader_id = builders[0].id
+
+        async def _consume_ids(runner: DummyRunner, builder: TaskRunBuilder):
+            # The id is read for every chunk, like when serializing the chunks
+            return [builder.id async for _ in runner.stream(builder, cache="always")]
+
+        leader_task = asyncio.create_task(_consume_ids(runners[0], builders[0]))
+        await asyncio.sleep(0)
+        waiter_task = asyncio.create_task(_consume_ids(runners[1], builders[1]))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        with pytest.raises(ValueError):
+            await leader_task
+        ids = await waiter_task
+
+        assert call_count == 2
+        # The waiter streamed the chunks of the leader, then its own, all with the same id
+        assert len(ids) >= 2
+        assert set(ids) == {leader_id}
+
+    async def test_stream_fan_out(self, hello_task: SerializableTaskVariant, mock_cache_fetcher: Mock):
+        release = asyncio.Event()
+        call_count = 0
+
+        async def _stream(*args: Any, **kwargs: Any):
+            nonlocal call_count
+            call_count += 1
+            yield RunOutput({"say_hello": "b"})
+            await release.wait()
+            yield RunOutput({"say_hello": "bla"})
+
+        runners = [self._runner(hello_task, mock_cache_fetcher) for _ in range(2)]
+        for runner in runners:
+            runner._stream_task_output = _stream  # pyright: ignore [reportPrivateUsage]
+
+        builders = [await runner.task_run_builder(input={"name": "a"}, start_time=0) for runner in runners]
+
+        async def _consume(runner: DummyRunner, builder: TaskRunBuilder):
+            return [chunk async for chunk in runner.stream(builder, cache="always")]
+
+        tasks = [asyncio.create_task(_consume(runner, builder)) for runner, builder in zip(runners, builders)]
+        await asyncio.sleep(0.01)
+        release.set()
+        leader_chunks, waiter_chunks = await asyncio.gather(*tasks)
+
+        assert call_count == 1
+        assert leader_chunks == [RunOutput({"say_hello": "b"}), RunOutput({"say_hello": "bla"})]
+        assert waiter_chunks == leader_chunks
+        assert builders[1].task_run
+        assert builders[1].task_run.from_cache
+        assert builders[1].task_run.id == builders[0].id
@@ -0,0 +1,74 @@
+import os
+from collections import deque
+
+from pydantic import BaseModel
+
+from core.domain.models import Model, Provider
+
+# Hedging is opt-in, a comma separated list of models or '*' for all models
+_HEDGED_MODELS = os.getenv("WORKFLOWAI_HEDGED_MODELS", "")
+_HEDGING_PERCENTILE = float(os.getenv("WORKFLOWAI_HEDGING_PERCENTILE", "0.95"))
+# Used when there are not enough latency samples
+_HEDGING_DEFAULT_DELAY_SECONDS = os.getenv("WORKFLOWAI_HEDGING_DEFAULT_DELAY_SECONDS")
+
+
+class LatencyTracker:
+    """Keeps a rolling window of successful completion durations per provider and model"""
+
+    def __init__(self, window: int = 200):
+        self._window = window
+        self._samples: dict[tuple[Provider, Model], deque[float]] = {}
+
+    def record(self, provider: Provider, model: Model, seconds: float):
+        key = (provider, model)
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=self._window)
+        self._samples[key].append(seconds)
+
+    def percentile(self, provider: Provider, model: Model, percentile: float, min_samples: int) -> float | None:
+        """Returns the latency percentile (between 0 and 1) or None if there are not enough samples"""
+        samples = self._samples.get((provider, model))
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+
+class HedgingConfig(BaseModel):
+    """When hedging is enabled, a second provider candidate is started if the first one did not
+    complete after the latency percentile observed for the provider and model. The first
+    candidate that succeeds wins and the other is cancelled."""
+
+    # Models for which hedging is enabled, None means all models
+    models: set[Model] | None = None
+
+    percentile: float = 0.95
+    # The minimum number of samples before relying on the percentile
+    min_samples: int = 20
+    # Used when there are not enough samples. If None, no hedging happens until
+    # enough samples are collected
+    default_delay_seconds: float | None = None
+
+    def is_enabled_for(self, model: Model) -> bool:
+        return self.models is None or model in self.models
+
+    def delay_seconds(self, provider: Provider, model: Model, tracker: LatencyTracker) -> float | None:
+        return tracker.percentile(provider, model, self.percentile, self.min_samples) or self.default_delay_seconds
+
+
+def parse_hedged_models(raw: str) -> set[Model] | None:
+    """Returns None when all models are hedged"""
+    if raw.strip() == "*":
+        return None
+    return {Model(m.strip()) for m in raw.split(",") if m.strip()}
+
+
+DEFAULT_HEDGING = (
+    HedgingConfig(
+        models=parse_hedged_models(_HEDGED_MODELS),
+        percentile=_HEDGING_PERCENTILE,
+        default_delay_seconds=float(_HEDGING_DEFAULT_DELAY_SECONDS) if _HEDGING_DEFAULT_DELAY_SECONDS else None,
+    )
+    if _HEDGED_MODELS
+    else None
+)
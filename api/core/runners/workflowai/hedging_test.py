@@ -0,0 +1,52 @@
+import pytest
+
+from core.domain.models import Model, Provider
+
+from .hedging import HedgingConfig, LatencyTracker, parse_hedged_models
+
+
+class TestLatencyTracker:
+    def test_not_enough_samples(self):
+        tracker = LatencyTracker()
+        tracker.record(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, 1)
+        assert tracker.percentile(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, 0.95, min_samples=2) is None
+
+    def test_percentile(self):
+        tracker = LatencyTracker()
+        for i in range(100):
+            tracker.record(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, i)
+        assert tracker.percentile(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, 0.95, min_samples=10) == 95
+        # Samples are separated by provider
+        assert tracker.percentile(Provider.AZURE_OPEN_AI, Model.GPT_4O_2024_11_20, 0.95, min_samples=10) is None
+
+    def test_window(self):
+        tracker = LatencyTracker(window=10)
+        for i in range(100):
+            tracker.record(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, i)
+        assert tracker.percentile(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, 0, min_samples=10) == 90
+
+
+class TestHedgingConfig:
+    def test_delay_seconds_defaults(self):
+        config = HedgingConfig(default_delay_seconds=2, min_samples=1)
+        tracker = LatencyTracker()
+        assert config.delay_seconds(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, tracker) == 2
+
+        tracker.record(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, 3)
+        assert config.delay_seconds(Provider.OPEN_AI, Model.GPT_4O_2024_11_20, tracker) == 3
+
+
+class TestParseHedgedModels:
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            ("*", None),
+            (
+                "gpt-4o-2024-11-20, gpt-4o-mini-2024-07-18",
+                {Model.GPT_4O_2024_11_20, Model.GPT_4O_MINI_2024_07_18},
+            ),
+            ("gpt-4o-2024-11-20,", {Model.GPT_4O_2024_11_20}),
+        ],
+    )
+    def test_parse_hedged_models(self, raw: str, expected: set[Model] | None):
+        assert parse_hedged_models(raw) == expected
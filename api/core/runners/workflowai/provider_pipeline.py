@@ -7,12 +7,15 @@ from typing import Any, NoReturn, Protocol
 from core.domain.error_response import ProviderErrorCode
 from core.domain.errors import InternalError, NoProviderSupportingModelError, ProviderError, StructuredGenerationError
 from core.domain.models.model_data import FinalModelData, ModelData
+from core.domain.models.model_index import MODEL_INDEX
 from core.domain.models.providers import Provider
 from core.domain.models.utils import get_model_data
 from core.domain.tenant_data import ProviderSettings
 from core.providers.base.abstract_provider import AbstractProvider
+from core.providers.base.provider_health import ProviderHealthRegistry
 from core.providers.base.provider_options import ProviderOptions
 from core.providers.factory.abstract_provider_factory import AbstractProviderFactory
+from core.providers.factory.custom_provider_cache import CustomProviderCache, shared_custom_provider_cache
 from core.runners.workflowai.templates import TemplateName
 from core.runners.workflowai.workflowai_options import WorkflowAIRunnerOptions
 
@@ -52,6 +55,8 @@ class ProviderPipeline:
         custom_configs: list[ProviderSettings] | None,
         factory: AbstractProviderFactory,
         builder: ProviderPipelineBuilder,
+        health: ProviderHealthRegistry | None = None,
+        custom_provider_cache: CustomProviderCache[AbstractProvider[Any, Any]] | None = None,
     ):
         self._factory = factory
         self._options = options
@@ -61,6 +66,10 @@ class ProviderPipeline:
         self.builder = builder
         self._force_structured_generation = options.is_structured_generation_enabled
         self._last_error_was_structured_generation = False
+        self._health = health or AbstractProvider.health_registry
+        self._custom_provider_cache = custom_provider_cache or shared_custom_provider_cache
+        # Providers with an open circuit, only tried once all other providers were tried
+        self._deferred: list[tuple[list[AbstractProvider[Any, Any]], FinalModelData]] = []
 
     @property
     def last_error_code(self) -> ProviderErrorCode | None:
@@ -132,33 +141,31 @@ class ProviderPipeline:
         if self._should_retry_without_structured_generation():
             yield self._build(provider, model_data)
 
-    def _single_provider_iterator(
+    def _split_by_health(
+        self,
+        providers: list[AbstractProvider[Any, Any]],
+        model_data: FinalModelData,
+    ) -> tuple[list[AbstractProvider[Any, Any]], list[AbstractProvider[Any, Any]], list[AbstractProvider[Any, Any]]]:
+        """Splits providers between healthy, degraded and open circuit ones, preserving the order"""
+        keys = [provider.health_key(model_data.model) for provider in providers]
+        healthy: list[AbstractProvider[Any, Any]] = []
+        degraded: list[AbstractProvider[Any, Any]] = []
+        opened: list[AbstractProvider[Any, Any]] = []
+        for provider, key in zip(providers, keys):
+            if self._health.is_open(key):
+                opened.append(provider)
+            elif self._health.is_degraded(key, keys):
+                degraded.append(provider)
+            else:
+                healthy.append(provider)
+        return healthy, degraded, opened
+
+    def _iter_providers(
         self,
         providers: Iterable[AbstractProvider[Any, Any]],
         model_data: FinalModelData,
-        provider_type: Provider,
     ) -> Iterator[PipelineProviderData]:
-        providers = iter(providers)
-        if provider_type not in _round_robin_similar_providers:
-            # We yield the first provider first in order to max out quotas
-            try:
-                provider = next(providers)
-            except StopIteration:
-                raise NoProviderSupportingModelError(model=self._options.model)
-            yield from self._iter_with_structured_gen(provider, model_data)
-
-            # No point in retrying on the same provider if the last error code was not a rate limit
-            if self.last_error_code != "rate_limit":
-                return
-
-        # Then we shuffle the rest
-        shuffled = list(providers)
-        if not shuffled:
-            return
-
-        random.shuffle(shuffled)
-
-        for provider in shuffled:
+        for provider in providers:
             # We can safely call _iter_with_structured_gen multiple times
             # if the structured generation fails the first time, the retries
             # Without the structured gen will not happen
@@ -168,12 +175,43 @@ class ProviderPipeline:
             if self.last_error_code != "rate_limit":
                 return
 
+    def _single_provider_iterator(
+        self,
+        providers: Iterable[AbstractProvider[Any, Any]],
+        model_data: FinalModelData,
+        provider_type: Provider,
+    ) -> Iterator[PipelineProviderData]:
+        all_providers = list(providers)
+        if not all_providers and provider_type not in _round_robin_similar_providers:
+            raise NoProviderSupportingModelError(model=self._options.model)
+
+        # Providers that are known to be down or rate limited are tried last
+        healthy, degraded, opened = self._split_by_health(all_providers, model_data)
+        if opened:
+            self._deferred.append((opened, model_data))
+
+        if provider_type in _round_robin_similar_providers:
+            random.shuffle(healthy)
+        else:
+            # We yield the first provider first in order to max out quotas
+            # and shuffle the rest
+            rest = healthy[1:]
+            random.shuffle(rest)
+            healthy = healthy[:1] + rest
+
+        yield from self._iter_providers(healthy + degraded, model_data)
+
     def _build_custom_providers(self, configs: list[ProviderSettings]) -> Iterable[AbstractProvider[Any, Any]]:
         for config in configs:
             try:
-                decrypted = config.decrypt()
-                provider = self._factory.build_provider(decrypted, config.id, preserve_credits=config.preserve_credits)
-                yield provider
+                yield self._custom_provider_cache.get_or_build(
+                    config,
+                    lambda decrypted: self._factory.build_provider(
+                        decrypted,
+                        config.id,
+                        preserve_credits=config.preserve_credits,
+                    ),
+                )
             except Exception:
                 _logger.exception("Failed to build provider with custom config", extra={"config_id": config.id})
                 continue
@@ -187,11 +225,19 @@ class ProviderPipeline:
             configs_by_provider.setdefault(config.provider, []).append(config)
 
         for provider, configs in configs_by_provider.items():
-            if not self.model_data.supported_by_provider(provider):
+            if not MODEL_INDEX.supported_by_provider(self.model_data.model, provider):
                 continue
             yield from self._single_provider_iterator(self._build_custom_providers(configs), self.model_data, provider)
 
     def provider_iterator(self) -> Iterator[PipelineProviderData]:
+        yield from self._pipeline_iterator()
+
+        # All other providers failed so we try the ones with an open circuit as a last resort
+        deferred, self._deferred = self._deferred, []
+        for providers, model_data in deferred:
+            yield from self._iter_providers(providers, model_data)
+
+    def _pipeline_iterator(self) -> Iterator[PipelineProviderData]:
         yield from self._custom_configs_iterator()
 
         if self._options.provider:
@@ -202,10 +248,10 @@ class ProviderPipeline:
             )
             return
 
-        for provider, provider_data in self.model_data.providers:
+        for provider, _ in self.model_data.providers:
             # We only use the override for the default pipeline
             # We assume that
-            provider_model_data = provider_data.override(self.model_data)
+            provider_model_data = MODEL_INDEX.provider_model_data(self.model_data.model, provider)
 
             yield from self._single_provider_iterator(
                 providers=self._factory.get_providers(provider),
@@ -8,6 +8,7 @@ from core.domain.models import Model, Provider
 from core.domain.tenant_data import ProviderSettings
 from core.providers.base.abstract_provider import AbstractProvider
 from core.providers.base.config import ProviderConfig
+from core.providers.base.provider_health import ProviderHealthRegistry
 from core.providers.factory.abstract_provider_factory import AbstractProviderFactory
 from core.providers.factory.local_provider_factory import LocalProviderFactory
 from core.runners.workflowai.provider_pipeline import ProviderPipeline, ProviderPipelineBuilder
@@ -223,3 +224,98 @@ class TestProviderIterator:
         assert len(providers) == 3
         names = [p[0].name() for p in providers]
         assert names == [Provider.OPEN_AI, Provider.OPEN_AI, Provider.AZURE_OPEN_AI]
+
+    def test_custom_providers_are_cached(self, provider_builder: Mock, mock_provider_factory: Mock):
+        mock_provider_factory.build_provider.side_effect = lambda *args, **kwargs: _mock_provider(args[0].provider)  # type: ignore
+        mock_provider_factory.get_providers.side_effect = lambda provider: [_mock_provider(provider)]  # type: ignore
+        configs = [_provider_settings(Provider.OPEN_AI)]
+
+        def _first_provider():
+            pipeline = ProviderPipeline(
+                options=WorkflowAIRunnerOptions(
+                    model=Model.GPT_4O_MINI_2024_07_18,
+                    provider=None,
+                    is_structured_generation_enabled=None,
+                    instructions="",
+                ),
+                custom_configs=configs,
+                builder=provider_builder,
+                factory=mock_provider_factory,
+            )
+            return next(pipeline.provider_iterator())[0]
+
+        assert _first_provider() is _first_provider()
+        mock_provider_factory.build_provider.assert_called_once()
+
+
+class TestProviderHealth:
+    @pytest.fixture
+    def health(self):
+        return ProviderHealthRegistry()
+
+    @pytest.fixture
+    def openai_providers(self, mock_provider_factory: Mock):
+        providers = [_mock_provider(Provider.OPEN_AI) for _ in range(3)]
+        for i, provider in enumerate(providers):
+            provider.health_key.return_value = (Provider.OPEN_AI, f"workflowai_{i}", Model.GPT_4O_MINI_2024_07_18)
+        mock_provider_factory.get_providers.return_value = providers
+        return providers
+
+    def _pipeline(self, provider_builder: Mock, factory: Mock, health: ProviderHealthRegistry):
+        return ProviderPipeline(
+            options=WorkflowAIRunnerOptions(
+                model=Model.GPT_4O_MINI_2024_07_18,
+                provider=Provider.OPEN_AI,
+                is_structured_generation_enabled=None,
+                instructions="",
+            ),
+            custom_configs=None,
+            builder=provider_builder,
+            factory=factory,
+            health=health,
+        )
+
+    @patch("random.shuffle", new=lambda x: None)  # type: ignore
+    def test_open_circuit_is_tried_last(
+        self,
+        provider_builder: Mock,
+        mock_provider_factory: Mock,
+        openai_providers: list[Mock],
+        health: ProviderHealthRegistry,
+    ):
+        health.record_error(openai_providers[0].health_key.return_value, ProviderRateLimitError())
+
+        pipeline = self._pipeline(provider_builder, mock_provider_factory, health)
+        pipeline.errors = [ProviderRateLimitError()]
+        providers = [p[0] for p in pipeline.provider_iterator()]
+        assert providers == [openai_providers[1], openai_providers[2], openai_providers[0]]
+
+    @patch("random.shuffle", new=lambda x: None)  # type: ignore
+    def test_degraded_is_tried_after_healthy(
+        self,
+        provider_builder: Mock,
+        mock_provider_factory: Mock,
+        openai_providers: list[Mock],
+        health: ProviderHealthRegistry,
+    ):
+        health.record_rate_limit(openai_providers[0].health_key.return_value, "requests", 0.99)
+
+        pipeline = self._pipeline(provider_builder, mock_provider_factory, health)
+        pipeline.errors = [ProviderRateLimitError()]
+        providers = [p[0] for p in pipeline.provider_iterator()]
+        assert providers == [openai_providers[1], openai_providers[2], openai_providers[0]]
+
+    def test_all_circuits_open(
+        self,
+        provider_builder: Mock,
+        mock_provider_factory: Mock,
+        openai_providers: list[Mock],
+        health: ProviderHealthRegistry,
+    ):
+        for provider in openai_providers:
+            health.record_error(provider.health_key.return_value, ProviderRateLimitError())
+
+        pipeline = self._pipeline(provider_builder, mock_provider_factory, health)
+        # Providers are still tried as a last resort
+        providers = [p[0] for p in pipeline.provider_iterator()]
+        assert providers == [openai_providers[0]]
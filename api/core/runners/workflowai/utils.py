@@ -1,9 +1,9 @@
-import asyncio
 import base64
 import copy
+import hashlib
 import logging
-from io import BytesIO
-from typing import Any, cast, override
+import os
+from typing import Any, NamedTuple, cast, override
 
 import httpx
 from pydantic import Field, ValidationError
@@ -22,7 +22,9 @@ from core.domain.models.model_datas_mapping import MODEL_DATAS
 from core.domain.tool import Tool
 from core.runners.workflowai.internal_tool import InternalTool
 from core.tools import ToolKind
+from core.utils.file_utils.file_cache import FileCache
 from core.utils.file_utils.file_utils import guess_content_type
+from core.utils.file_utils.pdf_renderer import PDFRenderer
 from core.utils.schema_sanitation import get_file_format
 from core.utils.strings import clean_unicode_chars
 
@@ -196,10 +198,50 @@ def extract_files(schema: dict[str, Any], payload: Any) -> tuple[dict[str, Any],
 
 _download_client = httpx.AsyncClient()
 
+_MAX_DOWNLOAD_BYTES = int(os.getenv("FILE_DOWNLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+# Only the beginning of error bodies is kept for error details
+_MAX_ERROR_BODY_BYTES = 1024
 
-async def _fetch_file_with_retries(url: str, retries: int = 2) -> httpx.Response:
+
+class _DownloadedFile(NamedTuple):
+    status_code: int
+    contents: bytes
+    sha256: str
+    etag: str | None
+
+
+async def _read_response(url: str, response: httpx.Response, max_bytes: int) -> tuple[bytes, str]:
+    """Streams the body of the response, failing as soon as it is larger than max_bytes"""
+    if (length := response.headers.get("content-length")) and length.isdigit() and int(length) > max_bytes:
+        raise InvalidFileError(f"File is larger than {max_bytes} bytes", file_url=url, capture=False)
+
+    buffer = bytearray()
+    digest = hashlib.sha256()
+    async for chunk in response.aiter_bytes():
+        buffer.extend(chunk)
+        digest.update(chunk)
+        if len(buffer) > max_bytes:
+            raise InvalidFileError(f"File is larger than {max_bytes} bytes", file_url=url, capture=False)
+    return bytes(buffer), digest.hexdigest()
+
+
+async def _fetch_file_with_retries(
+    url: str,
+    headers: dict[str, str] | None = None,
+    retries: int = 2,
+) -> _DownloadedFile:
     try:
-        return await _download_client.get(url)
+        async with _download_client.stream("GET", url, headers=headers) as response:
+            if response.status_code != 200:
+                body = b""
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= _MAX_ERROR_BODY_BYTES:
+                        break
+                return _DownloadedFile(response.status_code, body[:_MAX_ERROR_BODY_BYTES], "", None)
+
+            contents, sha256 = await _read_response(url, response, _MAX_DOWNLOAD_BYTES)
+            return _DownloadedFile(response.status_code, contents, sha256, response.headers.get("etag"))
     except (
         httpx.ConnectTimeout,
         httpx.ReadTimeout,
@@ -212,30 +254,54 @@ async def _fetch_file_with_retries(url: str, retries: int = 2) -> httpx.Response
                 f"Failed to download file: {e}",
                 capture=False,
             )
-        return await _fetch_file_with_retries(url, retries - 1)
+        return await _fetch_file_with_retries(url, headers, retries - 1)
 
 
-async def download_file(file: File):
-    if not file.url:
-        raise InvalidFileError("File url is required when data is not provided")
+async def _download(url: str, file_cache: FileCache | None) -> bytes:
+    cached = file_cache.lookup(url) if file_cache else None
+    if file_cache and cached and file_cache.is_fresh(cached):
+        if (contents := await file_cache.read(cached)) is not None:
+            return contents
+
+    headers = {"If-None-Match": cached.etag} if cached and cached.etag else None
+    downloaded = await _fetch_file_with_retries(url, headers)
 
-    response = await _fetch_file_with_retries(file.url)
+    if downloaded.status_code == 304 and file_cache and cached:
+        if (contents := await file_cache.read(cached)) is not None:
+            file_cache.revalidated(url, cached)
+            return contents
+        # The cached contents are gone
+        downloaded = await _fetch_file_with_retries(url)
 
-    if response.status_code != 200:
+    if downloaded.status_code != 200:
         raise InvalidFileError(
-            f"Failed to file image: {response.status_code}",
-            file_url=file.url,
-            details={"response_status_code": response.status_code, "response_body": response.text},
+            f"Failed to file image: {downloaded.status_code}",
+            file_url=url,
+            details={
+                "response_status_code": downloaded.status_code,
+                "response_body": downloaded.contents.decode(errors="replace"),
+            },
         )
 
-    file.data = base64.b64encode(response.content).decode("utf-8")
+    if file_cache:
+        await file_cache.store(url, downloaded.sha256, downloaded.contents, downloaded.etag)
+    return downloaded.contents
+
+
+async def download_file(file: File, file_cache: FileCache | None = None):
+    if not file.url:
+        raise InvalidFileError("File url is required when data is not provided")
+
+    contents = await _download(file.url, file_cache)
+
+    file.data = base64.b64encode(contents).decode("utf-8")
 
     if file.content_type is None:
-        file.content_type = guess_content_type(response.content)
+        file.content_type = guess_content_type(contents)
         if file.content_type is None:
             _logger.warning("Could not guess content type of url", extra={"url": file.url})
 
-    return response.content
+    return contents
 
 
 def sanitize_model_and_provider(model_str: str | None, provider_str: str | None) -> tuple[Model, Provider | None]:
@@ -288,34 +354,23 @@ def split_tools(
     return internal_tools, external_tools
 
 
-async def convert_pdf_to_images(pdf_file: FileWithKeyPath) -> list[FileWithKeyPath]:
+async def convert_pdf_to_images(
+    pdf_file: FileWithKeyPath,
+    renderer: PDFRenderer,
+    file_cache: FileCache | None = None,
+) -> list[FileWithKeyPath]:
     # No need to wrap in a try-except block
     # The error will be caught upstream
-    from pdf2image import convert_from_bytes  # pyright: ignore[reportUnknownVariableType]
-    from PIL import Image
-
     if not pdf_file.data:
-        pdf_data = await download_file(pdf_file)
+        pdf_data = await download_file(pdf_file, file_cache)
     else:
         pdf_data = base64.b64decode(pdf_file.data)
 
-    images = await asyncio.to_thread(convert_from_bytes, pdf_file=pdf_data, fmt="jpg", dpi=150)  # pyright: ignore[reportUnknownArgumentType]
-
-    def _map(image: Image.Image, idx: int):
-        # Convert PIL Image to bytes and encode as base64
-        buffer = BytesIO()
-        image.save(
-            buffer,
-            format="JPEG",
-            quality=60,
-            optimize=True,
-            progressive=True,
-        )
-        image_bytes = buffer.getvalue()
-        image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-        return FileWithKeyPath(data=image_base64, content_type="image/jpeg", key_path=pdf_file.key_path + [idx])
-
-    return [_map(image, i) for i, image in enumerate(images)]
+    pages = await renderer.render(pdf_data)
+    return [
+        FileWithKeyPath(data=page, content_type="image/jpeg", key_path=pdf_file.key_path + [idx])
+        for idx, page in enumerate(pages)
+    ]
 
 
 def cleanup_provider_json(obj: Any) -> Any:
@@ -1,5 +1,6 @@
 import base64
 import json
+from pathlib import Path
 from typing import Any
 from unittest.mock import Mock, patch
 
@@ -14,6 +15,8 @@ from core.domain.fields.file import File
 from core.domain.tool import Tool
 from core.runners.workflowai.internal_tool import InternalTool
 from core.tools import ToolKind
+from core.utils.file_utils.file_cache import FileCache
+from core.utils.file_utils.pdf_renderer import PDFRenderer
 from tests.utils import fixture_bytes
 
 from .utils import (
@@ -381,6 +384,19 @@ class TestExtractFiles:
         assert files[0].format == "image"
 
 
+@pytest.fixture
+def file_cache(tmp_path: Path):
+    return FileCache(directory=str(tmp_path))
+
+
+@pytest.fixture
+def pdf_renderer():
+    # Threads so that pdf2image can be patched
+    renderer = PDFRenderer(use_processes=False)
+    yield renderer
+    renderer.shutdown()
+
+
 class TestDownloadImage:
     async def test_download_image(self, httpx_mock: HTTPXMock):
         image = File(url="https://bla.com/file.png")
@@ -401,6 +417,49 @@ class TestDownloadImage:
         await download_file(image)
         assert image.content_type == "image/webp"
 
+    async def test_download_is_cached(self, httpx_mock: HTTPXMock, file_cache: FileCache):
+        httpx_mock.add_response(status_code=200, content=b"hello")
+
+        assert await download_file(File(url="https://bla.com/file.png"), file_cache) == b"hello"
+        # The second download is served from the cache without a request
+        assert await download_file(File(url="https://bla.com/file.png"), file_cache) == b"hello"
+        assert len(httpx_mock.get_requests()) == 1
+
+    async def test_download_not_cached_without_cache(self, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(status_code=200, content=b"hello")
+        httpx_mock.add_response(status_code=200, content=b"hello")
+
+        assert await download_file(File(url="https://bla.com/file.png")) == b"hello"
+        assert await download_file(File(url="https://bla.com/file.png")) == b"hello"
+        assert len(httpx_mock.get_requests()) == 2
+
+    async def test_download_revalidated_with_etag(self, httpx_mock: HTTPXMock, file_cache: FileCache):
+        httpx_mock.add_response(status_code=200, content=b"hello", headers={"ETag": '"v1"'})
+        assert await download_file(File(url="https://bla.com/file.png"), file_cache) == b"hello"
+
+        httpx_mock.add_response(status_code=304, match_headers={"If-None-Match": '"v1"'})
+        with patch.object(file_cache, "is_fresh", return_value=False):
+            assert await download_file(File(url="https://bla.com/file.png"), file_cache) == b"hello"
+        assert len(httpx_mock.get_requests()) == 2
+
+    async def test_download_too_large(self, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(status_code=200, content=b"hello world")
+
+        with patch("core.runners.workflowai.utils._MAX_DOWNLOAD_BYTES", 5):
+            with pytest.raises(InvalidFileError, match="larger than 5 bytes"):
+                await download_file(File(url="https://bla.com/file.png"))
+
+    async def test_download_error(self, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(status_code=404, content=b"not found")
+
+        with pytest.raises(InvalidFileError) as e:
+            await download_file(File(url="https://bla.com/file.png"))
+        assert e.value.details == {
+            "file_url": "https://bla.com/file.png",
+            "response_status_code": 404,
+            "response_body": "not found",
+        }
+
 
 async def test_retry_download_file(httpx_mock: HTTPXMock):
     httpx_mock.add_exception(httpx.ConnectTimeout("Test exception"))
@@ -471,10 +530,13 @@ class TestSplitTools:
 
 
 class TestConvertPdfToImages:
+    @patch("pdf2image.pdfinfo_from_bytes", return_value={"Pages": 1})
     @patch("pdf2image.convert_from_bytes")
     async def test_convert_pdf_to_images_success(
         self,
         mock_convert: Mock,
+        mock_pdfinfo: Mock,
+        pdf_renderer: PDFRenderer,
     ) -> None:
         # Setup mock
         img = Image.new("RGB", (100, 100), color="red")
@@ -485,6 +547,7 @@ class TestConvertPdfToImages:
                 data="blabla==",
                 key_path=[1, 2],
             ),
+            pdf_renderer,
         )
 
         assert files[0].data
@@ -497,16 +560,37 @@ class TestConvertPdfToImages:
         assert call_args["fmt"] == "jpg"
         assert call_args["dpi"] == 150
 
+    @patch("pdf2image.pdfinfo_from_bytes", return_value={"Pages": 1})
     @patch("pdf2image.convert_from_bytes")
     async def test_convert_pdf_to_images_invalid_pdf(
         self,
         mock_convert: Mock,
+        mock_pdfinfo: Mock,
+        pdf_renderer: PDFRenderer,
     ) -> None:
         mock_convert.side_effect = Exception("Invalid PDF")
         invalid_pdf = FileWithKeyPath(data=base64.b64encode(b"not a pdf").decode("utf-8"), key_path=[])
 
         with pytest.raises(Exception):
-            await convert_pdf_to_images(invalid_pdf)
+            await convert_pdf_to_images(invalid_pdf, pdf_renderer)
+
+    @patch("pdf2image.pdfinfo_from_bytes", return_value={"Pages": 1})
+    @patch("pdf2image.convert_from_bytes")
+    async def test_convert_pdf_to_images_cached(
+        self,
+        mock_convert: Mock,
+        mock_pdfinfo: Mock,
+        pdf_renderer: PDFRenderer,
+    ) -> None:
+        mock_convert.return_value = [Image.new("RGB", (100, 100), color="red")]
+        pdf = FileWithKeyPath(data="blabla==", key_path=[1])
+
+        first = await convert_pdf_to_images(pdf, pdf_renderer)
+        # Another provider in the pipeline converts the same PDF
+        second = await convert_pdf_to_images(pdf, pdf_renderer)
+
+        assert [f.data for f in first] == [f.data for f in second]
+        mock_convert.assert_called_once()
 
 
 class TestProcessRef:
@@ -1,8 +1,10 @@
 import asyncio
+import base64
+import itertools
 import json
 import logging
 import time
-from collections.abc import Sequence
+from collections.abc import Container, Iterator, Sequence
 from copy import deepcopy
 from typing import Any, Callable, Iterable, NamedTuple, Optional
 
@@ -22,7 +24,7 @@ from core.domain.errors import (
 )
 from core.domain.fields.internal_reasoning_steps import InternalReasoningStep
 from core.domain.message import Message
-from core.domain.metrics import send_gauge
+from core.domain.metrics import send_counter, send_gauge
 from core.domain.models.model_data import FinalModelData, ModelData
 from core.domain.models.model_datas_mapping import MODEL_DATAS
 from core.domain.models.utils import get_model_data, get_model_provider_data
@@ -39,8 +41,9 @@ from core.domain.types import TaskInputDict
 from core.providers.base.abstract_provider import AbstractProvider
 from core.providers.base.provider_options import ProviderOptions
 from core.runners.abstract_runner import AbstractRunner, CacheFetcher
+from core.runners.workflowai.hedging import DEFAULT_HEDGING, HedgingConfig, LatencyTracker
 from core.runners.workflowai.internal_tool import build_all_internal_tools
-from core.runners.workflowai.provider_pipeline import ProviderPipeline
+from core.runners.workflowai.provider_pipeline import PipelineProviderData, ProviderPipeline
 from core.runners.workflowai.templates import (
     TemplateName,
     get_template_content,
@@ -60,8 +63,11 @@ from core.runners.workflowai.utils import (
 )
 from core.utils.background import add_background_task
 from core.utils.dicts import set_at_keypath
+from core.utils.file_utils.file_cache import FileCache
 from core.utils.file_utils.file_utils import extract_text_from_file_base64
+from core.utils.file_utils.pdf_renderer import PDFRenderer
 from core.utils.generics import T
+from core.utils.image_utils import ImagePreprocessor
 from core.utils.iter_utils import safe_map_optional
 from core.utils.json_utils import parse_tolerant_json
 from core.utils.schema_augmentation_utils import (
@@ -102,6 +108,13 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
 
     template_manager = TemplateManager()
 
+    # Shared by all the runs of the process unless provided to the runner
+    file_cache = FileCache()
+    pdf_renderer = PDFRenderer()
+    image_preprocessor = ImagePreprocessor()
+
+    latency_tracker = LatencyTracker()
+
     def __init__(
         self,
         task: SerializableTaskVariant,
@@ -111,6 +124,10 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
         cache_fetcher: Optional[CacheFetcher] = None,
         metadata: dict[str, Any] | None = None,
         disable_fallback: bool = False,
+        hedging: HedgingConfig | None = None,
+        file_cache: FileCache | None = None,
+        pdf_renderer: PDFRenderer | None = None,
+        image_preprocessor: ImagePreprocessor | None = None,
     ):
         super().__init__(
             task=task,
@@ -127,6 +144,10 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
         self._custom_configs = custom_configs
 
         self.disable_fallback = disable_fallback
+        self._hedging = hedging or DEFAULT_HEDGING
+        self._file_cache = file_cache or self.file_cache
+        self._pdf_renderer = pdf_renderer or self.pdf_renderer
+        self._image_preprocessor = image_preprocessor or self.image_preprocessor
         # internal tool cache contains the result of internal tool calls
         self._internal_tool_cache = ToolCache()
         # For external tools we still use a cache to ensure the unicity of tool calls
@@ -230,7 +251,7 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
         if not provider.requires_downloading_file(file, self._options.model):
             return
 
-        await download_file(file)
+        await download_file(file, self._file_cache)
 
         set_at_keypath(
             input,
@@ -308,7 +329,7 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
                 )
 
             try:
-                converted = await convert_pdf_to_images(file)
+                converted = await convert_pdf_to_images(file, self._pdf_renderer, self._file_cache)
             except Exception as e:
                 logger.exception("Error converting pdf to images", exc_info=e)
                 # We raise a ModelDoesNotSupportMode error, it will get picked up in the next pipeline step
@@ -319,6 +340,33 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
             res.extend(converted)
         return res
 
+    async def _preprocess_image(self, file: FileWithKeyPath, model_data: ModelData) -> FileWithKeyPath:
+        if not file.is_image or not file.data:
+            return file
+        try:
+            processed = await self._image_preprocessor.preprocess(
+                base64.b64decode(file.data),
+                model_data.max_image_dimension,
+            )
+        except Exception:
+            # The original image is sent, the provider will reject it if it is invalid
+            logger.warning("Failed to preprocess image", exc_info=True)
+            return file
+        if processed is None:
+            return file
+        return file.model_copy(
+            update={"data": base64.b64encode(processed.data).decode(), "content_type": processed.content_type},
+        )
+
+    async def _preprocess_images(
+        self,
+        files: Sequence[FileWithKeyPath],
+        model_data: ModelData,
+    ) -> list[FileWithKeyPath]:
+        """Downscales and compresses images to what the model makes use of. Only the files sent to
+        the provider are updated, the input is stored with the original images"""
+        return list(await asyncio.gather(*(self._preprocess_image(file, model_data) for file in files)))
+
     def _inline_text_files(
         self,
         files: Sequence[FileWithKeyPath],
@@ -442,6 +490,7 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
                         tg.create_task(self._download_file_and_update_input_if_needed(provider, file, input))
             except* InvalidFileError as eg:
                 raise eg.exceptions[0]
+            files = await self._preprocess_images(files, model_data)
             # Here we update the input copy instead of the provided input
             # Since the data will just be provided to the provider
             files, has_inlined_files = self._inline_text_files(files, input_copy)
@@ -1005,6 +1054,152 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
 
         return pipeline
 
+    async def _build_task_output_from_candidate(
+        self,
+        provider: AbstractProvider[Any, Any],
+        template_name: TemplateName,
+        options: ProviderOptions,
+        model_data: ModelData,
+        input: TaskInputDict,
+    ) -> RunOutput:
+        messages = await self._build_messages(template_name, input, provider, model_data)
+        start = time.time()
+        output = await self._build_task_output_from_messages(provider, options, messages)
+        # Tool calls add latency that does not depend on the provider
+        if not self.is_tool_use_enabled:
+            self.latency_tracker.record(provider.name(), options.model, time.time() - start)
+        return output
+
+    def _should_hedge(self, hedging: HedgingConfig) -> bool:
+        return (
+            not self.disable_fallback
+            # Tools can have side effects so they should not be called by concurrent attempts
+            and not self.is_tool_use_enabled
+            and hedging.is_enabled_for(self._options.model)
+        )
+
+    async def _attempt_chain(
+        self,
+        pipeline: ProviderPipeline,
+        candidates: Iterable[PipelineProviderData],
+        input: TaskInputDict,
+        started: list[AbstractProvider[Any, Any]],
+        skipped: Container[AbstractProvider[Any, Any]] = (),
+    ) -> tuple[AbstractProvider[Any, Any], RunOutput] | None:
+        """Tries the candidates in order like the sequential iteration over the pipeline. Returns None
+        when all candidates failed with errors that were swallowed by the pipeline.
+
+        Providers are added to started when they are tried. Candidates with a provider in skipped
+        are not tried, since they are already tried by another chain."""
+        for provider, template_name, options, model_data in candidates:
+            if provider in skipped:
+                continue
+            started.append(provider)
+            self._append_metadata(METADATA_KEY_USED_PROVIDERS, provider.name())
+            with pipeline.wrap_provider_call(provider):
+                output = await self._build_task_output_from_candidate(
+                    provider,
+                    template_name,
+                    options,
+                    model_data,
+                    input,
+                )
+                return provider, output
+        return None
+
+    def _hedge_candidates(
+        self,
+        pipeline: ProviderPipeline,
+        excluded: Container[AbstractProvider[Any, Any]],
+    ) -> Iterator[PipelineProviderData]:
+        """The candidates of the first provider that is not excluded, including the retry without
+        structured generation. The pipeline should not be shared with another chain."""
+        hedge_provider: AbstractProvider[Any, Any] | None = None
+        for candidate in pipeline.provider_iterator():
+            provider = candidate[0]
+            if hedge_provider is None:
+                if provider in excluded:
+                    continue
+                hedge_provider = provider
+                self._send_hedged_metric(candidate)
+            elif provider is not hedge_provider:
+                return
+            yield candidate
+
+    def _send_hedged_metric(self, candidate: PipelineProviderData):
+        provider, _, options, _ = candidate
+        add_background_task(
+            send_counter(
+                "provider_hedged_request",
+                model=options.model.value,
+                provider=provider.name(),
+                tenant=self.task.tenant or "unknown",
+            ),
+        )
+
+    @classmethod
+    async def _cancel_attempts(cls, attempts: Iterable[asyncio.Task[Any]]):
+        attempts = list(attempts)
+        for task in attempts:
+            task.cancel()
+        if attempts:
+            # Waiting for the cancelled attempts so that their completions are finalized
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    async def _build_task_output_hedged(self, input: TaskInputDict, pipeline: ProviderPipeline, hedging: HedgingConfig):
+        """Same as the sequential iteration over the pipeline, except that the next provider is started
+        when the first candidate is slower than usual. The first successful chain wins and the other one is
+        cancelled. LLM completions of both chains are added to the builder so both are accounted for.
+
+        The hedge uses its own pipeline so that the state of the main pipeline, i-e the retry without
+        structured generation and the errors, only depends on the main chain."""
+        candidates = pipeline.provider_iterator()
+        first = next(candidates, None)
+        if first is None:
+            return pipeline.raise_on_end(self.task.task_id)
+
+        main_started: list[AbstractProvider[Any, Any]] = []
+        hedge_started: list[AbstractProvider[Any, Any]] = []
+        hedge_pipeline: ProviderPipeline | None = None
+        main = asyncio.create_task(
+            self._attempt_chain(pipeline, itertools.chain([first], candidates), input, main_started, hedge_started),
+        )
+        attempts = {main}
+        error: BaseException | None = None
+
+        try:
+            delay = hedging.delay_seconds(first[0].name(), first[2].model, self.latency_tracker)
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                hedge_pipeline = self._build_pipeline()
+                hedge_candidates = self._hedge_candidates(hedge_pipeline, main_started)
+                attempts.add(
+                    asyncio.create_task(self._attempt_chain(hedge_pipeline, hedge_candidates, input, hedge_started)),
+                )
+
+            # Errors are only raised once all chains are finished, since another chain can still succeed
+            while attempts:
+                done, _ = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    attempts.remove(task)
+                    if (e := task.exception()) is not None:
+                        # Errors of the main chain take precedence
+                        if error is None or task is main:
+                            error = e
+                        continue
+                    if (result := task.result()) is not None:
+                        provider, output = result
+                        self._set_metadata(METADATA_KEY_PROVIDER_NAME, provider.name())
+                        return output
+        finally:
+            await self._cancel_attempts(attempts)
+
+        if error is not None:
+            raise error
+        if not pipeline.errors and hedge_pipeline is not None:
+            return hedge_pipeline.raise_on_end(self.task.task_id)
+        return pipeline.raise_on_end(self.task.task_id)
+
     @override
     async def _build_task_output(self, input: TaskInputDict) -> RunOutput:
         """
@@ -1012,12 +1207,14 @@ class WorkflowAIRunner(AbstractRunner[WorkflowAIRunnerOptions]):
         """
         pipeline = self._build_pipeline()
 
+        if (hedging := self._hedging) and self._should_hedge(hedging):
+            return await self._build_task_output_hedged(input, pipeline, hedging)
+
         for provider, template_name, options, model_data in pipeline.provider_iterator():
             self._append_metadata(METADATA_KEY_USED_PROVIDERS, provider.name())
             self._set_metadata(METADATA_KEY_PROVIDER_NAME, provider.name())
             with pipeline.wrap_provider_call(provider):
-                messages = await self._build_messages(template_name, input, provider, model_data)
-                return await self._build_task_output_from_messages(provider, options, messages)
+                return await self._build_task_output_from_candidate(provider, template_name, options, model_data, input)
 
         return pipeline.raise_on_end(self.task.task_id)
 
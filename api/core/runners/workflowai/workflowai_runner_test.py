@@ -1,3 +1,6 @@
+import asyncio
+import base64
+import io
 import re
 from collections.abc import Awaitable, Callable
 from datetime import date
@@ -15,6 +18,7 @@ from core.domain.errors import (
     MaxToolCallIterationError,
     ModelDoesNotSupportMode,
     ProviderDoesNotSupportModelError,
+    ProviderError,
     ProviderInternalError,
     ProviderUnavailableError,
     StructuredGenerationError,
@@ -36,6 +40,7 @@ from core.domain.tool_call import ToolCall, ToolCallRequestWithID
 from core.domain.types import TaskOutputDict
 from core.providers.base.abstract_provider import AbstractProvider
 from core.providers.base.provider_options import ProviderOptions
+from core.runners.workflowai.hedging import HedgingConfig
 from core.runners.workflowai.internal_tool import InternalTool
 from core.runners.workflowai.templates import TemplateName
 from core.runners.workflowai.utils import FileWithKeyPath, ToolCallRecursionError
@@ -45,6 +50,9 @@ from core.runners.workflowai.workflowai_runner import (
     WorkflowAIRunner,
 )
 from core.tools import ToolKind
+from core.utils.file_utils.file_cache import FileCache
+from core.utils.file_utils.pdf_renderer import PDFRenderer
+from core.utils.image_utils import ImagePreprocessor
 from tests.models import task_variant
 from tests.utils import mock_aiter
 
@@ -59,10 +67,14 @@ def _build_runner(
     task: SerializableTaskVariant | None = None,
     input_model: type[BaseModel] | None = None,
     output_model: type[BaseModel] | None = None,
+    pdf_renderer: PDFRenderer | None = None,
+    image_preprocessor: ImagePreprocessor | None = None,
 ):
     return WorkflowAIRunner(
         task or task_variant(input_model=input_model, output_model=output_model or input_model),
         properties=properties or TaskGroupProperties(model=model),
+        pdf_renderer=pdf_renderer,
+        image_preprocessor=image_preprocessor,
     )
 
 
@@ -379,10 +391,10 @@ def mock_download_file():
 
 
 class TestBuildMessages:
-    @patch("pdf2image.convert_from_bytes")
+    @patch("pdf2image.convert_from_path")
     async def test_run_with_pdf_and_unsupported_images(
         self,
-        mock_convert_from_bytes: Mock,
+        mock_convert_from_path: Mock,
         mock_provider: Mock,
         model_data: ModelData,
     ) -> None:
@@ -407,12 +419,12 @@ class TestBuildMessages:
                 model_data,
             )
 
-        mock_convert_from_bytes.assert_not_called()
+        mock_convert_from_path.assert_not_called()
 
-    @patch("pdf2image.convert_from_bytes")
+    @patch("pdf2image.convert_from_path")
     async def test_run_with_pdf_and_supported_images(
         self,
-        mock_convert_from_bytes: Mock,
+        mock_convert_from_path: Mock,
         mock_provider: Mock,
         model_data: ModelData,
     ) -> None:
@@ -437,12 +449,14 @@ class TestBuildMessages:
                 model_data,
             )
 
-        mock_convert_from_bytes.assert_not_called()
+        mock_convert_from_path.assert_not_called()
 
-    @patch("pdf2image.convert_from_bytes")
+    @patch("pdf2image.pdfinfo_from_path", return_value={"Pages": 2})
+    @patch("pdf2image.convert_from_path")
     async def test_with_converted_pdf(
         self,
-        mock_convert_from_bytes: Mock,
+        mock_convert_from_path: Mock,
+        mock_pdfinfo_from_path: Mock,
         mock_provider: Mock,
         model_data: ModelData,
     ) -> None:
@@ -451,12 +465,13 @@ class TestBuildMessages:
 
         task = task_variant(input_model=PdfSummaryTaskInput, output_model=PdfSummaryTaskInput)
 
-        runner = _build_runner(task=task, model=Model.GPT_4O_2024_11_20)
+        # Pages are rendered in threads so that pdf2image is patched
+        runner = _build_runner(task=task, model=Model.GPT_4O_2024_11_20, pdf_renderer=PDFRenderer(use_processes=False))
 
         model_data.display_name = "Llama 3.1 (8B)"
         model_data.supports_input_image = True
 
-        mock_convert_from_bytes.return_value = [
+        mock_convert_from_path.return_value = [
             Image.new("RGB", (1, 1), color="red"),
             Image.new("RGB", (1, 1), color="blue"),
         ]
@@ -475,7 +490,38 @@ class TestBuildMessages:
         assert msgs[1].files[0].data
         assert msgs[1].files[1].data
 
-        mock_convert_from_bytes.assert_called_once()
+        mock_convert_from_path.assert_called_once()
+
+    async def test_images_are_downscaled(self, mock_provider: Mock, model_data: ModelData) -> None:
+        class ImageTaskInput(BaseModel):
+            file: File
+
+        task = task_variant(input_model=ImageTaskInput, output_model=ImageTaskInput)
+        runner = _build_runner(
+            task=task,
+            model=Model.GPT_4O_2024_11_20,
+            image_preprocessor=ImagePreprocessor(use_processes=False),
+        )
+        model_data.max_image_dimension = 100
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (400, 200), color="red").save(buffer, format="PNG")
+        image_data = base64.b64encode(buffer.getvalue()).decode()
+        input = {"file": {"content_type": "image/png", "data": image_data}}
+
+        msgs = await runner._build_messages(  # pyright: ignore [reportPrivateUsage]
+            TemplateName.V2_DEFAULT,
+            input,
+            mock_provider,
+            model_data,
+        )
+
+        assert msgs[1].files is not None and len(msgs[1].files) == 1
+        assert msgs[1].files[0].content_type == "image/jpeg"
+        assert msgs[1].files[0].data
+        assert Image.open(io.BytesIO(base64.b64decode(msgs[1].files[0].data))).size == (100, 50)
+        # The input keeps the original image
+        assert input["file"]["data"] == image_data
 
     async def test_run_with_unsupported_multiple_images(self, mock_provider: Mock, model_data: ModelData) -> None:
         class PdfSummaryTaskInput(BaseModel):
@@ -824,8 +870,9 @@ async def test_download_file_before_request(
 
     mock_provider.requires_downloading_file.return_value = require_download
 
-    def download_side_effect(file: File) -> None:
+    def download_side_effect(file: File, file_cache: FileCache | None) -> None:
         assert file == FileWithKeyPath(content_type="image/png", url="some_url", key_path=["file"])
+        assert file_cache is WorkflowAIRunner.file_cache
         file.data = "some_data"
 
     mock_download_file.side_effect = download_side_effect
@@ -1453,6 +1500,153 @@ class TestBuildTaskOutput:
         assert isinstance(first_opts, ProviderOptions), "sanity check"
         assert first_opts.structured_generation is False
 
+    async def test_hedged_request(
+        self,
+        patched_runner: WorkflowAIRunner,
+        patched_provider_factory: Mock,
+    ):
+        patched_runner._options.model = Model.GEMINI_1_5_FLASH_002  # pyright: ignore[reportPrivateUsage]
+        patched_runner._options.provider = None  # pyright: ignore[reportPrivateUsage]
+        patched_runner._hedging = HedgingConfig(default_delay_seconds=0.01)  # pyright: ignore[reportPrivateUsage]
+
+        cancelled = asyncio.Event()
+
+        async def _slow_complete(*args: Any, **kwargs: Any):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        patched_provider_factory.google.complete.side_effect = _slow_complete
+        patched_provider_factory.gemini.complete.return_value = StructuredOutput({"output": "final"})
+
+        result = await patched_runner._build_task_output({"input": "test"})  # pyright: ignore[reportPrivateUsage]
+        assert result == RunOutput({"output": "final"})
+
+        patched_provider_factory.google.complete.assert_awaited_once()
+        patched_provider_factory.gemini.complete.assert_awaited_once()
+        # The slow attempt was cancelled once the hedge succeeded
+        assert cancelled.is_set()
+
+    async def test_hedged_request_first_candidate_wins(
+        self,
+        patched_runner: WorkflowAIRunner,
+        patched_provider_factory: Mock,
+    ):
+        patched_runner._options.model = Model.GEMINI_1_5_FLASH_002  # pyright: ignore[reportPrivateUsage]
+        patched_runner._options.provider = None  # pyright: ignore[reportPrivateUsage]
+        patched_runner._hedging = HedgingConfig(default_delay_seconds=1)  # pyright: ignore[reportPrivateUsage]
+
+        patched_provider_factory.google.complete.return_value = StructuredOutput({"output": "final"})
+
+        result = await patched_runner._build_task_output({"input": "test"})  # pyright: ignore[reportPrivateUsage]
+        assert result == RunOutput({"output": "final"})
+
+        patched_provider_factory.google.complete.assert_awaited_once()
+        patched_provider_factory.gemini.complete.assert_not_called()
+
+    async def test_hedged_request_failover(
+        self,
+        patched_runner: WorkflowAIRunner,
+        patched_provider_factory: Mock,
+    ):
+        patched_runner._options.model = Model.GEMINI_1_5_FLASH_002  # pyright: ignore[reportPrivateUsage]
+        patched_runner._options.provider = None  # pyright: ignore[reportPrivateUsage]
+        patched_runner._hedging = HedgingConfig(default_delay_seconds=1)  # pyright: ignore[reportPrivateUsage]
+
+        patched_provider_factory.google.complete.side_effect = ProviderInternalError()
+        patched_provider_factory.gemini.complete.return_value = StructuredOutput({"output": "final"})
+
+        result = await patched_runner._build_task_output({"input": "test"})  # pyright: ignore[reportPrivateUsage]
+        assert result == RunOutput({"output": "final"})
+
+        patched_provider_factory.google.complete.assert_awaited_once()
+        patched_provider_factory.gemini.complete.assert_awaited_once()
+
+    async def test_hedged_request_structured_generation_retry(
+        self,
+        patched_runner: WorkflowAIRunner,
+        patched_provider_factory: Mock,
+    ):
+        # OpenAI supports structured generation
+        patched_runner._options.model = Model.GPT_4O_MINI_2024_07_18  # pyright: ignore[reportPrivateUsage]
+        patched_runner._options.provider = None  # pyright: ignore[reportPrivateUsage]
+        patched_runner._options.is_structured_generation_enabled = None  # pyright: ignore[reportPrivateUsage]
+        patched_runner._hedging = HedgingConfig(default_delay_seconds=0.01)  # pyright: ignore[reportPrivateUsage]
+
+        async def _openai_complete(*args: Any, **kwargs: Any):
+            if patched_provider_factory.openai.complete.await_count == 1:
+                await asyncio.sleep(0.05)
+                raise StructuredGenerationError()
+            return StructuredOutput({"output": "final"})
+
+        async def _slow_complete(*args: Any, **kwargs: Any):
+            await asyncio.sleep(10)
+
+        patched_provider_factory.openai.complete.side_effect = _openai_complete
+        patched_provider_factory.azure_openai.complete.side_effect = _slow_complete
+
+        result = await patched_runner._build_task_output({"input": "test"})  # pyright: ignore[reportPrivateUsage]
+        assert result == RunOutput({"output": "final"})
+
+        # The hedge was started but did not prevent the retry without structured generation
+        patched_provider_factory.azure_openai.complete.assert_awaited_once()
+        assert patched_provider_factory.openai.complete.await_count == 2
+        second_opts = patched_provider_factory.openai.complete.call_args_list[1].args[1]
+        assert isinstance(second_opts, ProviderOptions), "sanity check"
+        assert second_opts.structured_generation is False
+
+    async def test_hedged_request_error_waits_for_hedge(
+        self,
+        patched_runner: WorkflowAIRunner,
+        patched_provider_factory: Mock,
+    ):
+        patched_runner._options.model = Model.GEMINI_1_5_FLASH_002  # pyright: ignore[reportPrivateUsage]
+        patched_runner._options.provider = None  # pyright: ignore[reportPrivateUsage]
+        patched_runner._hedging = HedgingConfig(default_delay_seconds=0.01)  # pyright: ignore[reportPrivateUsage]
+
+        async def _slow_error(*args: Any, **kwargs: Any):
+            await asyncio.sleep(0.05)
+            raise ProviderError()
+
+        async def _slower_complete(*args: Any, **kwargs: Any):
+            await asyncio.sleep(0.1)
+            return StructuredOutput({"output": "final"})
+
+        patched_provider_factory.google.complete.side_effect = _slow_error
+        # Otherwise the error is swallowed by the pipeline
+        patched_provider_factory.google.is_custom_config = False
+        patched_provider_factory.gemini.complete.side_effect = _slower_complete
+
+        # The error of the first attempt is not raised since the hedge succeeds
+        result = await patched_runner._build_task_output({"input": "test"})  # pyright: ignore[reportPrivateUsage]
+        assert result == RunOutput({"output": "final"})
+
+    async def test_hedged_request_all_fail(
+        self,
+        patched_runner: WorkflowAIRunner,
+        patched_provider_factory: Mock,
+    ):
+        patched_runner._options.model = Model.GEMINI_1_5_FLASH_002  # pyright: ignore[reportPrivateUsage]
+        patched_runner._options.provider = None  # pyright: ignore[reportPrivateUsage]
+        patched_runner._hedging = HedgingConfig(default_delay_seconds=0.01)  # pyright: ignore[reportPrivateUsage]
+
+        async def _slow_error(*args: Any, **kwargs: Any):
+            await asyncio.sleep(0.05)
+            raise ProviderError()
+
+        patched_provider_factory.google.complete.side_effect = _slow_error
+        # Otherwise the error is swallowed by the pipeline
+        patched_provider_factory.google.is_custom_config = False
+        patched_provider_factory.gemini.complete.side_effect = ProviderInternalError()
+
+        with pytest.raises(ProviderError):
+            await patched_runner._build_task_output({"input": "test"})  # pyright: ignore[reportPrivateUsage]
+
+        # The hedge provider is not tried again by the first chain
+        patched_provider_factory.gemini.complete.assert_awaited_once()
+
     async def test_provider_sanitizes_template(
         self,
         patched_runner: WorkflowAIRunner,
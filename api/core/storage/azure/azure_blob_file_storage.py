@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import mimetypes
 from typing import override
@@ -33,7 +32,7 @@ class AzureBlobFileStorage(FileStorage):
     async def store_file(self, file: FileData, folder_path: str) -> str:
         # folder_path is like /{tenant}/{task_id}
 
-        content_hash = hashlib.sha256(file.contents).hexdigest()
+        content_hash = file.content_hash()
         extension = mimetypes.guess_extension(file.content_type) if file.content_type else None
         blob_name = f"{folder_path}/{content_hash}{extension or ''}"
 
@@ -1,5 +1,7 @@
 import asyncio
 import logging
+import os
+import tempfile
 from datetime import datetime, timedelta
 from typing import Any, AsyncIterator, Literal, NotRequired, Sequence, TypedDict, cast, override
 
@@ -19,11 +21,30 @@ from core.storage import ObjectNotFoundException, TaskTuple
 from core.storage.clickhouse.models.runs import FIELD_TO_COLUMN, ClickhouseRun
 from core.storage.clickhouse.models.utils import data_and_columns, id_lower_bound
 from core.storage.clickhouse.query_builder import Q, W, WhereAndClause
+from core.storage.clickhouse.run_batcher import ClickhouseRunBatcher
+from core.storage.clickhouse.run_cache import RunCache
 from core.storage.task_run_storage import RunAggregate, TaskRunStorage, TokenCounts, WeeklyRunAggregate
+from core.utils.redis_cache import shared_redis_client
 
 
 class ClickhouseClient(TaskRunStorage):
     _client_pools: dict[str, AsyncClient] = {}
+    # Shared by all clients in the process, cache hashes include the tenant uid
+    _run_cache = RunCache(shared_redis_client)
+    # Run batchers by connection string, only set when batching is enabled, i-e in workers
+    _run_batching: bool = False
+    # Batches that fail to insert are spooled to this directory and replayed
+    _run_spool_dir: str = os.getenv(
+        "CLICKHOUSE_RUN_SPOOL_DIR",
+        os.path.join(tempfile.gettempdir(), "workflowai-run-spool"),
+    )
+    _run_batchers: dict[str, ClickhouseRunBatcher] = {}
+    # Whether aggregations are read from the runs_daily rollup, see migrations/m2026_10_17_runs_daily.sql
+    # Off by default since the migration is applied manually and the rollup is only complete after the backfill
+    _use_runs_daily: bool = os.getenv("CLICKHOUSE_RUNS_DAILY", "false") == "true"
+    # Whether cache lookups use the runs_by_cache_hash index, see migrations/m2026_10_17_runs_by_cache_hash.sql
+    # Off by default since the migration is applied manually
+    _use_runs_by_cache_hash: bool = os.getenv("CLICKHOUSE_RUNS_BY_CACHE_HASH", "false") == "true"
 
     @classmethod
     async def get_shared_client(cls, connection_string: str) -> AsyncClient:
@@ -31,6 +52,39 @@ class ClickhouseClient(TaskRunStorage):
             cls._client_pools[connection_string] = await create_async_client(dsn=connection_string)
         return cls._client_pools[connection_string]
 
+    @classmethod
+    def enable_run_batching(cls):
+        """Runs stored without explicit insert settings are inserted in batches"""
+        cls._run_batching = True
+
+    @classmethod
+    def _run_batcher(cls, connection_string: str) -> ClickhouseRunBatcher | None:
+        if not cls._run_batching:
+            return None
+        if connection_string not in cls._run_batchers:
+
+            async def _insert(columns: Sequence[str], rows: list[list[Any]]):
+                client = await cls.get_shared_client(connection_string)
+                # Batches are large enough to be inserted synchronously
+                await client.insert(table="runs", column_names=columns, data=rows, settings={"async_insert": 0})
+
+            cls._run_batchers[connection_string] = ClickhouseRunBatcher(_insert, spool_dir=cls._run_spool_dir)
+        return cls._run_batchers[connection_string]
+
+    @classmethod
+    async def replay_spooled_runs(cls, connection_string: str):
+        if batcher := cls._run_batcher(connection_string):
+            await batcher.replay_spool()
+
+    @classmethod
+    async def close_run_batchers(cls):
+        """Inserts all pending runs and disables batching"""
+        batchers = list(cls._run_batchers.values())
+        cls._run_batchers = {}
+        cls._run_batching = False
+        for batcher in batchers:
+            await batcher.close()
+
     def __init__(self, connection_string: str, tenant_uid: int):
         self.connection_string = connection_string
         self._client: AsyncClient | None = None
@@ -96,16 +150,20 @@ class ClickhouseClient(TaskRunStorage):
     async def store_task_run(self, task_run: AgentRun, settings: InsertSettings | None = None):
         clickhouse_run = ClickhouseRun.from_domain(self.tenant_uid, task_run)
         data, columns = data_and_columns(clickhouse_run)
-        client = await self.client()
-
-        settings = settings or {"async_insert": 1, "wait_for_async_insert": 1}
 
-        await client.insert(
-            table="runs",
-            column_names=columns,
-            data=[data],
-            settings=cast(dict[str, Any], settings),
-        )
+        if settings is None and (batcher := self._run_batcher(self.connection_string)):
+            await batcher.add(columns, data)
+        else:
+            client = await self.client()
+            settings = settings or {"async_insert": 1, "wait_for_async_insert": 1}
+
+            await client.insert(
+                table="runs",
+                column_names=columns,
+                data=[data],
+                settings=cast(dict[str, Any], settings),
+            )
+        self._run_cache.set(clickhouse_run, task_run.task_id)
         return task_run
 
     @classmethod
@@ -125,11 +183,16 @@ class ClickhouseClient(TaskRunStorage):
         limit: int,
         offset: int,
         timeout_ms: int = 60_000,
+        before_run_id: str | None = None,
     ):
         columns = ClickhouseRun.select_in_search()
         where = await self._search_where(task_uid, search_fields)
+        if before_run_id:
+            # Keyset pagination, the default order is a prefix of the primary key so
+            # the page is a range scan instead of reading and discarding the offset rows
+            where &= ClickhouseRun.where_before_id(before_run_id)
 
-        async with asyncio.timeout(timeout_ms):
+        async with asyncio.timeout(timeout_ms / 1000):
             result = await self._runs(
                 task_id=task_uid[0] if task_uid else None,
                 select=columns,
@@ -223,13 +286,17 @@ class ClickhouseClient(TaskRunStorage):
             select=["COUNT()"],
             where=where,
         )
-        # print(q, parameters)
-        async with asyncio.timeout(timeout_ms):
-            result = await self.query(
-                q,
-                parameters=parameters,
-            )
-            return result.first_row[0]
+        try:
+            async with asyncio.timeout(timeout_ms / 1000):
+                result = await self.query(
+                    q,
+                    parameters=parameters,
+                )
+                return result.first_row[0]
+        except TimeoutError:
+            # The count is only informative so the search should not fail because of it
+            self._logger.warning("Timeout when counting filtered task runs", extra={"task_uid": task_uid})
+            return None
 
     @override
     async def fetch_task_run_resource(
@@ -256,24 +323,60 @@ class ClickhouseClient(TaskRunStorage):
         timeout_ms: int | None,
         success_only: bool = True,
     ) -> AgentRun | None:
-        async with asyncio.timeout(timeout_ms):
+        async with asyncio.timeout(timeout_ms / 1000 if timeout_ms else None):
             cache_hash = ClickhouseRun.compute_cache_hash(
                 self.tenant_uid,
                 task_id[1],
                 version_id=group_id,
                 input_hash=task_input_hash,
             )
+            # Cached runs are always successful so they can be returned regardless of success_only
+            if cached := await self._run_cache.get(cache_hash, task_schema_id):
+                return cached
 
             w = W("cache_hash", type="String", value=cache_hash)
             w &= W("task_schema_id", type="UInt16", value=task_schema_id)
-            if success_only:
-                w &= W("error_payload", type="String", value="") & W("output", type="String", value="", operator="!=")
 
-            result = await self._runs(task_id[0], ClickhouseRun.select_not_heavy(), w, limit=1)
+            # The index only contains successful runs
+            if self._use_runs_by_cache_hash and success_only:
+                result = await self._cached_run_from_index(task_id[0], w)
+            else:
+                if success_only:
+                    w &= W("error_payload", type="String", value="") & W(
+                        "output",
+                        type="String",
+                        value="",
+                        operator="!=",
+                    )
+                result = await self._runs(task_id[0], ClickhouseRun.select_not_heavy(), w, limit=1)
             if not result:
+                self._run_cache.record_miss()
                 return None
+            self._run_cache.set_from_clickhouse(cache_hash, result[0])
             return result[0]
 
+    async def _cached_run_from_index(self, task_id: str, where: W):
+        # Latest run first, the lookup is a range of the primary key of the index
+        q, parameters = Q(
+            "runs_by_cache_hash",
+            select=["created_at_date", "task_uid", "run_uuid"],
+            where=self._with_tenant(where),
+            limit=1,
+            order_by=["run_uuid DESC"],
+        )
+        result = await self.query(q, parameters=parameters)
+        if not result.result_rows:
+            return []
+        created_at_date, task_uid, run_uuid = result.first_row
+
+        # Point lookup on the primary key of the runs table
+        w = (
+            W("created_at_date", type="Date", value=created_at_date.isoformat())
+            & W("task_uid", type="UInt32", value=task_uid)
+            & W("run_uuid", type="UInt128", value=run_uuid)
+        )
+        return await self._runs(task_id, ClickhouseRun.select_not_heavy(), w, limit=1)
+
     @override
     async def aggregate_task_metadata_fields(self, task_id: TaskTuple, exclude_prefix: str | None = None):
         date = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
@@ -343,15 +446,25 @@ class ClickhouseClient(TaskRunStorage):
         where, parameters = w.to_sql_req()
 
         # Aggregate input_token_count and output_token_count
-        sql = f"""
-        SELECT
-            avg(input_token_count) AS avg_input_token_count,
-            avg(output_token_count) AS avg_output_token_count,
-            count() AS total_count
-        FROM runs
-        WHERE {where}
-        LIMIT 10000
-        """
+        if self._use_runs_daily:
+            sql = f"""
+            SELECT
+                sum(input_token_count) / sum(run_count) AS avg_input_token_count,
+                sum(output_token_count) / sum(run_count) AS avg_output_token_count,
+                sum(run_count) AS total_count
+            FROM runs_daily
+            WHERE {where}
+            """
+        else:
+            sql = f"""
+            SELECT
+                avg(input_token_count) AS avg_input_token_count,
+                avg(output_token_count) AS avg_output_token_count,
+                count() AS total_count
+            FROM runs
+            WHERE {where}
+            LIMIT 10000
+            """
 
         async with asyncio.timeout(maxTimeMS):
             query = await self.query(sql, parameters=parameters)
@@ -380,15 +493,26 @@ class ClickhouseClient(TaskRunStorage):
         raw, parameters = w.to_sql_req()
 
         # Aggregate date, total runs and total cost usd per day
-        sql = f"""
-        SELECT
-            created_at_date,
-            count() AS total_count,
-            sum(cost_millionth_usd) AS total_cost_usd
-        FROM runs
-        WHERE {raw}
-        GROUP BY created_at_date
-        """
+        if self._is_runs_daily_query(query):
+            sql = f"""
+            SELECT
+                created_at_date,
+                sum(run_count) AS total_count,
+                sum(cost_millionth_usd) AS total_cost_usd
+            FROM runs_daily
+            WHERE {raw}
+            GROUP BY created_at_date
+            """
+        else:
+            sql = f"""
+            SELECT
+                created_at_date,
+                count() AS total_count,
+                sum(cost_millionth_usd) AS total_cost_usd
+            FROM runs
+            WHERE {raw}
+            GROUP BY created_at_date
+            """
         async with asyncio.timeout(timeout_ms):
             res = await self.query(sql, parameters=parameters)
 
@@ -449,27 +573,73 @@ class ClickhouseClient(TaskRunStorage):
             for row in res.result_rows
         }
 
+    @classmethod
+    def _is_runs_daily_query(cls, query: SerializableTaskRunQuery) -> bool:
+        """Whether the query only filters on columns that are in the runs_daily rollup"""
+        return cls._use_runs_daily and not (
+            query.status or query.task_input_hashes or query.task_output_hash or query.metadata
+        )
+
+    def _run_counts_since_sql(self, group_by: str, w: W, from_date: datetime):
+        """Query for the run count and the cost in millionth of USD per value of group_by,
+        for the runs created after from_date.
+
+        Only the first day, which is not entirely in the range, is read from the runs table.
+        Following days are read from the daily rollup"""
+        from_day = from_date.strftime("%Y-%m-%d")
+        if not self._use_runs_daily:
+            raw, parameters = (
+                w
+                & W("created_at_date", type="Date", value=from_day, operator=">=")
+                & W("run_uuid", type="UInt128", value=id_lower_bound(from_date), operator=">=")
+            ).to_sql_req()
+            sql = f"""
+            SELECT
+                {group_by},
+                count() AS total_count,
+                sum(cost_millionth_usd) AS total_cost_usd
+            FROM runs
+            WHERE {raw}
+            GROUP BY {group_by}
+            """
+            return sql, parameters
+
+        first_day, parameters = (
+            w
+            & W("created_at_date", type="Date", value=from_day)
+            & W("run_uuid", type="UInt128", value=id_lower_bound(from_date), operator=">=")
+        ).to_sql_req()
+        following_days, following_parameters = (
+            w & W("created_at_date", type="Date", value=from_day, operator=">")
+        ).to_sql_req(param_start=len(parameters))
+        sql = f"""
+        SELECT
+            {group_by},
+            sum(day_run_count) AS total_count,
+            sum(day_cost_millionth_usd) AS total_cost_usd
+        FROM (
+            SELECT {group_by}, count() AS day_run_count, sum(cost_millionth_usd) AS day_cost_millionth_usd
+            FROM runs
+            WHERE {first_day}
+            GROUP BY {group_by}
+            UNION ALL
+            SELECT {group_by}, sum(run_count) AS day_run_count, sum(cost_millionth_usd) AS day_cost_millionth_usd
+            FROM runs_daily
+            WHERE {following_days}
+            GROUP BY {group_by}
+        )
+        GROUP BY {group_by}
+        """
+        return sql, {**parameters, **following_parameters}
+
     @override
     async def run_count_by_version_id(
         self,
         agent_uid: int,
         from_date: datetime,
     ):
-        w = (
-            W("tenant_uid", type="UInt32", value=self.tenant_uid)
-            & W("task_uid", type="UInt32", value=agent_uid)
-            & W("created_at_date", type="Date", value=from_date.strftime("%Y-%m-%d"), operator=">=")
-            & W("run_uuid", type="UInt128", value=id_lower_bound(from_date), operator=">=")
-        )
-        raw, parameters = w.to_sql_req()
-        sql = f"""
-        SELECT
-            version_id,
-            count() AS total_count
-        FROM runs
-        WHERE {raw}
-        GROUP BY version_id
-        """
+        w = W("tenant_uid", type="UInt32", value=self.tenant_uid) & W("task_uid", type="UInt32", value=agent_uid)
+        sql, parameters = self._run_counts_since_sql("version_id", w, from_date)
         res = await self.query(sql, parameters=parameters)
 
         for row in res.result_rows:
@@ -480,21 +650,8 @@ class ClickhouseClient(TaskRunStorage):
 
     @override
     async def run_count_by_agent_uid(self, from_date: datetime) -> AsyncIterator[TaskRunStorage.AgentRunCount]:
-        w = (
-            W("tenant_uid", type="UInt32", value=self.tenant_uid)
-            & W("created_at_date", type="Date", value=from_date.strftime("%Y-%m-%d"), operator=">=")
-            & W("run_uuid", type="UInt128", value=id_lower_bound(from_date), operator=">=")
-        )
-        raw, parameters = w.to_sql_req()
-        sql = f"""
-        SELECT
-            task_uid,
-            count() AS total_count,
-            sum(cost_millionth_usd) AS total_cost_usd
-        FROM runs
-        WHERE {raw}
-        GROUP BY task_uid
-        """
+        w = W("tenant_uid", type="UInt32", value=self.tenant_uid)
+        sql, parameters = self._run_counts_since_sql("task_uid", w, from_date)
         res = await self.query(sql, parameters=parameters)
         for row in res.result_rows:
             yield TaskRunStorage.AgentRunCount(
@@ -5,6 +5,7 @@ import time
 from collections.abc import Collection
 from pathlib import Path
 from typing import Any
+from unittest.mock import patch
 from urllib.parse import urlparse
 
 import bson
@@ -33,6 +34,7 @@ from core.storage.clickhouse.clickhouse_client import (
     ClickhouseClient,
 )
 from core.storage.clickhouse.models.runs import ClickhouseRun
+from core.storage.clickhouse.run_cache import RunCache
 from core.storage.mongo.models.task_run_document import TaskRunDocument
 from core.storage.task_run_storage import RunAggregate, WeeklyRunAggregate
 from core.utils.fields import datetime_factory
@@ -42,8 +44,8 @@ from tests.models import task_group, task_run_ser
 from tests.utils import fixture_bytes, fixtures_json
 
 
-def read_sql_commands() -> list[str]:
-    setup_sql_commands = (Path(__file__).parent / "migrations/m2025_02_10_init.sql").read_text().splitlines()
+def read_sql_commands(migration: str = "m2025_02_10_init.sql") -> list[str]:
+    setup_sql_commands = (Path(__file__).parent / "migrations" / migration).read_text().splitlines()
     lines_per_command: list[list[str]] = [[]]
     # Remove all lines that start with --
     for line in setup_sql_commands:
@@ -70,6 +72,10 @@ async def fresh_clickhouse_client(dsn: str | None = None):
     db_name = urlparse(dsn).path.lstrip("/")
 
     try:
+        await client.command("DROP VIEW IF EXISTS runs_daily_mv;")
+        await client.command("DROP TABLE IF EXISTS runs_daily;")
+        await client.command("DROP VIEW IF EXISTS runs_by_cache_hash_mv;")
+        await client.command("DROP TABLE IF EXISTS runs_by_cache_hash;")
         await client.command("DROP TABLE IF EXISTS runs;")
     except DatabaseError as e:
         if f"Database {db_name} does not exist" not in str(e):
@@ -91,6 +97,21 @@ async def fresh_clickhouse_client(dsn: str | None = None):
     ), "sanity check"
     await client.command(setup_commands[1])
 
+    # Daily rollup, the backfill is not needed since the runs table is empty
+    # Moving the cutover to the epoch so that the view aggregates the runs created in the tests
+    rollup_commands = read_sql_commands("m2026_10_17_runs_daily.sql")
+    assert rollup_commands[0].startswith("CREATE TABLE runs_daily"), "sanity check"
+    assert rollup_commands[1].startswith("CREATE MATERIALIZED VIEW runs_daily_mv"), "sanity check"
+    assert "'2026-10-19 00:00:00'" in rollup_commands[1], "sanity check"
+    await client.command(rollup_commands[0])
+    await client.command(rollup_commands[1].replace("'2026-10-19 00:00:00'", "'1970-01-01 00:00:00'"))
+
+    cache_hash_commands = read_sql_commands("m2026_10_17_runs_by_cache_hash.sql")
+    assert cache_hash_commands[0].startswith("CREATE TABLE runs_by_cache_hash"), "sanity check"
+    assert cache_hash_commands[1].startswith("CREATE MATERIALIZED VIEW runs_by_cache_hash_mv"), "sanity check"
+    for command in cache_hash_commands[:2]:
+        await client.command(command)
+
     return client
 
 
@@ -102,6 +123,15 @@ async def clickhouse_client():
 @pytest.fixture(scope="function", autouse=True)
 async def truncate_run_table(clickhouse_client: ClickhouseClient):
     await clickhouse_client.command("TRUNCATE TABLE runs;")
+    await clickhouse_client.command("TRUNCATE TABLE runs_daily;")
+    await clickhouse_client.command("TRUNCATE TABLE runs_by_cache_hash;")
+
+
+@pytest.fixture(autouse=True)
+def run_cache():
+    """The run cache is disabled by default so that lookups always query clickhouse"""
+    with patch.object(ClickhouseClient, "_run_cache", RunCache(None, capacity=0)):
+        yield
 
 
 def _uuid7(v: int):
@@ -186,6 +216,30 @@ class TestSearchTaskRun:
         r = await self._search(clickhouse_client, [], task_uid=2)
         assert r == [str(_uuid7(2))]
 
+    async def test_search_pages(self, clickhouse_client: ClickhouseClient):
+        # Runs spread over a few days, a page crosses a day boundary
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        models = [_ck_run(created_at=start + datetime.timedelta(hours=10 * i)) for i in range(5)]
+        await clickhouse_client.insert_models("runs", models, {"async_insert": 0, "wait_for_async_insert": 0})
+
+        ids: list[str] = []
+        before_run_id: str | None = None
+        for _ in range(3):
+            page = [
+                r.id
+                async for r in clickhouse_client.search_task_runs(
+                    ("", 1),
+                    [],
+                    limit=2,
+                    offset=0,
+                    before_run_id=before_run_id,
+                )
+            ]
+            ids.extend(page)
+            before_run_id = page[-1]
+
+        assert ids == [str(m.run_uuid) for m in reversed(models)]
+
     async def test_count(self, clickhouse_client: ClickhouseClient):
         await self._insert_runs(
             clickhouse_client,
@@ -533,6 +587,38 @@ class TestFetchCachedRun:
         assert fetched_run.id == str(uuid)
         assert fetched_run.llm_completions is None
 
+    @patch.object(ClickhouseClient, "_use_runs_by_cache_hash", True)
+    async def test_fetch_cached_run_from_cache_hash_index(self, clickhouse_client: ClickhouseClient):
+        now_ms = int(time.time() * 1000)
+        run = task_run_ser(
+            id=str(uuid7(ms=lambda: now_ms - 1)),
+            task_uid=1,
+            task_input={"name": "test"},
+            metadata={"a": "b"},
+        )
+        # Failed run created later with the same input
+        failed_run = task_run_ser(
+            id=str(uuid7(ms=lambda: now_ms)),
+            task_uid=1,
+            task_input={"name": "test"},
+            status="failure",
+            error=ErrorResponse.Error(message="error"),
+        )
+        await clickhouse_client.insert_models(
+            "runs",
+            [ClickhouseRun.from_domain(1, run), ClickhouseRun.from_domain(1, failed_run)],
+            {"async_insert": 0, "wait_for_async_insert": 0},
+        )
+        # Failed runs are not indexed
+        indexed = await clickhouse_client.query("SELECT count() FROM runs_by_cache_hash")
+        assert indexed.first_row[0] == 1
+
+        fetched_run = await clickhouse_client.fetch_cached_run(_TASK_TUPLE, 1, run.task_input_hash, run.group.id, None)
+        assert fetched_run
+        assert fetched_run.id == run.id
+        assert fetched_run.task_output == run.task_output
+        assert fetched_run.metadata == {"a": "b"}
+
     async def test_fetch_cached_run_ordered(self, clickhouse_client: ClickhouseClient):
         """Check that the most recent run is returned for cache"""
 
@@ -645,6 +731,34 @@ class TestFetchCachedRun:
         assert fetched_run
         assert fetched_run.id == str(uuid1)
 
+    async def test_fetch_cached_run_from_run_cache(self, clickhouse_client: ClickhouseClient):
+        """Stored runs are added to the run cache and returned without querying clickhouse"""
+        with patch.object(ClickhouseClient, "_run_cache", RunCache(None)):
+            run = task_run_ser(id=str(uuid7()), task_uid=1, task_input={"name": "test"}, task_output={"output": 1})
+            await clickhouse_client.store_task_run(run)
+
+            # Truncating the table to make sure the run is returned by the cache
+            await clickhouse_client.command("TRUNCATE TABLE runs;")
+            await clickhouse_client.command("TRUNCATE TABLE runs_by_cache_hash;")
+
+            fetched_run = await clickhouse_client.fetch_cached_run(
+                _TASK_TUPLE,
+                1,
+                run.task_input_hash,
+                run.group.id,
+                None,
+            )
+            assert fetched_run
+            assert fetched_run.id == run.id
+            assert fetched_run.task_output == {"output": 1}
+            assert fetched_run.llm_completions is None
+
+            # Schema id does not match
+            assert (
+                await clickhouse_client.fetch_cached_run(_TASK_TUPLE, 2, run.task_input_hash, run.group.id, None)
+                is None
+            )
+
 
 def _ck_run(task_uid: int = 1, tenant_uid: int = 1, created_at: datetime.datetime | None = None, **kwargs: Any):
     uuid = uuid7() if created_at is None else uuid7(ms=lambda: int(created_at.timestamp() * 1000))
@@ -837,6 +951,11 @@ class TestAggregateTokenCounts:
 
 
 class TestAggregateTaskRunCosts:
+    @pytest.fixture
+    def use_runs_daily(self):
+        with patch.object(ClickhouseClient, "_use_runs_daily", True):
+            yield
+
     async def test_aggregate_task_run_costs(self, clickhouse_client: ClickhouseClient):
         await clickhouse_client.insert_models(
             "runs",
@@ -856,6 +975,53 @@ class TestAggregateTaskRunCosts:
             TaskRunAggregatePerDay(date=datetime.date(2024, 1, 3), total_count=1, total_cost_usd=300),
         ]
 
+    @pytest.mark.usefixtures("use_runs_daily")
+    async def test_read_from_rollup(self, clickhouse_client: ClickhouseClient):
+        await clickhouse_client.insert_models(
+            "runs",
+            [
+                _ck_run(cost_usd=100, created_at=datetime.datetime(2024, 1, 1)),
+                _ck_run(cost_usd=200, created_at=datetime.datetime(2024, 1, 1), group_id="v2"),
+            ],
+            {"async_insert": 0, "wait_for_async_insert": 0},
+        )
+        # Dropping the raw runs to make sure that the rollup is used
+        await clickhouse_client.command("TRUNCATE TABLE runs;")
+
+        result = [
+            r async for r in clickhouse_client.aggregate_task_run_costs(1, SerializableTaskRunQuery(task_id="task_id"))
+        ]
+        assert result == [
+            TaskRunAggregatePerDay(date=datetime.date(2024, 1, 1), total_count=2, total_cost_usd=300),
+        ]
+
+    @pytest.mark.usefixtures("use_runs_daily")
+    async def test_filter_not_in_rollup(self, clickhouse_client: ClickhouseClient):
+        await clickhouse_client.insert_models(
+            "runs",
+            [
+                _ck_run(cost_usd=100, created_at=datetime.datetime(2024, 1, 1)),
+                _ck_run(
+                    cost_usd=200,
+                    created_at=datetime.datetime(2024, 1, 1),
+                    status="failure",
+                    error=ErrorResponse.Error(message="error"),
+                ),
+            ],
+            {"async_insert": 0, "wait_for_async_insert": 0},
+        )
+
+        result = [
+            r
+            async for r in clickhouse_client.aggregate_task_run_costs(
+                1,
+                SerializableTaskRunQuery(task_id="task_id", status={"failure"}),
+            )
+        ]
+        assert result == [
+            TaskRunAggregatePerDay(date=datetime.date(2024, 1, 1), total_count=1, total_cost_usd=200),
+        ]
+
 
 class TestAggregateRuns:
     # TODO[clickhouse]: add a test with filters
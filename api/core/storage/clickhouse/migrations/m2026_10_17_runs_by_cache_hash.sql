@@ -0,0 +1,48 @@
+-- File should be executed in Clickhouse directly, after m2025_02_10_init.sql
+
+-- Index of successful runs by cache hash, used for cache lookups
+-- The runs table is ordered by date so looking up a cache hash relies on a bloom filter
+-- and reads more granules as the tenant grows. Here a lookup is a range of the primary key
+-- that returns the primary key of the run in the runs table, which is then read with a point lookup.
+-- Only the keys are stored so the table stays small compared to the runs table.
+CREATE TABLE runs_by_cache_hash (
+    tenant_uid UInt32,
+    cache_hash FixedString(32),
+    task_schema_id UInt16,
+    run_uuid UInt128,
+
+    created_at_date Date,
+    task_uid UInt32,
+)
+ENGINE = ReplacingMergeTree
+ORDER BY (tenant_uid, cache_hash, task_schema_id, run_uuid)
+-- Smaller granules since lookups only read a few rows
+SETTINGS index_granularity = 1024;
+
+-- The view indexes every block inserted in the runs table so the table is written
+-- in the same insert as the run
+-- Only successful runs are returned from the cache so failed runs are not indexed
+CREATE MATERIALIZED VIEW runs_by_cache_hash_mv TO runs_by_cache_hash AS
+SELECT
+    tenant_uid,
+    cache_hash,
+    task_schema_id,
+    run_uuid,
+    created_at_date,
+    task_uid
+FROM runs
+WHERE error_payload = '' AND output != '';
+
+-- Backfill the runs that were inserted before the view was created
+-- Runs that the view already indexed are inserted twice, which is harmless since rows
+-- with the same key are replaced
+INSERT INTO runs_by_cache_hash
+SELECT
+    tenant_uid,
+    cache_hash,
+    task_schema_id,
+    run_uuid,
+    created_at_date,
+    task_uid
+FROM runs
+WHERE error_payload = '' AND output != '';
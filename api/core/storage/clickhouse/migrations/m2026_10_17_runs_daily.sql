@@ -0,0 +1,84 @@
+-- File should be executed in Clickhouse directly, after m2025_02_10_init.sql
+
+-- Cutover: runs created at or after 2026-10-19 00:00:00 UTC are aggregated by the view, runs created
+-- before are aggregated by the backfill. Both use the timestamp of the UUID7 run_uuid, i-e the first
+-- 48 bits are the creation timestamp in ms, so every run is counted exactly once whenever it is inserted.
+-- 1. Update the cutover in the view and the backfill to a time after the view will be created
+-- 2. Create the table and the view, before the cutover
+-- 3. Run the backfill once all runs created before the cutover are inserted, e-g 1 hour after the cutover
+-- 4. Set CLICKHOUSE_RUNS_DAILY=true once the backfill is done
+
+-- The runs table is a ReplacingMergeTree so runs that are inserted again are deduplicated on merge.
+-- The rollup counts every insert and is not deduplicated, so a run inserted twice is counted twice:
+-- - the store_task_run job is retried when it fails after the insert succeeded
+-- - a spooled batch is replayed when its insert failed after being applied, see ClickhouseRunBatcher
+-- Both are rare and only skew the stats, runs must not be re-inserted in bulk, e-g by backfill scripts,
+-- without rebuilding the affected days of the rollup
+
+-- Daily rollup of the runs table
+-- Stats, run counts and token estimates only need counts and sums per day, version and model
+-- so they can be read from the rollup instead of scanning all runs
+CREATE TABLE runs_daily (
+    tenant_uid UInt32,
+    task_uid UInt32,
+    created_at_date Date,
+    task_schema_id UInt16,
+    version_id FixedString(32),
+    version_model LowCardinality(String),
+    is_active Boolean,
+
+    run_count UInt64,
+    failed_run_count UInt64,
+    -- Same units as the runs table
+    cost_millionth_usd UInt64,
+    duration_ds UInt64,
+    input_token_count UInt64,
+    output_token_count UInt64,
+)
+-- Rows with the same key are summed when parts are merged. Merges happen at any time
+-- so queries must still aggregate with sum() and GROUP BY
+ENGINE = SummingMergeTree
+PARTITION BY toYYYYMM(created_at_date)
+ORDER BY (tenant_uid, task_uid, created_at_date, task_schema_id, version_id, version_model, is_active);
+
+-- The view aggregates every block inserted in the runs table, for runs created after the cutover
+-- Rows updated through mutations are not re-aggregated, which is fine since the
+-- aggregated columns are set when the run is created
+CREATE MATERIALIZED VIEW runs_daily_mv TO runs_daily AS
+SELECT
+    tenant_uid,
+    task_uid,
+    created_at_date,
+    task_schema_id,
+    version_id,
+    version_model,
+    is_active,
+    count() AS run_count,
+    countIf(error_payload != '') AS failed_run_count,
+    sum(cost_millionth_usd) AS cost_millionth_usd,
+    sum(duration_ds) AS duration_ds,
+    sum(input_token_count) AS input_token_count,
+    sum(output_token_count) AS output_token_count
+FROM runs
+WHERE run_uuid >= bitShiftLeft(toUInt128(toUnixTimestamp(toDateTime('2026-10-19 00:00:00', 'UTC')) * 1000), 80)
+GROUP BY tenant_uid, task_uid, created_at_date, task_schema_id, version_id, version_model, is_active;
+
+-- Backfill the runs created before the cutover, the view aggregates the others
+INSERT INTO runs_daily
+SELECT
+    tenant_uid,
+    task_uid,
+    created_at_date,
+    task_schema_id,
+    version_id,
+    version_model,
+    is_active,
+    count() AS run_count,
+    countIf(error_payload != '') AS failed_run_count,
+    sum(cost_millionth_usd) AS cost_millionth_usd,
+    sum(duration_ds) AS duration_ds,
+    sum(input_token_count) AS input_token_count,
+    sum(output_token_count) AS output_token_count
+FROM runs
+WHERE run_uuid < bitShiftLeft(toUInt128(toUnixTimestamp(toDateTime('2026-10-19 00:00:00', 'UTC')) * 1000), 80)
+GROUP BY tenant_uid, task_uid, created_at_date, task_schema_id, version_id, version_model, is_active;
@@ -1,7 +1,7 @@
 import json
 import logging
 from collections.abc import Callable
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import Annotated, Any
 from uuid import UUID
 
@@ -782,6 +782,29 @@ class ClickhouseRun(BaseModel):
             & W("run_uuid", type="UInt128", value=run_uuid.int)
         )
 
+    @classmethod
+    def where_before_id(cls, id: str):
+        """Clause selecting the runs that come after the run with the given id in the search order,
+        i-e a keyset on (created_at_date, run_uuid) that maps to a range of the primary key.
+
+        Run uuids are UUID7 so the run uuid bound implies the date bound. The date bound
+        is still needed for clickhouse to skip granules and is padded by a day since created_at_date
+        comes from the run's created_at and not from its uuid"""
+        try:
+            run_uuid = UUID(id)
+        except ValueError:
+            raise BadRequestError("Invalid page token")
+        if not is_uuid7(run_uuid):
+            raise BadRequestError("Invalid page token")
+
+        created_at_date = uuid7_generation_time(run_uuid).date() + timedelta(days=1)
+        return W("created_at_date", operator="<=", type="Date", value=created_at_date) & W(
+            "run_uuid",
+            operator="<",
+            type="UInt128",
+            value=run_uuid.int,
+        )
+
     @classmethod
     def where_for_query(cls, tenant: int, task_uid: int | None, query: SerializableTaskRunQuery):  # noqa: C901
         w = W("tenant_uid", type="UInt32", value=tenant)
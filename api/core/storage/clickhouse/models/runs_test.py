@@ -1,10 +1,10 @@
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from typing import get_args
 
 import pytest
 
 from core.domain.agent_run import AgentRun
-from core.domain.errors import InternalError
+from core.domain.errors import BadRequestError, InternalError
 from core.domain.fields.internal_reasoning_steps import InternalReasoningStep
 from core.domain.llm_completion import LLMCompletion
 from core.domain.llm_usage import LLMUsage
@@ -212,6 +212,20 @@ class TestToClause:
                 ClickhouseRun.to_clause(query)
 
 
+class TestWhereBeforeId:
+    def test_where_before_id(self):
+        run_uuid = uuid7(ms=lambda: int(datetime(2024, 1, 1, 23, tzinfo=timezone.utc).timestamp() * 1000))
+        raw = ClickhouseRun.where_before_id(str(run_uuid)).to_sql()
+        assert raw
+        assert raw[0] == "created_at_date <= {v0:Date} AND run_uuid < {v1:UInt128}"
+        assert raw[1] == {"v0": date(2024, 1, 2), "v1": run_uuid.int}
+
+    @pytest.mark.parametrize("id", ["not_a_uuid", "a3bb189e-8bf9-4888-9912-ace4e6543002"])
+    def test_invalid_id(self, id: str):
+        with pytest.raises(BadRequestError):
+            ClickhouseRun.where_before_id(id)
+
+
 class TestRunColumns:
     @pytest.mark.parametrize("include", get_args(SerializableTaskRunField))
     def test_includes(self, include: SerializableTaskRunField):
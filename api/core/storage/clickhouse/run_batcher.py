@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import os
+import pickle
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from core.domain.metrics import send_counter, send_gauge
+from core.utils.background import add_background_task
+
+_logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = int(os.getenv("CLICKHOUSE_RUN_BATCH_SIZE", "500"))
+_BATCH_MAX_DELAY_SECONDS = float(os.getenv("CLICKHOUSE_RUN_BATCH_MAX_DELAY_SECONDS", "1"))
+# Maximum number of rows waiting to be inserted before add() blocks
+_BATCH_MAX_PENDING_ROWS = int(os.getenv("CLICKHOUSE_RUN_BATCH_MAX_PENDING_ROWS", "5000"))
+
+# Inserts a list of rows that share the same columns
+InsertFn = Callable[[Sequence[str], list[list[Any]]], Awaitable[None]]
+
+
+class _PendingRow(NamedTuple):
+    columns: tuple[str, ...]
+    data: list[Any]
+
+
+class ClickhouseRunBatcher:
+    """Accumulates rows in memory and inserts them in batches, when the batch is full
+    or when the oldest row in the batch has waited for max_delay_seconds.
+
+    Adding a row returns as soon as the row is queued so that callers, i-e jobs, do not hold
+    a worker slot while the batch fills up. Adding blocks when too many rows are pending.
+
+    Batches that could not be inserted, either when flushing or when closing the batcher,
+    are spooled to disk and re-inserted when the spool is replayed."""
+
+    def __init__(
+        self,
+        insert: InsertFn,
+        max_batch_size: int = _BATCH_SIZE,
+        max_delay_seconds: float = _BATCH_MAX_DELAY_SECONDS,
+        max_pending_rows: int = _BATCH_MAX_PENDING_ROWS,
+        # Batches that fail to insert are lost when there is no spool dir
+        spool_dir: str | None = None,
+    ):
+        self._insert = insert
+        self._max_batch_size = max_batch_size
+        self._max_delay_seconds = max_delay_seconds
+        self._max_pending_rows = max_pending_rows
+        self._spool_dir = spool_dir
+        self._batch: list[_PendingRow] = []
+        self._pending_count = 0
+        # Only one batch is inserted at a time
+        self._flush_lock = asyncio.Lock()
+        self._capacity = asyncio.Condition()
+        self._delayed_flush: asyncio.Task[None] | None = None
+        self._flushes = set[asyncio.Task[None]]()
+        self._closed = False
+        self._has_spooled = False
+
+    @property
+    def pending_count(self) -> int:
+        """The number of rows that were added and are not inserted yet"""
+        return self._pending_count
+
+    async def _wait_for_capacity(self):
+        async with self._capacity:
+            await self._capacity.wait_for(lambda: self._pending_count < self._max_pending_rows)
+
+    async def _release_capacity(self, count: int):
+        async with self._capacity:
+            self._pending_count -= count
+            self._capacity.notify_all()
+
+    async def add(self, columns: Sequence[str], data: list[Any]):
+        """Adds a row to the current batch, waiting only if too many rows are pending"""
+        if self._closed:
+            # Should not happen but in case a job is still running after the shutdown,
+            # we insert the row directly
+            await self._insert(columns, [data])
+            return
+
+        if self._pending_count >= self._max_pending_rows:
+            add_background_task(send_counter("clickhouse_run_batch_backpressure"))
+            await self._wait_for_capacity()
+
+        self._batch.append(_PendingRow(tuple(columns), data))
+        self._pending_count += 1
+
+        if len(self._batch) >= self._max_batch_size:
+            self._start_flush()
+        elif self._delayed_flush is None:
+            self._delayed_flush = asyncio.create_task(self._flush_after_delay())
+
+    def _start_flush(self):
+        if self._delayed_flush is not None:
+            self._delayed_flush.cancel()
+            self._delayed_flush = None
+        batch = self._batch
+        self._batch = []
+        # Keeping a reference to the task so that it is not garbage collected and can be awaited on close
+        t = asyncio.create_task(self._flush(batch))
+        self._flushes.add(t)
+        t.add_done_callback(self._flushes.discard)
+
+    async def _flush_after_delay(self):
+        await asyncio.sleep(self._max_delay_seconds)
+        # Resetting before starting the flush to avoid cancelling ourselves
+        self._delayed_flush = None
+        self._start_flush()
+
+    @classmethod
+    def _group_by_columns(cls, batch: Sequence[_PendingRow]) -> dict[tuple[str, ...], list[_PendingRow]]:
+        # Rows are dumped without None values so columns can differ between rows
+        groups: dict[tuple[str, ...], list[_PendingRow]] = {}
+        for row in batch:
+            groups.setdefault(row.columns, []).append(row)
+        return groups
+
+    async def _insert_batch(self, batch: Sequence[_PendingRow]):
+        start = time.time()
+        for columns, rows in self._group_by_columns(batch).items():
+            await self._insert(columns, [r.data for r in rows])
+        add_background_task(send_gauge("clickhouse_run_batch_insert_seconds", time.time() - start, size=len(batch)))
+
+    async def _flush(self, batch: Sequence[_PendingRow]):
+        """Inserts the batch. Never raises since the rows were already acknowledged to the callers,
+        batches that can't be inserted are spooled to disk and dropped if they can't be spooled"""
+        if not batch:
+            return
+        try:
+            async with self._flush_lock:
+                await self._insert_batch(batch)
+        except Exception:
+            _logger.exception("Failed to insert run batch, spooling", extra={"size": len(batch)})
+            if self._safe_spool(batch):
+                self._has_spooled = True
+            else:
+                _logger.error("Dropping run batch that could not be inserted nor spooled", extra={"size": len(batch)})
+                add_background_task(send_counter("clickhouse_run_batch_dropped", value=len(batch)))
+            return
+        finally:
+            await self._release_capacity(len(batch))
+
+        # Clickhouse is reachable again so the batches spooled since are replayed
+        if self._has_spooled and not self._closed:
+            self._has_spooled = False
+            try:
+                await self.replay_spool()
+            except Exception:
+                _logger.exception("Failed to replay run spool")
+
+    async def close(self):
+        """Inserts the remaining rows, waiting for the batches that are being inserted.
+        Never raises since it is called when shutting down."""
+        self._closed = True
+        if self._delayed_flush is not None:
+            self._delayed_flush.cancel()
+            self._delayed_flush = None
+        batch = self._batch
+        self._batch = []
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+        await self._flush(batch)
+
+    def _safe_spool(self, batch: Sequence[_PendingRow]) -> bool:
+        try:
+            return self._spool(batch)
+        except Exception:
+            _logger.exception("Failed to spool run batch", extra={"size": len(batch)})
+            return False
+
+    def _spool(self, batch: Sequence[_PendingRow]) -> bool:
+        if not self._spool_dir:
+            return False
+        path = Path(self._spool_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        file = path / f"runs_{time.time_ns()}_{os.getpid()}.pkl"
+        with file.open("wb") as f:
+            pickle.dump([(row.columns, row.data) for row in batch], f)
+        _logger.warning("Spooled run batch", extra={"file": str(file), "size": len(batch)})
+        return True
+
+    async def replay_spool(self):
+        """Inserts the rows that were spooled to disk by a previous close"""
+        if not self._spool_dir:
+            return
+        path = Path(self._spool_dir)
+        if not path.exists():
+            return
+        for file in sorted(path.glob("runs_*.pkl")):
+            # Claiming the file first since other workers can replay the same spool
+            claimed = file.with_suffix(".replaying")
+            try:
+                file.rename(claimed)
+            except FileNotFoundError:
+                continue
+            try:
+                with claimed.open("rb") as f:
+                    rows: list[tuple[tuple[str, ...], list[Any]]] = pickle.load(f)
+                groups: dict[tuple[str, ...], list[list[Any]]] = {}
+                for columns, data in rows:
+                    groups.setdefault(columns, []).append(data)
+                for columns, datas in groups.items():
+                    await self._insert(columns, datas)
+            except Exception:
+                _logger.exception("Failed to replay spooled run batch", extra={"file": str(file)})
+                # Releasing the file so that it is replayed next time
+                claimed.rename(file)
+                continue
+            claimed.unlink()
@@ -0,0 +1,163 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.storage.clickhouse.run_batcher import ClickhouseRunBatcher
+
+
+@pytest.fixture
+def mock_insert():
+    return AsyncMock()
+
+
+def _batcher(mock_insert: AsyncMock, **kwargs: Any):
+    return ClickhouseRunBatcher(mock_insert, **kwargs)
+
+
+class TestAdd:
+    async def test_flush_on_size(self, mock_insert: AsyncMock):
+        batcher = _batcher(mock_insert, max_batch_size=3, max_delay_seconds=10)
+
+        await asyncio.gather(*(batcher.add(["a", "b"], [i, i]) for i in range(3)))
+        await asyncio.sleep(0)
+
+        mock_insert.assert_awaited_once_with(("a", "b"), [[0, 0], [1, 1], [2, 2]])
+        assert batcher.pending_count == 0
+
+    async def test_flush_on_delay(self, mock_insert: AsyncMock):
+        batcher = _batcher(mock_insert, max_batch_size=10, max_delay_seconds=0.01)
+
+        await asyncio.gather(batcher.add(["a"], [1]), batcher.add(["a"], [2]))
+        mock_insert.assert_not_awaited()
+        await asyncio.sleep(0.05)
+
+        mock_insert.assert_awaited_once_with(("a",), [[1], [2]])
+
+    async def test_rows_are_grouped_by_columns(self, mock_insert: AsyncMock):
+        batcher = _batcher(mock_insert, max_batch_size=3, max_delay_seconds=10)
+
+        await asyncio.gather(batcher.add(["a"], [1]), batcher.add(["a", "b"], [2, 2]), batcher.add(["a"], [3]))
+        await asyncio.sleep(0)
+
+        assert mock_insert.await_count == 2
+        assert mock_insert.await_args_list[0].args == (("a",), [[1], [3]])
+        assert mock_insert.await_args_list[1].args == (("a", "b"), [[2, 2]])
+
+    async def test_add_does_not_wait_for_insert(self, mock_insert: AsyncMock):
+        batcher = _batcher(mock_insert, max_batch_size=10, max_delay_seconds=10)
+
+        await batcher.add(["a"], [1])
+
+        mock_insert.assert_not_awaited()
+        assert batcher.pending_count == 1
+
+    async def test_more_jobs_than_worker_slots(self, mock_insert: AsyncMock):
+        # Jobs hold a worker slot while adding their row, the batch should still fill up
+        slots = asyncio.Semaphore(5)
+        batcher = _batcher(mock_insert, max_batch_size=20, max_delay_seconds=10)
+
+        async def _job(i: int):
+            async with slots:
+                await batcher.add(["a"], [i])
+
+        await asyncio.wait_for(asyncio.gather(*(_job(i) for i in range(20))), timeout=1)
+        await asyncio.sleep(0)
+
+        mock_insert.assert_awaited_once_with(("a",), [[i] for i in range(20)])
+
+    async def test_insert_failure_is_spooled_and_replayed(self, mock_insert: AsyncMock, tmp_path: Path):
+        mock_insert.side_effect = ValueError("boom")
+        batcher = _batcher(mock_insert, max_batch_size=1, max_delay_seconds=10, spool_dir=str(tmp_path))
+
+        await batcher.add(["a"], [1])
+        await asyncio.sleep(0.01)
+        assert batcher.pending_count == 0
+        assert len(list(tmp_path.iterdir())) == 1
+
+        # The next successful insert replays the spool
+        mock_insert.reset_mock(side_effect=True)
+        await batcher.add(["a"], [2])
+        await asyncio.sleep(0.01)
+
+        assert mock_insert.await_args_list[0].args == (("a",), [[2]])
+        assert mock_insert.await_args_list[1].args == (("a",), [[1]])
+        assert not list(tmp_path.iterdir())
+
+    async def test_backpressure(self, mock_insert: AsyncMock):
+        release = asyncio.Event()
+
+        async def _insert(*args: Any):
+            await release.wait()
+
+        mock_insert.side_effect = _insert
+        batcher = _batcher(mock_insert, max_batch_size=1, max_delay_seconds=10, max_pending_rows=1)
+
+        first = asyncio.create_task(batcher.add(["a"], [1]))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(batcher.add(["a"], [2]))
+        await asyncio.sleep(0.01)
+
+        # The second row is waiting for capacity
+        assert mock_insert.await_count == 1
+        assert batcher.pending_count == 1
+
+        release.set()
+        await asyncio.gather(first, second)
+        await batcher.close()
+        assert mock_insert.await_count == 2
+
+
+class TestClose:
+    async def test_close_flushes_pending_rows(self, mock_insert: AsyncMock):
+        batcher = _batcher(mock_insert, max_batch_size=10, max_delay_seconds=10)
+
+        await batcher.add(["a"], [1])
+        mock_insert.assert_not_awaited()
+
+        await batcher.close()
+        mock_insert.assert_awaited_once_with(("a",), [[1]])
+
+    async def test_add_after_close(self, mock_insert: AsyncMock):
+        batcher = _batcher(mock_insert)
+        await batcher.close()
+
+        await batcher.add(["a"], [1])
+        mock_insert.assert_awaited_once_with(["a"], [[1]])
+
+    async def test_close_spools_and_replays(self, mock_insert: AsyncMock, tmp_path: Path):
+        mock_insert.side_effect = ValueError("boom")
+        batcher = _batcher(mock_insert, max_batch_size=10, max_delay_seconds=10, spool_dir=str(tmp_path))
+
+        await batcher.add(["a"], [1])
+        await batcher.close()
+        assert len(list(tmp_path.iterdir())) == 1
+
+        mock_insert.reset_mock(side_effect=True)
+        replayer = _batcher(mock_insert, spool_dir=str(tmp_path))
+        await replayer.replay_spool()
+
+        mock_insert.assert_awaited_once_with(("a",), [[1]])
+        assert not list(tmp_path.iterdir())
+
+    async def test_close_without_spool(self, mock_insert: AsyncMock):
+        mock_insert.side_effect = ValueError("boom")
+        batcher = _batcher(mock_insert, max_batch_size=10, max_delay_seconds=10)
+
+        await batcher.add(["a"], [1])
+        # Closing does not raise so that the rest of the shutdown can happen
+        await batcher.close()
+        assert batcher.pending_count == 0
+
+    async def test_close_spool_fails(self, mock_insert: AsyncMock, tmp_path: Path):
+        mock_insert.side_effect = ValueError("boom")
+        # The spool dir is a file so it can't be written to
+        spool_file = tmp_path / "spool"
+        spool_file.write_text("")
+        batcher = _batcher(mock_insert, max_batch_size=10, max_delay_seconds=10, spool_dir=str(spool_file))
+
+        await batcher.add(["a"], [1])
+        await batcher.close()
+        assert batcher.pending_count == 0
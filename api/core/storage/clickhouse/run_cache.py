@@ -0,0 +1,120 @@
+import logging
+from datetime import timedelta
+from typing import Any, Literal
+
+from core.domain.agent_run import AgentRun
+from core.domain.metrics import send_counter
+from core.storage.clickhouse.models.runs import ClickhouseRun
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import TLRUCache
+
+_logger = logging.getLogger(__name__)
+
+RunCacheTier = Literal["memory", "redis", "clickhouse", "miss"]
+
+
+class RunCache:
+    """A two tier cache of runs, keyed by the run cache hash, that sits in front of the
+    Clickhouse cache lookup.
+
+    - the first tier is a bounded in process LRU
+    - the second tier is a redis cache shared between processes
+
+    Only successful runs are cached. Cached runs contain the same fields as the ones
+    returned by Clickhouse, i-e without the heavy fields.
+
+    Redis writes happen in the background so that they do not slow down storing runs."""
+
+    def __init__(
+        self,
+        redis_client: Any | None,
+        capacity: int = 2048,
+        memory_ttl: timedelta = timedelta(minutes=10),
+        redis_ttl: timedelta = timedelta(days=1),
+    ):
+        self._capacity = capacity
+        self._memory_ttl = memory_ttl
+        self._memory = TLRUCache[str, AgentRun](capacity, lambda _, __: memory_ttl)
+        self._redis = redis_client
+        self._redis_ttl_seconds = int(redis_ttl.total_seconds())
+
+    @classmethod
+    def _redis_key(cls, cache_hash: str) -> str:
+        return f"run_cache:{cache_hash}"
+
+    @classmethod
+    def is_cacheable(cls, run: ClickhouseRun) -> bool:
+        return not run.error_payload and bool(run.output)
+
+    @classmethod
+    def _light_run(cls, run: ClickhouseRun, task_id: str) -> AgentRun:
+        # Mimicking what is returned when selecting the non heavy fields from clickhouse
+        return run.model_copy(update={k: None for k in ClickhouseRun.heavy_fields()}).to_domain(task_id)
+
+    def _send_lookup_metric(self, tier: RunCacheTier):
+        add_background_task(send_counter("run_cache_lookup", tier=tier))
+
+    async def _redis_get(self, cache_hash: str) -> AgentRun | None:
+        if not self._redis:
+            return None
+        try:
+            raw: bytes | None = await self._redis.get(self._redis_key(cache_hash))
+            if raw:
+                return AgentRun.model_validate_json(raw)
+        except Exception:
+            _logger.exception("Failed to get run from redis cache", extra={"cache_hash": cache_hash})
+        return None
+
+    async def _redis_set(self, cache_hash: str, run: AgentRun):
+        if not self._redis:
+            return
+        try:
+            await self._redis.setex(
+                self._redis_key(cache_hash),
+                self._redis_ttl_seconds,
+                run.model_dump_json().encode(),
+            )
+        except Exception:
+            _logger.exception("Failed to set run in redis cache", extra={"cache_hash": cache_hash})
+
+    async def get(self, cache_hash: str, task_schema_id: int) -> AgentRun | None:
+        # Returning copies since callers are allowed to update the returned run
+        run = self._memory.get(cache_hash)
+        if run is not None and run.task_schema_id == task_schema_id:
+            self._send_lookup_metric("memory")
+            return run.model_copy()
+
+        run = await self._redis_get(cache_hash)
+        if run is not None and run.task_schema_id == task_schema_id:
+            self._memory[cache_hash] = run
+            self._send_lookup_metric("redis")
+            return run.model_copy()
+
+        return None
+
+    def _background_redis_set(self, cache_hash: str, run: AgentRun):
+        if self._redis:
+            add_background_task(self._redis_set(cache_hash, run))
+
+    def set(self, run: ClickhouseRun, task_id: str):
+        """Add a run to all tiers. Non cacheable runs are ignored"""
+        if not self.is_cacheable(run):
+            return
+        light = self._light_run(run, task_id)
+        self._memory[run.cache_hash] = light
+        self._background_redis_set(run.cache_hash, light)
+
+    def set_from_clickhouse(self, cache_hash: str, run: AgentRun):
+        """Populate the tiers with a run retrieved from clickhouse"""
+        self._send_lookup_metric("clickhouse")
+        if run.status != "success" or not run.task_output:
+            return
+        self._memory[cache_hash] = run.model_copy()
+        self._background_redis_set(cache_hash, run)
+
+    def record_miss(self):
+        self._send_lookup_metric("miss")
+
+    def clear(self):
+        """Clears the in process tier"""
+        self._memory = TLRUCache[str, AgentRun](self._capacity, lambda _, __: self._memory_ttl)
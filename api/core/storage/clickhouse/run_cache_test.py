@@ -0,0 +1,115 @@
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from core.domain.error_response import ErrorResponse
+from core.storage.clickhouse.models.runs import ClickhouseRun
+from core.storage.clickhouse.run_cache import RunCache
+from core.utils.background import wait_for_background_tasks
+from core.utils.uuid import uuid7
+from tests.models import task_run_ser
+
+
+@pytest.fixture
+def mock_redis():
+    mock = AsyncMock()
+    mock.get.return_value = None
+    return mock
+
+
+@pytest.fixture
+def run_cache(mock_redis: AsyncMock):
+    return RunCache(mock_redis)
+
+
+@pytest.fixture(autouse=True)
+def patched_send_counter():
+    with patch("core.storage.clickhouse.run_cache.send_counter") as mock:
+        yield mock
+
+
+def _ck_run(**kwargs: Any):
+    run = task_run_ser(id=str(uuid7()), task_uid=1, task_input={"name": "test"}, **kwargs)
+    return ClickhouseRun.from_domain(1, run)
+
+
+class TestRunCache:
+    async def test_set_and_get(self, run_cache: RunCache, mock_redis: AsyncMock):
+        ck_run = _ck_run(task_output={"output": 1})
+        run_cache.set(ck_run, "task_id")
+        # The redis write is not awaited
+        mock_redis.setex.assert_not_called()
+
+        await wait_for_background_tasks()
+        mock_redis.setex.assert_called_once()
+        assert mock_redis.setex.call_args.args[0] == f"run_cache:{ck_run.cache_hash}"
+
+        cached = await run_cache.get(ck_run.cache_hash, 1)
+        assert cached
+        assert cached.id == str(ck_run.run_uuid)
+        assert cached.task_output == {"output": 1}
+        # Heavy fields are not stored
+        assert cached.llm_completions is None
+        mock_redis.get.assert_not_called()
+
+    async def test_get_schema_mismatch(self, run_cache: RunCache):
+        ck_run = _ck_run(task_output={"output": 1})
+        run_cache.set(ck_run, "task_id")
+
+        assert await run_cache.get(ck_run.cache_hash, 2) is None
+
+    async def test_failed_runs_are_not_cached(self, run_cache: RunCache, mock_redis: AsyncMock):
+        ck_run = _ck_run(status="failure", error=ErrorResponse.Error(message="test", code="test", status_code=500))
+        run_cache.set(ck_run, "task_id")
+        await wait_for_background_tasks()
+
+        mock_redis.setex.assert_not_called()
+        assert await run_cache.get(ck_run.cache_hash, 1) is None
+
+    async def test_empty_outputs_are_not_cached(self, run_cache: RunCache, mock_redis: AsyncMock):
+        ck_run = _ck_run(task_output={})
+        run_cache.set(ck_run, "task_id")
+        await wait_for_background_tasks()
+
+        mock_redis.setex.assert_not_called()
+
+    async def test_get_from_redis(self, run_cache: RunCache, mock_redis: AsyncMock):
+        run = task_run_ser(id=str(uuid7()), task_output={"output": 1})
+        mock_redis.get.return_value = run.model_dump_json().encode()
+
+        cached = await run_cache.get("cache_hash", 1)
+        assert cached == run
+        mock_redis.get.assert_called_once_with("run_cache:cache_hash")
+
+        # Second call hits the in process tier
+        assert await run_cache.get("cache_hash", 1) == run
+        mock_redis.get.assert_called_once()
+
+    async def test_redis_error(self, run_cache: RunCache, mock_redis: AsyncMock):
+        mock_redis.get.side_effect = Exception("boom")
+        assert await run_cache.get("cache_hash", 1) is None
+
+    async def test_no_redis(self):
+        run_cache = RunCache(None)
+        ck_run = _ck_run(task_output={"output": 1})
+        run_cache.set(ck_run, "task_id")
+
+        assert await run_cache.get(ck_run.cache_hash, 1)
+
+    async def test_set_from_clickhouse_failed_run(self, run_cache: RunCache, mock_redis: AsyncMock):
+        run = task_run_ser(id=str(uuid7()), status="failure")
+        run_cache.set_from_clickhouse("cache_hash", run)
+        await wait_for_background_tasks()
+
+        mock_redis.setex.assert_not_called()
+        assert await run_cache.get("cache_hash", 1) is None
+
+    async def test_redis_set_error(self, run_cache: RunCache, mock_redis: AsyncMock):
+        mock_redis.setex.side_effect = Exception("boom")
+        ck_run = _ck_run(task_output={"output": 1})
+        run_cache.set(ck_run, "task_id")
+        await wait_for_background_tasks()
+
+        # The in process tier is still populated
+        assert await run_cache.get(ck_run.cache_hash, 1)
@@ -1,10 +1,20 @@
+import hashlib
 from typing import NamedTuple, Protocol
 
+from core.domain.metrics import send_counter
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import LRUCache
+
 
 class FileData(NamedTuple):
     contents: bytes
     content_type: str | None = None
     filename: str | None = None
+    # The sha256 hex digest of the contents, computed by the storage when not provided
+    sha256: str | None = None
+
+    def content_hash(self) -> str:
+        return self.sha256 or hashlib.sha256(self.contents).hexdigest()
 
 
 class CouldNotStoreFileError(Exception):
@@ -13,3 +23,25 @@ class CouldNotStoreFileError(Exception):
 
 class FileStorage(Protocol):
     async def store_file(self, file: FileData, folder_path: str) -> str: ...
+
+
+class CachedFileStorage(FileStorage):
+    """Remembers the URLs of the files that were stored. Files are stored by content hash
+    so a file that was already stored in a folder does not need to be uploaded again."""
+
+    def __init__(self, storage: FileStorage, capacity: int = 10_000):
+        self._storage = storage
+        self._urls = LRUCache[tuple[str, str, str | None], str](capacity)
+
+    async def store_file(self, file: FileData, folder_path: str) -> str:
+        file = file._replace(sha256=file.content_hash())
+        key = (folder_path, file.content_hash(), file.content_type)
+        if url := self._urls.peek(key):
+            add_background_task(send_counter("file_storage_cache_lookup", hit=True))
+            return url
+
+        add_background_task(send_counter("file_storage_cache_lookup", hit=False))
+        url = await self._storage.store_file(file, folder_path)
+        if url:
+            self._urls[key] = url
+        return url
@@ -0,0 +1,30 @@
+import hashlib
+from unittest.mock import AsyncMock
+
+from core.storage.file_storage import CachedFileStorage, FileData, FileStorage
+
+
+class TestCachedFileStorage:
+    async def test_stored_once_per_folder(self):
+        storage = AsyncMock(spec=FileStorage)
+        storage.store_file.side_effect = lambda file, folder_path: f"https://blob/{folder_path}/{file.sha256}"  # pyright: ignore [reportUnknownLambdaType]
+        cached = CachedFileStorage(storage)
+
+        sha = hashlib.sha256(b"hello").hexdigest()
+        url = await cached.store_file(FileData(contents=b"hello", content_type="image/png"), "tenant/task")
+        assert url == f"https://blob/tenant/task/{sha}"
+        assert await cached.store_file(FileData(contents=b"hello", content_type="image/png"), "tenant/task") == url
+        storage.store_file.assert_awaited_once()
+
+        # Another folder requires another upload
+        await cached.store_file(FileData(contents=b"hello", content_type="image/png"), "tenant/other_task")
+        assert storage.store_file.await_count == 2
+
+    async def test_empty_urls_are_not_cached(self):
+        storage = AsyncMock(spec=FileStorage)
+        storage.store_file.return_value = ""
+        cached = CachedFileStorage(storage)
+
+        await cached.store_file(FileData(contents=b"hello"), "tenant/task")
+        await cached.store_file(FileData(contents=b"hello"), "tenant/task")
+        assert storage.store_file.await_count == 2
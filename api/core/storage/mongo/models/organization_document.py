@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 from datetime import datetime
@@ -42,6 +43,10 @@ class DecryptableProviderSettings(ProviderSettings):
             },
         )
 
+    @override
+    def revision(self) -> str:
+        return hashlib.sha256(self.secrets.encode()).hexdigest()
+
 
 class ProviderSettingsSchema(BaseModel):
     id: str = Field(default_factory=id_factory)
@@ -27,8 +27,19 @@ class TaskReviewBenchmarkDocument(BaseDocumentWithID, TaskIdAndSchemaMixin):
         average_cost_usd: float | None = None
         average_duration_seconds: float | None = None
 
+        # Maintained by the deltas, see ReviewBenchmarkState
+        eval_hash_run_counts: dict[str, int] | None = None
+        total_cost_usd: float | None = None
+        total_duration_seconds: float | None = None
+
         updated_at: datetime | None = None
 
+        def _average(self, total: float | None, average: float | None) -> float | None:
+            # Deltas only update the totals
+            if total is not None and self.total_run_count:
+                return total / self.total_run_count
+            return average
+
         def to_domain(self) -> ReviewBenchmark.VersionAggregation:
             return ReviewBenchmark.VersionAggregation(
                 iteration=self.iteration,
@@ -40,8 +51,9 @@ class TaskReviewBenchmarkDocument(BaseDocumentWithID, TaskIdAndSchemaMixin):
                 total_run_count=self.total_run_count or 0,
                 run_failed_count=self.run_failed_count or 0,
                 run_in_progress_count=len(self.run_in_progress_ids) if self.run_in_progress_ids else 0,
-                average_cost_usd=self.average_cost_usd or None,
-                average_duration_seconds=self.average_duration_seconds or None,
+                average_cost_usd=self._average(self.total_cost_usd, self.average_cost_usd) or None,
+                average_duration_seconds=self._average(self.total_duration_seconds, self.average_duration_seconds)
+                or None,
                 positive_user_review_count=self.positive_user_review_count or 0,
                 negative_user_review_count=self.negative_user_review_count or 0,
             )
@@ -50,6 +62,12 @@ class TaskReviewBenchmarkDocument(BaseDocumentWithID, TaskIdAndSchemaMixin):
 
     results: list[VersionAggregation] = Field(default_factory=list)
 
+    revision: int | None = None
+    reconciled_at: datetime | None = None
+    input_hashes: list[str] | None = None
+    # eval hash -> counted outcome
+    review_outcomes: dict[str, str] | None = None
+
     def to_domain(self) -> ReviewBenchmark:
         return ReviewBenchmark(
             task_id=self.task_id,
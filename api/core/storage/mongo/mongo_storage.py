@@ -2,7 +2,8 @@ import asyncio
 import json
 import logging
 import os
-from typing import Any, AsyncIterator, Optional
+from datetime import timedelta
+from typing import Any, AsyncIterator, ClassVar, Optional
 
 from bson import CodecOptions
 from motor.motor_asyncio import (
@@ -50,6 +51,7 @@ from core.storage.task_group_storage import TaskGroupStorage
 from core.storage.task_input_storage import TaskInputsStorage
 from core.storage.task_run_storage import TaskRunStorage
 from core.utils.encryption import Encryption
+from core.utils.lru.lru_cache import TLRUCache
 
 from .codecs import type_registry
 from .models.task_example import TaskExampleDocument
@@ -60,8 +62,32 @@ from .utils import dump_model, extract_connection_info, object_id
 
 logger = logging.getLogger(__name__)
 
+# db name, tenant, task id, task uid, task schema id, group hash
+# The task uid changes when a task is deleted and re-created so groups of a deleted task are never
+# returned, even by processes that did not handle the deletion
+_RunGroupCacheKey = tuple[str, str, str, int, int, str]
+# db name, tenant, task id
+_TaskUidCacheKey = tuple[str, str, str]
+
+
+def _run_group_cache():
+    # The ttl only bounds how long mutable fields, e-g aliases or the semver, can be stale
+    # The hash to iteration mapping never changes
+    return TLRUCache[_RunGroupCacheKey, TaskGroupDocument](10_000, lambda _, __: timedelta(minutes=10))
+
+
+def _task_uid_cache():
+    # Uids are only looked up for variants that were stored without a uid, which are deleted
+    # with the task. The ttl bounds how long another process can use the uid of a deleted task
+    return TLRUCache[_TaskUidCacheKey, int](10_000, lambda _, __: timedelta(minutes=10))
+
 
 class MongoStorage(BackendStorage):
+    # Groups and task uids are resolved for every stored run. They are cached per process
+    # since they do not change once created
+    _run_groups: ClassVar[TLRUCache[_RunGroupCacheKey, TaskGroupDocument]] = _run_group_cache()
+    _task_uids: ClassVar[TLRUCache[_TaskUidCacheKey, int]] = _task_uid_cache()
+
     def __init__(
         self,
         tenant: str,
@@ -94,6 +120,20 @@ class MongoStorage(BackendStorage):
     def tenant(self) -> str:
         return self._tenant
 
+    @classmethod
+    def clear_caches(cls):
+        cls._run_groups = _run_group_cache()
+        cls._task_uids = _task_uid_cache()
+
+    async def _get_task_uid(self, task_id: str) -> int:
+        key = (self._db_name, self._tenant, task_id)
+        if uid := self._task_uids.get(key):
+            return uid
+        task_info = await self.tasks.get_task_info(task_id)
+        if task_info.uid:
+            self._task_uids[key] = task_info.uid
+        return task_info.uid
+
     @classmethod
     def build_client(cls, connection_string: str) -> tuple[AsyncClient, str]:
         """Returns a client and db name"""
@@ -427,8 +467,7 @@ class MongoStorage(BackendStorage):
         res = schema.to_resource()
         if not res.task_uid:
             try:
-                task_info = await self.tasks.get_task_info(res.task_id)
-                res.task_uid = task_info.uid
+                res.task_uid = await self._get_task_uid(res.task_id)
             except ObjectNotFoundException:
                 logger.error("Task info not found, skipping task uid assignment", extra={"task_id": res.task_id})
         return res
@@ -497,7 +536,9 @@ class MongoStorage(BackendStorage):
         run_is_external: bool,
         user: Optional[UserIdentifier],
         disable_autosave: bool | None = None,
+        task_uid: int = 0,
     ) -> TaskGroupDocument:
+        """Groups are only cached when the task uid is known"""
         if not group.hash or not group.task_id or not group.properties or not group.tenant:
             raise ValueError("Invalid group")
 
@@ -519,9 +560,15 @@ class MongoStorage(BackendStorage):
                 # in between the 2 steps below
                 return None
 
+        cache_key = (self._db_name, self._tenant, group.task_id, task_uid, group.task_schema_id, group.hash)
+        if task_uid and (cached := self._run_groups.get(cache_key)):
+            return cached.model_copy()
+
         # If the group exists with the provided hash, then we can just return it
         existing = await _find_group()
         if existing:
+            if task_uid:
+                self._run_groups[cache_key] = existing.model_copy()
             return existing
         if run_is_external:
             # When the run is external (aka the tenant that created the run is not the current tenant)
@@ -604,6 +651,8 @@ class MongoStorage(BackendStorage):
             ),
         )
 
+        if task_uid:
+            self._run_groups[cache_key] = group.model_copy()
         return group
 
     # TODO: remove this method when we can get rid of the CLI
@@ -646,8 +695,7 @@ class MongoStorage(BackendStorage):
             # This is always true for now, we should re-enable this warning when all task variants have a uid
             # logger.warning("Task uid not found, fetching task info")
             try:
-                info = await self.tasks.get_task_info(task.task_id)
-                task.task_uid = info.uid
+                task.task_uid = await self._get_task_uid(task.task_id)
             except ObjectNotFoundException:
                 logger.exception("Task info not found, skipping task uid assignment", extra={"task_id": task.task_id})
 
@@ -664,7 +712,12 @@ class MongoStorage(BackendStorage):
             resource=run.group,
         )
         group.tenant_uid = self._tenant_uid
-        group = await self._get_or_create_run_group(group, run_is_external=run_is_external, user=user)
+        group = await self._get_or_create_run_group(
+            group,
+            run_is_external=run_is_external,
+            user=user,
+            task_uid=task.task_uid,
+        )
 
         run.group = group.to_resource()
         run.is_active = source.is_active if source else None
@@ -901,6 +954,8 @@ class MongoStorage(BackendStorage):
 
     @override
     async def delete_task(self, task_id: str) -> None:
+        # Cached groups are keyed by the task uid which differs for a re-created task
+        self._task_uids.pop((self._db_name, self._tenant, task_id))
         # Remove task
         await self._task_variants_collection.delete_many({"slug": task_id, **self._tenant_filter()})
         # Remove task runs
@@ -757,6 +757,54 @@ class TestGetOrCreateRunGroup:
             assert g.created_by.user_id == "123"
             assert g.created_by.user_email == "test@test.com"
 
+    async def test_cached_group(self, storage: MongoStorage, task_run_group_col: AsyncCollection) -> None:
+        created = await storage._get_or_create_run_group(  # pyright: ignore [reportPrivateUsage]
+            _task_group(hash="1", iteration=0, alias="1"),
+            run_is_external=False,
+            user=None,
+            task_uid=1,
+        )
+        assert created.iteration == 1
+
+        # Removing the group from the db to make sure the second call is served from the cache
+        await task_run_group_col.delete_many({})
+        cached = await storage._get_or_create_run_group(  # pyright: ignore [reportPrivateUsage]
+            _task_group(hash="1", iteration=0, alias="1"),
+            run_is_external=False,
+            user=None,
+            task_uid=1,
+        )
+        assert cached.iteration == 1
+        assert cached is not created
+
+        # A re-created task has a different uid
+        recreated = await storage._get_or_create_run_group(  # pyright: ignore [reportPrivateUsage]
+            _task_group(hash="1", iteration=0, alias="1"),
+            run_is_external=False,
+            user=None,
+            task_uid=2,
+        )
+        assert recreated.iteration == 2
+
+    async def test_not_cached_without_task_uid(
+        self,
+        storage: MongoStorage,
+        task_run_group_col: AsyncCollection,
+    ) -> None:
+        await storage._get_or_create_run_group(  # pyright: ignore [reportPrivateUsage]
+            _task_group(hash="1", iteration=0, alias="1"),
+            run_is_external=False,
+            user=None,
+        )
+        await task_run_group_col.delete_many({})
+
+        created = await storage._get_or_create_run_group(  # pyright: ignore [reportPrivateUsage]
+            _task_group(hash="1", iteration=0, alias="1"),
+            run_is_external=False,
+            user=None,
+        )
+        assert created.iteration == 2
+
 
 class TestTaskVersionResourceByID:
     async def test_task_version_by_id(self, storage: MongoStorage, task_variants_col: AsyncCollection) -> None:
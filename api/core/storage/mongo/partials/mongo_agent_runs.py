@@ -201,15 +201,19 @@ class MongoTaskRunStorage(PartialStorage[TaskRunDocument], TaskRunStorage):
         limit: int,
         offset: int,
         timeout_ms: int = 60_000,
+        before_run_id: str | None = None,
     ) -> AsyncIterator[AgentRunBase]:
         filter = TaskRunDocument.build_search_filter(self._tenant, task_uid[0], search_fields)
+        if before_run_id:
+            # Run ids are UUID7 so they sort like their creation date
+            filter["_id"] = {"$lt": before_run_id}
         project = projection(self._search_run_include())
 
         try:
             cursor = self._find(
                 filter,
                 projection=project,
-                sort=[("created_at", -1)],
+                sort=[("created_at", -1), ("_id", -1)],
                 skip=offset,
                 limit=limit,
                 timeout_ms=timeout_ms,
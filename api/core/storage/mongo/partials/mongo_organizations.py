@@ -12,6 +12,7 @@ from core.domain.tenant_data import (
 )
 from core.domain.users import UserIdentifier
 from core.providers.base.config import ProviderConfig
+from core.providers.factory.custom_provider_cache import shared_custom_provider_cache
 from core.storage import ObjectNotFoundException, TenantTuple
 from core.storage.mongo.models.organization_document import (
     APIKeyDocument,
@@ -23,6 +24,7 @@ from core.storage.mongo.mongo_types import AsyncCollection
 from core.storage.mongo.partials.base_partial_storage import PartialStorage
 from core.storage.mongo.utils import dump_model, projection
 from core.storage.organization_storage import OrganizationStorage
+from core.storage.tenant_cache import shared_tenant_cache
 from core.utils.encryption import Encryption
 from core.utils.fields import datetime_factory
 
@@ -46,6 +48,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
             {"stripe_customer_id": {"$exists": False}},
             {"$set": {"stripe_customer_id": stripe_customer_id}},
         )
+        shared_tenant_cache.invalidate(self._tenant)
 
     @override
     async def get_organization(self, include: set[str] | None = None) -> TenantData:
@@ -108,6 +111,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
                 {"org_id": org_id},
                 {"$set": update},
             )
+        shared_tenant_cache.invalidate(org_id=org_id)
 
     async def _find_tenant(
         self,
@@ -126,6 +130,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
                 {"tenant": tenant, **filter},
                 update,
             )
+        shared_tenant_cache.invalidate(tenant)
         if res.matched_count != 1:
             raise ObjectNotFoundException("Organization  not found", code="organization_not_found")
 
@@ -138,7 +143,9 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
         )
         if doc is None:
             raise ObjectNotFoundException("Organization  not found", code="organization_not_found")
-        return OrganizationDocument.model_validate(doc).to_domain(self.encryption)
+        tenant_data = OrganizationDocument.model_validate(doc).to_domain(self.encryption)
+        shared_tenant_cache.invalidate(tenant_data.tenant)
+        return tenant_data
 
     @override
     async def find_tenant_for_org_id(self, org_id: str) -> TenantData:
@@ -164,6 +171,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
             {},
             {"$push": {"providers": dump_model(schema)}},
         )
+        shared_tenant_cache.invalidate(self._tenant)
 
         return schema.to_domain(self.encryption)
 
@@ -173,6 +181,8 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
             {},
             {"$pull": {"providers": {"id": config_id}}},
         )
+        shared_tenant_cache.invalidate(self._tenant)
+        shared_custom_provider_cache.invalidate(config_id)
         if updated.modified_count != 1:
             raise ObjectNotFoundException(f"Config {config_id} not found", code="config_not_found")
 
@@ -186,6 +196,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
                 "$unset": {"payment_failure": "", "low_credits_email_sent": ""},
             },
         )
+        shared_tenant_cache.invalidate(tenant)
 
     @override
     async def decrement_credits(self, tenant: str, credits: float) -> TenantData:
@@ -205,6 +216,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
             },
             return_document=True,
         )
+        shared_tenant_cache.invalidate(tenant)
         return OrganizationDocument.model_validate(res).to_domain(self.encryption)
 
     @override
@@ -232,6 +244,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
                 "$unset": {"no_tasks_yet": ""},
             },
         )
+        shared_tenant_cache.invalidate(self._tenant)
 
     @override
     async def delete_organization(self, org_id: str):
@@ -243,6 +256,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
                     {"$set": {"deleted": True, "slug": {"$concat": [f"__deleted__.{current_date}.", "$slug"]}}},
                 ],
             )
+        shared_tenant_cache.invalidate(org_id=org_id)
 
     @override
     async def create_api_key_for_organization(
@@ -286,6 +300,8 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
             {"api_keys.id": key_id},
             {"$pull": {"api_keys": {"id": key_id}}},
         )
+        # Cached API key lookups must not outlive the key
+        shared_tenant_cache.invalidate(self._tenant)
         return result.modified_count > 0
 
     @override
@@ -337,6 +353,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
                 },
             },
         )
+        shared_tenant_cache.invalidate(self._tenant)
 
     @classmethod
     def _anonymous_user_id_filter(cls, unknown_user_id: str):
@@ -452,6 +469,7 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
     @override
     async def clear_payment_failure(self) -> None:
         await self._update_one({}, {"$unset": {"payment_failure": ""}})
+        shared_tenant_cache.invalidate(self._tenant)
 
     @override
     async def set_slack_channel_id(self, channel_id: str | None, force: bool = False) -> None:
@@ -460,3 +478,4 @@ class MongoOrganizationStorage(PartialStorage[OrganizationDocument], Organizatio
         else:
             filter = {"slack_channel_id": {"$exists": False}} if not force else {}
             await self._update_one(filter, {"$set": {"slack_channel_id": channel_id}})
+        shared_tenant_cache.invalidate(self._tenant)
@@ -25,6 +25,7 @@ from core.storage.mongo.mongo_storage import MongoStorage
 from core.storage.mongo.mongo_types import AsyncCollection
 from core.storage.mongo.partials.mongo_organizations import MongoOrganizationStorage
 from core.storage.mongo.utils import dump_model
+from core.storage.tenant_cache import shared_tenant_cache
 from core.utils import no_op
 from core.utils.encryption import Encryption
 
@@ -822,6 +823,24 @@ class TestDeleteAPIKeyForOrganization:
         keys = await organization_storage.get_api_keys_for_organization()
         assert not any(key.id == doc.id for key in keys)
 
+    async def test_delete_api_key_invalidates_tenant_cache(
+        self,
+        organization_storage: MongoOrganizationStorage,
+        org_col: AsyncCollection,
+    ) -> None:
+        await org_col.insert_one(dump_model(OrganizationDocument(tenant=TENANT, slug="simple_slug")))
+        doc = await organization_storage.create_api_key_for_organization(
+            name="test key",
+            hashed_key="hashed123",
+            partial_key="sk-123****",
+            created_by=UserIdentifier(user_id="user1", user_email="test@example.com"),
+        )
+        shared_tenant_cache.set(("api_key", "hashed123"), TenantData(tenant=TENANT))
+
+        await organization_storage.delete_api_key_for_organization(key_id=str(doc.id))
+
+        assert shared_tenant_cache.get(("api_key", "hashed123"), TenantData) is None
+
 
 class TestFindTenantForAPIKey:
     async def test_validate_key(self, organization_storage: MongoOrganizationStorage, org_col: AsyncCollection) -> None:
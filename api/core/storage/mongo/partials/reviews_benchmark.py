@@ -9,7 +9,12 @@ from core.storage.mongo.models.task_review_benchmarks import TaskReviewBenchmark
 from core.storage.mongo.mongo_types import AsyncCollection
 from core.storage.mongo.partials.base_partial_storage import PartialStorage
 from core.storage.mongo.utils import dump_model
-from core.storage.review_benchmark_storage import RunReviewAggregateWithIteration
+from core.storage.review_benchmark_storage import (
+    ReviewBenchmarkDelta,
+    ReviewBenchmarkReconciliation,
+    ReviewBenchmarkState,
+    RunReviewAggregateWithIteration,
+)
 
 _BY_TASK_SCHEMA_UNIQUE = "by_task_schema_unique"
 
@@ -78,6 +83,21 @@ class MongoReviewsBenchmarkStorage(PartialStorage[TaskReviewBenchmarkDocument]):
         yield f"results.{idx}.run_failed_count", agg["failed_run_count"]
         yield f"results.{idx}.average_cost_usd", agg["average_cost_usd"]
         yield f"results.{idx}.average_duration_seconds", agg["average_duration_seconds"]
+        if "eval_hash_run_counts" in agg:
+            yield f"results.{idx}.eval_hash_run_counts", agg["eval_hash_run_counts"]
+        if "total_cost_usd" in agg:
+            yield f"results.{idx}.total_cost_usd", agg["total_cost_usd"]
+        if "total_duration_seconds" in agg:
+            yield f"results.{idx}.total_duration_seconds", agg["total_duration_seconds"]
+
+    def _updates_for_reconciliation(self, reconciliation: ReviewBenchmarkReconciliation, now: datetime):
+        if reconciliation.is_full:
+            yield "review_outcomes", reconciliation.review_outcomes
+            yield "input_hashes", sorted(reconciliation.input_hashes)
+            yield "reconciled_at", now
+            return
+        for eval_hash, outcome in reconciliation.review_outcomes.items():
+            yield f"review_outcomes.{eval_hash}", outcome
 
     async def complete_run(self, task_id: str, task_schema_id: int, iteration: int, run_id: str):
         await self._update_one(
@@ -97,6 +117,7 @@ class MongoReviewsBenchmarkStorage(PartialStorage[TaskReviewBenchmarkDocument]):
         task_schema_id: int,
         aggregates: Iterable[RunReviewAggregateWithIteration],
         now: datetime,
+        reconciliation: ReviewBenchmarkReconciliation | None = None,
     ):
         sets: dict[str, Any] = {}
         array_filters: list[dict[str, Any]] = []
@@ -117,13 +138,79 @@ class MongoReviewsBenchmarkStorage(PartialStorage[TaskReviewBenchmarkDocument]):
                 # Can't use list comprehension here since we have nested loops
                 sets[k] = v  # noqa: PERF403
 
+        update: dict[str, Any] = {"$set": sets}
+        if reconciliation:
+            sets.update(self._updates_for_reconciliation(reconciliation, now))
+            # Invalidating the deltas that were computed before the reconciliation
+            update["$inc"] = {"revision": 1}
+
         await self._update_one(
             {"task_id": task_id, "task_schema_id": task_schema_id},
-            {"$set": sets},
+            update,
             array_filters=array_filters,
             hint=_BY_TASK_SCHEMA_UNIQUE,
         )
 
+    async def get_benchmark_state(self, task_id: str, task_schema_id: int, eval_hash: str | None):
+        projection: dict[str, Any] = {
+            "task_id": 1,
+            "task_schema_id": 1,
+            "revision": 1,
+            "reconciled_at": 1,
+            "input_hashes": 1,
+            "results.iteration": 1,
+            "results.properties": 1,
+        }
+        if eval_hash:
+            # Only fetching the state of the eval hash, not the whole maps
+            projection[f"review_outcomes.{eval_hash}"] = 1
+            projection[f"results.eval_hash_run_counts.{eval_hash}"] = 1
+        try:
+            doc = await self._find_one(
+                {"task_id": task_id, "task_schema_id": task_schema_id},
+                projection=projection,
+                hint=_BY_TASK_SCHEMA_UNIQUE,
+            )
+        except ObjectNotFoundException:
+            return None
+        if doc.reconciled_at is None:
+            return None
+
+        outcome = doc.review_outcomes.get(eval_hash) if doc.review_outcomes and eval_hash else None
+        return ReviewBenchmarkState(
+            revision=doc.revision or 0,
+            reconciled_at=doc.reconciled_at,
+            input_hashes=set(doc.input_hashes or []),
+            eval_hash_run_counts={
+                r.iteration: (r.eval_hash_run_counts or {}).get(eval_hash, 0) if eval_hash else 0 for r in doc.results
+            },
+            review_outcome=outcome,  # pyright: ignore [reportArgumentType]
+        )
+
+    async def apply_delta(self, task_id: str, task_schema_id: int, delta: ReviewBenchmarkDelta) -> bool:
+        incs: dict[str, Any] = {"revision": 1}
+        array_filters: list[dict[str, Any]] = []
+        for i, (iteration, increments) in enumerate(delta.increments.items()):
+            array_filters.append({f"r{i}.iteration": iteration})
+            for field, value in increments.items():
+                incs[f"results.$[r{i}].{field}"] = value
+
+        outcome_key = f"review_outcomes.{delta.eval_hash}"
+        update: dict[str, Any] = {"$inc": incs}
+        if delta.review_outcome:
+            update["$set"] = {outcome_key: delta.review_outcome}
+        else:
+            update["$unset"] = {outcome_key: ""}
+
+        res = await self._update_one(
+            {"task_id": task_id, "task_schema_id": task_schema_id, "revision": delta.revision},
+            update,
+            array_filters=array_filters or None,
+            hint=_BY_TASK_SCHEMA_UNIQUE,
+            throw_on_not_found=False,
+        )
+        return res.matched_count > 0
+
     async def mark_as_loading_new_ai_reviewer(
         self,
         task_id: str,
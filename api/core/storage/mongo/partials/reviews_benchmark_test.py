@@ -13,7 +13,11 @@ from core.storage.mongo.mongo_storage import MongoStorage
 from core.storage.mongo.mongo_types import AsyncCollection
 from core.storage.mongo.partials.reviews_benchmark import MongoReviewsBenchmarkStorage
 from core.storage.mongo.utils import dump_model
-from core.storage.review_benchmark_storage import RunReviewAggregateWithIteration
+from core.storage.review_benchmark_storage import (
+    ReviewBenchmarkDelta,
+    ReviewBenchmarkReconciliation,
+    RunReviewAggregateWithIteration,
+)
 
 
 @pytest.fixture(scope="function")
@@ -428,3 +432,121 @@ class TestCompleteRun:
 
         # Check that we don't throw on not found
         await reviews_benchmark_storage.complete_run("hello", 1, 1, "a")
+
+
+class TestBenchmarkDeltas:
+    @pytest.fixture
+    async def reconciled_benchmark(
+        self,
+        reviews_benchmark_storage: MongoReviewsBenchmarkStorage,
+        reviews_benchmark_col: AsyncCollection,
+    ):
+        await reviews_benchmark_col.insert_one(
+            dump_model(
+                _review_benchmark_doc(
+                    results=[
+                        TaskReviewBenchmarkDocument.VersionAggregation(iteration=1, properties={}),
+                        TaskReviewBenchmarkDocument.VersionAggregation(iteration=2, properties={}),
+                    ],
+                ),
+            ),
+        )
+        await reviews_benchmark_storage.update_benchmark(
+            "hello",
+            1,
+            aggregates=[
+                RunReviewAggregateWithIteration(
+                    iteration=1,
+                    positive_review_count=2,
+                    negative_review_count=0,
+                    positive_user_review_count=0,
+                    negative_user_review_count=0,
+                    unsure_review_count=0,
+                    in_progress_review_count=0,
+                    total_run_count=2,
+                    failed_run_count=0,
+                    average_cost_usd=1,
+                    average_duration_seconds=2,
+                    eval_hash_run_counts={"e1": 2},
+                    total_cost_usd=2,
+                    total_duration_seconds=4,
+                ),
+            ],
+            now=datetime(2022, 1, 2, tzinfo=timezone.utc),
+            reconciliation=ReviewBenchmarkReconciliation(
+                review_outcomes={"e1": "positive"},
+                input_hashes={"a"},
+                is_full=True,
+            ),
+        )
+
+    async def test_state_not_reconciled(
+        self,
+        reviews_benchmark_storage: MongoReviewsBenchmarkStorage,
+        reviews_benchmark_col: AsyncCollection,
+    ):
+        await reviews_benchmark_col.insert_one(dump_model(_review_benchmark_doc()))
+
+        assert await reviews_benchmark_storage.get_benchmark_state("hello", 1, "e1") is None
+
+    async def test_apply_delta(
+        self,
+        reviews_benchmark_storage: MongoReviewsBenchmarkStorage,
+        reconciled_benchmark: None,
+    ):
+        state = await reviews_benchmark_storage.get_benchmark_state("hello", 1, "e1")
+        assert state
+        assert state.revision == 1
+        assert state.reconciled_at == datetime(2022, 1, 2, tzinfo=timezone.utc)
+        assert state.input_hashes == {"a"}
+        assert state.eval_hash_run_counts == {1: 2, 2: 0}
+        assert state.review_outcome == "positive"
+
+        delta = ReviewBenchmarkDelta(
+            revision=state.revision,
+            increments={1: {"positive_review_count": -2, "negative_review_count": 2}},
+            eval_hash="e1",
+            review_outcome="negative",
+        )
+        assert await reviews_benchmark_storage.apply_delta("hello", 1, delta)
+        # The revision has changed so the same delta is rejected
+        assert not await reviews_benchmark_storage.apply_delta("hello", 1, delta)
+
+        state = await reviews_benchmark_storage.get_benchmark_state("hello", 1, "e1")
+        assert state
+        assert state.revision == 2
+        assert state.review_outcome == "negative"
+
+        found = await reviews_benchmark_storage.get_review_benchmark("hello", 1)
+        assert found.results[0].positive_review_count == 0
+        assert found.results[0].negative_review_count == 2
+
+    async def test_run_delta_updates_averages(
+        self,
+        reviews_benchmark_storage: MongoReviewsBenchmarkStorage,
+        reconciled_benchmark: None,
+    ):
+        delta = ReviewBenchmarkDelta(
+            revision=1,
+            increments={
+                1: {
+                    "total_run_count": 1,
+                    "total_cost_usd": 4,
+                    "total_duration_seconds": 5,
+                    "eval_hash_run_counts.e2": 1,
+                },
+            },
+            eval_hash="e2",
+            review_outcome=None,
+        )
+        assert await reviews_benchmark_storage.apply_delta("hello", 1, delta)
+
+        found = await reviews_benchmark_storage.get_review_benchmark("hello", 1)
+        assert found.results[0].total_run_count == 3
+        assert found.results[0].average_cost_usd == 2
+        assert found.results[0].average_duration_seconds == 3
+
+        state = await reviews_benchmark_storage.get_benchmark_state("hello", 1, "e2")
+        assert state
+        assert state.eval_hash_run_counts == {1: 1, 2: 0}
+        assert state.review_outcome is None
@@ -1,14 +1,15 @@
 import asyncio
 from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from typing import Any
 
 from bson import ObjectId
+from pymongo import UpdateOne
 
 from core.domain.errors import DuplicateValueError, InternalError
 from core.domain.major_minor import MajorMinor
 from core.domain.task_group import TaskGroup, TaskGroupFields, TaskGroupIdentifier, TaskGroupQuery
-from core.domain.task_group_update import TaskGroupUpdate
+from core.domain.task_group_update import TaskGroupRunCounters, TaskGroupUpdate
 from core.domain.users import UserIdentifier
 from core.domain.version_major import VersionMajor
 from core.storage import ObjectNotFoundException
@@ -88,6 +89,24 @@ class MongoTaskGroupStorage(PartialStorage[TaskGroupDocument]):
             {"$inc": {"run_count": increment}},
         )
 
+    async def apply_run_counters(self, counters: Sequence[TaskGroupRunCounters]) -> None:
+        if not counters:
+            return
+
+        operations: list[UpdateOne] = []
+        for c in counters:
+            update: dict[str, Any] = {"$inc": {"run_count": c.run_count}}
+            if c.last_active_at is not None:
+                # $max so that a late flush never moves the date backwards
+                update["$max"] = {"last_active_at": c.last_active_at}
+            operations.append(
+                UpdateOne(
+                    self._tenant_filter(self._task_group_by_iteration_filter(c.task_id, c.task_schema_id, c.iteration)),
+                    update,
+                ),
+            )
+        await self.bulk_write(operations)
+
     async def _update_task_group(
         self,
         filter: dict[str, Any],
@@ -9,7 +9,7 @@ from pymongo.errors import DuplicateKeyError
 
 from core.domain.major_minor import MajorMinor
 from core.domain.task_group import TaskGroupQuery
-from core.domain.task_group_update import TaskGroupUpdate
+from core.domain.task_group_update import TaskGroupRunCounters, TaskGroupUpdate
 from core.storage import ObjectNotFoundException
 from core.storage.mongo.conftest import TENANT
 from core.storage.mongo.models.task_group import TaskGroupDocument
@@ -164,6 +164,40 @@ class TestUpdateTaskGroup:
         assert doc["notes"] == "Re-added notes"
 
 
+class TestApplyRunCounters:
+    async def test_apply_run_counters(
+        self,
+        task_groups_storage: MongoTaskGroupStorage,
+        task_run_group_col: AsyncCollection,
+    ):
+        now = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        later = datetime(2024, 1, 3, tzinfo=timezone.utc)
+        await task_run_group_col.insert_many(
+            [
+                dump_model(_task_group(iteration=1, run_count=3, last_active_at=later)),
+                dump_model(_task_group(iteration=2)),
+                dump_model(_task_group(iteration=3, tenant="other_tenant")),
+            ],
+        )
+
+        await task_groups_storage.apply_run_counters(
+            [
+                TaskGroupRunCounters(TASK_ID, 1, 1, run_count=2, last_active_at=now),
+                TaskGroupRunCounters(TASK_ID, 1, 2, run_count=5, last_active_at=now),
+                TaskGroupRunCounters(TASK_ID, 1, 3, run_count=1, last_active_at=None),
+            ],
+        )
+
+        docs = {doc["iteration"]: doc async for doc in task_run_group_col.find({})}
+        # The last active date is never moved backwards
+        assert docs[1]["run_count"] == 5
+        assert docs[1]["last_active_at"] == later
+        assert docs[2]["run_count"] == 5
+        assert docs[2]["last_active_at"] == now
+        # Groups of other tenants are not updated
+        assert docs[3]["run_count"] == 0
+
+
 class TestAddBenchmarkForDataset:
     @pytest.fixture(scope="function", autouse=True)
     async def inserted_groups(self, task_groups_storage: MongoTaskGroupStorage, task_run_group_col: AsyncCollection):
@@ -1,6 +1,6 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 from datetime import datetime
-from typing import Protocol, TypedDict
+from typing import Literal, NamedTuple, NotRequired, Protocol, TypedDict
 
 from core.domain.review_benchmark import ReviewBenchmark
 from core.domain.task_group_properties import TaskGroupProperties
@@ -20,6 +20,49 @@ class RunReviewAggregateWithIteration(TypedDict):
     total_run_count: int
     failed_run_count: int | None
 
+    # The state needed to apply deltas, see ReviewBenchmarkState
+    eval_hash_run_counts: NotRequired[dict[str, int]]
+    total_cost_usd: NotRequired[float]
+    total_duration_seconds: NotRequired[float]
+
+
+# The review that is counted for an eval hash
+# User reviews are counted both in the review count and the user review count
+BenchmarkReviewOutcome = Literal["in_progress", "positive", "positive_user", "negative", "negative_user", "unsure"]
+
+
+class ReviewBenchmarkState(NamedTuple):
+    """The part of a benchmark needed to apply a delta for a single eval hash"""
+
+    # Incremented on every delta, deltas are only applied on the revision they were computed from
+    revision: int
+    reconciled_at: datetime
+    # The input hashes that have been evaluated when the benchmark was last reconciled
+    input_hashes: set[str]
+    # The benchmarked iterations -> the number of runs with the eval hash
+    eval_hash_run_counts: dict[int, int]
+    # The outcome counted for the eval hash
+    review_outcome: BenchmarkReviewOutcome | None
+
+
+class ReviewBenchmarkDelta(NamedTuple):
+    revision: int
+    # iteration -> field of the version aggregation -> increment
+    increments: Mapping[int, Mapping[str, float]]
+    eval_hash: str
+    # The outcome counted for the eval hash after the delta
+    review_outcome: BenchmarkReviewOutcome | None
+
+
+class ReviewBenchmarkReconciliation(NamedTuple):
+    """Sent with the aggregates when recomputing a benchmark"""
+
+    review_outcomes: dict[str, BenchmarkReviewOutcome]
+    input_hashes: set[str]
+    # Whether all the versions were recomputed. Partial recomputes
+    # only add review outcomes and do not mark the benchmark as reconciled
+    is_full: bool
+
 
 class ReviewBenchmarkStorage(Protocol):
     async def get_benchmark_versions(
@@ -56,4 +99,19 @@ class ReviewBenchmarkStorage(Protocol):
         task_schema_id: int,
         aggregates: Iterable[RunReviewAggregateWithIteration],
         now: datetime,
+        reconciliation: ReviewBenchmarkReconciliation | None = None,
     ): ...
+
+    async def get_benchmark_state(
+        self,
+        task_id: str,
+        task_schema_id: int,
+        eval_hash: str | None,
+    ) -> ReviewBenchmarkState | None:
+        """Returns None if the benchmark does not exist or was never reconciled.
+        The run counts and the review outcome are empty when no eval hash is provided"""
+        ...
+
+    async def apply_delta(self, task_id: str, task_schema_id: int, delta: ReviewBenchmarkDelta) -> bool:
+        """Returns False if the benchmark was updated since the state the delta was computed from"""
+        ...
@@ -1,5 +1,4 @@
 import asyncio
-import hashlib
 import logging
 import mimetypes
 from typing import override
@@ -40,7 +39,7 @@ class S3FileStorage(FileStorage):
     @override
     async def store_file(self, file: FileData, folder_path: str) -> str:
         # Generate a unique filename using content hash
-        content_hash = hashlib.sha256(file.contents).hexdigest()
+        content_hash = file.content_hash()
         extension = mimetypes.guess_extension(file.content_type) if file.content_type else None
         key = f"{folder_path}/{content_hash}{extension or ''}"
 
@@ -66,14 +66,20 @@ class TaskRunStorage(TaskRunSystemStorage):
         limit: int,
         offset: int,
         timeout_ms: int = 60_000,
-    ) -> AsyncIterator[AgentRunBase]: ...
+        before_run_id: str | None = None,
+    ) -> AsyncIterator[AgentRunBase]:
+        """Search runs by descending creation date. When provided, only runs that
+        come after the run with id `before_run_id` are returned"""
+        ...
 
     async def count_filtered_task_runs(
         self,
         task_uid: TaskTuple,
         search_fields: list[SearchQuery] | None,
         timeout_ms: int = 60_000,
-    ) -> int | None: ...
+    ) -> int | None:
+        """Returns None if the count could not be computed in time"""
+        ...
 
     async def aggregate_runs(
         self,
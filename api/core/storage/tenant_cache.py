@@ -0,0 +1,128 @@
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Literal, TypeVar
+
+from core.domain.metrics import send_counter
+from core.domain.tenant_data import PublicOrganizationData
+from core.utils.background import add_background_task
+
+# How an organization was looked up, e-g ("api_key", <hashed key>) or ("slug", <slug>)
+TenantLookup = Literal["api_key", "org_id", "owner_id", "anon_id", "slug"]
+TenantCacheKey = tuple[TenantLookup, str]
+
+_O = TypeVar("_O", bound=PublicOrganizationData)
+
+# Also bounds how long an update, e-g a deleted API key, made in another process is ignored
+_TTL_SECONDS = float(os.getenv("TENANT_CACHE_TTL_SECONDS", "30"))
+
+
+class TenantCache:
+    """A per process cache of the organizations resolved when authenticating requests.
+
+    Entries expire after a short TTL and are invalidated when the organization is updated
+    through the organization storage. Invalidation is only local so updates made by other
+    processes are picked up once the TTL expires, which also bounds how long a deleted API key
+    remains valid in other processes. Lookups that do not find an organization
+    are not cached since the organization is often created right after.
+
+    Returned organizations are copies so callers can update them freely."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = _TTL_SECONDS,
+        capacity: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl_seconds = ttl_seconds
+        self._capacity = capacity
+        self._clock = clock
+        self._entries = OrderedDict[TenantCacheKey, tuple[float, PublicOrganizationData]]()
+        # Allows invalidating all the lookups of an organization at once
+        self._keys_by_tenant: dict[str, set[TenantCacheKey]] = {}
+        self._tenants_by_org_id: dict[str, str] = {}
+        # Incremented on each invalidation so that fetches that started before
+        # an invalidation do not store stale data
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0
+
+    def _send_lookup_metric(self, lookup: TenantLookup, hit: bool):
+        add_background_task(send_counter("tenant_cache_lookup", lookup=lookup, hit=hit))
+
+    def _remove(self, key: TenantCacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        tenant = entry[1].tenant
+        keys = self._keys_by_tenant.get(tenant)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_tenant[tenant]
+            if entry[1].org_id:
+                self._tenants_by_org_id.pop(entry[1].org_id, None)
+
+    def get(self, key: TenantCacheKey, org_type: type[_O]) -> _O | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, org = entry
+        # A slug lookup stores public data that can't be returned as tenant data
+        if expires_at < self._clock() or not isinstance(org, org_type):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return org.model_copy()
+
+    def set(self, key: TenantCacheKey, org: PublicOrganizationData):
+        if not self.enabled:
+            return
+        self._remove(key)
+        self._entries[key] = (self._clock() + self._ttl_seconds, org.model_copy())
+        self._keys_by_tenant.setdefault(org.tenant, set()).add(key)
+        if org.org_id:
+            self._tenants_by_org_id[org.org_id] = org.tenant
+
+        while len(self._entries) > self._capacity:
+            self._remove(next(iter(self._entries)))
+
+    async def get_or_fetch(self, key: TenantCacheKey, org_type: type[_O], fetch: Callable[[], Awaitable[_O]]) -> _O:
+        """Returns the cached organization or fetches and caches it. Errors raised
+        by fetch, e-g ObjectNotFoundException, are propagated and not cached."""
+        if not self.enabled:
+            return await fetch()
+
+        if (org := self.get(key, org_type)) is not None:
+            self._send_lookup_metric(key[0], hit=True)
+            return org
+
+        self._send_lookup_metric(key[0], hit=False)
+        generation = self._generation
+        org = await fetch()
+        if generation == self._generation:
+            self.set(key, org)
+        return org
+
+    def invalidate(self, tenant: str | None = None, org_id: str | None = None):
+        """Removes all the cached lookups of an organization"""
+        self._generation += 1
+        if org_id and not tenant:
+            tenant = self._tenants_by_org_id.get(org_id)
+        if not tenant:
+            return
+        for key in list(self._keys_by_tenant.get(tenant, ())):
+            self._remove(key)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+        self._keys_by_tenant.clear()
+        self._tenants_by_org_id.clear()
+
+
+shared_tenant_cache = TenantCache()
@@ -0,0 +1,131 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from core.domain.tenant_data import PublicOrganizationData, TenantData
+from core.storage import ObjectNotFoundException
+from core.storage.tenant_cache import TenantCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def tenant_cache(clock: _Clock):
+    return TenantCache(ttl_seconds=10, capacity=3, clock=clock)
+
+
+@pytest.fixture(autouse=True)
+def patched_send_counter():
+    with patch("core.storage.tenant_cache.send_counter") as mock:
+        yield mock
+
+
+def _tenant(tenant: str = "t1", org_id: str | None = "org_1"):
+    return TenantData(tenant=tenant, uid=1, org_id=org_id, current_credits_usd=5)
+
+
+class TestGetOrFetch:
+    async def test_fetches_once(self, tenant_cache: TenantCache):
+        fetch = AsyncMock(return_value=_tenant())
+
+        first = await tenant_cache.get_or_fetch(("api_key", "hashed"), TenantData, fetch)
+        second = await tenant_cache.get_or_fetch(("api_key", "hashed"), TenantData, fetch)
+
+        assert first == second == _tenant()
+        fetch.assert_awaited_once()
+
+    async def test_returns_copies(self, tenant_cache: TenantCache):
+        org = await tenant_cache.get_or_fetch(("api_key", "hashed"), TenantData, AsyncMock(return_value=_tenant()))
+        org.current_credits_usd = 0
+
+        cached = tenant_cache.get(("api_key", "hashed"), TenantData)
+        assert cached and cached.current_credits_usd == 5
+
+    async def test_expires(self, tenant_cache: TenantCache, clock: _Clock):
+        fetch = AsyncMock(return_value=_tenant())
+        await tenant_cache.get_or_fetch(("org_id", "org_1"), TenantData, fetch)
+
+        clock.now = 11
+        await tenant_cache.get_or_fetch(("org_id", "org_1"), TenantData, fetch)
+        assert fetch.await_count == 2
+
+    async def test_not_found_is_not_cached(self, tenant_cache: TenantCache):
+        fetch = AsyncMock(side_effect=ObjectNotFoundException())
+        for _ in range(2):
+            with pytest.raises(ObjectNotFoundException):
+                await tenant_cache.get_or_fetch(("anon_id", "anon_1"), TenantData, fetch)
+        assert fetch.await_count == 2
+
+    async def test_disabled(self, clock: _Clock):
+        tenant_cache = TenantCache(ttl_seconds=0, clock=clock)
+        fetch = AsyncMock(return_value=_tenant())
+        await tenant_cache.get_or_fetch(("org_id", "org_1"), TenantData, fetch)
+        await tenant_cache.get_or_fetch(("org_id", "org_1"), TenantData, fetch)
+        assert fetch.await_count == 2
+
+    async def test_public_data_is_not_returned_as_tenant_data(self, tenant_cache: TenantCache):
+        tenant_cache.set(("slug", "slug"), PublicOrganizationData(tenant="t1", slug="slug"))
+
+        assert tenant_cache.get(("slug", "slug"), PublicOrganizationData) == PublicOrganizationData(
+            tenant="t1",
+            slug="slug",
+        )
+        assert tenant_cache.get(("slug", "slug"), TenantData) is None
+
+    async def test_invalidated_during_fetch(self, tenant_cache: TenantCache):
+        async def _fetch():
+            tenant_cache.invalidate("t1")
+            return _tenant()
+
+        await tenant_cache.get_or_fetch(("org_id", "org_1"), TenantData, _fetch)
+        assert tenant_cache.get(("org_id", "org_1"), TenantData) is None
+
+
+class TestInvalidate:
+    def test_invalidate_tenant(self, tenant_cache: TenantCache):
+        tenant_cache.set(("api_key", "hashed"), _tenant())
+        tenant_cache.set(("org_id", "org_1"), _tenant())
+        tenant_cache.set(("org_id", "org_2"), _tenant("t2", "org_2"))
+
+        tenant_cache.invalidate("t1")
+
+        assert tenant_cache.get(("api_key", "hashed"), TenantData) is None
+        assert tenant_cache.get(("org_id", "org_1"), TenantData) is None
+        assert tenant_cache.get(("org_id", "org_2"), TenantData) is not None
+
+    def test_invalidate_org_id(self, tenant_cache: TenantCache):
+        tenant_cache.set(("slug", "slug"), PublicOrganizationData(tenant="t1", org_id="org_1"))
+        tenant_cache.set(("api_key", "hashed"), _tenant())
+
+        tenant_cache.invalidate(org_id="org_1")
+
+        assert tenant_cache.get(("slug", "slug"), PublicOrganizationData) is None
+        assert tenant_cache.get(("api_key", "hashed"), TenantData) is None
+
+    def test_invalidate_unknown(self, tenant_cache: TenantCache):
+        tenant_cache.set(("api_key", "hashed"), _tenant())
+        tenant_cache.invalidate("t2")
+        tenant_cache.invalidate(org_id="org_2")
+        assert tenant_cache.get(("api_key", "hashed"), TenantData) is not None
+
+
+def test_capacity(tenant_cache: TenantCache):
+    for i in range(4):
+        tenant_cache.set(("api_key", str(i)), _tenant(f"t{i}", f"org_{i}"))
+
+    assert tenant_cache.get(("api_key", "0"), TenantData) is None
+    assert all(tenant_cache.get(("api_key", str(i)), TenantData) is not None for i in range(1, 4))
+    # Evicted entries are removed from the indexes as well
+    assert "t0" not in tenant_cache._keys_by_tenant  # pyright: ignore [reportPrivateUsage]
+    assert "org_0" not in tenant_cache._tenants_by_org_id  # pyright: ignore [reportPrivateUsage]
@@ -1,5 +1,5 @@
 import asyncio
-from typing import Any, AsyncGenerator, Awaitable, Callable, TypeVar
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, TypeVar
 
 T_Ret = TypeVar("T_Ret")  # Type variable for return type
 
@@ -20,3 +20,47 @@ async def parallel(
     tasks = [run_func_with_semaphore(*args) for args in args_list]
     for future in asyncio.as_completed(tasks):
         yield await future
+
+
+async def latest_only(source: AsyncIterator[T_Ret]) -> AsyncGenerator[T_Ret, None]:
+    """Consumes the source in a separate task and yields the latest item every time the
+    consumer is ready. When the consumer is slower than the source, e-g when the client
+    socket is back-pressured, intermediate items are dropped so items should be cumulative.
+    The last item of the source is always yielded."""
+    latest: list[T_Ret] = []
+    error: BaseException | None = None
+    done = False
+    updated = asyncio.Event()
+
+    async def _produce():
+        nonlocal error, done
+        try:
+            async for item in source:
+                latest[:] = [item]
+                updated.set()
+                # Giving a chance to a waiting consumer to pick the item
+                await asyncio.sleep(0)
+        except Exception as e:
+            error = e
+        finally:
+            done = True
+            updated.set()
+            # Making sure the source is cleaned up when the consumer exits early
+            if isinstance(source, AsyncGenerator):
+                await source.aclose()
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            if latest:
+                yield latest.pop()
+                continue
+            if done:
+                break
+            await updated.wait()
+            updated.clear()
+        if error:
+            raise error
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -1,6 +1,9 @@
 import asyncio
+from collections.abc import AsyncGenerator
 
-from .aio import parallel
+import pytest
+
+from .aio import latest_only, parallel
 
 
 async def test_parallel() -> None:
@@ -33,3 +36,51 @@ async def test_parallel_limit() -> None:
         pass
 
     assert max_counter == limit
+
+
+async def _numbers(count: int, error: Exception | None = None) -> AsyncGenerator[int, None]:
+    for i in range(count):
+        await asyncio.sleep(0)
+        yield i
+    if error:
+        raise error
+
+
+class TestLatestOnly:
+    async def test_fast_consumer(self):
+        assert [i async for i in latest_only(_numbers(5))] == [0, 1, 2, 3, 4]
+
+    async def test_slow_consumer(self):
+        res: list[int] = []
+        async for i in latest_only(_numbers(10)):
+            res.append(i)
+            await asyncio.sleep(0.01)
+
+        # Intermediate items are dropped but the last one is always received
+        assert res[-1] == 9
+        assert len(res) < 10
+
+    async def test_error(self):
+        res: list[int] = []
+        with pytest.raises(ValueError):
+            async for i in latest_only(_numbers(3, ValueError("boom"))):
+                assert i == len(res)
+                res.append(i)
+        assert res == [0, 1, 2]
+
+    async def test_early_exit_closes_source(self):
+        closed = asyncio.Event()
+
+        async def _infinite():
+            try:
+                while True:
+                    yield 1
+                    await asyncio.sleep(0.01)
+            finally:
+                closed.set()
+
+        it = latest_only(_infinite())
+        async for _ in it:
+            break
+        await it.aclose()
+        assert closed.is_set()
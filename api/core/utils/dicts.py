@@ -1,4 +1,6 @@
+import copy
 import re
+from itertools import islice
 from typing import Any, Generic, Sequence, TypeVar, Union
 
 T = TypeVar("T", bound=dict[Any, Any])
@@ -219,3 +221,70 @@ def delete_at_keypath(d: _T, keys: Sequence[int | str]) -> _T:
 def exclude_keys(d: dict[str, Any], keys: set[str]) -> dict[str, Any]:
     """Returns a copy of the dictionary without the keys in the set."""
     return {k: v for k, v in d.items() if k not in keys}
+
+
+def _child_keypath(prefix: str, key: str | int) -> str:
+    return f"{prefix}.{key}" if prefix else str(key)
+
+
+class _NotGrowingError(Exception):
+    pass
+
+
+def _check_growing(sent: Sequence[Any], new: Sequence[Any]):
+    # Only the last item can still be updated, all the previous ones are complete
+    if len(new) < len(sent) or any(a != b for a, b in zip(sent[:-1], new)):
+        raise _NotGrowingError()
+
+
+def _update_in_order_inner(
+    sent: Any,
+    new: Any,
+    prefix: str,
+    res: list[tuple[str, Any, Any]],
+) -> Any:
+    if isinstance(sent, dict) and isinstance(new, dict):
+        _check_growing(list(sent.items()), list(new.items()))  # pyright: ignore [reportUnknownArgumentType]
+        if sent and next(islice(new, len(sent) - 1, None)) != next(reversed(sent)):  # pyright: ignore [reportUnknownArgumentType]
+            raise _NotGrowingError()
+        for key, value in islice(new.items(), max(len(sent) - 1, 0), None):  # pyright: ignore [reportUnknownVariableType, reportUnknownArgumentType]
+            path = _child_keypath(prefix, key)  # pyright: ignore [reportUnknownArgumentType]
+            if key in sent:
+                sent[key] = _update_in_order_inner(sent[key], value, path, res)
+            else:
+                res.append((path, None, value))
+                sent[key] = copy.deepcopy(value)
+        return sent
+    if isinstance(sent, list) and isinstance(new, list):
+        _check_growing(sent, new)  # pyright: ignore [reportUnknownArgumentType]
+        for idx in range(max(len(sent) - 1, 0), len(new)):  # pyright: ignore [reportUnknownArgumentType]
+            path = _child_keypath(prefix, idx)
+            if idx < len(sent):  # pyright: ignore [reportUnknownArgumentType]
+                sent[idx] = _update_in_order_inner(sent[idx], new[idx], path, res)
+            else:
+                res.append((path, None, new[idx]))
+                sent.append(copy.deepcopy(new[idx]))  # pyright: ignore [reportUnknownMemberType]
+        return sent
+    if isinstance(sent, str) and isinstance(new, str) and not new.startswith(sent):
+        raise _NotGrowingError()
+    if sent is not new and sent != new:
+        res.append((prefix, sent, new))
+        return copy.deepcopy(new)
+    return sent
+
+
+def update_in_order(sent: dict[str, Any], new: dict[str, Any]) -> list[tuple[str, Any, Any]]:
+    """Updates sent in place to match new and returns the (keypath, previous, value) updates that
+    were applied, previous being None for new keys.
+
+    new is expected to only grow in document order, like outputs built by the JSONStreamParser.
+    When it does not, e-g when a stream restarts after a provider fallback, sent is replaced
+    by new and a single update with an empty keypath is returned."""
+    res: list[tuple[str, Any, Any]] = []
+    try:
+        _update_in_order_inner(sent, new, "", res)
+    except _NotGrowingError:
+        sent.clear()
+        sent.update(copy.deepcopy(new))
+        return [("", None, new)]
+    return res
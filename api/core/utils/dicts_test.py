@@ -12,6 +12,7 @@ from .dicts import (
     delete_at_keypath,
     get_at_keypath_str,
     set_at_keypath_str,
+    update_in_order,
 )
 
 
@@ -184,3 +185,54 @@ class TestDeleteAtKeypath:
     )
     def test_delete_keypath(self, d: Any, key_path: str, expected: Any):
         assert delete_at_keypath(d, key_path.split(".")) == expected
+
+
+class TestUpdateInOrder:
+    @pytest.mark.parametrize(
+        "sent, new, expected",
+        [
+            ({}, {}, []),
+            ({}, {"a": 1}, [("a", None, 1)]),
+            ({"a": "hel"}, {"a": "hello"}, [("a", "hel", "hello")]),
+            ({"a": {"b": 1}}, {"a": {"b": 1, "c": [1]}}, [("a.c", None, [1])]),
+            (
+                {"a": [{"b": "x"}]},
+                {"a": [{"b": "xy"}, {"b": "z"}]},
+                [("a.0.b", "x", "xy"), ("a.1", None, {"b": "z"})],
+            ),
+            ({"a": 1}, {"a": None}, [("a", 1, None)]),
+            ({"a": [1]}, {"a": {"b": 1}}, [("a", [1], {"b": 1})]),
+        ],
+    )
+    def test_update_in_order(self, sent: Any, new: Any, expected: list[tuple[str, Any, Any]]):
+        assert update_in_order(sent, new) == expected
+        assert sent == new
+
+    @pytest.mark.parametrize(
+        "sent, new",
+        [
+            pytest.param({"a": "hello", "b": "wor"}, {"a": "hi"}, id="removed key"),
+            pytest.param({"a": "hello", "b": "wor"}, {"a": "hi", "b": "world"}, id="changed completed key"),
+            pytest.param({"a": "hello"}, {"a": "hi"}, id="shrunk string"),
+            pytest.param({"a": "hello"}, {"a": "help"}, id="non prefix string"),
+            pytest.param({"a": "hello", "b": "wor"}, {"a": "hello", "c": "wor"}, id="renamed key"),
+            pytest.param({"a": [1, 2]}, {"a": [1]}, id="shrunk list"),
+            pytest.param({"a": [{"b": "x"}, {"b": "y"}]}, {"a": [{"b": "z"}, {"b": "y"}]}, id="changed list item"),
+        ],
+    )
+    def test_not_growing(self, sent: dict[str, Any], new: dict[str, Any]):
+        assert update_in_order(sent, new) == [("", None, new)]
+        assert sent == new
+
+        # The updates continue from the new output
+        assert update_in_order(sent, {**new, "z": 1}) == [("z", None, 1)]
+
+    def test_sent_is_a_copy(self):
+        sent: dict[str, Any] = {}
+        new: dict[str, Any] = {"a": [{"b": "x"}]}
+        update_in_order(sent, new)
+
+        new["a"][0]["b"] = "xy"
+        new["a"].append({"b": "z"})
+        assert update_in_order(sent, new) == [("a.0.b", "x", "xy"), ("a.1", None, {"b": "z"})]
+        assert sent == new
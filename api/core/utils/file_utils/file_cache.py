@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from core.domain.metrics import send_counter
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import LRUCache
+
+_logger = logging.getLogger(__name__)
+
+_FILE_CACHE_DIR = os.getenv("FILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "workflowai-files"))
+_FILE_CACHE_MAX_BYTES = int(os.getenv("FILE_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+# How long a URL is served from the cache without being revalidated
+_FILE_CACHE_FRESH_SECONDS = float(os.getenv("FILE_CACHE_FRESH_SECONDS", "300"))
+
+
+class CachedFile(NamedTuple):
+    sha256: str
+    etag: str | None
+    # Unix timestamp of the last time the file was fetched or revalidated
+    fetched_at: float
+
+
+class FileCache:
+    """A content addressed cache of downloaded files, shared by all the processes of a host.
+
+    Contents are stored on disk by sha256 and written atomically, so processes that download
+    the same file do not conflict. The modification time of a file is updated when it is read
+    and the least recently used files are removed once the directory exceeds its size.
+    URLs are mapped to the sha256 of their contents per process. A URL that was fetched
+    recently is served from the cache without a request, after that the cached contents
+    are revalidated with the ETag of the response when there is one."""
+
+    def __init__(
+        self,
+        directory: str = _FILE_CACHE_DIR,
+        max_bytes: int = _FILE_CACHE_MAX_BYTES,
+        # Files that are larger than this are not cached
+        max_file_bytes: int = 50 * 1024 * 1024,
+        fresh_seconds: float = _FILE_CACHE_FRESH_SECONDS,
+        max_urls: int = 10_000,
+        # Temporary files older than this were left by interrupted writes
+        stale_tmp_seconds: float = 600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._max_bytes = max_bytes
+        self._max_file_bytes = max_file_bytes
+        self._fresh_seconds = fresh_seconds
+        self._max_urls = max_urls
+        self._stale_tmp_seconds = stale_tmp_seconds
+        self._clock = clock
+        self._directory = Path(directory)
+        self._urls = LRUCache[str, CachedFile](self._max_urls)
+        # Bytes written by this process since the directory was last swept
+        self._written_bytes = 0
+
+    def _path(self, sha256: str) -> Path:
+        return self._directory / sha256
+
+    def lookup(self, url: str) -> CachedFile | None:
+        try:
+            cached = self._urls[url]
+        except KeyError:
+            return None
+        if not self._path(cached.sha256).exists():
+            # The contents were evicted, possibly by another process
+            del self._urls[url]
+            return None
+        return cached
+
+    def is_fresh(self, cached: CachedFile) -> bool:
+        return self._clock() - cached.fetched_at < self._fresh_seconds
+
+    def revalidated(self, url: str, cached: CachedFile):
+        self._urls[url] = cached._replace(fetched_at=self._clock())
+
+    def _touch(self, path: Path | str):
+        # The modification time orders files for eviction
+        now = self._clock()
+        os.utime(path, (now, now))
+
+    def _read(self, path: Path) -> bytes:
+        contents = path.read_bytes()
+        try:
+            self._touch(path)
+        except FileNotFoundError:
+            # Evicted in the meantime
+            pass
+        return contents
+
+    async def read(self, cached: CachedFile) -> bytes | None:
+        try:
+            contents = await asyncio.to_thread(self._read, self._path(cached.sha256))
+        except FileNotFoundError:
+            return None
+        add_background_task(send_counter("file_cache_read"))
+        return contents
+
+    def _write(self, sha256: str, contents: bytes) -> bool:
+        """Returns false if the contents were already stored"""
+        path = self._path(sha256)
+        try:
+            self._touch(path)
+            return False
+        except FileNotFoundError:
+            pass
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        # Writing to a unique temporary file first so that readers never see partial contents
+        # and that concurrent writers do not conflict
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(contents)
+            self._touch(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return True
+
+    def _sweep(self):
+        """Removes the least recently used files until the directory fits in the cache size
+        and the temporary files of interrupted writes"""
+        now = self._clock()
+        files: list[tuple[float, str, int]] = []
+        for entry in os.scandir(self._directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".tmp"):
+                if now - stat.st_mtime > self._stale_tmp_seconds:
+                    Path(entry.path).unlink(missing_ok=True)
+                continue
+            files.append((stat.st_mtime, entry.name, stat.st_size))
+
+        total_bytes = sum(size for _, _, size in files)
+        for _, name, size in sorted(files):
+            if total_bytes <= self._max_bytes:
+                break
+            self._path(name).unlink(missing_ok=True)
+            total_bytes -= size
+
+    def _write_and_sweep(self, url: str, sha256: str, contents: bytes):
+        if not self._write(sha256, contents):
+            return
+
+        self._written_bytes += len(contents)
+        # Sweeping lists the whole directory so it only happens once a tenth of the cache size was written
+        if self._written_bytes * 10 < self._max_bytes:
+            return
+        self._written_bytes = 0
+        try:
+            self._sweep()
+        except OSError:
+            _logger.exception("Failed to sweep file cache", extra={"url": url})
+
+    async def store(self, url: str, sha256: str, contents: bytes, etag: str | None):
+        if len(contents) > min(self._max_file_bytes, self._max_bytes):
+            return
+
+        try:
+            await asyncio.to_thread(self._write_and_sweep, url, sha256, contents)
+        except OSError:
+            _logger.exception("Failed to write file to cache", extra={"url": url})
+            return
+        self._urls[url] = CachedFile(sha256=sha256, etag=etag, fetched_at=self._clock())
+
+    def clear(self):
+        self._urls = LRUCache[str, CachedFile](self._max_urls)
+        self._written_bytes = 0
+        shutil.rmtree(self._directory, ignore_errors=True)
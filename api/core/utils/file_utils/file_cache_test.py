@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from core.utils.file_utils.file_cache import FileCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def cache(tmp_path: Path, clock: _Clock):
+    return FileCache(directory=str(tmp_path), max_bytes=10, fresh_seconds=60, clock=clock)
+
+
+class TestFileCache:
+    async def test_store_and_read(self, cache: FileCache):
+        await cache.store("https://bla.com/1", "sha1", b"hello", etag='"v1"')
+
+        cached = cache.lookup("https://bla.com/1")
+        assert cached
+        assert cached.etag == '"v1"'
+        assert await cache.read(cached) == b"hello"
+        assert cache.lookup("https://bla.com/2") is None
+
+    async def test_same_contents_are_stored_once(self, cache: FileCache, tmp_path: Path):
+        await cache.store("https://bla.com/1", "sha1", b"hello", etag=None)
+        await cache.store("https://bla.com/2", "sha1", b"hello", etag=None)
+
+        assert len(list(tmp_path.iterdir())) == 1
+        cached = cache.lookup("https://bla.com/2")
+        assert cached
+        assert await cache.read(cached) == b"hello"
+
+    async def test_freshness(self, cache: FileCache, clock: _Clock):
+        await cache.store("https://bla.com/1", "sha1", b"hello", etag=None)
+        cached = cache.lookup("https://bla.com/1")
+        assert cached
+        assert cache.is_fresh(cached)
+
+        clock.now += 61
+        assert not cache.is_fresh(cached)
+
+        cache.revalidated("https://bla.com/1", cached)
+        cached = cache.lookup("https://bla.com/1")
+        assert cached
+        assert cache.is_fresh(cached)
+
+    async def test_lru_eviction(self, cache: FileCache, clock: _Clock):
+        await cache.store("https://bla.com/1", "sha1", b"hello", etag=None)
+        clock.now += 1
+        await cache.store("https://bla.com/2", "sha2", b"world", etag=None)
+        clock.now += 1
+        # Reading the first file makes the second one the least recently used
+        cached = cache.lookup("https://bla.com/1")
+        assert cached
+        await cache.read(cached)
+        clock.now += 1
+
+        await cache.store("https://bla.com/3", "sha3", b"!", etag=None)
+
+        assert cache.lookup("https://bla.com/1")
+        assert cache.lookup("https://bla.com/2") is None
+        assert cache.lookup("https://bla.com/3")
+
+    async def test_large_files_are_not_cached(self, cache: FileCache):
+        await cache.store("https://bla.com/1", "sha1", b"hello world", etag=None)
+        assert cache.lookup("https://bla.com/1") is None
+
+    async def test_shared_between_processes(self, cache: FileCache, tmp_path: Path, clock: _Clock):
+        other = FileCache(directory=str(tmp_path), max_bytes=10, clock=clock)
+
+        await cache.store("https://bla.com/1", "sha1", b"hello", etag=None)
+        clock.now += 1
+        # Contents stored by another process are not written again
+        await other.store("https://bla.com/1", "sha1", b"hello", etag=None)
+        clock.now += 1
+        await other.store("https://bla.com/2", "sha2", b"world", etag=None)
+        clock.now += 1
+        assert cache.lookup("https://bla.com/1")
+
+        # Files evicted by another process are not returned
+        await other.store("https://bla.com/3", "sha3", b"!", etag=None)
+        assert cache.lookup("https://bla.com/1") is None
+        assert other.lookup("https://bla.com/2")
+
+    async def test_stale_temporary_files_are_removed(self, cache: FileCache, tmp_path: Path, clock: _Clock):
+        stale = tmp_path / "stale.tmp"
+        stale.write_bytes(b"partial")
+        os.utime(stale, (clock.now - 601, clock.now - 601))
+        recent = tmp_path / "recent.tmp"
+        recent.write_bytes(b"partial")
+        os.utime(recent, (clock.now, clock.now))
+
+        await cache.store("https://bla.com/1", "sha1", b"hello", etag=None)
+
+        assert not stale.exists()
+        assert recent.exists()
+
+    async def test_clear(self, cache: FileCache):
+        await cache.store("https://bla.com/1", "sha1", b"hello", etag=None)
+        cache.clear()
+        assert cache.lookup("https://bla.com/1") is None
@@ -0,0 +1,191 @@
+import asyncio
+import base64
+import hashlib
+import os
+import tempfile
+from collections.abc import AsyncIterator, Sequence
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+from core.domain.errors import InvalidFileError
+from core.domain.metrics import send_counter
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import SizedLRUCache
+from core.utils.worker_pool import WorkerPool
+
+_PDF_RENDER_MAX_PAGES = int(os.getenv("PDF_RENDER_MAX_PAGES", "100"))
+_PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+# When false, pages are rendered in a thread pool. poppler runs in a subprocess
+# anyway but the JPEG encoding then holds the GIL
+_PDF_RENDER_PROCESSES = os.getenv("PDF_RENDER_PROCESSES", "true") == "true"
+
+
+def _page_count(pdf_path: str, timeout: float) -> int:
+    from pdf2image import pdfinfo_from_path  # pyright: ignore[reportUnknownVariableType]
+
+    info: dict[str, Any] = pdfinfo_from_path(pdf_path, timeout=timeout)  # pyright: ignore[reportUnknownVariableType]
+    return int(info["Pages"])
+
+
+def _render_pages(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    dpi: int,
+    quality: int,
+    timeout: float,
+) -> list[str]:
+    """Rasterizes a range of pages and returns the base64 encoded JPEGs.
+    Runs in a worker process so it must only use picklable arguments. The PDF is passed
+    as a path so that it is not sent to the worker for every chunk."""
+    from pdf2image import convert_from_path  # pyright: ignore[reportUnknownVariableType]
+
+    images = convert_from_path(  # pyright: ignore[reportUnknownVariableType]
+        pdf_path=pdf_path,
+        fmt="jpg",
+        dpi=dpi,
+        first_page=first_page,
+        last_page=last_page,
+        timeout=timeout,
+    )
+
+    pages: list[str] = []
+    for image in images:  # pyright: ignore[reportUnknownVariableType]
+        buffer = BytesIO()
+        image.save(  # pyright: ignore[reportUnknownMemberType]
+            buffer,
+            format="JPEG",
+            quality=quality,
+            optimize=True,
+            progressive=True,
+        )
+        pages.append(base64.b64encode(buffer.getvalue()).decode("utf-8"))
+    return pages
+
+
+def _write_temp_file(data: bytes) -> str:
+    with tempfile.NamedTemporaryFile(prefix="workflowai-pdf-", suffix=".pdf", delete=False) as f:
+        f.write(data)
+    return f.name
+
+
+def _pages_size(pages: Sequence[str]) -> int:
+    return sum(len(page) for page in pages)
+
+
+class PDFRenderer:
+    """Converts PDFs to base64 encoded JPEG pages.
+
+    - pages are rasterized and encoded in a process pool, in chunks of pages so that
+    large PDFs are rendered in parallel and neither the event loop nor the GIL is held
+    - pages are yielded in order as soon as their chunk is rendered
+    - the PDF is written once to a temporary file that all the chunks read
+    - rendered pages are cached by PDF hash so that a PDF that is sent to several
+    providers, e-g when a provider fails and the pipeline falls back to another one,
+    is only rendered once"""
+
+    def __init__(
+        self,
+        dpi: int = 150,
+        jpeg_quality: int = 60,
+        max_pages: int = _PDF_RENDER_MAX_PAGES,
+        max_pdf_bytes: int = 50 * 1024 * 1024,
+        # Timeout of a single poppler call
+        timeout_seconds: float = 120,
+        pages_per_chunk: int = 4,
+        max_workers: int = _PDF_RENDER_WORKERS,
+        use_processes: bool = _PDF_RENDER_PROCESSES,
+        # Total size of the cached pages
+        cache_max_bytes: int = 100 * 1024 * 1024,
+        # PDFs that render to more than this are not cached
+        max_cached_bytes: int = 20 * 1024 * 1024,
+    ):
+        self._dpi = dpi
+        self._jpeg_quality = jpeg_quality
+        self._max_pages = max_pages
+        self._max_pdf_bytes = max_pdf_bytes
+        self._timeout_seconds = timeout_seconds
+        self._pages_per_chunk = pages_per_chunk
+        self._cache_max_bytes = cache_max_bytes
+        self._max_cached_bytes = max_cached_bytes
+        self._pool = WorkerPool("pdf", max_workers, use_processes)
+        # PDF hash -> base64 encoded pages
+        self._cache = self._new_cache()
+
+    def _new_cache(self):
+        return SizedLRUCache[str, tuple[str, ...]](self._cache_max_bytes, _pages_size)
+
+    def _check_size(self, pdf_data: bytes, page_count: int | None = None):
+        if len(pdf_data) > self._max_pdf_bytes:
+            raise InvalidFileError(
+                "PDF is too large to be converted to images",
+                capture=False,
+                details={"size": len(pdf_data), "max_size": self._max_pdf_bytes},
+            )
+        if page_count is not None and page_count > self._max_pages:
+            raise InvalidFileError(
+                "PDF has too many pages to be converted to images",
+                capture=False,
+                details={"page_count": page_count, "max_pages": self._max_pages},
+            )
+
+    def _chunks(self, page_count: int) -> list[tuple[int, int]]:
+        # Pages are 1-indexed and ranges are inclusive
+        step = self._pages_per_chunk
+        return [(first, min(first + step - 1, page_count)) for first in range(1, page_count + 1, step)]
+
+    async def iter_pages(self, pdf_data: bytes) -> AsyncIterator[str]:
+        """Yields the base64 encoded JPEG of each page, in order"""
+        self._check_size(pdf_data)
+
+        key = hashlib.sha256(pdf_data).hexdigest()
+        if (cached := self._cache.get(key)) is not None:
+            add_background_task(send_counter("pdf_render_cache_lookup", hit=True))
+            for page in cached:
+                yield page
+            return
+        add_background_task(send_counter("pdf_render_cache_lookup", hit=False))
+
+        pdf_path = await asyncio.to_thread(_write_temp_file, pdf_data)
+        pages: list[str] = []
+        chunks: list[asyncio.Future[list[str]]] = []
+        try:
+            page_count = await self._pool.run(_page_count, pdf_path, self._timeout_seconds)
+            self._check_size(pdf_data, page_count)
+
+            # All chunks are submitted upfront, the pool bounds how many are rendered at once
+            chunks = [
+                self._pool.submit(
+                    _render_pages,
+                    pdf_path,
+                    first,
+                    last,
+                    self._dpi,
+                    self._jpeg_quality,
+                    self._timeout_seconds,
+                )
+                for first, last in self._chunks(page_count)
+            ]
+            for chunk in chunks:
+                for page in await chunk:
+                    pages.append(page)
+                    yield page
+        finally:
+            # Not rendering the remaining pages when the consumer stops early or fails
+            for chunk in chunks:
+                chunk.cancel()
+            # Chunks that are already rendering keep their file handle open
+            Path(pdf_path).unlink(missing_ok=True)
+
+        if _pages_size(pages) <= self._max_cached_bytes:
+            self._cache[key] = tuple(pages)
+
+    async def render(self, pdf_data: bytes) -> list[str]:
+        return [page async for page in self.iter_pages(pdf_data)]
+
+    def clear(self):
+        self._cache = self._new_cache()
+
+    def shutdown(self):
+        self._pool.shutdown()
@@ -0,0 +1,133 @@
+import base64
+from collections.abc import Iterator
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+from PIL import Image
+
+from core.domain.errors import InvalidFileError
+from core.utils.file_utils.pdf_renderer import PDFRenderer
+
+
+def _page_images(first_page: int, last_page: int, **kwargs: Any) -> list[Image.Image]:
+    # The width of a page is its page number so that the order can be checked
+    return [Image.new("RGB", (page, 10), color="red") for page in range(first_page, last_page + 1)]
+
+
+def _width(page: str) -> int:
+    return Image.open(BytesIO(base64.b64decode(page))).width
+
+
+@pytest.fixture
+def mock_convert() -> Iterator[Mock]:
+    with patch("pdf2image.convert_from_path", side_effect=_page_images) as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_pdfinfo() -> Iterator[Mock]:
+    with patch("pdf2image.pdfinfo_from_path", return_value={"Pages": 10}) as mock:
+        yield mock
+
+
+@pytest.fixture
+def renderer() -> Iterator[PDFRenderer]:
+    renderer = PDFRenderer(use_processes=False, pages_per_chunk=4)
+    yield renderer
+    renderer.shutdown()
+
+
+class TestRender:
+    async def test_rendered_in_chunks(self, renderer: PDFRenderer, mock_convert: Mock, mock_pdfinfo: Mock):
+        pages = await renderer.render(b"pdf")
+
+        assert [_width(page) for page in pages] == list(range(1, 11))
+        assert [(c.kwargs["first_page"], c.kwargs["last_page"]) for c in mock_convert.call_args_list] == [
+            (1, 4),
+            (5, 8),
+            (9, 10),
+        ]
+
+    async def test_cached(self, renderer: PDFRenderer, mock_convert: Mock, mock_pdfinfo: Mock):
+        pages = await renderer.render(b"pdf")
+        assert await renderer.render(b"pdf") == pages
+        assert mock_convert.call_count == 3
+
+        # Different contents are rendered
+        await renderer.render(b"other pdf")
+        assert mock_convert.call_count == 6
+
+    async def test_large_renders_are_not_cached(self, mock_convert: Mock, mock_pdfinfo: Mock):
+        renderer = PDFRenderer(use_processes=False, max_cached_bytes=10)
+
+        await renderer.render(b"pdf")
+        await renderer.render(b"pdf")
+        assert mock_pdfinfo.call_count == 2
+
+    async def test_cache_is_bounded_by_size(self, mock_convert: Mock, mock_pdfinfo: Mock):
+        renderer = PDFRenderer(use_processes=False)
+        pages_size = sum(len(page) for page in await renderer.render(b"pdf"))
+        renderer = PDFRenderer(use_processes=False, cache_max_bytes=pages_size)
+
+        await renderer.render(b"pdf")
+        await renderer.render(b"other pdf")
+        mock_pdfinfo.reset_mock()
+
+        # Only the last render fits in the cache
+        await renderer.render(b"other pdf")
+        mock_pdfinfo.assert_not_called()
+        await renderer.render(b"pdf")
+        mock_pdfinfo.assert_called_once()
+
+    async def test_pdf_is_written_once(self, renderer: PDFRenderer, mock_convert: Mock, mock_pdfinfo: Mock):
+        contents: set[bytes] = set()
+
+        def _render(pdf_path: str, **kwargs: Any):
+            contents.add(Path(pdf_path).read_bytes())
+            return _page_images(**kwargs)
+
+        mock_convert.side_effect = _render
+        await renderer.render(b"pdf")
+
+        paths = {c.kwargs["pdf_path"] for c in mock_convert.call_args_list}
+        assert paths == {mock_pdfinfo.call_args.args[0]}
+        assert contents == {b"pdf"}
+        # The file is removed once the PDF is rendered
+        assert not Path(paths.pop()).exists()
+
+    async def test_too_many_pages(self, renderer: PDFRenderer, mock_convert: Mock, mock_pdfinfo: Mock):
+        mock_pdfinfo.return_value = {"Pages": 101}
+
+        with pytest.raises(InvalidFileError, match="too many pages"):
+            await renderer.render(b"pdf")
+        mock_convert.assert_not_called()
+
+    async def test_too_large(self, mock_convert: Mock, mock_pdfinfo: Mock):
+        renderer = PDFRenderer(use_processes=False, max_pdf_bytes=2)
+
+        with pytest.raises(InvalidFileError, match="too large"):
+            await renderer.render(b"pdf")
+        mock_pdfinfo.assert_not_called()
+
+    async def test_render_error(self, renderer: PDFRenderer, mock_convert: Mock, mock_pdfinfo: Mock):
+        mock_convert.side_effect = ValueError("Invalid PDF")
+
+        with pytest.raises(ValueError):
+            await renderer.render(b"pdf")
+        # Failed renders are not cached
+        mock_convert.side_effect = _page_images
+        assert len(await renderer.render(b"pdf")) == 10
+
+
+class TestIterPages:
+    async def test_stop_early(self, renderer: PDFRenderer, mock_convert: Mock, mock_pdfinfo: Mock):
+        pages = renderer.iter_pages(b"pdf")
+        first = await anext(pages)
+        await pages.aclose()
+
+        assert _width(first) == 1
+        # Partial renders are not cached
+        assert len(await renderer.render(b"pdf")) == 10
@@ -1,39 +1,161 @@
+import hashlib
 import io
+import os
+from typing import NamedTuple
 
 from PIL import Image
 
+from core.domain.metrics import send_counter
+from core.utils.background import add_background_task
+from core.utils.lru.lru_cache import SizedLRUCache
+from core.utils.worker_pool import WorkerPool
+
+_MIN_QUALITY = 10
+_MAX_QUALITY = 90
+
+_IMAGE_PREPROCESSING = os.getenv("IMAGE_PREPROCESSING", "true") == "true"
+_IMAGE_MAX_SIZE_BYTES = int(os.getenv("IMAGE_MAX_SIZE_BYTES", str(5 * 1024 * 1024)))
+_IMAGE_PREPROCESSING_WORKERS = int(os.getenv("IMAGE_PREPROCESSING_WORKERS", str(min(4, os.cpu_count() or 1))))
+_IMAGE_PREPROCESSING_PROCESSES = os.getenv("IMAGE_PREPROCESSING_PROCESSES", "true") == "true"
+
+
+def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=quality, optimize=True)
+    return buffered.getvalue()
+
+
+def _encode_jpeg_within(image: Image.Image, max_size_bytes: int) -> bytes:
+    """Returns the highest quality encoding that fits in max_size_bytes.
+    The image is downscaled when even the lowest quality is too large."""
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    # A binary search takes at most 7 encodes over the quality range
+    low, high = _MIN_QUALITY, _MAX_QUALITY
+    best: bytes | None = None
+    smallest = b""
+    while low <= high:
+        quality = (low + high) // 2
+        encoded = _encode_jpeg(image, quality)
+        if len(encoded) <= max_size_bytes:
+            best = encoded
+            low = quality + 1
+        else:
+            smallest = encoded
+            high = quality - 1
+    if best is not None:
+        return best
+
+    # The size of a JPEG is roughly proportional to its number of pixels
+    for _ in range(3):
+        ratio = (max_size_bytes / len(smallest)) ** 0.5 * 0.9
+        width, height = image.size
+        image = image.resize((max(int(width * ratio), 1), max(int(height * ratio), 1)), Image.Resampling.LANCZOS)
+        smallest = _encode_jpeg(image, _MIN_QUALITY)
+        if len(smallest) <= max_size_bytes:
+            break
+    # If we could not find a satisfactory compression, return the last attempt
+    return smallest
+
 
 def compress_image(image_bytes: bytes, max_size_kb: int = 600) -> bytes:
-    image_size_bytes = len(image_bytes)
     max_size_bytes = max_size_kb * 1024
 
     # Check if the original image size is already within the limit
-    if image_size_bytes <= max_size_bytes:
+    if len(image_bytes) <= max_size_bytes:
         return image_bytes
 
-    # Convert bytes to PIL image
-    image = Image.open(io.BytesIO(image_bytes))  # type: ignore
+    image = Image.open(io.BytesIO(image_bytes))
+    return _encode_jpeg_within(image, max_size_bytes)
+
+
+class ProcessedImage(NamedTuple):
+    data: bytes
+    content_type: str
+
+
+def _has_transparency(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
 
-    # Initialize variables
-    quality = 90
-    decrement_step = 20
-    min_quality = 10
 
-    while quality >= min_quality:
-        # Convert image to bytes with current quality
+def _preprocess_image(image_bytes: bytes, max_dimension: int | None, max_size_bytes: int) -> ProcessedImage | None:
+    """Downscales and compresses an image. Returns None when the original should be used as is.
+    Runs in a worker process so it must only use picklable arguments."""
+    image = Image.open(io.BytesIO(image_bytes))
+    if getattr(image, "is_animated", False):
+        return None
+
+    too_large = max_dimension is not None and max(image.size) > max_dimension
+    if not too_large and len(image_bytes) <= max_size_bytes:
+        return None
+
+    if too_large:
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)  # pyright: ignore[reportArgumentType]
+
+    if _has_transparency(image):
+        # Keeping the alpha channel, JPEG does not support it
         buffered = io.BytesIO()
-        image.save(buffered, format="JPEG", quality=quality)  # type: ignore
-        image_bytes = buffered.getvalue()
-        image_size_bytes = len(image_bytes)
+        image.save(buffered, format="PNG", optimize=True)
+        processed = ProcessedImage(buffered.getvalue(), "image/png")
+    else:
+        processed = ProcessedImage(_encode_jpeg_within(image, max_size_bytes), "image/jpeg")
+
+    if not too_large and len(processed.data) >= len(image_bytes):
+        return None
+    return processed
+
+
+def _cached_size(processed: ProcessedImage | None) -> int:
+    # Entries for which the original is used are counted as well so that their number is bounded
+    return 128 + (len(processed.data) if processed else 0)
+
+
+class ImagePreprocessor:
+    """Resizes and compresses input images before they are sent to providers.
+
+    - images are downscaled to the largest resolution that the model makes use of, since
+    providers downscale larger images anyway, and re-encoded when larger than max_size_bytes
+    - images are decoded once and the JPEG quality is picked with a binary search
+    - the work runs in a process pool and results are cached by content hash so that
+    retries and fallbacks to other providers do not re-process the same image"""
+
+    def __init__(
+        self,
+        enabled: bool = _IMAGE_PREPROCESSING,
+        max_size_bytes: int = _IMAGE_MAX_SIZE_BYTES,
+        max_workers: int = _IMAGE_PREPROCESSING_WORKERS,
+        use_processes: bool = _IMAGE_PREPROCESSING_PROCESSES,
+        # Total size of the cached images
+        cache_max_bytes: int = 100 * 1024 * 1024,
+    ):
+        self._enabled = enabled
+        self._max_size_bytes = max_size_bytes
+        self._cache_max_bytes = cache_max_bytes
+        self._pool = WorkerPool("image", max_workers, use_processes)
+        # (content hash, max dimension) -> processed image, None when the original is used
+        self._cache = self._new_cache()
+
+    def _new_cache(self):
+        return SizedLRUCache[tuple[str, int | None], ProcessedImage | None](self._cache_max_bytes, _cached_size)
+
+    async def preprocess(self, image_bytes: bytes, max_dimension: int | None) -> ProcessedImage | None:
+        """Returns None when the original image should be used"""
+        if not self._enabled:
+            return None
 
-        # Check if the image size is within the limit
-        if image_size_bytes <= max_size_bytes:
-            return image_bytes
+        key = (hashlib.sha256(image_bytes).hexdigest(), max_dimension)
+        if key in self._cache:
+            add_background_task(send_counter("image_preprocessing_cache_lookup", hit=True))
+            return self._cache.get(key)
+        add_background_task(send_counter("image_preprocessing_cache_lookup", hit=False))
 
-        # Decrease the quality for the next iteration
-        quality -= decrement_step
+        processed = await self._pool.run(_preprocess_image, image_bytes, max_dimension, self._max_size_bytes)
+        self._cache[key] = processed
+        return processed
 
-        image = Image.open(io.BytesIO(image_bytes))  # type: ignore
+    def clear(self):
+        self._cache = self._new_cache()
 
-    # If the loop ends without finding a satisfactory compression, return the last attempt
-    return image_bytes
+    def shutdown(self):
+        self._pool.shutdown()
@@ -1,8 +1,11 @@
 import io
+from collections.abc import Iterator
+from unittest.mock import patch
 
+import pytest
 from PIL import Image
 
-from core.utils.image_utils import compress_image
+from core.utils.image_utils import ImagePreprocessor, ProcessedImage, compress_image
 from tests.utils import fixture_bytes
 
 
@@ -28,3 +31,74 @@ def test_do_not_compress_when_already_below_max_size() -> None:
     compressed_image_data = compress_image(raw_image_data, max_size_kb=15)
 
     assert compressed_image_data == compressed_image_data
+
+
+def _image_bytes(size: tuple[int, int], mode: str = "RGB", format: str = "PNG") -> bytes:
+    buffered = io.BytesIO()
+    Image.new(mode, size, color="red").save(buffered, format=format)
+    return buffered.getvalue()
+
+
+@pytest.fixture
+def preprocessor() -> Iterator[ImagePreprocessor]:
+    preprocessor = ImagePreprocessor(use_processes=False)
+    yield preprocessor
+    preprocessor.shutdown()
+
+
+class TestImagePreprocessor:
+    async def test_downscaled(self, preprocessor: ImagePreprocessor):
+        processed = await preprocessor.preprocess(_image_bytes((4000, 1000)), max_dimension=2048)
+
+        assert processed
+        assert processed.content_type == "image/jpeg"
+        assert Image.open(io.BytesIO(processed.data)).size == (2048, 512)
+
+    async def test_transparency_is_kept(self, preprocessor: ImagePreprocessor):
+        processed = await preprocessor.preprocess(_image_bytes((4000, 1000), mode="RGBA"), max_dimension=2048)
+
+        assert processed
+        assert processed.content_type == "image/png"
+        assert Image.open(io.BytesIO(processed.data)).mode == "RGBA"
+
+    async def test_small_image_is_unchanged(self, preprocessor: ImagePreprocessor):
+        assert await preprocessor.preprocess(_image_bytes((100, 100)), max_dimension=2048) is None
+        assert await preprocessor.preprocess(fixture_bytes("files/animal.jpeg"), max_dimension=None) is None
+
+    async def test_compressed_when_too_large(self):
+        preprocessor = ImagePreprocessor(use_processes=False, max_size_bytes=4 * 1024)
+        image_bytes = fixture_bytes("files/animal.jpeg")
+
+        processed = await preprocessor.preprocess(image_bytes, max_dimension=None)
+
+        assert processed
+        assert len(processed.data) < 4 * 1024
+        # The resolution is preserved when possible
+        assert Image.open(io.BytesIO(processed.data)).size == Image.open(io.BytesIO(image_bytes)).size
+
+    async def test_cached(self, preprocessor: ImagePreprocessor):
+        image_bytes = _image_bytes((4000, 1000))
+        with patch("core.utils.image_utils._preprocess_image", return_value=None) as mock_preprocess:
+            await preprocessor.preprocess(image_bytes, max_dimension=2048)
+            await preprocessor.preprocess(image_bytes, max_dimension=2048)
+            mock_preprocess.assert_called_once()
+
+            # Another model uses a different resolution
+            await preprocessor.preprocess(image_bytes, max_dimension=1568)
+            assert mock_preprocess.call_count == 2
+
+    async def test_cache_is_bounded_by_size(self):
+        preprocessor = ImagePreprocessor(use_processes=False, cache_max_bytes=1200)
+        processed = ProcessedImage(b"a" * 1000, "image/jpeg")
+        with patch("core.utils.image_utils._preprocess_image", return_value=processed) as mock_preprocess:
+            await preprocessor.preprocess(b"1", max_dimension=2048)
+            await preprocessor.preprocess(b"2", max_dimension=2048)
+            # Only the last image fits in the cache
+            await preprocessor.preprocess(b"2", max_dimension=2048)
+            assert mock_preprocess.call_count == 2
+            await preprocessor.preprocess(b"1", max_dimension=2048)
+            assert mock_preprocess.call_count == 3
+
+    async def test_disabled(self):
+        preprocessor = ImagePreprocessor(enabled=False)
+        assert await preprocessor.preprocess(_image_bytes((4000, 1000)), max_dimension=2048) is None
@@ -59,3 +59,53 @@ class TLRUCache(Generic[_K, _T]):
             return self[key]
         except KeyError:
             return default
+
+    def pop(self, key: _K) -> _T | None:
+        val = self._cache.cache.pop(key, None)
+        return val[1] if val else None
+
+
+class SizedLRUCache(Generic[_K, _T]):
+    """An LRU cache bounded by the total size of its values, e-g a number of bytes.
+    Values that are larger than the max size are not stored."""
+
+    def __init__(self, max_size: int, size: Callable[[_T], int]):
+        self.max_size = max_size
+        self.total_size = 0
+        self._size = size
+        self._cache = OrderedDict[Any, tuple[int, _T]]()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: _K) -> bool:
+        return key in self._cache
+
+    def get(self, key: _K) -> _T | None:
+        try:
+            self._cache.move_to_end(key)
+        except KeyError:
+            return None
+        return self._cache[key][1]
+
+    def pop(self, key: _K) -> _T | None:
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+        self.total_size -= entry[0]
+        return entry[1]
+
+    def __setitem__(self, key: _K, value: _T) -> None:
+        self.pop(key)
+        size = self._size(value)
+        if size > self.max_size:
+            return
+        self._cache[key] = (size, value)
+        self.total_size += size
+        while self.total_size > self.max_size:
+            _, (evicted_size, _) = self._cache.popitem(last=False)
+            self.total_size -= evicted_size
+
+    def clear(self):
+        self._cache.clear()
+        self.total_size = 0
@@ -4,7 +4,7 @@ from datetime import timedelta
 import pytest
 from freezegun.api import FrozenDateTimeFactory
 
-from .lru_cache import LRUCache, TLRUCache
+from .lru_cache import LRUCache, SizedLRUCache, TLRUCache
 
 
 class TestLRUCache:
@@ -118,3 +118,48 @@ class TestTLRUCache:
 
         # Should still be available because we updated it
         assert cache[1] == 1
+
+
+class TestSizedLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = SizedLRUCache[str, bytes](10, len)
+
+        cache["a"] = b"aaaa"
+        cache["b"] = b"bbbb"
+        # Using a makes b the least recently used
+        assert cache.get("a") == b"aaaa"
+        cache["c"] = b"cccc"
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("c") == b"cccc"
+        assert cache.total_size == 8
+
+    def test_update_existing_key(self):
+        cache = SizedLRUCache[str, bytes](10, len)
+
+        cache["a"] = b"aaaa"
+        cache["a"] = b"aaaaaaaa"
+        assert cache.total_size == 8
+        assert len(cache) == 1
+
+    def test_too_large_values_are_not_stored(self):
+        cache = SizedLRUCache[str, bytes](10, len)
+
+        cache["a"] = b"aaaa"
+        cache["b"] = b"b" * 11
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+
+    def test_pop_and_clear(self):
+        cache = SizedLRUCache[str, bytes](10, len)
+
+        cache["a"] = b"aaaa"
+        cache["b"] = b"bb"
+        assert cache.pop("a") == b"aaaa"
+        assert cache.pop("a") is None
+        assert cache.total_size == 2
+
+        cache.clear()
+        assert cache.get("b") is None
+        assert cache.total_size == 0
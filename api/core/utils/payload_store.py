@@ -0,0 +1,92 @@
+import logging
+import os
+import zlib
+from datetime import timedelta
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from core.utils.lru.lru_cache import TLRUCache
+
+_logger = logging.getLogger(__name__)
+
+_M = TypeVar("_M", bound=BaseModel)
+
+# Disabled by default until all workers can resolve references
+_PAYLOAD_CLAIM_CHECK = os.getenv("PAYLOAD_CLAIM_CHECK", "false") == "true"
+# Payloads must outlive the job and its retries
+_PAYLOAD_TTL_SECONDS = int(os.getenv("PAYLOAD_CLAIM_CHECK_TTL_SECONDS", str(2 * 24 * 60 * 60)))
+
+
+class PayloadStore:
+    """A claim check store for large job payloads.
+
+    Payloads are compressed and written with a TTL, refreshed on every write, so that
+    broker messages only carry their key. Redis is used when available, otherwise payloads are kept in process
+    which only works when jobs are executed in the same process, e-g with the in memory broker."""
+
+    def __init__(
+        self,
+        redis_client: Any | None = None,
+        enabled: bool = _PAYLOAD_CLAIM_CHECK,
+        ttl_seconds: int = _PAYLOAD_TTL_SECONDS,
+        # Fast compression, payloads are mostly JSON which compresses well even at level 1
+        compression_level: int = 1,
+        # Capacity of the in process store used when redis is not available
+        memory_capacity: int = 1024,
+    ):
+        self._redis = redis_client
+        self._enabled = enabled
+        self._ttl_seconds = ttl_seconds
+        self._compression_level = compression_level
+        ttl = timedelta(seconds=ttl_seconds)
+        self._memory = TLRUCache[str, bytes](memory_capacity, lambda _, __: ttl)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def ttl(self) -> timedelta:
+        return timedelta(seconds=self._ttl_seconds)
+
+    @classmethod
+    def _redis_key(cls, key: str) -> str:
+        return f"payload:{key}"
+
+    async def put(self, key: str, payload: bytes) -> bool:
+        """Stores the payload under the key with a full TTL. Returns False if the payload could
+        not be stored, in which case the caller should send the payload inline"""
+        compressed = zlib.compress(payload, self._compression_level)
+        if not self._redis:
+            self._memory[key] = compressed
+            return True
+        try:
+            return bool(await self._redis.set(self._redis_key(key), compressed, ex=self._ttl_seconds))
+        except Exception:
+            _logger.exception("Failed to store payload", extra={"key": key})
+            return False
+
+    async def get(self, key: str) -> bytes | None:
+        if not self._redis:
+            compressed = self._memory.get(key)
+        else:
+            compressed = await self._redis.get(self._redis_key(key))
+        return zlib.decompress(compressed) if compressed else None
+
+    async def delete(self, key: str):
+        if not self._redis:
+            self._memory.pop(key)
+            return
+        try:
+            await self._redis.delete(self._redis_key(key))
+        except Exception:
+            # Not a big deal, the payload will expire
+            _logger.exception("Failed to delete payload", extra={"key": key})
+
+    async def put_model(self, key: str, model: BaseModel) -> bool:
+        return await self.put(key, model.model_dump_json().encode())
+
+    async def get_model(self, key: str, model_cls: type[_M]) -> _M | None:
+        payload = await self.get(key)
+        return model_cls.model_validate_json(payload) if payload else None
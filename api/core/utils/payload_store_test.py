@@ -0,0 +1,68 @@
+import zlib
+from unittest.mock import AsyncMock
+
+import pytest
+
+from core.utils.payload_store import PayloadStore
+from tests.models import task_variant
+
+
+@pytest.fixture
+def mock_redis():
+    mock = AsyncMock()
+    mock.get.return_value = None
+    return mock
+
+
+class TestRedisStore:
+    async def test_put_and_get(self, mock_redis: AsyncMock):
+        store = PayloadStore(redis_client=mock_redis)
+
+        assert await store.put("key", b"hello" * 100)
+
+        mock_redis.set.assert_called_once()
+        key, compressed = mock_redis.set.call_args.args
+        assert key == "payload:key"
+        assert len(compressed) < 500
+        assert mock_redis.set.call_args.kwargs == {"ex": 2 * 24 * 60 * 60}
+
+        mock_redis.get.return_value = compressed
+        assert await store.get("key") == b"hello" * 100
+
+    async def test_put_not_stored(self, mock_redis: AsyncMock):
+        mock_redis.set.return_value = None
+        store = PayloadStore(redis_client=mock_redis)
+
+        assert not await store.put("key", b"hello")
+
+    async def test_put_failure(self, mock_redis: AsyncMock):
+        mock_redis.set.side_effect = ConnectionError("redis is down")
+        store = PayloadStore(redis_client=mock_redis)
+
+        assert not await store.put("key", b"hello")
+
+    async def test_get_model(self, mock_redis: AsyncMock):
+        store = PayloadStore(redis_client=mock_redis)
+        variant = task_variant()
+        mock_redis.get.return_value = zlib.compress(variant.model_dump_json().encode())
+
+        assert await store.get_model("key", type(variant)) == variant
+
+
+class TestMemoryStore:
+    async def test_put_get_delete(self):
+        store = PayloadStore()
+
+        assert await store.get("key") is None
+        assert await store.put("key", b"hello")
+        assert await store.get("key") == b"hello"
+
+        await store.delete("key")
+        assert await store.get("key") is None
+
+    async def test_overwrite(self):
+        store = PayloadStore()
+
+        await store.put("key", b"hello")
+        await store.put("key", b"world")
+        assert await store.get("key") == b"world"
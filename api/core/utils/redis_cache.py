@@ -52,7 +52,10 @@ def _generate_cache_key(
     return f"{module_name}.{func_name}{suffix}:{args_hash}"
 
 
-def redis_cached(expiration_seconds: int = 60 * 60 * 24) -> Callable[[F], F]:  # default ttl is 1 day
+def redis_cached(
+    expiration_seconds: int = 60 * 60 * 24,  # default ttl is 1 day
+    cache_none: bool = True,
+) -> Callable[[F], F]:
     if not shared_redis_client:
         _logger.warning("Redis cache is not available, skipping redis_cached")
 
@@ -74,7 +77,8 @@ def redis_cached(expiration_seconds: int = 60 * 60 * 24) -> Callable[[F], F]:  #
                 result: Any = (
                     await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
                 )
-                await shared_redis_client.setex(cache_key, expiration_seconds, pickle.dumps(result))  # pyright: ignore
+                if result is not None or cache_none:
+                    await shared_redis_client.setex(cache_key, expiration_seconds, pickle.dumps(result))  # pyright: ignore
                 return result
             except Exception as e:
                 _logger.exception("Exception in redis_cached", exc_info=e)
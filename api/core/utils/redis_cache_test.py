@@ -51,6 +51,24 @@ async def test_redis_cached_miss() -> None:
     mock_inner.assert_called_once_with("test_param")  # Function should be called on cache miss
 
 
+async def test_redis_cached_none_not_cached() -> None:
+    mock_cache = AsyncMock()
+    mock_cache.get.return_value = None
+
+    mock_inner = AsyncMock(return_value=None)
+
+    with patch("core.utils.redis_cache.shared_redis_client", mock_cache):
+
+        @redis_cached(cache_none=False)
+        async def test_func(param: str) -> str | None:
+            return await mock_inner(param)
+
+        result = await test_func("test_param")
+
+    assert result is None
+    mock_cache.setex.assert_not_called()
+
+
 async def test_redis_cached_non_async_function() -> None:
     """
     This test verifies that redis_cached() works with non-async functions.
@@ -0,0 +1,127 @@
+import asyncio
+from collections.abc import AsyncIterator, Hashable, Iterator
+from contextlib import contextmanager
+from typing import Generic, TypeVar
+
+_K = TypeVar("_K", bound=Hashable)
+_C = TypeVar("_C")
+_R = TypeVar("_R")
+
+
+class FlightAbandonedError(Exception):
+    """Raised to waiters when the leader of a flight stopped without producing a result,
+    e.g. when it failed or was cancelled. Waiters are expected to execute the work themselves."""
+
+    pass
+
+
+class Flight(Generic[_C, _R]):
+    """An in-flight execution that other coroutines can attach to.
+
+    Chunks are assumed to be cumulative (each chunk supersedes the previous one), so
+    waiters only ever receive the latest chunk and can skip intermediate ones.
+
+    leader_id optionally identifies the work of the leader, e.g. the id of the run being
+    executed, so that waiters can present it as their own."""
+
+    def __init__(self, leader_id: str | None = None):
+        self.leader_id = leader_id
+        self._chunk: _C | None = None
+        self._seq = 0
+        self._result: _R | None = None
+        self._abandoned = False
+        self._done = False
+        self._updated = asyncio.Event()
+        self.waiter_count = 0
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def _notify(self):
+        # Swapping the event so that waiters that wake up can wait on the next update
+        updated = self._updated
+        self._updated = asyncio.Event()
+        updated.set()
+
+    def publish(self, chunk: _C):
+        self._chunk = chunk
+        self._seq += 1
+        self._notify()
+
+    def complete(self, result: _R):
+        if self._done:
+            return
+        self._result = result
+        self._done = True
+        self._notify()
+
+    def abandon(self):
+        if self._done:
+            return
+        self._abandoned = True
+        self._done = True
+        self._notify()
+
+    async def stream(self) -> AsyncIterator[_C]:
+        """Yields the latest published chunk every time it changes, until the flight is done"""
+        seen = 0
+        while True:
+            updated = self._updated
+            if self._seq > seen:
+                seen = self._seq
+                yield self._chunk  # pyright: ignore [reportReturnType]
+                continue
+            if self._done:
+                break
+            await updated.wait()
+        if self._abandoned:
+            raise FlightAbandonedError()
+
+    async def result(self) -> _R:
+        while not self._done:
+            await self._updated.wait()
+        if self._abandoned:
+            raise FlightAbandonedError()
+        return self._result  # pyright: ignore [reportReturnType]
+
+
+class SingleFlight(Generic[_K, _C, _R]):
+    """Coalesces concurrent executions that share the same key so that only a single one
+    (the leader) does the actual work while the others attach to its flight."""
+
+    def __init__(self):
+        self._flights: dict[_K, Flight[_C, _R]] = {}
+
+    def _active(self, key: _K) -> Flight[_C, _R] | None:
+        flight = self._flights.get(key)
+        if flight is None or flight.done:
+            return None
+        return flight
+
+    def get(self, key: _K) -> Flight[_C, _R] | None:
+        """Returns the active flight for the key, if any, and registers the caller as a waiter"""
+        if flight := self._active(key):
+            flight.waiter_count += 1
+        return flight
+
+    @contextmanager
+    def lead(self, key: _K | None, leader_id: str | None = None) -> Iterator[Flight[_C, _R]]:
+        """Registers a new flight for the key. The flight is abandoned if it was not
+        completed when the context exits, including on exceptions and cancellations.
+
+        When the key is None or a flight is already registered, the flight is not
+        registered and no one can attach to it."""
+        flight = Flight[_C, _R](leader_id)
+        registered = key is not None and self._active(key) is None
+        if registered:
+            self._flights[key] = flight  # pyright: ignore [reportArgumentType]
+        try:
+            yield flight
+        finally:
+            if registered and self._flights.get(key) is flight:  # pyright: ignore [reportArgumentType]
+                del self._flights[key]  # pyright: ignore [reportArgumentType]
+            flight.abandon()
+
+    def __len__(self) -> int:
+        return len(self._flights)
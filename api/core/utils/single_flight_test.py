@@ -0,0 +1,115 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from .single_flight import FlightAbandonedError, SingleFlight
+
+
+class TestSingleFlight:
+    async def test_get_no_flight(self):
+        flights = SingleFlight[str, int, str]()
+        assert flights.get("a") is None
+
+    async def test_result_is_shared(self):
+        flights = SingleFlight[str, int, str]()
+
+        with flights.lead("a") as leader:
+            flight = flights.get("a")
+            assert flight is leader
+            assert flight.waiter_count == 1
+
+            waiter = asyncio.create_task(flight.result())
+            await asyncio.sleep(0)
+            assert not waiter.done()
+
+            leader.complete("result")
+            assert await waiter == "result"
+
+        # The flight is unregistered once the leader exits
+        assert flights.get("a") is None
+        assert len(flights) == 0
+
+    async def test_leader_id(self):
+        flights = SingleFlight[str, int, str]()
+        with flights.lead("a", leader_id="run_1"):
+            flight = flights.get("a")
+            assert flight and flight.leader_id == "run_1"
+
+    async def test_none_key_is_not_registered(self):
+        flights = SingleFlight[str, int, str]()
+        with flights.lead(None):
+            assert len(flights) == 0
+
+    async def test_second_leader_is_not_registered(self):
+        flights = SingleFlight[str, int, str]()
+        with flights.lead("a") as first:
+            with flights.lead("a") as second:
+                assert second is not first
+            assert flights.get("a") is first
+
+    async def test_abandoned_on_exception(self):
+        flights = SingleFlight[str, int, str]()
+
+        with pytest.raises(ValueError):
+            with flights.lead("a"):
+                flight = flights.get("a")
+                assert flight
+                raise ValueError("boom")
+
+        with pytest.raises(FlightAbandonedError):
+            await flight.result()
+
+    async def test_stream_fan_out(self):
+        flights = SingleFlight[str, int, str]()
+
+        async def _consume():
+            flight = flights.get("a")
+            assert flight
+            return [c async for c in flight.stream()]
+
+        with flights.lead("a") as leader:
+            waiters = [asyncio.create_task(_consume()) for _ in range(3)]
+            await asyncio.sleep(0)
+
+            for i in range(3):
+                leader.publish(i)
+                await asyncio.sleep(0)
+            leader.complete("done")
+
+            results = await asyncio.gather(*waiters)
+
+        assert results == [[0, 1, 2]] * 3
+
+    async def test_stream_only_yields_latest_chunk(self):
+        flights = SingleFlight[str, int, str]()
+
+        with flights.lead("a") as leader:
+            leader.publish(1)
+            leader.publish(2)
+            flight = flights.get("a")
+            assert flight
+            waiter = asyncio.create_task(_collect(flight.stream()))
+            await asyncio.sleep(0)
+            leader.publish(3)
+            leader.complete("done")
+
+            assert await waiter == [2, 3]
+
+    async def test_stream_abandoned(self):
+        flights = SingleFlight[str, int, str]()
+
+        with flights.lead("a") as leader:
+            flight = flights.get("a")
+            assert flight
+            waiter = asyncio.create_task(_collect(flight.stream()))
+            await asyncio.sleep(0)
+            leader.publish(1)
+            await asyncio.sleep(0)
+
+        with pytest.raises(FlightAbandonedError):
+            await waiter
+
+
+async def _collect(it: AsyncIterator[int]) -> list[int]:
+    return [c async for c in it]
@@ -0,0 +1,41 @@
+import os
+import time
+from collections.abc import Callable
+
+# 0 means no limit
+_MIN_INTERVAL_SECONDS = float(os.getenv("STREAM_PARTIAL_MIN_INTERVAL_SECONDS", "0"))
+_MIN_DELTA_CHARS = int(os.getenv("STREAM_PARTIAL_MIN_DELTA_CHARS", "0"))
+
+
+class StreamThrottle:
+    """Decides whether a partial output should be emitted, to limit the number of times a
+    streamed output is validated and serialized.
+
+    The first update is always emitted so that the time to first chunk is not impacted.
+    Subsequent updates are emitted only if enough time has passed and enough characters
+    were received since the last emission. The final output is never throttled by callers."""
+
+    def __init__(
+        self,
+        min_interval_seconds: float = _MIN_INTERVAL_SECONDS,
+        min_delta_chars: int = _MIN_DELTA_CHARS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._min_interval_seconds = min_interval_seconds
+        self._min_delta_chars = min_delta_chars
+        self._clock = clock
+        self._last_emitted_at: float | None = None
+        self._last_emitted_size = 0
+
+    def should_emit(self, size: int) -> bool:
+        """Returns true and records the emission if an update should be emitted.
+        Size is the total number of characters received so far"""
+        now = self._clock()
+        if self._last_emitted_at is not None:
+            if now - self._last_emitted_at < self._min_interval_seconds:
+                return False
+            if size - self._last_emitted_size < self._min_delta_chars:
+                return False
+        self._last_emitted_at = now
+        self._last_emitted_size = size
+        return True
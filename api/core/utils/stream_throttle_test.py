@@ -0,0 +1,38 @@
+from .stream_throttle import StreamThrottle
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestStreamThrottle:
+    def test_no_limit(self):
+        throttle = StreamThrottle()
+        assert all(throttle.should_emit(i) for i in range(10))
+
+    def test_min_interval(self):
+        clock = _Clock()
+        throttle = StreamThrottle(min_interval_seconds=0.1, clock=clock)
+
+        # First update is always emitted
+        assert throttle.should_emit(1)
+        assert not throttle.should_emit(2)
+
+        clock.now = 0.05
+        assert not throttle.should_emit(3)
+
+        clock.now = 0.11
+        assert throttle.should_emit(4)
+        assert not throttle.should_emit(5)
+
+    def test_min_delta_chars(self):
+        throttle = StreamThrottle(min_delta_chars=10)
+
+        assert throttle.should_emit(1)
+        assert not throttle.should_emit(10)
+        assert throttle.should_emit(11)
+        assert not throttle.should_emit(20)
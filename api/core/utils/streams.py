@@ -46,6 +46,12 @@ _outside_of_quotes_chars = set("{]}],-0123456789.nulltruefalse")
 _post_quote_chars = set(",}]\\")
 
 
+# A run of characters that can be added as is to a string value
+_plain_string_run = re.compile(r'[^"\\]+')
+_space_run = re.compile(r"\s+")
+_non_space = re.compile(r"\S")
+
+
 def should_ignore_outside_quotes(c: str) -> bool:
     return c not in _outside_of_quotes_chars
 
@@ -58,6 +64,8 @@ class JSONStreamParser:
     def __init__(self, is_tolerant: bool = True) -> None:
         # To keep track of the key path
         self.path_stack: list[Union[str, int]] = []
+        # The key paths of each element of the path stack, to avoid re-joining the stack
+        self._key_paths: list[str] = []
         # To keep track of the current object or array, true if object
         self._dict_stack: list[bool] = []
         self.key_path: str = ""
@@ -71,6 +79,9 @@ class JSONStreamParser:
         self.is_escaping = False
         self.is_tolerant = is_tolerant
         self._leftover_buffer = ""
+        # The buffer being processed and the position right after the current char
+        self._buffer = ""
+        self._position = 0
         self._last_char = ""
 
         self.ignore_outside_quotes = should_ignore_outside_quotes if is_tolerant else is_space
@@ -83,17 +94,21 @@ class JSONStreamParser:
             raise self._exception("Cannot increment array index when not in an array")
         if isinstance(self.path_stack[-1], int):
             self.path_stack[-1] += 1
-            self._reset_key_path()
+            parent = self._key_paths[-2] if len(self._key_paths) > 1 else None
+            self._key_paths[-1] = self._child_key_path(parent, self.path_stack[-1])
+            self.key_path = self._key_paths[-1]
             return True
         return False
 
-    def _reset_key_path(self) -> None:
-        self.key_path = ".".join([str(a) for a in self.path_stack])
+    @staticmethod
+    def _child_key_path(parent: Optional[str], key: Union[str, int]) -> str:
+        return str(key) if parent is None else f"{parent}.{key}"
 
     def _add_path(self, key: Union[str, int]) -> None:
         self.is_value = False
         self.path_stack.append(key)
-        self._reset_key_path()
+        self._key_paths.append(self._child_key_path(self._key_paths[-1] if self._key_paths else None, key))
+        self.key_path = self._key_paths[-1]
 
     def _pop_path(self, res: Optional[list[tuple[str, Any]]]) -> None:
         if self.is_value:
@@ -102,7 +117,8 @@ class JSONStreamParser:
             self.path_stack.pop()
         except IndexError:
             raise self._exception("Cannot pop path stack when it is empty")
-        self._reset_key_path()
+        self._key_paths.pop()
+        self.key_path = self._key_paths[-1] if self._key_paths else ""
 
     def _finish_current_chain(self, res: Optional[list[tuple[str, Any]]], force: bool = False) -> None:
         """Finish the current chain and append it to the res list if provided"""
@@ -198,10 +214,10 @@ class JSONStreamParser:
         self.current_chain += c
 
     def _next_non_space_char(self) -> str:
-        for c in self._leftover_buffer:
-            if not is_space(c):
-                return c
-        raise _WaitForChunksError()
+        match = _non_space.search(self._buffer, self._position)
+        if match is None:
+            raise _WaitForChunksError()
+        return match.group()
 
     def _process_chunk_inner_loop(self, c: str, res: list[tuple[str, Any]], i: int):  # noqa: C901
         # Returns true if the character was processed, false if the character was ignored
@@ -284,6 +300,66 @@ class JSONStreamParser:
             return False
         return True
 
+    def _skip_run(self, position: int) -> int:
+        """Returns the length of the run of characters that start at position and that can be
+        processed at once, i-e plain characters in a string or spaces outside of a string"""
+        if self.is_within_quotes:
+            if self.is_escaping:
+                return 0
+            match = _plain_string_run.match(self._buffer, position)
+            if match is None:
+                return 0
+            run = match.group()
+            self.current_chain += run
+            self._last_char = run[-1]
+            return len(run)
+
+        # Spaces are always ignored outside of quotes
+        match = _space_run.match(self._buffer, position)
+        return 0 if match is None else match.end() - position
+
+    def _is_plain_string_chunk(self, chunk: str) -> bool:
+        return (
+            self.is_within_quotes
+            and not self.is_escaping
+            and not self._leftover_buffer
+            and bool(chunk)
+            and '"' not in chunk
+            and "\\" not in chunk
+        )
+
+    def _process_buffer(self, res: list[tuple[str, Any]]) -> bool:
+        """Returns false if the processing stopped to wait for more chunks"""
+        buffer = self._buffer
+        position = 0
+        # The number of characters processed in this chunk
+        i = 0
+
+        while position < len(buffer):
+            if run_length := self._skip_run(position):
+                position += run_length
+                i += run_length
+                continue
+
+            c = buffer[position]
+            self._position = position + 1
+            try:
+                processed = self._process_chunk_inner_loop(c, res=res, i=i)
+            except _WaitForChunksError:
+                # We need to wait for more data so we break here
+                # The current character was not processed, so we keep it in the buffer
+                self._leftover_buffer = buffer[position:]
+                return False
+            except _JsonEnd:
+                self.is_done = True
+                return True
+
+            position += 1
+            i += 1
+            if processed:
+                self._last_char = c
+        return True
+
     @staticmethod
     def _first_json_index(chunk: str) -> Optional[int]:
         try:
@@ -305,6 +381,12 @@ class JSONStreamParser:
             # JSON already parsed, exiting
             return []
 
+        if self._is_plain_string_chunk(chunk):
+            # Fast path for the most common case, a chunk in the middle of a string
+            self.current_chain += chunk
+            self._last_char = chunk[-1]
+            return [(self.key_path, self.current_chain)] if self.is_value else []
+
         if not self.in_json:
             first_idx = self._first_json_index(chunk)
             if first_idx is None:
@@ -314,28 +396,10 @@ class JSONStreamParser:
             self.in_json = True
 
         res: list[tuple[str, Any]] = []
-        i = 0
-
-        self._leftover_buffer += chunk
-
-        while self._leftover_buffer:
-            c = self._leftover_buffer[0]
-            self._leftover_buffer = self._leftover_buffer[1:]
-
-            try:
-                processed = self._process_chunk_inner_loop(c, res=res, i=i)
-            except _WaitForChunksError:
-                # We need to wait for more data so we break here
-                # The current character was not processed, so we add it back to the buffer
-                self._leftover_buffer = f"{c}{self._leftover_buffer}"
-                return res
-            except _JsonEnd:
-                self.is_done = True
-                break
-
-            i += 1
-            if processed:
-                self._last_char = c
+        self._buffer = self._leftover_buffer + chunk
+        self._leftover_buffer = ""
+        if not self._process_buffer(res):
+            return res
 
         if self.is_value:
             chain = self._send_current_chain()
@@ -1,9 +1,11 @@
 import json
+import random
 from typing import Any
 
 import pytest
 
 from core.utils.dicts import set_at_keypath_str
+from tests.legacy_json_stream_parser import LegacyJSONStreamParser
 from tests.utils import fixtures_json, mock_aiter
 
 from .streams import JSONStreamError, JSONStreamParser, standard_wrap_sse
@@ -291,6 +293,45 @@ def test_4o_mini_tabs():
     assert parsed == {"characters": {}, "bla": "bla"}
 
 
+@pytest.mark.parametrize("is_tolerant", [True, False])
+def test_structured_output_fixture(is_tolerant: bool):
+    # Chunks of a few characters, similar to what providers send
+    chunks: list[str] = fixtures_json("streams/structured_output.json")
+    parsed = _stream_to_dict({}, chunks, is_tolerant=is_tolerant)
+    assert parsed == json.loads("".join(chunks))
+
+
+def _split_at_random(raw: str, seed: int, max_size: int) -> list[str]:
+    rng = random.Random(seed)
+    chunks: list[str] = []
+    i = 0
+    while i < len(raw):
+        size = rng.randint(1, max_size)
+        chunks.append(raw[i : i + size])
+        i += size
+    return chunks
+
+
+def _structured_output_chunkings():
+    chunks: list[str] = fixtures_json("streams/structured_output.json")
+    raw = "".join(chunks)
+    yield pytest.param(chunks, id="fixture")
+    for size in (1, 2, 3, 7, 64, 1024):
+        yield pytest.param([raw[i : i + size] for i in range(0, len(raw), size)], id=f"size-{size}")
+    for seed in range(5):
+        yield pytest.param(_split_at_random(raw, seed, max_size=32), id=f"random-{seed}")
+
+
+@pytest.mark.parametrize("is_tolerant", [True, False])
+@pytest.mark.parametrize("chunks", _structured_output_chunkings())
+def test_same_updates_as_legacy_parser(chunks: list[str], is_tolerant: bool):
+    parser = JSONStreamParser(is_tolerant=is_tolerant)
+    legacy = LegacyJSONStreamParser(is_tolerant=is_tolerant)
+    for i, chunk in enumerate(chunks):
+        assert parser.process_chunk(chunk) == legacy.process_chunk(chunk), f"chunk {i}"
+    assert parser.is_done == legacy.is_done
+
+
 class TestFailures:
     def test_unfixable_json(self) -> None:
         txt = '{meal_plan": "hello"}'
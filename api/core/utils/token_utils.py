@@ -1,7 +1,30 @@
+import asyncio
+import contextvars
+import functools
+import hashlib
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
 from tiktoken import Encoding, encoding_for_model, get_encoding
 
+from core.utils.lru.lru_cache import LRUCache
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+# Texts longer than this are encoded in a thread pool by count_tokens
+_THREAD_MIN_LENGTH = int(os.getenv("TOKEN_COUNT_THREAD_MIN_LENGTH", "16384"))
+# When false, counts are estimated from the byte length instead of encoded
+_EXACT = os.getenv("TOKEN_COUNT_EXACT", "true") == "true"
+
 
+@functools.cache
 def _get_tiktoken_encoding(model: str) -> Encoding:
+    # Resolving an encoding is a registry lookup + a regex compilation for unknown models
+    # and encodings are thread safe so they are shared for the lifetime of the process
     try:
         encoding = encoding_for_model(model)
     except KeyError:
@@ -10,7 +33,114 @@ def _get_tiktoken_encoding(model: str) -> Encoding:
     return encoding
 
 
+def estimate_tokens(text: str) -> int:
+    """A fast approximation of the token count, based on the ~4 bytes per token average
+    of BPE tokenizers on english text. Use when an exact count is not needed."""
+    return (len(text.encode()) + 3) // 4
+
+
+class TokenCounter:
+    """Counts tokens with cached encoders.
+
+    - counts are memoized by content hash so that repeated texts, e-g system prompts
+    or instructions shared by all the runs of a version, are only encoded once
+    - count_async encodes large texts in a thread pool. tiktoken releases the GIL while
+    encoding so the event loop is not blocked"""
+
+    def __init__(
+        self,
+        # Texts shorter than this are not memoized since hashing them is not much cheaper than encoding
+        memo_min_length: int = 256,
+        memo_capacity: int = 10_000,
+        thread_min_length: int = _THREAD_MIN_LENGTH,
+        max_workers: int = 4,
+        exact: bool = _EXACT,
+    ):
+        self._memo_min_length = memo_min_length
+        self._thread_min_length = thread_min_length
+        self._max_workers = max_workers
+        self._exact = exact
+        self._memo = LRUCache[tuple[str, bytes], int](memo_capacity)
+        # The memo is accessed from the thread pool
+        self._memo_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="tokens")
+        return self._executor
+
+    def _memo_key(self, text: str, encoding: Encoding) -> tuple[str, bytes] | None:
+        if len(text) < self._memo_min_length:
+            return None
+        return (encoding.name, hashlib.blake2b(text.encode(), digest_size=16).digest())
+
+    def _memo_get(self, key: tuple[str, bytes] | None) -> int | None:
+        if key is None:
+            return None
+        with self._memo_lock:
+            try:
+                return self._memo[key]
+            except KeyError:
+                return None
+
+    def _memo_set(self, key: tuple[str, bytes] | None, count: int):
+        if key is None:
+            return
+        with self._memo_lock:
+            self._memo[key] = count
+
+    def _encode(self, text: str, encoding: Encoding, key: tuple[str, bytes] | None) -> int:
+        count = len(encoding.encode(text))
+        self._memo_set(key, count)
+        return count
+
+    def count(self, text: str, model: str) -> int:
+        if not text:
+            return 0
+        if not self._exact:
+            return estimate_tokens(text)
+
+        encoding = _get_tiktoken_encoding(model)
+        key = self._memo_key(text, encoding)
+        if (count := self._memo_get(key)) is not None:
+            return count
+        return self._encode(text, encoding, key)
+
+    async def count_async(self, text: str, model: str) -> int:
+        """Same as count but large texts are encoded outside of the event loop"""
+        if len(text) < self._thread_min_length or not self._exact:
+            return self.count(text, model)
+
+        encoding = _get_tiktoken_encoding(model)
+        key = self._memo_key(text, encoding)
+        if (count := self._memo_get(key)) is not None:
+            return count
+        return await self.run_in_executor(self._encode, text, encoding, key)
+
+    async def run_in_executor(self, fn: Callable[_P, _R], *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        """Runs a function that counts tokens, e-g a provider's prompt token count, in the thread pool"""
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_token_counter = TokenCounter()
+
+
 def tokens_from_string(completion: str, model: str) -> int:
-    encoding = _get_tiktoken_encoding(model)
+    return _token_counter.count(completion, model)
+
+
+async def count_tokens(text: str, model: str) -> int:
+    return await _token_counter.count_async(text, model)
+
 
-    return len(encoding.encode(completion))
+async def run_token_count(fn: Callable[_P, _R], *args: _P.args, **kwargs: _P.kwargs) -> _R:
+    """Runs a function that counts tokens, e-g a provider's prompt token count, outside of the event loop"""
+    return await _token_counter.run_in_executor(fn, *args, **kwargs)
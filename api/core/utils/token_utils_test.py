@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from core.utils.token_utils import (
+    TokenCounter,
+    _get_tiktoken_encoding,  # pyright: ignore[reportPrivateUsage]
+    estimate_tokens,
+)
+
+
+class TestGetTiktokenEncoding:
+    def test_cached(self):
+        assert _get_tiktoken_encoding("gpt-4o") is _get_tiktoken_encoding("gpt-4o")
+
+    def test_unknown_model(self):
+        assert _get_tiktoken_encoding("not-a-model").name == "cl100k_base"
+
+
+class TestEstimateTokens:
+    def test_estimate(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abc") == 1
+        assert estimate_tokens("abcdefgh") == 2
+        # Multi byte characters count for their byte length
+        assert estimate_tokens("é" * 4) == 2
+
+
+class TestTokenCounter:
+    def test_count(self):
+        counter = TokenCounter()
+        assert counter.count("", "gpt-4o") == 0
+        assert counter.count("hello world", "gpt-4o") == 2
+
+    def test_memoized(self):
+        counter = TokenCounter(memo_min_length=10)
+        text = "hello world " * 10
+        expected = counter.count(text, "gpt-4o")
+
+        with patch.object(counter, "_encode") as mock_encode:
+            assert counter.count(text, "gpt-4o") == expected
+            mock_encode.assert_not_called()
+
+            # Short texts are not memoized
+            counter.count("hello", "gpt-4o")
+            mock_encode.assert_called_once()
+
+    def test_memo_per_encoding(self):
+        counter = TokenCounter(memo_min_length=10)
+        text = "hello world " * 10
+        counter.count(text, "gpt-4o")
+
+        with patch.object(counter, "_encode", return_value=1) as mock_encode:
+            # gpt-4 uses a different encoding so the memoized count can't be used
+            assert counter.count(text, "gpt-4") == 1
+            mock_encode.assert_called_once()
+
+    def test_estimate_mode(self):
+        counter = TokenCounter(exact=False)
+        assert counter.count("abcdefgh", "gpt-4o") == 2
+
+    async def test_count_async_in_thread(self):
+        counter = TokenCounter(thread_min_length=100, memo_min_length=100)
+        text = "hello world " * 10
+
+        with patch.object(counter, "run_in_executor", wraps=counter.run_in_executor) as mock_run:
+            assert await counter.count_async(text, "gpt-4o") == counter.count(text, "gpt-4o")
+            mock_run.assert_called_once()
+
+            # Short texts are encoded inline
+            assert await counter.count_async("hello world", "gpt-4o") == 2
+            mock_run.assert_called_once()
+
+            # Memoized texts do not need the thread pool
+            await counter.count_async(text, "gpt-4o")
+            mock_run.assert_called_once()
+        counter.shutdown()
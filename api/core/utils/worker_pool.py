@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import TypeVar, TypeVarTuple, Unpack
+
+_logger = logging.getLogger(__name__)
+
+_R = TypeVar("_R")
+_Ts = TypeVarTuple("_Ts")
+
+
+class WorkerPool:
+    """A lazily created pool for CPU bound work that should not run in the event loop.
+
+    When use_processes is true, functions run in worker processes so they must be
+    module level functions with picklable arguments and results. Threads are used
+    otherwise, e-g in tests so that patches apply."""
+
+    def __init__(self, name: str, max_workers: int, use_processes: bool = True):
+        self._name = name
+        self._max_workers = max_workers
+        self._use_processes = use_processes
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._use_processes:
+                # Forking a process that runs an event loop and threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=get_context("forkserver"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=self._name)
+        return self._executor
+
+    def submit(self, fn: Callable[[Unpack[_Ts]], _R], *args: Unpack[_Ts]) -> "asyncio.Future[_R]":
+        """Cancelling the returned future cancels the call if it has not started yet"""
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died, e-g killed by the OOM killer. The pool can not be reused
+            _logger.warning("Worker pool is broken, recreating it", extra={"pool": self._name})
+            self.shutdown()
+            future = self._get_executor().submit(fn, *args)
+        return asyncio.wrap_future(future)
+
+    async def run(self, fn: Callable[[Unpack[_Ts]], _R], *args: Unpack[_Ts]) -> _R:
+        return await self.submit(fn, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -175,6 +175,8 @@ async def integration_storage(
     if not no_truncate:
         assert int_clickhouse_client.connection_string.endswith("/db_test"), "DB Name must be db_test"
         await int_clickhouse_client.command("TRUNCATE TABLE runs;")
+        await int_clickhouse_client.command("TRUNCATE TABLE runs_daily;")
+        await int_clickhouse_client.command("TRUNCATE TABLE runs_by_cache_hash;")
 
         # Remove all data from all collections
         db = storage.client[_INT_DB_NAME]
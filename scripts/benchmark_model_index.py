@@ -0,0 +1,128 @@
+import time
+from collections.abc import Callable
+from typing import Annotated, Any
+
+import typer
+
+from api.services.models import ModelsService
+from core.domain.models import Model
+from core.domain.models.model_data import DeprecatedModel, FinalModelData, LatestModel, ModelData
+from core.domain.models.model_datas_mapping import MODEL_DATAS
+from core.domain.models.model_index import MODEL_INDEX
+from core.domain.task_typology import TaskTypology
+from core.tools import get_tools_in_instructions
+
+
+def _legacy_model_data(model: Model) -> FinalModelData:
+    data = MODEL_DATAS[model]
+    if isinstance(data, LatestModel):
+        return MODEL_DATAS[data.model]  # pyright: ignore [reportReturnType]
+    if isinstance(data, DeprecatedModel):
+        return MODEL_DATAS[data.replacement_model]  # pyright: ignore [reportReturnType]
+    return data
+
+
+def _legacy_model_for_task(model: Model, typology: TaskTypology, instructions: str):
+    """The listing before the index, walking MODEL_DATAS for every model"""
+    data = MODEL_DATAS[model]
+    if isinstance(data, DeprecatedModel):
+        return None
+    display_name = data.display_name
+    is_default = data.is_default
+    model_id = model
+    if isinstance(data, LatestModel):
+        model = data.model
+        data = MODEL_DATAS[data.model]
+        is_latest = True
+    else:
+        is_latest = data.latest_model is None
+    if not isinstance(data, ModelData):
+        return None
+    provider_data = data.provider_data_for_pricing()
+    if len(get_tools_in_instructions(instructions)) > 0 and data.supports_tool_calling is False:
+        is_not_supported_reason = f"{data.display_name} does not support tool calling"
+    else:
+        is_not_supported_reason = data.is_not_supported_reason(typology)
+    return ModelsService.ModelForTask(
+        id=model_id,
+        name=display_name,
+        icon_url=data.icon_url,
+        is_not_supported_reason=is_not_supported_reason,
+        modes=data.modes,
+        is_latest=is_latest,
+        is_default=is_default,
+        release_date=data.release_date,
+        quality_index=data.quality_index,
+        price_per_input_token_usd=provider_data.text_price.prompt_cost_per_token,
+        price_per_output_token_usd=provider_data.text_price.completion_cost_per_token,
+        context_window_tokens=data.max_tokens_data.max_tokens,
+        provider_name=data.provider_name,
+        providers=[p for p, _ in data.providers],
+    )
+
+
+def _legacy_pipeline(model: Model):
+    """The model data lookups of a ProviderPipeline before the index"""
+    data = _legacy_model_data(model)
+    for provider, provider_data in data.providers:
+        data.supported_by_provider(provider)
+        provider_data.override(data)
+
+
+def _indexed_pipeline(model: Model):
+    data = MODEL_INDEX.model_data(model)
+    for provider, _ in data.providers:
+        MODEL_INDEX.supported_by_provider(model, provider)
+        MODEL_INDEX.provider_model_data(model, provider)
+
+
+def _bench(fn: Callable[[], Any], iterations: int) -> float:
+    """Returns the average duration of a call in seconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def _main(
+    iterations: Annotated[int, typer.Option(help="Number of iterations per benchmark")] = 500,
+):
+    """Compares the model lookups of the models listing and of the provider pipeline
+    before and after the precomputed model index"""
+
+    models = list(Model)
+    typology = TaskTypology(has_image_in_input=True)
+
+    instructions = "Extract the name of the person"
+
+    def _legacy_listing():
+        return [m for model in models if (m := _legacy_model_for_task(model, typology, instructions))]
+
+    def _indexed_listing():
+        requires_tools = len(get_tools_in_instructions(instructions)) > 0
+        return [
+            m
+            for model in models
+            if (m := ModelsService._build_model_for_task(model, typology, None, requires_tools))  # pyright: ignore [reportPrivateUsage]
+        ]
+
+    assert _legacy_listing() == _indexed_listing(), "Listings differ"
+
+    print(f"{len(models)} models, {iterations} iterations")
+    print(f"{'Benchmark':<32} {'before µs':>12} {'after µs':>12} {'Speedup':>8}")
+    print("-" * 68)
+    for name, before, after in (
+        ("models listing", _legacy_listing, _indexed_listing),
+        (
+            "pipeline lookups (all models)",
+            lambda: [_legacy_pipeline(m) for m in models],
+            lambda: [_indexed_pipeline(m) for m in models],
+        ),
+    ):
+        baseline = _bench(before, iterations)
+        indexed = _bench(after, iterations)
+        print(f"{name:<32} {baseline * 1e6:>12.1f} {indexed * 1e6:>12.1f} {baseline / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    typer.run(_main)
@@ -0,0 +1,78 @@
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+from jsonschema import ValidationError, validate
+
+from core.domain.errors import JSONSchemaValidationError
+from core.domain.task_io import SerializableTaskIO
+from core.utils.schemas import make_optional
+
+_FIXTURES_DIR = Path(__file__).parent.parent / "api" / "tests" / "fixtures" / "jsonschemas"
+
+_DEFAULTS: dict[str, Any] = {"string": "hello", "integer": 1, "number": 1.5, "boolean": True, "null": None}
+
+
+def _sample(schema: dict[str, Any], defs: dict[str, Any]) -> Any:
+    """Builds an object that matches the schema from its examples, enums and types"""
+    if ref := schema.get("$ref"):
+        return _sample(defs[ref.split("/")[-1]], defs)
+    if examples := schema.get("examples"):
+        return examples[0]
+    if enum := schema.get("enum"):
+        return enum[0]
+    if sub := schema.get("anyOf") or schema.get("oneOf") or schema.get("allOf"):
+        return _sample(sub[0], defs)
+
+    match schema.get("type"):
+        case "object":
+            properties: dict[str, Any] = schema.get("properties", {})
+            return {k: _sample(v, defs) for k, v in properties.items()}
+        case "array":
+            return [_sample(schema.get("items", {}), defs) for _ in range(3)]
+        case str() as t:
+            return _DEFAULTS.get(t)
+        case _:
+            return None
+
+
+def _bench(fn: Callable[[], Any], iterations: int) -> float:
+    """Returns the average duration of a call in seconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            fn()
+        except (ValidationError, JSONSchemaValidationError):
+            # Sampled objects do not always match, the failure path is benchmarked as well
+            pass
+    return (time.perf_counter() - start) / iterations
+
+
+def _main(
+    iterations: Annotated[int, typer.Option(help="Number of validations per fixture")] = 2000,
+):
+    """Compares jsonschema.validate, which compiles a validator on every call, with
+    SerializableTaskIO.enforce, which reuses a validator per schema version"""
+
+    print(f"{'Fixture':<32} {'Partial':>8} {'validate µs':>12} {'enforce µs':>12} {'Speedup':>8}")
+    print("-" * 76)
+    for fixture in sorted(_FIXTURES_DIR.glob("*.json")):
+        with fixture.open() as f:
+            schema: dict[str, Any] = json.load(f)
+        task_io = SerializableTaskIO.from_json_schema(schema)
+        obj = _sample(schema, schema.get("$defs", {}))
+
+        for partial in (False, True):
+            raw_schema = make_optional(schema) if partial else schema
+            baseline = _bench(lambda: validate(obj, raw_schema), iterations)  # noqa: B023
+            cached = _bench(lambda: task_io.enforce(obj, partial=partial), iterations)  # noqa: B023
+            print(
+                f"{fixture.name:<32} {partial!s:>8} {baseline * 1e6:>12.1f} {cached * 1e6:>12.1f} {baseline / cached:>7.1f}x",
+            )
+
+
+if __name__ == "__main__":
+    typer.run(_main)
@@ -0,0 +1,65 @@
+import json
+import time
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from core.utils.streams import JSONStreamError, JSONStreamParser
+
+_FIXTURES_DIR = Path(__file__).parent.parent / "api" / "tests" / "fixtures" / "streams"
+
+
+def _rechunk(chunks: list[str], chunk_size: int | None) -> list[str]:
+    if chunk_size is None:
+        return chunks
+    raw = "".join(chunks)
+    return [raw[i : i + chunk_size] for i in range(0, len(raw), chunk_size)]
+
+
+def _parse(chunks: list[str]):
+    parser = JSONStreamParser()
+    try:
+        for chunk in chunks:
+            parser.process_chunk(chunk)
+    except JSONStreamError:
+        # Some fixtures are invalid on purpose
+        pass
+
+
+def _bench(chunks: list[str], iterations: int) -> float:
+    """Returns the average duration of a full parse in seconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _parse(chunks)
+    return (time.perf_counter() - start) / iterations
+
+
+def _main(
+    iterations: Annotated[int, typer.Option(help="Number of parses per fixture and chunk size")] = 200,
+    chunk_sizes: Annotated[
+        list[int] | None,
+        typer.Option("--chunk-size", help="Re-chunk fixtures with the given sizes, in chars"),
+    ] = None,
+):
+    """Micro benchmark of the JSONStreamParser over the stream fixtures"""
+    sizes: list[int | None] = [None, *(chunk_sizes or [4, 16, 256])]
+
+    print(f"{'Fixture':<32} {'Chunking':>10} {'Chunks':>8} {'ms/parse':>10} {'MB/s':>8}")
+    print("-" * 72)
+    for fixture in sorted(_FIXTURES_DIR.glob("*.json")):
+        with fixture.open() as f:
+            raw_chunks: list[str] = json.load(f)
+        size = len("".join(raw_chunks))
+
+        for chunk_size in sizes:
+            chunks = _rechunk(raw_chunks, chunk_size)
+            duration = _bench(chunks, iterations)
+            label = "fixture" if chunk_size is None else str(chunk_size)
+            print(
+                f"{fixture.name:<32} {label:>10} {len(chunks):>8} {duration * 1000:>10.3f} {size / duration / 1e6:>8.2f}",
+            )
+
+
+if __name__ == "__main__":
+    typer.run(_main)